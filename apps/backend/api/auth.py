@@ -9,6 +9,16 @@ from fastapi import APIRouter, HTTPException, Header
 from pydantic import BaseModel
 
 from .database import get_db_context
+from .token_cache import (
+    cache_user_id,
+    create_signed_token,
+    get_cached_user_id,
+    invalidate_token,
+    is_signed_token,
+    signing_enabled,
+    token_expiry_cutoff,
+    verify_signed_token,
+)
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
@@ -29,8 +39,10 @@ def verify_password(password: str, hashed: str) -> bool:
         return False
 
 
-def generate_token() -> str:
-    """生成随机 token"""
+def generate_token(user_id: str) -> str:
+    """生成 token（配置 AUTH_SIGNING_SECRET 时为签名 token，否则为随机 token）"""
+    if signing_enabled():
+        return create_signed_token(user_id)
     return secrets.token_hex(32)
 
 
@@ -67,13 +79,13 @@ async def register(data: RegisterRequest):
     if len(data.password) < 4:
         raise HTTPException(status_code=400, detail="密码至少需要4个字符")
 
-    with get_db_context() as conn:
+    async with get_db_context() as conn:
         # 检查用户名是否已存在
-        cursor = conn.execute(
+        cursor = await conn.execute(
             "SELECT id FROM users WHERE username = %s",
             (data.username,)
         )
-        if cursor.fetchone():
+        if await cursor.fetchone():
             raise HTTPException(status_code=400, detail="用户名已存在")
 
         # 创建用户
@@ -81,19 +93,19 @@ async def register(data: RegisterRequest):
         password_hash = hash_password(data.password)
         now = datetime.now()
 
-        conn.execute(
+        await conn.execute(
             "INSERT INTO users (id, username, password_hash, created_at) VALUES (%s, %s, %s, %s)",
             (user_id, data.username, password_hash, now)
         )
 
         # 创建 token
-        token = generate_token()
-        conn.execute(
+        token = generate_token(user_id)
+        await conn.execute(
             "INSERT INTO tokens (token, user_id, created_at) VALUES (%s, %s, %s)",
             (token, user_id, now)
         )
 
-        conn.commit()
+        await conn.commit()
 
     return AuthResponse(user_id=user_id, username=data.username, token=token)
 
@@ -101,33 +113,41 @@ async def register(data: RegisterRequest):
 @router.post("/login", response_model=AuthResponse)
 async def login(data: LoginRequest):
     """用户登录"""
-    with get_db_context() as conn:
-        cursor = conn.execute(
+    async with get_db_context() as conn:
+        cursor = await conn.execute(
             "SELECT id, username, password_hash FROM users WHERE username = %s",
             (data.username,)
         )
-        user = cursor.fetchone()
+        user = await cursor.fetchone()
 
         if not user or not verify_password(data.password, user["password_hash"]):
             raise HTTPException(status_code=401, detail="用户名或密码错误")
 
-        # 查找已有 token，如果没有则创建新的
-        cursor = conn.execute(
-            "SELECT token FROM tokens WHERE user_id = %s LIMIT 1",
-            (user["id"],)
-        )
-        existing = cursor.fetchone()
+        # 签名 token 有有效期，每次登录签发新的并清理已过期的记录；
+        # 随机 token 不过期，复用已有的
+        existing = None
+        if signing_enabled():
+            await conn.execute(
+                "DELETE FROM tokens WHERE user_id = %s AND token LIKE 'v1.%%' AND created_at < %s",
+                (user["id"], token_expiry_cutoff())
+            )
+        else:
+            cursor = await conn.execute(
+                "SELECT token FROM tokens WHERE user_id = %s AND token NOT LIKE 'v1.%%' LIMIT 1",
+                (user["id"],)
+            )
+            existing = await cursor.fetchone()
 
         if existing:
             token = existing["token"]
         else:
-            token = generate_token()
+            token = generate_token(user["id"])
             now = datetime.now()
-            conn.execute(
+            await conn.execute(
                 "INSERT INTO tokens (token, user_id, created_at) VALUES (%s, %s, %s)",
                 (token, user["id"], now)
             )
-            conn.commit()
+        await conn.commit()
 
     return AuthResponse(user_id=user["id"], username=user["username"], token=token)
 
@@ -139,9 +159,10 @@ async def logout(authorization: Optional[str] = Header(None)):
         return {"success": True}
 
     token = authorization.replace("Bearer ", "")
-    with get_db_context() as conn:
-        conn.execute("DELETE FROM tokens WHERE token = %s", (token,))
-        conn.commit()
+    invalidate_token(token)
+    async with get_db_context() as conn:
+        await conn.execute("DELETE FROM tokens WHERE token = %s", (token,))
+        await conn.commit()
 
     return {"success": True}
 
@@ -153,14 +174,17 @@ async def get_current_user(authorization: Optional[str] = Header(None)):
         raise HTTPException(status_code=401, detail="未登录")
 
     token = authorization.replace("Bearer ", "")
-    with get_db_context() as conn:
-        cursor = conn.execute("""
+    if is_signed_token(token) and not verify_signed_token(token):
+        raise HTTPException(status_code=401, detail="登录已过期")
+
+    async with get_db_context() as conn:
+        cursor = await conn.execute("""
             SELECT u.id, u.username
             FROM users u
             JOIN tokens t ON u.id = t.user_id
             WHERE t.token = %s
         """, (token,))
-        user = cursor.fetchone()
+        user = await cursor.fetchone()
 
     if not user:
         raise HTTPException(status_code=401, detail="登录已过期")
@@ -168,17 +192,32 @@ async def get_current_user(authorization: Optional[str] = Header(None)):
     return UserInfo(user_id=user["id"], username=user["username"])
 
 
-def get_user_from_token(authorization: Optional[str]) -> Optional[str]:
-    """从 token 获取 user_id（供其他模块使用）"""
+async def get_user_from_token(authorization: Optional[str]) -> Optional[str]:
+    """从 token 获取 user_id（供其他模块使用）
+
+    签名 token 只做签名校验（无效、过期或已吊销直接拒绝，不查询数据库）；
+    其他 token 先查进程内缓存，未命中时才查询数据库。
+    """
     if not authorization:
         return None
 
     token = authorization.replace("Bearer ", "")
-    with get_db_context() as conn:
-        cursor = conn.execute(
+    if is_signed_token(token):
+        return verify_signed_token(token)
+
+    user_id = get_cached_user_id(token)
+    if user_id:
+        return user_id
+
+    async with get_db_context() as conn:
+        cursor = await conn.execute(
             "SELECT user_id FROM tokens WHERE token = %s",
             (token,)
         )
-        result = cursor.fetchone()
+        result = await cursor.fetchone()
+
+    if not result:
+        return None
 
-    return result["user_id"] if result else None
+    cache_user_id(token, result["user_id"])
+    return result["user_id"]
@@ -0,0 +1,190 @@
+"""PDF 解析结果缓存
+
+用户经常重复上传同一份简历。解析结果按
+SHA-256(文件字节) + 提示词版本 缓存到本地 SQLite，重复上传直接返回，
+不再执行文本提取和 LLM 调用。
+
+- 提示词或模型变化时版本号随之变化，旧条目自然失效
+- 按 markdown 字节数统计总大小，超过 PDF_CACHE_MAX_BYTES 时按最近访问时间淘汰
+- SQLite 操作通过 asyncio.to_thread 执行，不阻塞事件循环
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# 缓存配置（路径留空则不启用）
+PDF_CACHE_PATH = os.getenv("PDF_CACHE_PATH", "./data/pdf_cache.db")
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+def make_cache_key(content: bytes, prompt_version: str) -> str:
+    """缓存 key：文件内容哈希 + 提示词版本"""
+    return f"{hashlib.sha256(content).hexdigest()}:{prompt_version}"
+
+
+class PdfParseCache:
+    """PDF 解析结果缓存"""
+
+    def __init__(self, db_path: str | None = PDF_CACHE_PATH, max_bytes: int = PDF_CACHE_MAX_BYTES):
+        self._db_path = db_path or None
+        self._max_bytes = max_bytes
+        self._conn: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()
+        self._db_failed = False
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._db_path is not None and not self._db_failed
+
+    async def get(self, key: str) -> dict[str, Any] | None:
+        """获取缓存的解析结果 {"markdown", "pages"}"""
+        result = await self._run_db(self._db_get, key)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    async def put(self, key: str, result: dict[str, Any]) -> None:
+        evicted = await self._run_db(self._db_put, key, result["markdown"], result["pages"])
+        if evicted:
+            self.evictions += evicted
+
+    def get_stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "errors": self.errors,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ==================== SQLite ====================
+
+    async def _run_db(self, fn: Any, *args: Any) -> Any:
+        if not self.enabled:
+            return None
+        try:
+            return await asyncio.to_thread(fn, *args)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"PDF 缓存读写失败: {e}")
+            return None
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            assert self._db_path is not None
+            try:
+                Path(self._db_path).parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(self._db_path, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS pdf_cache (
+                        key TEXT PRIMARY KEY,
+                        markdown TEXT NOT NULL,
+                        pages INTEGER NOT NULL,
+                        size INTEGER NOT NULL,
+                        created_at REAL NOT NULL,
+                        accessed_at REAL NOT NULL
+                    )
+                """)
+                conn.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_pdf_cache_accessed_at
+                    ON pdf_cache(accessed_at)
+                """)
+                conn.commit()
+            except Exception:
+                # 持久化不可用时直接关闭缓存
+                self._db_failed = True
+                raise
+            self._conn = conn
+            logger.info(f"PDF 解析缓存已启用: {self._db_path}")
+        return self._conn
+
+    def _db_get(self, key: str) -> dict[str, Any] | None:
+        with self._db_lock:
+            conn = self._get_conn()
+            row = conn.execute(
+                "SELECT markdown, pages FROM pdf_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE pdf_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+        return {"markdown": row[0], "pages": row[1]}
+
+    def _db_put(self, key: str, markdown: str, pages: int) -> int:
+        """写入条目并按总大小淘汰，返回淘汰条数"""
+        size = len(markdown.encode("utf-8"))
+        now = time.time()
+        with self._db_lock:
+            conn = self._get_conn()
+            conn.execute(
+                """
+                INSERT INTO pdf_cache (key, markdown, pages, size, created_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    markdown = excluded.markdown,
+                    pages = excluded.pages,
+                    size = excluded.size,
+                    accessed_at = excluded.accessed_at
+                """,
+                (key, markdown, pages, size, now, now),
+            )
+
+            evicted = 0
+            (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM pdf_cache").fetchone()
+            if total > self._max_bytes:
+                rows = conn.execute(
+                    "SELECT key, size FROM pdf_cache WHERE key != ? ORDER BY accessed_at ASC",
+                    (key,),
+                ).fetchall()
+                stale: list[str] = []
+                for old_key, old_size in rows:
+                    if total <= self._max_bytes:
+                        break
+                    stale.append(old_key)
+                    total -= old_size
+                conn.executemany("DELETE FROM pdf_cache WHERE key = ?", [(k,) for k in stale])
+                evicted = len(stale)
+            conn.commit()
+        return evicted
+
+
+# 进程级缓存实例
+_cache: PdfParseCache | None = None
+
+
+def get_pdf_cache() -> PdfParseCache:
+    """获取进程级 PDF 解析缓存"""
+    global _cache
+    if _cache is None:
+        _cache = PdfParseCache()
+    return _cache
+
+
+def close_pdf_cache() -> None:
+    """关闭 SQLite 连接（应用退出时调用）"""
+    if _cache is not None:
+        _cache.close()
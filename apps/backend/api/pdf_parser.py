@@ -0,0 +1,320 @@
+"""PDF 简历解析
+
+/api/parse-pdf 的处理流水线：
+1. 文本提取（pymupdf4llm，CPU 密集）在有界进程池中执行，不阻塞事件循环
+2. LLM 将提取结果整理为结构化 Markdown，复用进程级 ChatOpenAI 客户端
+
+解析结果按文件内容哈希 + PROMPT_VERSION 缓存（见 pdf_cache），
+同一文件的并发请求只解析一次：解析在独立任务中执行，请求取消不影响其他等待者。
+
+进程池在 FastAPI lifespan 中创建/关闭。排队任务数超过 PDF_MAX_PENDING 时
+直接拒绝（PdfParserBusyError），单个提取任务超过 PDF_EXTRACT_TIMEOUT 时报超时。
+工作进程崩溃（BrokenProcessPool）后重建进程池，并在新进程池中重试一次
+（一个工作进程崩溃会连带结束同一进程池中的其他任务）；任务超时后进程池被替换，
+旧进程池在其余任务完成后强制结束卡住的工作进程并释放名额。
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable
+
+from config.app_config import config
+
+from .pdf_cache import close_pdf_cache, get_pdf_cache, make_cache_key
+
+logger = logging.getLogger(__name__)
+
+# 进程池配置
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", "2"))
+# 允许同时存在的提取任务数（执行中 + 排队中）
+PDF_MAX_PENDING = int(os.getenv("PDF_MAX_PENDING", "8"))
+# 单个提取任务超时（秒）
+PDF_EXTRACT_TIMEOUT = float(os.getenv("PDF_EXTRACT_TIMEOUT", "30"))
+
+PROMPT_TEMPLATE = """请将以下简历内容转换为结构清晰的 Markdown 格式。
+
+要求：
+1. 使用 # 作为姓名/主标题
+2. 使用 ## 作为各个板块标题（如：教育背景、工作经历、项目经验、技能等）
+3. 使用 ### 作为子标题（如：公司名称、项目名称）
+4. 使用 **粗体** 突出重要信息（如：职位、时间、技术栈）
+5. 使用 - 列表展示具体内容
+6. 保持原有信息完整，不要添加或删除内容
+7. 直接输出 Markdown 内容，不要添加任何解释
+
+简历原文：
+{raw_text}
+
+Markdown 格式简历："""
+
+# LLM 整理使用的模型
+LLM_MODEL = config.openai_api_key and "gpt-4o-mini" or "deepseek-chat"
+
+# 提示词版本：提示词或模型变化时自动变化，使旧缓存失效
+PROMPT_VERSION = hashlib.sha256(f"{LLM_MODEL}\n{PROMPT_TEMPLATE}".encode("utf-8")).hexdigest()[:12]
+
+
+class PdfParserBusyError(Exception):
+    """提取任务排队已满"""
+
+
+class PdfExtractTimeoutError(Exception):
+    """提取任务超时"""
+
+
+def extract_pdf_text(content: bytes) -> tuple[str, int]:
+    """提取 PDF 文本（在工作进程中执行）
+
+    Returns:
+        (Markdown 格式的原始文本, 页数)
+    """
+    import fitz  # pymupdf
+    import pymupdf4llm
+
+    with fitz.open(stream=content, filetype="pdf") as doc:
+        num_pages = len(doc)
+        raw_text = pymupdf4llm.to_markdown(doc, pages=list(range(num_pages)))
+    return raw_text, num_pages
+
+
+# ==================== 进程池 ====================
+
+
+class _WorkerPool:
+    """一代进程池：崩溃或有任务超时后整体替换"""
+
+    def __init__(self, workers: int):
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.jobs = 0  # 已提交未结束的任务
+        self.hung = 0  # 已超时但仍在工作进程中执行的任务
+        self.retired = False
+
+    def retire(self) -> None:
+        """不再接收新任务；只剩卡住的任务时强制结束工作进程"""
+        self.retired = True
+        if self.jobs == 0:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        elif self.jobs == self.hung:
+            self.terminate()
+
+    def terminate(self) -> None:
+        """结束所有工作进程，未完成的任务以 BrokenProcessPool 结束（名额随之释放）"""
+        terminate_workers = getattr(self.executor, "terminate_workers", None)
+        if terminate_workers is not None:  # Python 3.14+
+            terminate_workers()
+            return
+        # 更早的版本没有公开接口，直接结束工作进程
+        for process in list((self.executor._processes or {}).values()):
+            process.terminate()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool: _WorkerPool | None = None
+_pending = 0
+_restarts = 0
+
+
+@asynccontextmanager
+async def open_pdf_executor() -> AsyncIterator[None]:
+    """创建 PDF 提取进程池（应用生命周期内使用），退出时一并关闭解析缓存"""
+    global _pool
+    _pool = _WorkerPool(PDF_WORKERS)
+    logger.info(f"PDF 解析进程池已启动: workers={PDF_WORKERS}, max_pending={PDF_MAX_PENDING}")
+    try:
+        yield
+    finally:
+        pool, _pool = _pool, None
+        pool.executor.shutdown(wait=False, cancel_futures=True)
+        close_pdf_cache()
+        logger.info("PDF 解析进程池已关闭")
+
+
+def _replace_pool(pool: _WorkerPool, reason: str) -> None:
+    """用新进程池替换 pool 并让其退役（pool 已被替换时只重新检查是否可以结束）"""
+    global _pool, _restarts
+    if pool is _pool:
+        _pool = _WorkerPool(PDF_WORKERS)
+        _restarts += 1
+        logger.warning(f"PDF 解析进程池已重建: {reason}")
+    pool.retire()
+
+
+def _job_finished(pool: _WorkerPool, hung: bool) -> None:
+    global _pending
+    _pending -= 1
+    pool.jobs -= 1
+    if hung:
+        pool.hung -= 1
+    if pool.retired:
+        pool.retire()
+
+
+def _submit(pool: _WorkerPool, fn: Callable[..., Any], *args: Any) -> Future:
+    global _pending
+    future = pool.executor.submit(fn, *args)
+    _pending += 1
+    pool.jobs += 1
+    return future
+
+
+async def _run_job(fn: Callable[..., Any], *args: Any) -> Any:
+    """在进程池中执行 fn(*args)
+
+    工作进程崩溃时进程池已重建，在新进程池中重试一次；再次崩溃则抛出 BrokenProcessPool。
+    """
+    if _pending >= PDF_MAX_PENDING:
+        raise PdfParserBusyError(f"PDF 解析任务过多（{_pending}），请稍后重试")
+
+    try:
+        return await _run_on_pool(fn, *args)
+    except BrokenProcessPool:
+        logger.warning("PDF 工作进程异常退出，在新进程池中重试一次")
+        return await _run_on_pool(fn, *args)
+
+
+async def _run_on_pool(fn: Callable[..., Any], *args: Any) -> Any:
+    """在当前进程池中执行一次 fn(*args)
+
+    超时的任务如果还在排队则直接取消；已在执行的任务无法中断，
+    此时替换进程池，旧进程池在其余任务结束后强制结束卡住的工作进程。
+    任务名额在任务真正结束（完成、取消或工作进程被结束）后才释放。
+    """
+    pool = _pool
+    if pool is None:
+        raise RuntimeError("PDF 解析进程池未初始化，请在应用 lifespan 中调用 open_pdf_executor()")
+
+    try:
+        future = _submit(pool, fn, *args)
+    except BrokenProcessPool:
+        _replace_pool(pool, "提交任务时进程池已损坏")
+        pool = _pool
+        future = _submit(pool, fn, *args)
+
+    loop = asyncio.get_running_loop()
+    hung = False
+
+    def on_done(_: Future) -> None:
+        # 回调在进程池管理线程中触发，计数回到事件循环线程修改
+        try:
+            loop.call_soon_threadsafe(_job_finished, pool, hung)
+        except RuntimeError:
+            pass  # 事件循环已关闭
+
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout=PDF_EXTRACT_TIMEOUT)
+    except asyncio.TimeoutError:
+        if future.running():
+            hung = True
+            pool.hung += 1
+            _replace_pool(pool, "提取任务超时")
+        raise PdfExtractTimeoutError(f"PDF 文本提取超时（>{PDF_EXTRACT_TIMEOUT:g} 秒）") from None
+    except BrokenProcessPool:
+        _replace_pool(pool, "工作进程异常退出")
+        raise
+    finally:
+        future.add_done_callback(on_done)
+
+
+async def run_extract(content: bytes) -> tuple[str, int]:
+    """提交提取任务到进程池
+
+    Raises:
+        PdfParserBusyError: 排队任务已满
+        PdfExtractTimeoutError: 提取超时
+        BrokenProcessPool: 重试后工作进程仍然崩溃（进程池已重建）
+    """
+    return await _run_job(extract_pdf_text, content)
+
+
+# ==================== LLM 整理 ====================
+
+_llm: Any = None
+
+
+def _get_llm() -> Any:
+    """进程级复用的 ChatOpenAI 客户端（连接池随客户端复用）"""
+    global _llm
+    if _llm is None:
+        from langchain_openai import ChatOpenAI
+
+        _llm = ChatOpenAI(
+            model=LLM_MODEL,
+            base_url=config.openai_api_base,
+            api_key=config.openai_api_key,
+            temperature=0,
+        )
+    return _llm
+
+
+async def restructure_markdown(raw_text: str) -> str:
+    """使用 LLM 将提取文本转换为结构化 Markdown"""
+    response = await _get_llm().ainvoke(PROMPT_TEMPLATE.format(raw_text=raw_text))
+    md_content = response.content
+
+    # 清理可能的代码块标记
+    md_content = re.sub(r'^```markdown\s*', '', md_content)
+    md_content = re.sub(r'^```\s*', '', md_content)
+    md_content = re.sub(r'\s*```$', '', md_content)
+    return md_content
+
+
+# 正在解析的文件（同一 key 的并发请求共享同一个解析任务）
+_inflight: dict[str, asyncio.Task[dict[str, Any]]] = {}
+
+
+async def parse_pdf_bytes(content: bytes) -> dict[str, Any]:
+    """解析 PDF 字节流为结构化 Markdown（命中缓存时直接返回）
+
+    解析任务与请求解耦：发起解析的请求被取消（如客户端断开）时，
+    任务继续执行，其他等待同一文件的请求照常拿到结果，结果也照常写入缓存。
+
+    Returns:
+        {"markdown": str, "pages": int}
+    """
+    key = make_cache_key(content, PROMPT_VERSION)
+    cache = get_pdf_cache()
+
+    cached = await cache.get(key)
+    if cached is not None:
+        return cached
+
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_parse_and_cache(key, content))
+        _inflight[key] = task
+        task.add_done_callback(lambda done: _parse_finished(key, done))
+    return await asyncio.shield(task)
+
+
+async def _parse_and_cache(key: str, content: bytes) -> dict[str, Any]:
+    raw_text, num_pages = await run_extract(content)
+    md_content = await restructure_markdown(raw_text)
+    result = {"markdown": md_content, "pages": num_pages}
+    await get_pdf_cache().put(key, result)
+    return result
+
+
+def _parse_finished(key: str, task: asyncio.Task[dict[str, Any]]) -> None:
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    if not task.cancelled():
+        task.exception()  # 等待者都已取消时避免 "exception was never retrieved"
+
+
+def get_pdf_parser_stats() -> dict[str, Any]:
+    """进程池状态（供 /metrics 使用）"""
+    return {
+        "workers": PDF_WORKERS,
+        "pending": _pending,
+        "max_pending": PDF_MAX_PENDING,
+        "restarts": _restarts,
+        "inflight": len(_inflight),
+        "prompt_version": PROMPT_VERSION,
+        "cache": get_pdf_cache().get_stats(),
+    }
@@ -39,14 +39,14 @@ class SessionListItem(BaseModel):
 @router.post("", response_model=SessionResponse)
 async def create_session(data: SessionCreate, authorization: Optional[str] = Header(None)):
     """创建或更新会话元数据"""
-    user_id = get_user_from_token(authorization)
+    user_id = await get_user_from_token(authorization)
     if not user_id:
         raise HTTPException(status_code=401, detail="未登录或登录已过期")
     now = datetime.now()
 
-    with get_db_context() as conn:
+    async with get_db_context() as conn:
         # PostgreSQL UPSERT 语法
-        conn.execute("""
+        await conn.execute("""
             INSERT INTO sessions (thread_id, user_id, filename, resume_content, created_at, updated_at)
             VALUES (%s, %s, %s, %s, %s, %s)
             ON CONFLICT (thread_id) DO UPDATE SET
@@ -54,7 +54,7 @@ async def create_session(data: SessionCreate, authorization: Optional[str] = Hea
                 resume_content = EXCLUDED.resume_content,
                 updated_at = EXCLUDED.updated_at
         """, (data.thread_id, user_id, data.filename, data.resume_content, now, now))
-        conn.commit()
+        await conn.commit()
 
     return SessionResponse(
         thread_id=data.thread_id,
@@ -68,12 +68,12 @@ async def create_session(data: SessionCreate, authorization: Optional[str] = Hea
 @router.get("", response_model=list[SessionListItem])
 async def list_sessions(limit: int = 50, offset: int = 0, authorization: Optional[str] = Header(None)):
     """获取当前用户的会话列表（不含简历内容，节省带宽）"""
-    user_id = get_user_from_token(authorization)
+    user_id = await get_user_from_token(authorization)
     if not user_id:
         raise HTTPException(status_code=401, detail="未登录或登录已过期")
 
-    with get_db_context() as conn:
-        cursor = conn.execute("""
+    async with get_db_context() as conn:
+        cursor = await conn.execute("""
             SELECT thread_id, filename, created_at, updated_at
             FROM sessions
             WHERE user_id = %s
@@ -88,7 +88,7 @@ async def list_sessions(limit: int = 50, offset: int = 0, authorization: Optiona
                 created_at=row["created_at"].isoformat() if hasattr(row["created_at"], 'isoformat') else str(row["created_at"]),
                 updated_at=row["updated_at"].isoformat() if hasattr(row["updated_at"], 'isoformat') else str(row["updated_at"]),
             )
-            for row in cursor.fetchall()
+            for row in await cursor.fetchall()
         ]
 
     return sessions
@@ -97,18 +97,18 @@ async def list_sessions(limit: int = 50, offset: int = 0, authorization: Optiona
 @router.get("/{thread_id}", response_model=SessionResponse)
 async def get_session(thread_id: str, authorization: Optional[str] = Header(None)):
     """获取单个会话详情（含简历内容）"""
-    user_id = get_user_from_token(authorization)
+    user_id = await get_user_from_token(authorization)
     if not user_id:
         raise HTTPException(status_code=401, detail="未登录或登录已过期")
 
-    with get_db_context() as conn:
-        cursor = conn.execute("""
+    async with get_db_context() as conn:
+        cursor = await conn.execute("""
             SELECT thread_id, filename, resume_content, created_at, updated_at
             FROM sessions
             WHERE thread_id = %s AND user_id = %s
         """, (thread_id, user_id))
 
-        row = cursor.fetchone()
+        row = await cursor.fetchone()
 
     if not row:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -125,16 +125,16 @@ async def get_session(thread_id: str, authorization: Optional[str] = Header(None
 @router.delete("/{thread_id}")
 async def delete_session(thread_id: str, authorization: Optional[str] = Header(None)):
     """删除会话"""
-    user_id = get_user_from_token(authorization)
+    user_id = await get_user_from_token(authorization)
     if not user_id:
         raise HTTPException(status_code=401, detail="未登录或登录已过期")
 
-    with get_db_context() as conn:
-        cursor = conn.execute(
+    async with get_db_context() as conn:
+        cursor = await conn.execute(
             "DELETE FROM sessions WHERE thread_id = %s AND user_id = %s",
             (thread_id, user_id)
         )
-        conn.commit()
+        await conn.commit()
         deleted = cursor.rowcount > 0
 
     if not deleted:
@@ -156,16 +156,16 @@ class UserPreferences(BaseModel):
 @prefs_router.get("", response_model=UserPreferences)
 async def get_preferences(authorization: Optional[str] = Header(None)):
     """获取用户偏好"""
-    user_id = get_user_from_token(authorization)
+    user_id = await get_user_from_token(authorization)
     if not user_id:
         raise HTTPException(status_code=401, detail="未登录或登录已过期")
 
-    with get_db_context() as conn:
-        cursor = conn.execute(
+    async with get_db_context() as conn:
+        cursor = await conn.execute(
             "SELECT target_job, style FROM user_preferences WHERE user_id = %s",
             (user_id,)
         )
-        row = cursor.fetchone()
+        row = await cursor.fetchone()
 
     if not row:
         return UserPreferences()
@@ -176,12 +176,12 @@ async def get_preferences(authorization: Optional[str] = Header(None)):
 @prefs_router.put("")
 async def update_preferences(data: UserPreferences, authorization: Optional[str] = Header(None)):
     """更新用户偏好"""
-    user_id = get_user_from_token(authorization)
+    user_id = await get_user_from_token(authorization)
     if not user_id:
         raise HTTPException(status_code=401, detail="未登录或登录已过期")
 
-    with get_db_context() as conn:
-        conn.execute("""
+    async with get_db_context() as conn:
+        await conn.execute("""
             INSERT INTO user_preferences (user_id, target_job, style, updated_at)
             VALUES (%s, %s, %s, NOW())
             ON CONFLICT (user_id) DO UPDATE SET
@@ -189,6 +189,6 @@ async def update_preferences(data: UserPreferences, authorization: Optional[str]
                 style = EXCLUDED.style,
                 updated_at = NOW()
         """, (user_id, data.target_job, data.style))
-        conn.commit()
+        await conn.commit()
 
     return {"success": True}
@@ -0,0 +1,158 @@
+"""Token 认证缓存
+
+前端会频繁轮询 /api/sessions、/api/preferences，每次都要把 token 解析为 user_id。
+这里提供两种免查库的方式：
+- 进程内 TTL + LRU 缓存：token → user_id，登出时显式失效
+- 可选的签名 token（配置 AUTH_SIGNING_SECRET 后启用）：token 自带 user_id 和签发时间，
+  HMAC 校验通过即可认证，不需要访问数据库
+
+签名 token 仍会写入 tokens 表（/me 查询依赖它），每次登录签发新 token。
+签名无效或超过 AUTH_TOKEN_MAX_AGE 的签名 token 直接拒绝，不回退到数据库查询。
+登出时除删除数据库记录外还会记入本进程的吊销列表。多进程部署下吊销只在处理登出请求的
+进程内立即生效，其他进程最迟在 AUTH_TOKEN_MAX_AGE 后拒绝该 token。
+
+随机 token 同理：登出只清除本进程的缓存，其他进程已缓存的 token → user_id
+在 AUTH_CACHE_TTL 到期前仍然有效。多进程部署需要登出立即全局生效时，
+应调小 AUTH_CACHE_TTL（设为 0 即不缓存）。
+"""
+
+import hashlib
+import hmac
+import os
+import secrets
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+# 缓存配置（AUTH_CACHE_TTL 同时是多进程下随机 token 登出后的最长残留时间）
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "300"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+
+# 签名 token 配置（不配置密钥则不启用）
+AUTH_SIGNING_SECRET = os.getenv("AUTH_SIGNING_SECRET", "")
+AUTH_TOKEN_MAX_AGE = int(os.getenv("AUTH_TOKEN_MAX_AGE", str(30 * 24 * 3600)))
+
+_SIGNED_TOKEN_PREFIX = "v1"
+
+
+class TTLCache:
+    """有界 TTL 缓存（超出容量时淘汰最久未使用的条目）"""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: Any, ttl: float | None = None) -> None:
+        self._data[key] = (time.monotonic() + (self._ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self._max_entries:
+            self._data.popitem(last=False)
+
+    def pop(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# 进程级缓存实例
+_token_cache = TTLCache(ttl=AUTH_CACHE_TTL, max_entries=AUTH_CACHE_MAX_ENTRIES)
+_revoked_tokens = TTLCache(ttl=AUTH_TOKEN_MAX_AGE, max_entries=AUTH_CACHE_MAX_ENTRIES)
+
+
+def get_cached_user_id(token: str) -> Optional[str]:
+    """从缓存获取 user_id（未命中返回 None）"""
+    return _token_cache.get(token)
+
+
+def cache_user_id(token: str, user_id: str) -> None:
+    _token_cache.put(token, user_id)
+
+
+def invalidate_token(token: str) -> None:
+    """登出时调用：移除缓存，签名 token 同时记入吊销列表
+
+    只作用于当前进程，其他进程的缓存见模块说明。
+    """
+    _token_cache.pop(token)
+    if is_signed_token(token):
+        _revoked_tokens.put(token, True)
+
+
+# ==================== 签名 token ====================
+
+
+def signing_enabled() -> bool:
+    return bool(AUTH_SIGNING_SECRET)
+
+
+def _sign(payload: str) -> str:
+    return hmac.new(AUTH_SIGNING_SECRET.encode(), payload.encode(), hashlib.sha256).hexdigest()
+
+
+def create_signed_token(user_id: str) -> str:
+    """生成签名 token: v1.<user_id>.<签发时间>.<随机数>.<签名>"""
+    payload = f"{_SIGNED_TOKEN_PREFIX}.{user_id}.{int(time.time()):x}.{secrets.token_hex(8)}"
+    return f"{payload}.{_sign(payload)}"
+
+
+def token_expiry_cutoff() -> datetime:
+    """签发时间早于该时刻的签名 token 已过期"""
+    return datetime.now() - timedelta(seconds=AUTH_TOKEN_MAX_AGE)
+
+
+def is_signed_token(token: str) -> bool:
+    return token.startswith(f"{_SIGNED_TOKEN_PREFIX}.")
+
+
+def verify_signed_token(token: str) -> Optional[str]:
+    """校验签名 token，返回 user_id；签名无效、已过期或已吊销返回 None"""
+    if not signing_enabled() or not is_signed_token(token):
+        return None
+
+    payload, _, signature = token.rpartition(".")
+    parts = payload.split(".")
+    if len(parts) != 4 or not hmac.compare_digest(_sign(payload), signature):
+        return None
+
+    _, user_id, issued_hex, _ = parts
+    try:
+        issued_at = int(issued_hex, 16)
+    except ValueError:
+        return None
+    if time.time() - issued_at > AUTH_TOKEN_MAX_AGE:
+        return None
+    if _revoked_tokens.get(token):
+        return None
+    return user_id
+
+
+def get_auth_cache_stats() -> dict[str, Any]:
+    """认证缓存统计（供 /metrics 使用）"""
+    lookups = _token_cache.hits + _token_cache.misses
+    return {
+        "entries": len(_token_cache),
+        "hits": _token_cache.hits,
+        "misses": _token_cache.misses,
+        "hit_ratio": round(_token_cache.hits / lookups, 4) if lookups else 0.0,
+        "signed_tokens": signing_enabled(),
+        "revoked": len(_revoked_tokens),
+    }
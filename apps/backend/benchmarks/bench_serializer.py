@@ -0,0 +1,92 @@
+"""SSE 序列化基准测试
+
+对比原 _PydanticJSONEncoder（json.dumps + default）与 serializer 模块，
+负载来自 docs/state.md（一次真实简历分析结束时的 Thread 状态）。
+
+运行（在 apps/backend 目录下）:
+    python -m benchmarks.bench_serializer
+"""
+
+from enum import Enum
+from pathlib import Path
+from typing import Any
+import dataclasses
+import json
+import timeit
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from pydantic import BaseModel
+
+from infrastructure.langgraph_server import serializer
+from infrastructure.langgraph_server.schemas import SSEEvent
+
+STATE_PATH = Path(__file__).resolve().parents[3] / "docs" / "state.md"
+SUBSCRIBERS = 3  # 重放场景：同一事件发送给多个订阅者
+
+_MESSAGE_TYPES = {"human": HumanMessage, "ai": AIMessage, "tool": ToolMessage}
+
+
+class _LegacyEncoder(json.JSONEncoder):
+    """原 routes/runs.py 中的编码器"""
+
+    def default(self, o: Any) -> Any:
+        if isinstance(o, BaseModel):
+            return o.model_dump()
+        if dataclasses.is_dataclass(o) and not isinstance(o, type):
+            return dataclasses.asdict(o)
+        if isinstance(o, Enum):
+            return o.value
+        if hasattr(o, "__dict__"):
+            return o.__dict__
+        return str(o)
+
+
+def _legacy_dumps(data: Any) -> str:
+    return json.dumps(data, ensure_ascii=False, cls=_LegacyEncoder)
+
+
+def _load_payloads() -> dict[str, Any]:
+    """values 事件和单条 messages 事件（消息均为 LangChain 对象，与 executor 产出一致）"""
+    state = json.loads(STATE_PATH.read_text(encoding="utf-8"))
+    values = dict(state["values"])
+    values["messages"] = [_MESSAGE_TYPES[m["type"]](**m) for m in values["messages"]]
+    last_ai = next(m for m in reversed(values["messages"]) if m.type == "ai")
+    return {
+        "values": values,
+        "messages": [last_ai, {"langgraph_node": "model", "langgraph_step": 1}],
+    }
+
+
+def _bench(fn: Any, number: int) -> float:
+    """返回单次调用耗时（微秒，取 5 轮最小值）"""
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def main() -> None:
+    payloads = _load_payloads()
+    print(f"orjson: {'yes' if serializer.orjson is not None else 'no'}")
+    print(f"{'payload':<10}{'bytes':>9}{'legacy us':>12}{'new us':>10}{'replay x' + str(SUBSCRIBERS):>14}")
+    for name, data in payloads.items():
+        assert json.loads(_legacy_dumps(data)) == json.loads(serializer.dumps(data))
+        size = len(serializer.dumps(data).encode("utf-8"))
+        number = 200 if name == "values" else 2000
+
+        legacy = _bench(lambda: _legacy_dumps(data), number)
+        new = _bench(lambda: serializer.dumps(data), number)
+
+        # 旧路径每个订阅者各序列化一次，新路径编码缓存在事件上
+        def replay_legacy() -> None:
+            for _ in range(SUBSCRIBERS):
+                _legacy_dumps(data)
+
+        def replay_new() -> None:
+            event = SSEEvent(event=name, data=data)
+            for _ in range(SUBSCRIBERS):
+                serializer.encode_event_data(event)
+
+        speedup = _bench(replay_legacy, number) / _bench(replay_new, number)
+        print(f"{name:<10}{size:>9}{legacy:>12.1f}{new:>10.1f}{speedup:>13.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -77,6 +77,21 @@ class Config:
         """SQLite 数据库路径（可选，用于本地持久化）"""
         return os.getenv("WORKFLOW_SQLITE_PATH")
 
+    @property
+    def langgraph_redis_url(self) -> str | None:
+        """Redis 连接字符串（可选，配置后事件缓冲区和 Run 注册表使用 Redis，支持多 worker）"""
+        return os.getenv("LANGGRAPH_REDIS_URL")
+
+    @property
+    def langgraph_max_concurrent_runs(self) -> int:
+        """进程内同时执行的 Run 上限"""
+        return int(os.getenv("LANGGRAPH_MAX_CONCURRENT_RUNS", "8"))
+
+    @property
+    def langgraph_run_wait_queue_size(self) -> int:
+        """等待执行的 Run 上限，超出时返回 429"""
+        return int(os.getenv("LANGGRAPH_RUN_WAIT_QUEUE_SIZE", "32"))
+
     @property
     def is_local(self) -> bool:
         """是否为本地开发环境"""
@@ -58,13 +58,17 @@ from .schemas import (
     ThreadPatch,
     ThreadSearchRequest,
     ThreadState,
+    ThreadStateDiff,
+    ThreadSummary,
     ThreadStateUpdate,
     ThreadStateUpdateResponse,
     ThreadStatus,
 )
 from .service import LangGraphService
-from .buffer import EventBuffer
+from .buffer import BaseEventBuffer, EventBuffer
 from .executor import GraphExecutor
+from .registry import LocalRunRegistry, RunRegistry
+from .run_store import MemoryRunStore, PostgresRunStore, RunStore
 from .types import ActiveRun
 
 __all__ = [
@@ -75,7 +79,13 @@ __all__ = [
     # 服务
     "LangGraphService",
     # 内部组件（高级用法）
+    "BaseEventBuffer",
     "EventBuffer",
+    "RunRegistry",
+    "LocalRunRegistry",
+    "RunStore",
+    "MemoryRunStore",
+    "PostgresRunStore",
     "GraphExecutor",
     "ActiveRun",
     # Schemas - Enums
@@ -90,7 +100,9 @@ __all__ = [
     "ThreadHistoryRequest",
     "ThreadPatch",
     "ThreadSearchRequest",
+    "ThreadSummary",
     "ThreadState",
+    "ThreadStateDiff",
     "ThreadStateUpdate",
     "ThreadStateUpdateResponse",
     # Schemas - Assistant
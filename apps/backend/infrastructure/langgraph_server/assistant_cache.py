@@ -0,0 +1,47 @@
+"""Thread → assistant_id 缓存
+
+读取 Thread 状态前需要先确定 Thread 使用的 graph（checkpoint metadata 中的 assistant_id），
+每次都读取 checkpoint 会让一次状态读取变成两次 checkpoint 加载。
+assistant_id 在 Run 开始时由 executor 写入，首次查询 checkpoint 后也会写入，删除 Thread 时失效。
+"""
+
+from collections import OrderedDict
+from typing import Any
+
+
+class ThreadAssistantCache:
+    """有界 LRU：thread_id → assistant_id"""
+
+    def __init__(self, max_size: int = 10000):
+        self._max_size = max_size
+        self._items: OrderedDict[str, str] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, thread_id: str) -> str | None:
+        assistant_id = self._items.get(thread_id)
+        if assistant_id is None:
+            self._misses += 1
+            return None
+        self._items.move_to_end(thread_id)
+        self._hits += 1
+        return assistant_id
+
+    def set(self, thread_id: str, assistant_id: str) -> None:
+        self._items[thread_id] = assistant_id
+        self._items.move_to_end(thread_id)
+        if len(self._items) > self._max_size:
+            self._items.popitem(last=False)
+
+    def invalidate(self, thread_id: str) -> None:
+        self._items.pop(thread_id, None)
+
+    def get_stats(self) -> dict[str, Any]:
+        total = self._hits + self._misses
+        return {
+            "size": len(self._items),
+            "max_size": self._max_size,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / total, 3) if total else 0.0,
+        }
@@ -0,0 +1,75 @@
+"""缓冲区 / 注册表后端选择
+
+根据 LangGraphServerConfig.buffer_backend 创建对应实现：
+- memory: 进程内存（默认，只能单 worker 运行）
+- redis: Redis Streams + Redis 注册表（多 worker 共享，需配置 redis_url）
+
+Run 历史存储根据 run_store_url 选择 PostgreSQL 或进程内存；
+Thread 摘要表只在配置 thread_summary_url 时启用。
+"""
+
+from .buffer import BaseEventBuffer, EventBuffer
+from .config import LangGraphServerConfig
+from .registry import LocalRunRegistry, RunRegistry
+from .run_store import MemoryRunStore, RunStore
+from .thread_summary import PostgresThreadSummaryStore
+
+
+def _require_redis_url(config: LangGraphServerConfig) -> str:
+    if not config.redis_url:
+        raise ValueError("buffer_backend='redis' 需要配置 redis_url")
+    return config.redis_url
+
+
+def create_event_buffer(config: LangGraphServerConfig) -> BaseEventBuffer:
+    """创建事件缓冲区"""
+    if config.buffer_backend == "redis":
+        from .buffer_redis import RedisEventBuffer
+
+        return RedisEventBuffer(
+            redis_url=_require_redis_url(config),
+            ttl_seconds=config.event_buffer_ttl,
+            stream_maxlen=config.redis_stream_maxlen,
+            key_prefix=config.redis_key_prefix,
+        )
+    if config.buffer_backend != "memory":
+        raise ValueError(f"未知的 buffer_backend: {config.buffer_backend}")
+    return EventBuffer(
+        ttl_seconds=config.event_buffer_ttl,
+        max_bytes=config.event_buffer_max_bytes,
+        run_max_bytes=config.event_buffer_run_max_bytes,
+        slow_subscriber_policy=config.slow_subscriber_policy,
+    )
+
+
+def create_run_registry(config: LangGraphServerConfig) -> RunRegistry:
+    """创建活跃 Run 注册表"""
+    if config.buffer_backend == "redis":
+        from .registry import RedisRunRegistry
+
+        return RedisRunRegistry(
+            redis_url=_require_redis_url(config),
+            key_prefix=config.redis_key_prefix,
+        )
+    return LocalRunRegistry()
+
+
+def create_run_store(config: LangGraphServerConfig) -> RunStore:
+    """创建 Run 历史存储"""
+    if config.run_store_url:
+        from .run_store import PostgresRunStore
+
+        return PostgresRunStore(
+            database_url=config.run_store_url,
+            batch_size=config.run_store_batch_size,
+            flush_interval=config.run_store_flush_interval,
+            pool=config.database_pool,
+        )
+    return MemoryRunStore()
+
+
+def create_thread_summary_store(config: LangGraphServerConfig) -> PostgresThreadSummaryStore | None:
+    """创建 Thread 摘要存储（未配置时返回 None）"""
+    if config.thread_summary_url:
+        return PostgresThreadSummaryStore(config.thread_summary_url, pool=config.database_pool)
+    return None
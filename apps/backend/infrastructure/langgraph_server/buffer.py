@@ -1,45 +1,216 @@
-"""事件缓冲区 - 支持 SSE 重连和多客户端订阅"""
+"""事件缓冲区 - 支持 SSE 重连和多客户端订阅
 
+- BaseEventBuffer: 缓冲区接口
+- EventBuffer: 进程内存实现（默认，单 worker）
+- RedisEventBuffer（buffer_redis.py）: Redis Streams 实现，多 worker 共享
+"""
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import AsyncIterator
+from typing import Any, AsyncIterator, Literal
 import asyncio
 import logging
 
 from .schemas import SSEEvent
+from .serializer import encode_event_frame
 
 logger = logging.getLogger(__name__)
 
 
+def _event_size(event: SSEEvent) -> int:
+    """事件占用的字节数（按 SSE 帧长度，帧缓存在事件上供发送时直接复用）"""
+    return len(encode_event_frame(event))
+
+
 @dataclass
 class RunBuffer:
-    """单个 Run 的事件缓冲"""
+    """单个 Run 的事件缓冲
+
+    每个事件在写入时分配单调递增的序号（即 SSE 的 id），重连时按
+    Last-Event-Id 直接定位到缺失的尾部。
+
+    事件以环形方式存储：超过单 Run 字节预算时从最旧的事件开始丢弃。
+    底层为 list + 起始偏移，丢弃只移动偏移（定期压缩），按序号定位为 O(1)。
+    首个 metadata 事件单独保存，不会被丢弃（客户端依赖它获取 run_id）。
+
+    订阅者不持有独立队列，而是各自记录已读序号，从共享的事件列表中读取；
+    写入时通过一个 asyncio.Event 一次性唤醒所有等待中的订阅者。
+    """
 
-    events: list[SSEEvent] = field(default_factory=list)
-    subscribers: list[asyncio.Queue[SSEEvent]] = field(default_factory=list)
+    events: list[tuple[SSEEvent, int]] = field(default_factory=list)  # (事件, 字节数)
+    start: int = 0  # events 中第一个有效事件的下标
+    first_seq: int = 0  # events[start] 的序号
+    next_seq: int = 0
+    head: tuple[SSEEvent, int] | None = None  # 固定保留的 metadata 事件
+    subscribers: int = 0
     created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
     finished: bool = False
+    closed: bool = False  # 已从 EventBuffer 移除
+    waiter: asyncio.Event | None = None
+    size_bytes: int = 0
+    dropped: int = 0  # 因预算被丢弃的事件数
+
+    def append(self, event: SSEEvent) -> int:
+        """写入事件、分配序号并编码为 SSE 帧，返回占用的字节数"""
+        seq = self.next_seq
+        self.next_seq += 1
+        event.id = str(seq)
+        size = _event_size(event)
+        if seq == 0 and event.event == "metadata":
+            self.head = (event, size)
+            self.first_seq = 1
+        else:
+            if self.start == len(self.events):
+                # 当前为空（或已全部丢弃），从该事件重新计数
+                self.first_seq = seq
+            self.events.append((event, size))
+        self.size_bytes += size
+        return size
+
+    def drop_oldest(self) -> int:
+        """丢弃最旧的事件，返回释放的字节数"""
+        if self.start >= len(self.events):
+            return 0
+        _, size = self.events[self.start]
+        self.events[self.start] = None  # type: ignore[call-overload]
+        self.start += 1
+        self.first_seq += 1
+        self.size_bytes -= size
+        self.dropped += 1
+        # 已丢弃部分超过一半时压缩，均摊 O(1)
+        if self.start > 64 and self.start * 2 > len(self.events):
+            del self.events[: self.start]
+            self.start = 0
+        return size
+
+    def notify(self) -> None:
+        """唤醒所有等待中的订阅者"""
+        if self.waiter is not None:
+            self.waiter.set()
+            self.waiter = None
+
+    async def wait(self) -> None:
+        """等待下一次 notify"""
+        if self.waiter is None:
+            self.waiter = asyncio.Event()
+        await self.waiter.wait()
+
+    def has_events(self) -> bool:
+        return self.start < len(self.events)
+
+    def events_after(self, last_seq: int | None = None) -> list[SSEEvent]:
+        """获取序号大于 last_seq 的事件（None 表示全部）"""
+        result: list[SSEEvent] = []
+        if self.head is not None and last_seq is None:
+            result.append(self.head[0])
+        begin = self.start
+        if last_seq is not None:
+            begin = max(self.start, self.start + (last_seq + 1 - self.first_seq))
+        result.extend(event for event, _ in self.events[begin:])
+        return result
+
+    def __len__(self) -> int:
+        return len(self.events) - self.start + (1 if self.head else 0)
+
+
+class BaseEventBuffer(ABC):
+    """事件缓冲区接口
+
+    事件序号约定：每个 Run 从 0 开始单调递增，put 时分配并写入 event.id。
+    """
+
+    async def start(self) -> None:
+        """启动后台任务"""
+
+    async def stop(self) -> None:
+        """停止后台任务并释放资源"""
+
+    async def open(self, run_id: str) -> None:
+        """登记还没有事件的 Run（如排队中的 Run），使 subscribe 等待其事件而不是直接返回"""
+
+    @abstractmethod
+    async def put(self, run_id: str, event: SSEEvent) -> SSEEvent:
+        """添加事件并通知订阅者，返回已分配序号的事件"""
+
+    @abstractmethod
+    async def finish(self, run_id: str) -> None:
+        """标记 Run 已结束（包括出错、取消），订阅者读完剩余事件后立即退出"""
+
+    @abstractmethod
+    async def get_events(self, run_id: str, last_event_id: int | None = None) -> list[SSEEvent]:
+        """获取 last_event_id 之后的历史事件"""
+
+    @abstractmethod
+    async def is_active(self, run_id: str) -> bool:
+        """检查 Run 是否还在执行"""
+
+    @abstractmethod
+    async def has_run(self, run_id: str) -> bool:
+        """检查 Run 是否存在"""
+
+    @abstractmethod
+    async def clear_run(self, run_id: str) -> None:
+        """清理指定 Run 的事件缓冲"""
+
+    @abstractmethod
+    def subscribe(self, run_id: str, last_event_id: int | None = None) -> AsyncIterator[SSEEvent]:
+        """重放 last_event_id 之后的历史事件，然后订阅实时事件
+
+        Run 不存在（未知或已被清理）时立即结束。
+        """
 
+    @abstractmethod
+    def get_stats(self) -> dict[str, Any]:
+        """缓冲区指标（供 /metrics 使用）"""
 
-class EventBuffer:
-    """事件缓冲区
+
+class EventBuffer(BaseEventBuffer):
+    """事件缓冲区（进程内存实现）
 
     职责：
     - 存储 Run 执行过程中的 SSE 事件
     - 支持断线重连后重放历史事件
     - 支持多客户端订阅同一 Run
     - 自动清理过期缓冲区
+
+    内存预算：
+    - 单 Run 超过 run_max_bytes 时丢弃该 Run 最旧的事件
+    - 全局超过 max_bytes 时按最近访问顺序（LRU）淘汰已结束的 Run，
+      仍不足时再丢弃最久未访问的活跃 Run 的旧事件
+
+    慢订阅者：订阅者读取速度跟不上、未读事件已被预算丢弃时，
+    按 slow_subscriber_policy 处理：
+    - skip: 跳过已丢弃的事件，从最旧的保留事件继续
+    - disconnect: 断开订阅，由客户端携带 Last-Event-Id 重连
     """
 
-    def __init__(self, ttl_seconds: int = 3600):
-        self._buffers: dict[str, RunBuffer] = {}
+    def __init__(
+        self,
+        ttl_seconds: int = 3600,
+        max_bytes: int = 256 * 1024 * 1024,
+        run_max_bytes: int = 8 * 1024 * 1024,
+        slow_subscriber_policy: Literal["skip", "disconnect"] = "skip",
+    ):
+        self._buffers: OrderedDict[str, RunBuffer] = OrderedDict()  # 按最近访问排序
         self._ttl = ttl_seconds
+        self._max_bytes = max_bytes
+        self._run_max_bytes = run_max_bytes
+        self._slow_policy = slow_subscriber_policy
+        self._total_bytes = 0
+        self._skipped_events = 0  # 慢订阅者跳过的事件数
+        self._slow_disconnects = 0
+        self._dropped_events = 0
+        self._evicted_runs = 0
         self._cleanup_task: asyncio.Task[None] | None = None
 
     async def start(self) -> None:
         """启动后台清理任务"""
         self._cleanup_task = asyncio.create_task(self._cleanup_loop())
-        logger.info("EventBuffer 已启动")
+        logger.info(
+            f"EventBuffer 已启动: max_bytes={self._max_bytes}, run_max_bytes={self._run_max_bytes}"
+        )
 
     async def stop(self) -> None:
         """停止清理任务"""
@@ -51,60 +222,160 @@ class EventBuffer:
                 pass
         logger.info("EventBuffer 已停止")
 
-    async def put(self, run_id: str, event: SSEEvent) -> None:
-        """添加事件并通知订阅者"""
+    async def open(self, run_id: str) -> None:
+        """创建空缓冲区（已存在时不变），由 finish 或 end 事件结束"""
+        self._get_or_create(run_id)
+
+    async def put(self, run_id: str, event: SSEEvent) -> SSEEvent:
+        """添加事件并通知订阅者
+
+        Returns:
+            同一事件对象，event.id 已设置为该 Run 内的序号，SSE 帧已编码
+        """
         buf = self._get_or_create(run_id)
-        buf.events.append(event)
+        self._total_bytes += buf.append(event)
+
+        # 单 Run 预算
+        while buf.size_bytes > self._run_max_bytes and buf.has_events():
+            self._release(buf.drop_oldest(), dropped=1)
 
-        for queue in buf.subscribers:
-            await queue.put(event)
+        # 全局预算
+        if self._total_bytes > self._max_bytes:
+            self._enforce_global_budget(keep=run_id)
 
         if event.event == "end":
             buf.finished = True
+        buf.notify()
+        return event
 
-    def get_events(self, run_id: str) -> list[SSEEvent]:
-        """获取所有历史事件"""
+    async def finish(self, run_id: str) -> None:
+        """标记 Run 已结束并唤醒订阅者"""
         buf = self._buffers.get(run_id)
-        return list(buf.events) if buf else []
+        if buf is not None and not buf.finished:
+            buf.finished = True
+            buf.notify()
 
-    def is_active(self, run_id: str) -> bool:
+    async def get_events(self, run_id: str, last_event_id: int | None = None) -> list[SSEEvent]:
+        """获取历史事件（超出预算被丢弃的事件不再返回）
+
+        Args:
+            run_id: Run ID
+            last_event_id: 客户端已收到的最后一个事件序号，只返回其后的事件
+        """
+        buf = self._touch(run_id)
+        return buf.events_after(last_event_id) if buf else []
+
+    async def is_active(self, run_id: str) -> bool:
         """检查 Run 是否还在执行"""
         buf = self._buffers.get(run_id)
         return buf is not None and not buf.finished
 
-    def has_run(self, run_id: str) -> bool:
+    async def has_run(self, run_id: str) -> bool:
         """检查 Run 是否存在"""
         return run_id in self._buffers
 
-    def clear_run(self, run_id: str) -> None:
+    async def clear_run(self, run_id: str) -> None:
         """清理指定 Run 的事件缓冲"""
-        if run_id in self._buffers:
-            del self._buffers[run_id]
+        self._remove(run_id)
 
-    async def subscribe(self, run_id: str) -> AsyncIterator[SSEEvent]:
-        """订阅 Run 的实时事件"""
-        buf = self._get_or_create(run_id)
-        queue: asyncio.Queue[SSEEvent] = asyncio.Queue()
-        buf.subscribers.append(queue)
+    def _remove(self, run_id: str) -> None:
+        buf = self._buffers.pop(run_id, None)
+        if buf is not None:
+            self._total_bytes -= buf.size_bytes
+            buf.closed = True
+            buf.notify()
+
+    def get_stats(self) -> dict[str, Any]:
+        """缓冲区指标（供 /metrics 使用）"""
+        return {
+            "backend": "memory",
+            "runs": len(self._buffers),
+            "active_runs": sum(1 for buf in self._buffers.values() if not buf.finished),
+            "buffered_events": sum(len(buf) for buf in self._buffers.values()),
+            "buffered_bytes": self._total_bytes,
+            "max_bytes": self._max_bytes,
+            "run_max_bytes": self._run_max_bytes,
+            "dropped_events": self._dropped_events,
+            "evicted_runs": self._evicted_runs,
+            "subscribers": sum(buf.subscribers for buf in self._buffers.values()),
+            "slow_subscriber_policy": self._slow_policy,
+            "skipped_events": self._skipped_events,
+            "slow_disconnects": self._slow_disconnects,
+        }
+
+    async def subscribe(
+        self, run_id: str, last_event_id: int | None = None
+    ) -> AsyncIterator[SSEEvent]:
+        """重放 last_event_id 之后的历史事件，然后订阅实时事件
+
+        按已读序号从缓冲区读取，没有新事件时等待 put/finish 唤醒；
+        Run 结束（end 事件或 finish）且事件读完后立即退出。
+        缓冲区不存在（未知 Run 或已被淘汰）时直接返回，不为其创建缓冲区——
+        否则这个永远不会结束的空缓冲区既不会被清理，订阅者也会一直等待。
+        """
+        buf = self._touch(run_id)
+        if buf is None:
+            return
+        buf.subscribers += 1
+        last_seq = -1 if last_event_id is None else last_event_id
 
         try:
-            while True:
-                try:
-                    event = await asyncio.wait_for(queue.get(), timeout=1.0)
+            while not buf.closed:
+                if last_seq >= 0 and buf.first_seq > last_seq + 1:
+                    # 未读事件已被预算丢弃
+                    if self._slow_policy == "disconnect":
+                        self._slow_disconnects += 1
+                        logger.info(f"Run {run_id} 订阅者落后（序号 {last_seq}），断开订阅")
+                        return
+                    self._skipped_events += buf.first_seq - last_seq - 1
+                    last_seq = buf.first_seq - 1
+
+                for event in buf.events_after(last_seq if last_seq >= 0 else None):
+                    last_seq = int(event.id)  # type: ignore[arg-type]
                     yield event
                     if event.event == "end":
-                        break
-                except asyncio.TimeoutError:
-                    if buf.finished:
-                        break
+                        return
+
+                if last_seq + 1 < buf.next_seq:
+                    continue  # 读取期间有新事件写入
+                if buf.finished:
+                    return
+                await buf.wait()
         finally:
-            if queue in buf.subscribers:
-                buf.subscribers.remove(queue)
+            buf.subscribers -= 1
 
     def _get_or_create(self, run_id: str) -> RunBuffer:
-        if run_id not in self._buffers:
-            self._buffers[run_id] = RunBuffer()
-        return self._buffers[run_id]
+        buf = self._touch(run_id)
+        if buf is None:
+            buf = self._buffers[run_id] = RunBuffer()
+        return buf
+
+    def _touch(self, run_id: str) -> RunBuffer | None:
+        """标记最近访问（LRU）"""
+        buf = self._buffers.get(run_id)
+        if buf is not None:
+            self._buffers.move_to_end(run_id)
+        return buf
+
+    def _release(self, size: int, dropped: int = 0) -> None:
+        self._total_bytes -= size
+        self._dropped_events += dropped
+
+    def _enforce_global_budget(self, keep: str) -> None:
+        """全局超预算时淘汰：先整体淘汰已结束的 Run，再裁剪活跃 Run 的旧事件"""
+        for run_id in list(self._buffers):
+            if self._total_bytes <= self._max_bytes:
+                return
+            buf = self._buffers[run_id]
+            if buf.finished and not buf.subscribers and run_id != keep:
+                self._remove(run_id)
+                self._evicted_runs += 1
+
+        for run_id, buf in list(self._buffers.items()):
+            while self._total_bytes > self._max_bytes and buf.has_events():
+                self._release(buf.drop_oldest(), dropped=1)
+            if self._total_bytes <= self._max_bytes:
+                return
 
     async def _cleanup_loop(self) -> None:
         """定期清理过期缓冲区"""
@@ -118,7 +389,7 @@ class EventBuffer:
                     if buf.finished and (now - buf.created_at).total_seconds() > self._ttl
                 ]
                 for run_id in to_remove:
-                    del self._buffers[run_id]
+                    self._remove(run_id)
                 if to_remove:
                     logger.debug(f"清理了 {len(to_remove)} 个过期缓冲区")
             except asyncio.CancelledError:
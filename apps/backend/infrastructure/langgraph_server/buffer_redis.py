@@ -0,0 +1,208 @@
+"""Redis Streams 事件缓冲区 - 多 worker 共享 SSE 事件
+
+每个 Run 对应一个 Stream，任意 worker 都可以重放和订阅，
+重连请求落到其他 worker 时同样能拿到完整事件。
+
+Key 约定（prefix 默认为 langgraph）:
+- {prefix}:run:{run_id}:events  事件 Stream（XADD MAXLEN ~ 限制长度）
+- {prefix}:run:{run_id}:head    首个 metadata 事件（不受 MAXLEN 裁剪）
+- {prefix}:run:{run_id}:pending 已登记但还没有事件的 Run（如排队中的 Run）
+- {prefix}:run:{run_id}:done    Run 已结束标记
+
+事件序号直接映射为 Stream ID：序号 n 对应 "0-{n+1}"。XADD 使用 "0-*"
+由 Redis 自动递增（需要 Redis >= 7.0），按 Last-Event-Id 定位只需一次 XRANGE/XREAD。
+
+依赖 redis（redis.asyncio），仅在启用该后端时导入。
+"""
+
+from typing import Any, AsyncIterator
+import json
+import logging
+
+from .buffer import BaseEventBuffer
+from .schemas import SSEEvent
+from .serializer import encode_event_data, event_from_json
+
+logger = logging.getLogger(__name__)
+
+# XREAD 阻塞时长（毫秒），超时后检查 Run 是否已被清理
+_XREAD_BLOCK_MS = 5000
+
+
+def create_redis_client(redis_url: str) -> Any:
+    """创建 redis.asyncio 客户端（延迟导入可选依赖）"""
+    try:
+        import redis.asyncio as redis_asyncio
+    except ImportError as e:
+        raise RuntimeError(
+            "Redis 后端需要安装 redis: pip install 'redis>=5.0'"
+        ) from e
+    return redis_asyncio.Redis.from_url(redis_url)
+
+
+def _seq_from_stream_id(stream_id: bytes | str) -> int:
+    if isinstance(stream_id, bytes):
+        stream_id = stream_id.decode()
+    return int(stream_id.split("-", 1)[1]) - 1
+
+
+def _decode_entry(stream_id: bytes | str, fields: dict[bytes, bytes]) -> SSEEvent:
+    return event_from_json(
+        fields[b"event"].decode(), fields[b"data"], id=str(_seq_from_stream_id(stream_id))
+    )
+
+
+class RedisEventBuffer(BaseEventBuffer):
+    """Redis Streams 事件缓冲区
+
+    内存预算由 Redis 承担：单 Run 通过 MAXLEN 限制事件条数，
+    所有 key 带 TTL，过期后自动清理。
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        ttl_seconds: int = 3600,
+        stream_maxlen: int = 10000,
+        key_prefix: str = "langgraph",
+    ):
+        self._redis_url = redis_url
+        self._ttl = ttl_seconds
+        self._maxlen = stream_maxlen
+        self._prefix = key_prefix
+        self._redis: Any = None
+        self._puts = 0
+        self._subscribers = 0
+
+    async def start(self) -> None:
+        self._redis = create_redis_client(self._redis_url)
+        await self._redis.ping()
+        logger.info(f"RedisEventBuffer 已启动: maxlen={self._maxlen}, ttl={self._ttl}s")
+
+    async def stop(self) -> None:
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+        logger.info("RedisEventBuffer 已停止")
+
+    # ==================== Keys ====================
+
+    def _events_key(self, run_id: str) -> str:
+        return f"{self._prefix}:run:{run_id}:events"
+
+    def _head_key(self, run_id: str) -> str:
+        return f"{self._prefix}:run:{run_id}:head"
+
+    def _done_key(self, run_id: str) -> str:
+        return f"{self._prefix}:run:{run_id}:done"
+
+    def _pending_key(self, run_id: str) -> str:
+        return f"{self._prefix}:run:{run_id}:pending"
+
+    # ==================== 读写 ====================
+
+    async def open(self, run_id: str) -> None:
+        """写入 pending 标记，Stream 创建前 is_active 也返回 True"""
+        await self._redis.set(self._pending_key(run_id), "1", ex=self._ttl)
+
+    async def put(self, run_id: str, event: SSEEvent) -> SSEEvent:
+        events_key = self._events_key(run_id)
+        fields = {"event": event.event, "data": encode_event_data(event)}
+        stream_id = await self._redis.xadd(
+            events_key, fields, id="0-*", maxlen=self._maxlen, approximate=True
+        )
+        seq = _seq_from_stream_id(stream_id)
+        event.id = str(seq)
+        self._puts += 1
+
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.expire(events_key, self._ttl)
+        if seq == 0 and event.event == "metadata":
+            pipe.set(self._head_key(run_id), json.dumps(fields, ensure_ascii=False), ex=self._ttl)
+        if event.event == "end":
+            pipe.set(self._done_key(run_id), "1", ex=self._ttl)
+        await pipe.execute()
+        return event
+
+    async def finish(self, run_id: str) -> None:
+        await self._redis.set(self._done_key(run_id), "1", ex=self._ttl)
+
+    async def get_events(self, run_id: str, last_event_id: int | None = None) -> list[SSEEvent]:
+        min_id = "-" if last_event_id is None else f"0-{last_event_id + 2}"
+        entries = await self._redis.xrange(self._events_key(run_id), min=min_id)
+        events = [_decode_entry(stream_id, fields) for stream_id, fields in entries]
+
+        # metadata 事件已被 MAXLEN 裁剪时从 head 补回
+        if last_event_id is None and (not events or events[0].id != "0"):
+            head = await self._redis.get(self._head_key(run_id))
+            if head:
+                fields = json.loads(head)
+                events.insert(0, event_from_json(fields["event"], fields["data"], id="0"))
+        return events
+
+    async def is_active(self, run_id: str) -> bool:
+        exists, done = await (
+            self._redis.pipeline(transaction=False)
+            .exists(self._events_key(run_id), self._pending_key(run_id))
+            .exists(self._done_key(run_id))
+            .execute()
+        )
+        return bool(exists) and not done
+
+    async def has_run(self, run_id: str) -> bool:
+        return bool(await self._redis.exists(self._events_key(run_id), self._pending_key(run_id)))
+
+    async def clear_run(self, run_id: str) -> None:
+        await self._redis.delete(
+            self._events_key(run_id),
+            self._head_key(run_id),
+            self._done_key(run_id),
+            self._pending_key(run_id),
+        )
+
+    async def subscribe(
+        self, run_id: str, last_event_id: int | None = None
+    ) -> AsyncIterator[SSEEvent]:
+        """重放历史事件，然后通过 XREAD BLOCK 接收新事件（按序号续读，不丢不重）
+
+        XREAD 超时后 Run 已结束时再非阻塞读一次，补上超时与检查之间写入的事件。
+        """
+        self._subscribers += 1
+        last_seq = -1 if last_event_id is None else last_event_id
+        events_key = self._events_key(run_id)
+        try:
+            for event in await self.get_events(run_id, last_event_id):
+                last_seq = int(event.id)  # type: ignore[arg-type]
+                yield event
+                if event.event == "end":
+                    return
+
+            while True:
+                response = await self._redis.xread(
+                    {events_key: f"0-{last_seq + 1}"}, block=_XREAD_BLOCK_MS, count=100
+                )
+                if not response:
+                    if await self.is_active(run_id):
+                        continue
+                    response = await self._redis.xread(
+                        {events_key: f"0-{last_seq + 1}"}, count=100
+                    )
+                    if not response:
+                        return
+                for _, entries in response:
+                    for stream_id, fields in entries:
+                        event = _decode_entry(stream_id, fields)
+                        last_seq = int(event.id)  # type: ignore[arg-type]
+                        yield event
+                        if event.event == "end":
+                            return
+        finally:
+            self._subscribers -= 1
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "backend": "redis",
+            "puts": self._puts,
+            "subscribers": self._subscribers,
+            "stream_maxlen": self._maxlen,
+        }
@@ -0,0 +1,178 @@
+"""messages 模式 token 片段合并
+
+LLM 逐 token 输出时，messages 模式每个片段都会产生一个 SSE 事件
+（完整的 AIMessageChunk model_dump）。开启合并（RunCreate.stream_coalesce_ms）后，
+同一消息 id 的连续片段在时间窗口或字符上限内相加为一个片段后再输出。
+
+片段通过 AIMessageChunk 的 + 合并，结果与 LangGraph SDK 客户端按 id 拼接片段一致；
+其他事件（values、updates 等）到达时先输出已合并的片段，保持原有顺序。
+"""
+
+from dataclasses import dataclass
+from typing import Any, AsyncIterator
+import asyncio
+import time
+
+from langchain_core.messages import AIMessageChunk
+
+# 单个合并片段的字符上限（文本 + 工具调用参数）
+COALESCE_MAX_CHARS = 2048
+
+_MESSAGE_MODES = ("messages", "messages-tuple")
+_END = object()
+
+
+def is_messages_mode(stream_mode: str | list[str]) -> bool:
+    if isinstance(stream_mode, str):
+        return stream_mode in _MESSAGE_MODES
+    return any(mode in _MESSAGE_MODES for mode in stream_mode)
+
+
+def _split_chunk(
+    chunk: Any, stream_mode: str | list[str]
+) -> tuple[tuple, AIMessageChunk, Any] | None:
+    """拆出 (外层前缀, 消息片段, metadata)，不是可合并的消息片段时返回 None
+
+    chunk 格式与 GraphExecutor._chunk_to_event 一致：
+    (message, metadata) / (namespace, data) / (mode, data) / (namespace, mode, data)
+    """
+    if not isinstance(chunk, tuple):
+        return None
+    if len(chunk) == 3:
+        prefix, mode, data = chunk[:2], chunk[1], chunk[2]
+    elif len(chunk) == 2 and isinstance(chunk[0], AIMessageChunk):
+        prefix, mode, data = (), stream_mode, chunk
+    elif len(chunk) == 2 and isinstance(chunk[0], (tuple, str)):
+        prefix, data = chunk[:1], chunk[1]
+        mode = chunk[0] if isinstance(chunk[0], str) else stream_mode
+    else:
+        return None
+
+    if mode not in _MESSAGE_MODES:
+        return None
+    if not (isinstance(data, tuple) and len(data) == 2 and isinstance(data[0], AIMessageChunk)):
+        return None
+    if not data[0].id:
+        return None
+    return prefix, data[0], data[1]
+
+
+def _chunk_chars(message: AIMessageChunk) -> int:
+    content = message.content
+    size = len(content) if isinstance(content, str) else len(str(content))
+    for tool_call in message.tool_call_chunks:
+        size += len(tool_call.get("args") or "")
+    return size
+
+
+@dataclass
+class CoalesceStats:
+    """合并统计（供 /metrics 使用）"""
+
+    chunks_in: int = 0  # 参与合并的原始片段数
+    chunks_out: int = 0  # 合并后输出的片段数
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "chunks_in": self.chunks_in,
+            "chunks_out": self.chunks_out,
+            "events_saved": self.chunks_in - self.chunks_out,
+            "ratio": round(self.chunks_in / self.chunks_out, 2) if self.chunks_out else 0.0,
+        }
+
+
+class MessageChunkCoalescer:
+    """按 (外层前缀, 消息 id) 合并连续的消息片段"""
+
+    def __init__(
+        self,
+        stream_mode: str | list[str],
+        window_seconds: float,
+        max_chars: int = COALESCE_MAX_CHARS,
+        stats: CoalesceStats | None = None,
+    ):
+        self._stream_mode = stream_mode
+        self._window = window_seconds
+        self._max_chars = max_chars
+        self._stats = stats or CoalesceStats()
+        # [key, prefix, message, metadata, started_at, chars]
+        self._pending: list[Any] | None = None
+
+    def add(self, chunk: Any) -> list[Any]:
+        """加入一个 chunk，返回可以输出的 chunk 列表"""
+        parts = _split_chunk(chunk, self._stream_mode)
+        if parts is None:
+            return [*self.flush(), chunk]
+
+        prefix, message, metadata = parts
+        self._stats.chunks_in += 1
+        key = (prefix, message.id)
+        ready: list[Any] = []
+        if self._pending is not None and self._pending[0] != key:
+            ready.extend(self.flush())
+        if self._pending is None:
+            self._pending = [key, prefix, message, metadata, time.monotonic(), 0]
+        else:
+            self._pending[2] = self._pending[2] + message
+        self._pending[5] += _chunk_chars(message)
+
+        if self._pending[5] >= self._max_chars or self.time_left() == 0:
+            ready.extend(self.flush())
+        return ready
+
+    def time_left(self) -> float | None:
+        """距离当前合并窗口结束的秒数，没有待输出片段时返回 None"""
+        if self._pending is None:
+            return None
+        return max(0.0, self._pending[4] + self._window - time.monotonic())
+
+    def flush(self) -> list[Any]:
+        if self._pending is None:
+            return []
+        _, prefix, message, metadata, _, _ = self._pending
+        self._pending = None
+        self._stats.chunks_out += 1
+        return [(*prefix, (message, metadata)) if prefix else (message, metadata)]
+
+
+async def coalesce_chunks(
+    stream: AsyncIterator[Any], coalescer: MessageChunkCoalescer
+) -> AsyncIterator[Any]:
+    """包装 graph.astream，合并消息片段
+
+    graph 流在单独的 Task 中消费（始终在同一个 Task 内迭代），
+    这里按合并窗口等待下一个 chunk，窗口到期时即使没有新片段也会输出。
+    """
+    queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=64)
+
+    async def produce() -> None:
+        try:
+            async for chunk in stream:
+                await queue.put(chunk)
+            await queue.put(_END)
+        except Exception as e:
+            await queue.put(e)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout=coalescer.time_left())
+            except asyncio.TimeoutError:
+                for chunk in coalescer.flush():
+                    yield chunk
+                continue
+            if item is _END:
+                break
+            if isinstance(item, Exception):
+                raise item
+            for chunk in coalescer.add(item):
+                yield chunk
+        for chunk in coalescer.flush():
+            yield chunk
+    finally:
+        producer.cancel()
+        try:
+            await producer
+        except asyncio.CancelledError:
+            pass
@@ -1,6 +1,7 @@
 """LangGraph Server 配置"""
 
 from dataclasses import dataclass
+from typing import Any, Literal
 
 
 @dataclass
@@ -12,11 +13,57 @@ class LangGraphServerConfig:
 
     Attributes:
         event_buffer_ttl: 事件缓冲区 TTL（秒）
+        event_buffer_max_bytes: 所有 Run 缓冲事件的总字节预算
+        event_buffer_run_max_bytes: 单个 Run 缓冲事件的字节预算
+        slow_subscriber_policy: 订阅者未读事件被预算丢弃时的处理方式
+            （skip 跳过缺失事件 | disconnect 断开订阅）
+        buffer_backend: 事件缓冲区/Run 注册表后端（memory | redis），
+            多 worker 部署需使用 redis
+        redis_url: Redis 连接字符串（buffer_backend=redis 时必填）
+        redis_key_prefix: Redis key 前缀
+        redis_stream_maxlen: 单个 Run 事件 Stream 的最大条数（近似裁剪）
+        run_queue_max_depth: 每个 Thread 排队 Run 的上限（multitask_strategy=enqueue）
+        max_concurrent_runs: 进程内同时执行的 Run 上限
+        run_wait_queue_size: 等待执行的 Run 上限，超出时返回 429
+        run_store_url: Run 历史存储的 PostgreSQL 连接字符串（不配置时保存在进程内存）
+        run_store_batch_size: Run 记录批量写入的条数上限
+        run_store_flush_interval: Run 记录批量写入的间隔（秒）
+        thread_assistant_cache_size: thread_id → assistant_id 缓存的条目上限
+        thread_summary_url: Thread 摘要表的 PostgreSQL 连接字符串（需与 checkpoint 同库，
+            不配置时 Thread 查询直接读取 checkpoint）
+        database_pool: 已打开的 AsyncConnectionPool（autocommit + dict_row），配置后 Run 历史
+            和 Thread 摘要复用该连接池，不再各自创建（由调用方负责关闭）
         sse_ping_interval: SSE ping 间隔（秒）
     """
 
     # 事件缓冲配置
     event_buffer_ttl: int = 3600  # 事件保留时间（秒）
+    event_buffer_max_bytes: int = 256 * 1024 * 1024  # 全局 256MB
+    event_buffer_run_max_bytes: int = 8 * 1024 * 1024  # 单 Run 8MB
+    slow_subscriber_policy: Literal["skip", "disconnect"] = "skip"
+
+    # 后端配置
+    buffer_backend: Literal["memory", "redis"] = "memory"
+    redis_url: str | None = None
+    redis_key_prefix: str = "langgraph"
+    redis_stream_maxlen: int = 10000
+
+    # Run 队列 / 调度配置
+    run_queue_max_depth: int = 10
+    max_concurrent_runs: int = 8
+    run_wait_queue_size: int = 32
+
+    # Run 历史存储配置
+    run_store_url: str | None = None
+    run_store_batch_size: int = 100
+    run_store_flush_interval: float = 1.0
+
+    # Thread 配置
+    thread_assistant_cache_size: int = 10000
+    thread_summary_url: str | None = None
+
+    # 共享连接池（如 checkpointer 的连接池）
+    database_pool: Any = None
 
     # SSE 配置
     sse_ping_interval: int = 30
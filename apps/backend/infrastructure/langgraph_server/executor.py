@@ -1,8 +1,11 @@
 """Graph 执行器 - 负责 LangGraph workflow 的执行"""
 
-from typing import Any, AsyncIterator
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator
 from uuid import uuid4
 import asyncio
+import itertools
 import logging
 
 from langchain_core.messages import BaseMessage
@@ -10,33 +13,74 @@ from langchain_core.runnables import RunnableConfig
 from langgraph.graph.state import CompiledStateGraph
 from langgraph.types import Command
 
-from .buffer import EventBuffer
+from .assistant_cache import ThreadAssistantCache
+from .buffer import BaseEventBuffer
+from .coalesce import CoalesceStats, MessageChunkCoalescer, coalesce_chunks, is_messages_mode
+from .registry import LocalRunRegistry, RunRegistry
+from .run_store import MemoryRunStore, RunStore
+from .scheduler import RunScheduler, RunSchedulerFullError
 from .schemas import MultitaskStrategy, RunCreate, RunStatus, SSEEvent, StreamMode
-from .types import ActiveRun
+from .thread_summary import PostgresThreadSummaryStore, summarize_state
+from .types import ActiveRun, QueuedRun
 
 logger = logging.getLogger(__name__)
 
 # 默认递归限制
 DEFAULT_RECURSION_LIMIT = 25
 
+# 取消其他 worker 上的 Run 后等待其注销的上限（秒）及轮询间隔
+REMOTE_CANCEL_TIMEOUT = 10.0
+REMOTE_CANCEL_POLL_INTERVAL = 0.1
+
 
 class GraphExecutor:
     """Graph 执行器
 
     职责：
     - 执行 LangGraph workflow
-    - 管理活跃 Run（内存）
+    - 管理活跃 Run（本进程内存，并登记到 RunRegistry 供其他 worker 查询/取消）
+    - 管理每个 Thread 的 Run 队列（multitask_strategy=enqueue，FIFO）
+    - 全局准入控制（RunScheduler 限制同时执行的 Run 数量）
+    - Run 状态变化时写入 RunStore（Run 历史），Run 结束后更新 Thread 摘要
     - 产生 SSE 事件流
     """
 
     def __init__(
         self,
         graphs: dict[str, CompiledStateGraph],
-        buffer: EventBuffer,
+        buffer: BaseEventBuffer,
+        registry: RunRegistry | None = None,
+        scheduler: RunScheduler | None = None,
+        max_queue_depth: int = 10,
+        run_store: RunStore | None = None,
+        thread_summaries: PostgresThreadSummaryStore | None = None,
+        assistant_cache: ThreadAssistantCache | None = None,
     ):
         self._graphs = graphs
         self._buffer = buffer
-        self._active_runs: dict[str, ActiveRun] = {}  # thread_id → ActiveRun
+        self._registry = registry or LocalRunRegistry()
+        self._scheduler = scheduler or RunScheduler()
+        self._run_store = run_store or MemoryRunStore()
+        self._thread_summaries = thread_summaries
+        self._assistant_cache = assistant_cache or ThreadAssistantCache()
+        # thread_id → 最后提交的摘要写入（同一 Thread 的写入按顺序执行）
+        self._summary_tasks: dict[str, asyncio.Task[None]] = {}
+        self._deleting_threads: set[str] = set()  # 正在删除的 Thread，不再写入摘要
+        self._active_runs: dict[str, ActiveRun] = {}  # thread_id → ActiveRun（本进程）
+        self._run_queues: dict[str, deque[QueuedRun]] = {}  # thread_id → 排队的 Run
+        self._max_queue_depth = max_queue_depth
+        self._coalesce_stats = CoalesceStats()
+
+    async def start(self) -> None:
+        """启动注册表（接收其他 worker 转发的取消请求）"""
+        await self._registry.start(self._cancel_local_run)
+
+    async def stop(self) -> None:
+        await self.cancel_all()
+        # 等待被取消 Run 的摘要写入完成
+        if self._summary_tasks:
+            await asyncio.gather(*self._summary_tasks.values(), return_exceptions=True)
+        await self._registry.stop()
 
     def get_graph(self, assistant_id: str) -> CompiledStateGraph | None:
         return self._graphs.get(assistant_id)
@@ -50,22 +94,330 @@ class GraphExecutor:
     def has_active_run(self, thread_id: str) -> bool:
         return thread_id in self._active_runs
 
+    def active_thread_ids(self) -> list[str]:
+        """本进程有活跃 Run 的 Thread"""
+        return list(self._active_runs)
+
+    async def get_run_info(self, thread_id: str) -> dict[str, Any] | None:
+        """获取 Thread 的活跃 Run（本进程优先，其次查询其他 worker）"""
+        run = self._active_runs.get(thread_id)
+        if run:
+            return run.to_dict()
+        return await self._registry.get_run(thread_id)
+
+    async def list_run_infos(self, thread_id: str) -> list[dict[str, Any]]:
+        """获取 Thread 排队中和活跃的 Run（新的在前）"""
+        runs = [queued.run.to_dict() for queued in reversed(self._run_queues.get(thread_id, ()))]
+        active = await self.get_run_info(thread_id)
+        if active:
+            runs.append(active)
+        return runs
+
     async def cancel_all(self) -> None:
-        """取消所有活跃 Run"""
+        """取消所有排队中和活跃的 Run"""
+        for queue in list(self._run_queues.values()):
+            for queued in list(queue):
+                self._cancel_queued(queued)
+                await self._buffer.finish(str(queued.run.run_id))
         for run in list(self._active_runs.values()):
             run.task.cancel()
-        self._active_runs.clear()
+            await self._remove_active_run(run, start_next=False)
 
     async def cancel_run(self, thread_id: str, run_id: str) -> bool:
-        """取消指定 Run"""
+        """取消指定 Run（Run 在其他 worker 上时转发取消请求）"""
+        if await self._cancel_local_run(thread_id, run_id):
+            return True
+        return await self._registry.request_cancel(thread_id, run_id)
+
+    async def _cancel_local_run(self, thread_id: str, run_id: str) -> bool:
+        queued = self._find_queued(thread_id, run_id)
+        if queued:
+            self._cancel_queued(queued)
+            # 已订阅该 Run 输出的客户端立即结束
+            await self._buffer.finish(run_id)
+            return True
+
         run = self._active_runs.get(thread_id)
         if run and str(run.run_id) == run_id:
             run.task.cancel()
-            del self._active_runs[thread_id]
             await self._buffer.put(run_id, SSEEvent(event="end", data={"status": "cancelled"}))
+            await self._remove_active_run(run)
             return True
         return False
 
+    async def _add_active_run(self, run: ActiveRun) -> None:
+        self._active_runs[run.thread_id] = run
+        self._assistant_cache.set(run.thread_id, run.assistant_id)
+        await self._registry.register(run)
+        self._run_store.record(run.to_dict())
+        self._schedule_placeholder(run)
+
+    async def _remove_active_run(self, run: ActiveRun, start_next: bool = True) -> None:
+        """移除活跃 Run（只移除同一个 Run，避免误删同 Thread 的新 Run）
+
+        同时通知缓冲区 Run 已结束，出错/取消时订阅者也能立即退出。
+        start_next 为 True 时启动该 Thread 队列中的下一个 Run
+        （被新 Run 打断时由新 Run 占用，不启动队列）。
+        已结束的 Run 直接返回：被取消/打断的 Run 已由取消方移除，其任务的 finally 会再次调用。
+        """
+        if run.ended_at is not None:
+            return
+        if self._active_runs.get(run.thread_id) is run:
+            del self._active_runs[run.thread_id]
+        run.end()
+        self._run_store.record(run.to_dict())
+        if run.ticket is not None:
+            self._scheduler.release(run.ticket)
+        await self._buffer.finish(str(run.run_id))
+        await self._registry.unregister(run)
+        self._schedule_summary(run)
+        if start_next:
+            await self._start_next_queued(run.thread_id)
+
+    async def _interrupt_active_run(self, run: ActiveRun, strategy: MultitaskStrategy) -> None:
+        """取消被新 Run 打断的活跃 Run
+
+        先写入错误事件再移除（移除时结束缓冲区），订阅者退出前能收到打断原因。
+        位置由新 Run 占用，不启动队列。
+        rollback 需要更复杂的 checkpoint 操作，暂简化为 interrupt。
+        """
+        logger.info(f"multitask_strategy={strategy.value}: 取消 Run {run.run_id}")
+        if strategy == MultitaskStrategy.ROLLBACK:
+            message = "Run rolled back by new run"
+        else:
+            message = "Run interrupted by new run"
+        run.task.cancel()
+        await self._buffer.put(str(run.run_id), SSEEvent(event="error", data={"message": message}))
+        await self._remove_active_run(run, start_next=False)
+
+    # ==================== Thread 摘要 ====================
+
+    def _schedule_summary(self, run: ActiveRun) -> None:
+        """Run 结束后在后台更新 Thread 摘要（不阻塞 Run 清理和下一个 Run 启动）"""
+        graph = self.get_graph(run.assistant_id)
+        self._schedule_summary_write(
+            run.thread_id, lambda: self.refresh_thread_summary(run.thread_id, graph)
+        )
+
+    def _schedule_placeholder(self, run: ActiveRun) -> None:
+        """Run 开始时在后台写入占位摘要（Thread 第一个 Run 执行期间也能被列出/搜索到）"""
+        summaries = self._thread_summaries
+        if summaries is None:
+            return
+        metadata = {**run.metadata, "assistant_id": run.assistant_id}
+        self._schedule_summary_write(
+            run.thread_id,
+            lambda: summaries.insert_placeholder(run.thread_id, run.assistant_id, metadata),
+        )
+
+    def _schedule_summary_write(
+        self, thread_id: str, write: Callable[[], Awaitable[None]]
+    ) -> None:
+        """在后台执行摘要写入，同一 Thread 的写入在前一次完成后执行（正在删除的 Thread 跳过）"""
+        if self._thread_summaries is None or thread_id in self._deleting_threads:
+            return
+        previous = self._summary_tasks.get(thread_id)
+
+        async def _write_in_order() -> None:
+            if previous is not None:
+                await asyncio.wait([previous])
+            if thread_id not in self._deleting_threads:
+                await write()
+
+        task = asyncio.create_task(_write_in_order())
+        self._summary_tasks[thread_id] = task
+
+        def _done(_: asyncio.Task[None]) -> None:
+            if self._summary_tasks.get(thread_id) is task:
+                del self._summary_tasks[thread_id]
+
+        task.add_done_callback(_done)
+
+    @asynccontextmanager
+    async def deleting_thread(self, thread_id: str) -> AsyncIterator[None]:
+        """删除 Thread 期间不再写入其摘要，进入时等待已提交的摘要写入完成
+
+        避免被取消 Run 的摘要更新在摘要行删除之后又写回。
+        """
+        self._deleting_threads.add(thread_id)
+        try:
+            pending = self._summary_tasks.get(thread_id)
+            if pending is not None:
+                await asyncio.wait([pending])
+            yield
+        finally:
+            self._deleting_threads.discard(thread_id)
+
+    async def refresh_thread_summary(
+        self,
+        thread_id: str,
+        graph: CompiledStateGraph | None,
+        state: Any = None,
+    ) -> None:
+        """根据最新 state 写入 Thread 摘要（state 为 None 时读取）"""
+        if self._thread_summaries is None or graph is None:
+            return
+        try:
+            if state is None:
+                state = await graph.aget_state({"configurable": {"thread_id": thread_id}})
+        except Exception as e:
+            logger.warning(f"读取 Thread {thread_id} 状态失败，跳过摘要更新: {e}")
+            return
+        if thread_id in self._deleting_threads:
+            return
+        if not state or not state.values:
+            # Run 未写入任何 checkpoint（如开始前就被取消）：移除占位摘要
+            try:
+                await self._thread_summaries.delete(thread_id)
+            except Exception as e:
+                logger.warning(f"删除 Thread {thread_id} 占位摘要失败: {e}")
+            return
+        await self._thread_summaries.upsert(summarize_state(thread_id, state))
+
+    # ==================== Run 队列 ====================
+
+    def _enqueue(self, run: ActiveRun) -> QueuedRun:
+        """加入 Thread 的 Run 队列（队列已满时抛出 ValueError）"""
+        queue = self._run_queues.setdefault(run.thread_id, deque())
+        if len(queue) >= self._max_queue_depth:
+            raise ValueError(f"Thread run queue is full ({self._max_queue_depth} queued runs)")
+        queued = QueuedRun(run=run)
+        queue.append(queued)
+        self._run_store.record(run.to_dict())
+        logger.info(f"Run {run.run_id} 排队等待，Thread {run.thread_id} 队列长度 {len(queue)}")
+        return queued
+
+    def _dequeue(self, queued: QueuedRun) -> None:
+        queue = self._run_queues.get(queued.run.thread_id)
+        if queue is None:
+            return
+        if queued in queue:
+            queue.remove(queued)
+        if not queue:
+            del self._run_queues[queued.run.thread_id]
+
+    def _cancel_queued(self, queued: QueuedRun) -> None:
+        self._dequeue(queued)
+        if not queued.ready.done():
+            queued.ready.set_result(False)
+        queued.run.end()
+        self._run_store.record(queued.run.to_dict())
+        logger.info(f"排队中的 Run {queued.run.run_id} 已取消")
+
+    async def _start_next_queued(self, thread_id: str) -> None:
+        """Thread 空闲时启动队列中的下一个 Run（先占用 ActiveRun 位置再唤醒）"""
+        queue = self._run_queues.get(thread_id)
+        while queue and thread_id not in self._active_runs:
+            queued = queue.popleft()
+            if not queue:
+                del self._run_queues[thread_id]
+            if queued.ready.done():
+                continue  # 等待方已离开（客户端断开）
+            await self._add_active_run(queued.run)
+            queued.ready.set_result(True)
+
+    async def _wait_queued(self, queued: QueuedRun) -> bool:
+        """等待排队的 Run 开始执行，排队期间被取消时返回 False"""
+        try:
+            return await queued.ready
+        except asyncio.CancelledError:
+            # 等待方被取消（如 SSE 断开）：离开队列，已占用的位置交给下一个 Run
+            self._dequeue(queued)
+            if queued.ready.done() and not queued.ready.cancelled() and queued.ready.result():
+                await self._remove_active_run(queued.run)
+            else:
+                if queued.run.ended_at is None:
+                    queued.run.end()
+                    self._run_store.record(queued.run.to_dict())
+                # 通过 join/stream 等待该 Run 的订阅者随之结束
+                await self._buffer.finish(str(queued.run.run_id))
+            raise
+
+    def _find_queued(self, thread_id: str, run_id: str) -> QueuedRun | None:
+        for queued in self._run_queues.get(thread_id, ()):
+            if str(queued.run.run_id) == run_id:
+                return queued
+        return None
+
+    # ==================== 准入控制 ====================
+
+    def check_admission(self) -> None:
+        """新 Run 会因等待队列已满被拒绝时抛出 RunSchedulerFullError"""
+        self._scheduler.check()
+
+    def _submit(self, run: ActiveRun, request: RunCreate, force: bool = False) -> None:
+        """向调度器申请执行（等待队列已满时抛出 RunSchedulerFullError）"""
+        run.ticket = self._scheduler.submit(self._get_user_id(request), force=force)
+
+    async def _admit(self, run: ActiveRun) -> None:
+        """等待调度器放行（期间 Run 保持 PENDING），放行后标记为 RUNNING"""
+        assert run.ticket is not None
+        try:
+            await run.ticket
+        except asyncio.CancelledError:
+            self._scheduler.cancel(run.ticket)
+            raise
+        run.start()
+        await self._registry.register(run)
+        self._run_store.record(run.to_dict())
+
+    @staticmethod
+    def _get_user_id(request: RunCreate) -> str:
+        """公平调度使用的用户标识：metadata.user_id，其次 config.configurable.user_id"""
+        user_id = (request.metadata or {}).get("user_id")
+        if not user_id and request.config and request.config.configurable:
+            user_id = request.config.configurable.get("user_id")
+        return str(user_id or "")
+
+    def get_scheduler_stats(self) -> dict[str, Any]:
+        return self._scheduler.get_stats()
+
+    def get_queue_stats(self) -> dict[str, Any]:
+        """Run 队列指标（供 /metrics 使用）"""
+        return {
+            "threads": len(self._run_queues),
+            "queued_runs": sum(len(queue) for queue in self._run_queues.values()),
+            "max_depth": self._max_queue_depth,
+        }
+
+    async def _check_remote_run(self, thread_id: str, strategy: MultitaskStrategy) -> str | None:
+        """检查其他 worker 上是否有该 Thread 的活跃 Run
+
+        interrupt/rollback 时请求其他 worker 取消该 Run，并等待其注销后才放行，
+        避免两个 Run 同时写入同一 Thread 的 checkpoint。reject/enqueue 直接拒绝：
+        Run 队列只存在于持有当前 Run 的 worker，无法跨 worker 排队。
+
+        Returns:
+            需要拒绝新 Run 时返回错误信息，否则返回 None
+        """
+        if thread_id in self._active_runs:
+            return None
+        remote = await self._registry.get_run(thread_id)
+        if remote is None:
+            return None
+        if strategy in (MultitaskStrategy.INTERRUPT, MultitaskStrategy.ROLLBACK):
+            logger.info(
+                f"multitask_strategy={strategy.value}: 取消其他 worker 上的 Run {remote['run_id']}"
+            )
+            await self._registry.request_cancel(thread_id, remote["run_id"])
+            if await self._wait_remote_run_stopped(thread_id):
+                return None
+            logger.warning(
+                f"其他 worker 上的 Run {remote['run_id']} 在 {REMOTE_CANCEL_TIMEOUT:g} 秒内未停止"
+            )
+            return "Thread already has an active run that could not be cancelled in time"
+        return "Thread already has an active run"
+
+    async def _wait_remote_run_stopped(self, thread_id: str) -> bool:
+        """等待其他 worker 上该 Thread 的 Run 注销，超过 REMOTE_CANCEL_TIMEOUT 返回 False"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + REMOTE_CANCEL_TIMEOUT
+        while await self._registry.get_run(thread_id) is not None:
+            if loop.time() >= deadline:
+                return False
+            await asyncio.sleep(REMOTE_CANCEL_POLL_INTERVAL)
+        return True
+
     async def stream_run(
         self,
         thread_id: str,
@@ -74,6 +426,19 @@ class GraphExecutor:
         """流式执行 Run"""
         # 处理 multitask_strategy
         strategy = request.multitask_strategy or MultitaskStrategy.REJECT
+        if strategy in (MultitaskStrategy.INTERRUPT, MultitaskStrategy.ROLLBACK):
+            # 新 Run 会被拒绝时不取消其他 worker 上的 Run
+            try:
+                self.check_admission()
+            except RunSchedulerFullError as e:
+                yield SSEEvent(event="error", data={"message": str(e)})
+                return
+        remote_error = await self._check_remote_run(thread_id, strategy)
+        if remote_error:
+            yield SSEEvent(event="error", data={"message": remote_error})
+            return
+        enqueue = False
+        interrupted: ActiveRun | None = None
         if thread_id in self._active_runs:
             existing_run = self._active_runs[thread_id]
             if strategy == MultitaskStrategy.REJECT:
@@ -81,35 +446,12 @@ class GraphExecutor:
                     event="error", data={"message": "Thread already has an active run"}
                 )
                 return
-            elif strategy == MultitaskStrategy.INTERRUPT:
-                # 取消当前 Run，启动新 Run
-                logger.info(
-                    f"multitask_strategy=interrupt: 取消 Run {existing_run.run_id}"
-                )
-                existing_run.task.cancel()
-                del self._active_runs[thread_id]
-                await self._buffer.put(
-                    str(existing_run.run_id),
-                    SSEEvent(event="error", data={"message": "Run interrupted by new run"}),
-                )
-            elif strategy == MultitaskStrategy.ROLLBACK:
-                # 取消当前 Run 并回滚（回滚需要更复杂的 checkpoint 操作，暂简化为 interrupt）
-                logger.info(
-                    f"multitask_strategy=rollback: 取消 Run {existing_run.run_id}"
-                )
-                existing_run.task.cancel()
-                del self._active_runs[thread_id]
-                await self._buffer.put(
-                    str(existing_run.run_id),
-                    SSEEvent(event="error", data={"message": "Run rolled back by new run"}),
-                )
+            elif strategy in (MultitaskStrategy.INTERRUPT, MultitaskStrategy.ROLLBACK):
+                # 新 Run 通过准入后再取消当前 Run
+                interrupted = existing_run
             elif strategy == MultitaskStrategy.ENQUEUE:
-                # 排队策略暂不支持，降级为 reject
-                yield SSEEvent(
-                    event="error",
-                    data={"message": "Enqueue strategy not supported, thread has active run"},
-                )
-                return
+                # 排队，当前 Run 结束后自动开始
+                enqueue = True
 
         graph = self.get_graph(request.assistant_id)
         if not graph:
@@ -131,15 +473,43 @@ class GraphExecutor:
             run_id=run_id,
             thread_id=thread_id,
             assistant_id=request.assistant_id,
-            status=RunStatus.RUNNING,
+            status=RunStatus.PENDING,
             task=current_task,
             metadata=request.metadata or {},
             on_disconnect=request.on_disconnect or "cancel",
         )
-        self._active_runs[thread_id] = active_run
+        if enqueue:
+            try:
+                queued = self._enqueue(active_run)
+            except ValueError as e:
+                yield SSEEvent(event="error", data={"message": str(e)})
+                return
+            if not await self._wait_queued(queued):
+                yield SSEEvent(event="error", data={"message": "Run cancelled"})
+                return
+            # 已被 Thread 队列接受，不再受等待队列上限限制
+            self._submit(active_run, request, force=True)
+        else:
+            try:
+                self._submit(active_run, request)
+            except RunSchedulerFullError as e:
+                yield SSEEvent(event="error", data={"message": str(e)})
+                return
+            if interrupted is not None:
+                await self._interrupt_active_run(interrupted, strategy)
+            await self._add_active_run(active_run)
+
+        # 等待调度器放行（尚未开始执行，断开时直接移除，不转入后台）
+        try:
+            await self._admit(active_run)
+        except asyncio.CancelledError:
+            await self._remove_active_run(active_run)
+            raise
 
         # 是否缓冲事件（用于重连）
         stream_resumable = request.stream_resumable or False
+        # 事件序号（非 resumable 时本地分配，保证与缓冲区规则一致）
+        seq = itertools.count()
 
         try:
             # 延迟执行
@@ -151,28 +521,25 @@ class GraphExecutor:
             metadata_event = SSEEvent(
                 event="metadata", data={"run_id": run_id_str, "thread_id": thread_id}
             )
-            if stream_resumable:
-                await self._buffer.put(run_id_str, metadata_event)
-            yield metadata_event
+            yield await self._emit(run_id_str, metadata_event, stream_resumable, seq)
 
             # 执行 graph
-            config = self._build_config(thread_id, request)
+            config = self._build_config(thread_id, request, active_run)
             input_data = self._build_input(request)
             stream_mode = self._parse_stream_mode(request.stream_mode)
             interrupt_before, interrupt_after = self._parse_interrupt_config(request)
 
-            async for chunk in graph.astream(
+            stream = graph.astream(
                 input_data,
                 config=config,
                 stream_mode=stream_mode,  # pyright: ignore[reportArgumentType]
                 interrupt_before=interrupt_before,
                 interrupt_after=interrupt_after,
                 subgraphs=request.stream_subgraphs or False,
-            ):
+            )
+            async for chunk in self._coalesce(stream, stream_mode, request.stream_coalesce_ms):
                 event = self._chunk_to_event(chunk, stream_mode)
-                if stream_resumable:
-                    await self._buffer.put(run_id_str, event)
-                yield event
+                yield await self._emit(run_id_str, event, stream_resumable, seq)
 
             # 检查是否中断（仅更新内部状态，不发送额外事件）
             state = await graph.aget_state(config)
@@ -183,9 +550,7 @@ class GraphExecutor:
 
             # 结束事件（data=None 符合 LangGraph SDK 规范）
             end_event = SSEEvent(event="end", data=None)
-            if stream_resumable:
-                await self._buffer.put(run_id_str, end_event)
-            yield end_event
+            yield await self._emit(run_id_str, end_event, stream_resumable, seq)
 
             # Webhook 回调
             if request.webhook:
@@ -199,7 +564,7 @@ class GraphExecutor:
             # on_completion 处理
             if request.on_completion == "delete":
                 # 清理 buffer 中的事件历史
-                self._buffer.clear_run(run_id_str)
+                await self._buffer.clear_run(run_id_str)
 
         except asyncio.CancelledError:
             if active_run.on_disconnect == "continue":
@@ -221,6 +586,7 @@ class GraphExecutor:
                         stream_resumable=stream_resumable,
                         webhook=request.webhook,
                         on_completion=request.on_completion,
+                        coalesce_ms=request.stream_coalesce_ms,
                     )
                 )
                 active_run.task = background_task
@@ -229,36 +595,54 @@ class GraphExecutor:
                 # on_disconnect='cancel'：发送取消错误
                 active_run.status = RunStatus.INTERRUPTED
                 error_event = SSEEvent(event="error", data={"message": "Run cancelled"})
-                if stream_resumable:
-                    await self._buffer.put(run_id_str, error_event)
-                yield error_event
+                yield await self._emit(run_id_str, error_event, stream_resumable, seq)
         except Exception as e:
             logger.exception(f"Run {run_id_str} 失败")
             active_run.status = RunStatus.ERROR
+            active_run.error = str(e)
             error_event = SSEEvent(event="error", data={"message": str(e)})
-            await self._buffer.put(run_id_str, error_event)
-            yield error_event
+            yield await self._emit(run_id_str, error_event, stream_resumable, seq)
         finally:
             # 确保清理 active_run（除非 on_disconnect='continue' 且转为后台执行）
             current_task = asyncio.current_task()
-            if active_run.task == current_task and thread_id in self._active_runs:
-                del self._active_runs[thread_id]
+            if active_run.task == current_task:
+                await self._remove_active_run(active_run)
 
     async def stream_run_output(
         self,
         thread_id: str,
         run_id: str,
+        last_event_id: int | None = None,
     ) -> AsyncIterator[SSEEvent]:
-        """订阅 Run 输出（用于重连）"""
-        # 重放历史事件
-        for event in self._buffer.get_events(run_id):
-            yield event
-
-        # 如果还在执行，订阅新事件
-        if self._buffer.is_active(run_id):
-            async for event in self._buffer.subscribe(run_id):
+        """订阅 Run 输出（用于重连）
+
+        只传输 last_event_id 之后的事件；Run 仍在执行时继续订阅新事件。
+        """
+        # 排队中的 Run 尚无事件：先登记缓冲区，订阅后等待其开始执行
+        if self._find_queued(thread_id, run_id):
+            await self._buffer.open(run_id)
+            async for event in self._buffer.subscribe(run_id, last_event_id):
+                yield event
+        elif await self._buffer.is_active(run_id):
+            async for event in self._buffer.subscribe(run_id, last_event_id):
+                yield event
+        else:
+            for event in await self._buffer.get_events(run_id, last_event_id):
                 yield event
 
+    async def _emit(
+        self,
+        run_id: str,
+        event: SSEEvent,
+        resumable: bool,
+        seq: Iterator[int],
+    ) -> SSEEvent:
+        """为事件分配序号（resumable 时写入缓冲区，由缓冲区分配）"""
+        if resumable:
+            return await self._buffer.put(run_id, event)
+        event.id = str(next(seq))
+        return event
+
     async def create_run(
         self,
         thread_id: str,
@@ -267,22 +651,23 @@ class GraphExecutor:
         """创建 Run（后台执行，立即返回）"""
         # 处理 multitask_strategy
         strategy = request.multitask_strategy or MultitaskStrategy.REJECT
+        if strategy in (MultitaskStrategy.INTERRUPT, MultitaskStrategy.ROLLBACK):
+            # 新 Run 会被拒绝时不取消其他 worker 上的 Run
+            self.check_admission()
+        remote_error = await self._check_remote_run(thread_id, strategy)
+        if remote_error:
+            raise ValueError(remote_error)
+        enqueue = False
+        interrupted: ActiveRun | None = None
         if thread_id in self._active_runs:
             existing_run = self._active_runs[thread_id]
             if strategy == MultitaskStrategy.REJECT:
                 raise ValueError("Thread already has an active run")
             elif strategy in (MultitaskStrategy.INTERRUPT, MultitaskStrategy.ROLLBACK):
-                logger.info(
-                    f"multitask_strategy={strategy.value}: 取消 Run {existing_run.run_id}"
-                )
-                existing_run.task.cancel()
-                del self._active_runs[thread_id]
-                await self._buffer.put(
-                    str(existing_run.run_id),
-                    SSEEvent(event="error", data={"message": f"Run {strategy.value} by new run"}),
-                )
+                # 新 Run 通过准入后再取消当前 Run
+                interrupted = existing_run
             elif strategy == MultitaskStrategy.ENQUEUE:
-                raise ValueError("Enqueue strategy not supported, thread has active run")
+                enqueue = True
 
         graph = self.get_graph(request.assistant_id)
         if not graph:
@@ -291,8 +676,18 @@ class GraphExecutor:
         run_id = uuid4()
         run_id_str = str(run_id)
 
-        # 启动后台任务执行 workflow
+        queued: QueuedRun | None = None
+        # 不排队的 Run 在创建时申请执行，等待队列已满时直接拒绝（429）
+        ticket = None if enqueue else self._scheduler.submit(self._get_user_id(request))
+        if interrupted is not None:
+            await self._interrupt_active_run(interrupted, strategy)
+
+        # 启动后台任务执行 workflow（排队的 Run 先等待轮到自己）
         async def _run_wrapper() -> None:
+            if queued is not None:
+                if not await self._wait_queued(queued):
+                    return
+                self._submit(active_run, request, force=True)  # type: ignore[has-type]
             await self._execute_run_in_background(
                 thread_id=thread_id,
                 run_id_str=run_id_str,
@@ -311,8 +706,16 @@ class GraphExecutor:
             task=background_task,
             metadata=request.metadata or {},
             on_disconnect=request.on_disconnect or "continue",  # 后台运行默认 continue
+            ticket=ticket,
         )
-        self._active_runs[thread_id] = active_run
+        if enqueue:
+            try:
+                queued = self._enqueue(active_run)
+            except ValueError:
+                background_task.cancel()
+                raise
+        else:
+            await self._add_active_run(active_run)
 
         return active_run
 
@@ -331,14 +734,14 @@ class GraphExecutor:
         stream_resumable = request.stream_resumable or False
 
         try:
+            # 等待调度器放行，放行后状态为 RUNNING
+            await self._admit(active_run)
+
             # 延迟执行
             if request.after_seconds and request.after_seconds > 0:
                 logger.info(f"Run {run_id_str} 延迟 {request.after_seconds} 秒执行")
                 await asyncio.sleep(request.after_seconds)
 
-            # 更新状态为 RUNNING
-            active_run.status = RunStatus.RUNNING
-
             # 发送 metadata 事件
             metadata_event = SSEEvent(
                 event="metadata", data={"run_id": run_id_str, "thread_id": thread_id}
@@ -347,19 +750,20 @@ class GraphExecutor:
                 await self._buffer.put(run_id_str, metadata_event)
 
             # 执行 graph
-            config = self._build_config(thread_id, request)
+            config = self._build_config(thread_id, request, active_run)
             input_data = self._build_input(request)
             stream_mode = self._parse_stream_mode(request.stream_mode)
             interrupt_before, interrupt_after = self._parse_interrupt_config(request)
 
-            async for chunk in graph.astream(
+            stream = graph.astream(
                 input_data,
                 config=config,
                 stream_mode=stream_mode,  # pyright: ignore[reportArgumentType]
                 interrupt_before=interrupt_before,
                 interrupt_after=interrupt_after,
                 subgraphs=request.stream_subgraphs or False,
-            ):
+            )
+            async for chunk in self._coalesce(stream, stream_mode, request.stream_coalesce_ms):
                 event = self._chunk_to_event(chunk, stream_mode)
                 if stream_resumable:
                     await self._buffer.put(run_id_str, event)
@@ -387,7 +791,7 @@ class GraphExecutor:
 
             # on_completion 处理
             if request.on_completion == "delete":
-                self._buffer.clear_run(run_id_str)
+                await self._buffer.clear_run(run_id_str)
 
         except asyncio.CancelledError:
             active_run.status = RunStatus.INTERRUPTED
@@ -397,18 +801,23 @@ class GraphExecutor:
         except Exception as e:
             logger.exception(f"后台 Run {run_id_str} 失败")
             active_run.status = RunStatus.ERROR
+            active_run.error = str(e)
             error_event = SSEEvent(event="error", data={"message": str(e)})
             if stream_resumable:
                 await self._buffer.put(run_id_str, error_event)
         finally:
-            if thread_id in self._active_runs:
-                del self._active_runs[thread_id]
+            await self._remove_active_run(active_run)
 
-    def _build_config(self, thread_id: str, request: RunCreate) -> RunnableConfig:
+    def _build_config(
+        self, thread_id: str, request: RunCreate, run: ActiveRun
+    ) -> RunnableConfig:
         config: RunnableConfig = {
             "configurable": {"thread_id": thread_id},
-            # 将 assistant_id 写入 metadata，供后续 get_thread/get_thread_state 使用
-            "metadata": {"assistant_id": request.assistant_id},
+            # 将 assistant_id 写入 metadata，供后续 get_thread/get_thread_state 使用；
+            # Run 的 metadata 一并写入，作为 Thread metadata（search/摘要按其过滤）
+            "metadata": {**(request.metadata or {}), "assistant_id": request.assistant_id},
+            # 统计本次 Run 的 token 用量，结束时写入 RunStore
+            "callbacks": [run.usage],
         }
 
         # 支持从指定 checkpoint 恢复（用于错误重试或回退）
@@ -463,6 +872,23 @@ class GraphExecutor:
 
         return request.input
 
+    def _coalesce(
+        self,
+        stream: AsyncIterator[Any],
+        stream_mode: str | list[str],
+        window_ms: int | None,
+    ) -> AsyncIterator[Any]:
+        """按需合并 messages 模式的 token 片段（RunCreate.stream_coalesce_ms）"""
+        if not window_ms or window_ms <= 0 or not is_messages_mode(stream_mode):
+            return stream
+        coalescer = MessageChunkCoalescer(
+            stream_mode, window_ms / 1000, stats=self._coalesce_stats
+        )
+        return coalesce_chunks(stream, coalescer)
+
+    def get_coalesce_stats(self) -> dict[str, Any]:
+        return self._coalesce_stats.to_dict()
+
     def _parse_stream_mode(
         self, mode: StreamMode | list[StreamMode] | None
     ) -> str | list[str]:
@@ -492,31 +918,6 @@ class GraphExecutor:
 
         return before, after
 
-    def _serialize_message_data(self, data: Any) -> Any:
-        """序列化消息数据，将 LangChain 消息对象转换为可 JSON 序列化的格式。
-
-        messages 模式返回的数据可能是：
-        - BaseMessage 或其子类（AIMessage, HumanMessage, ToolMessage 等）
-        - (message, metadata) tuple
-        - list of messages
-        """
-        if isinstance(data, BaseMessage):
-            # 将 LangChain 消息对象转换为 dict
-            return data.model_dump()
-        elif isinstance(data, tuple) and len(data) == 2:
-            # (message, metadata) 格式
-            msg, metadata = data
-            if isinstance(msg, BaseMessage):
-                return [msg.model_dump(), metadata]
-            return data
-        elif isinstance(data, list):
-            # 消息列表
-            return [
-                item.model_dump() if isinstance(item, BaseMessage) else item
-                for item in data
-            ]
-        return data
-
     def _chunk_to_event(self, chunk: Any, stream_mode: str | list[str]) -> SSEEvent:
         """将 LangGraph chunk 转换为 SSE 事件。
 
@@ -531,16 +932,14 @@ class GraphExecutor:
         - 无 subgraphs: event: {mode}
         - 有 subgraphs: event: {mode}|{namespace_path}
           例如: event: messages|respond:5ecec403-30a5-ebd1-8c53-4745946ec2df
+
+        消息对象原样放入事件，写入缓冲区时由 serializer 编码（只序列化一次）。
         """
-        # 检查是否需要序列化消息数据
         current_mode = stream_mode if isinstance(stream_mode, str) else "values"
 
-        # 如果 chunk 本身是 BaseMessage，直接序列化（messages 模式单消息）
+        # messages 模式单消息
         if isinstance(chunk, BaseMessage):
-            return SSEEvent(
-                event=current_mode,
-                data=chunk.model_dump()
-            )
+            return SSEEvent(event=current_mode, data=chunk)
 
         if isinstance(chunk, tuple):
             if len(chunk) == 2:
@@ -549,41 +948,24 @@ class GraphExecutor:
                 if isinstance(first, tuple):
                     namespace, data = chunk
                     mode = stream_mode if isinstance(stream_mode, str) else "values"
-                    # 如果是 messages 模式，序列化消息数据
-                    if mode in ("messages", "messages-tuple"):
-                        data = self._serialize_message_data(data)
                     event_name = self._format_event_name(mode, namespace)
                     return SSEEvent(event=event_name, data=data)
                 # (message, metadata) - messages 模式返回的 tuple
                 # 判断方式：first 是 BaseMessage 对象
                 elif isinstance(first, BaseMessage):
-                    # 这是 (message, metadata) 格式，序列化后返回
-                    data = [first.model_dump(), second]
-                    return SSEEvent(event=current_mode, data=data)
+                    return SSEEvent(event=current_mode, data=[first, second])
                 # (mode, data) - 多模式无 subgraphs（mode 是字符串）
                 elif isinstance(first, str):
                     mode, data = chunk
-                    # 如果是 messages 模式，序列化消息数据
-                    if mode in ("messages", "messages-tuple"):
-                        data = self._serialize_message_data(data)
                     return SSEEvent(event=mode, data=data)
             elif len(chunk) == 3:
                 # (namespace, mode, data) - 多模式有 subgraphs
                 namespace, mode, data = chunk
-                # 如果是 messages 模式，序列化消息数据
-                if mode in ("messages", "messages-tuple"):
-                    data = self._serialize_message_data(data)
                 event_name = self._format_event_name(mode, namespace)
                 return SSEEvent(event=event_name, data=data)
 
         # 单模式无 subgraphs: 直接返回 data
-        data = chunk
-        # 如果是 messages 模式，序列化消息数据
-        if current_mode in ("messages", "messages-tuple"):
-            data = self._serialize_message_data(data)
-        return SSEEvent(
-            event=current_mode, data=data
-        )
+        return SSEEvent(event=current_mode, data=chunk)
 
     def _format_event_name(self, mode: str, namespace: tuple[str, ...]) -> str:
         """格式化 SSE 事件名称（含 namespace）。
@@ -646,6 +1028,7 @@ class GraphExecutor:
         stream_resumable: bool = False,
         webhook: str | None = None,
         on_completion: str | None = None,
+        coalesce_ms: int | None = None,
     ) -> None:
         """在后台继续执行 workflow（SSE 断开后）
 
@@ -653,14 +1036,15 @@ class GraphExecutor:
         事件会被写入 buffer，供客户端重连后获取。
         """
         try:
-            async for chunk in graph.astream(
+            stream = graph.astream(
                 None,  # 从 checkpoint 继续
                 config=config,
                 stream_mode=stream_mode,  # pyright: ignore[reportArgumentType]
                 interrupt_before=interrupt_before,
                 interrupt_after=interrupt_after,
                 subgraphs=subgraphs,
-            ):
+            )
+            async for chunk in self._coalesce(stream, stream_mode, coalesce_ms):
                 event = self._chunk_to_event(chunk, stream_mode)
                 if stream_resumable:
                     await self._buffer.put(run_id_str, event)
@@ -689,14 +1073,14 @@ class GraphExecutor:
 
             # on_completion 处理
             if on_completion == "delete":
-                self._buffer.clear_run(run_id_str)
+                await self._buffer.clear_run(run_id_str)
 
         except Exception as e:
             logger.exception(f"后台 Run {run_id_str} 失败")
             active_run.status = RunStatus.ERROR
+            active_run.error = str(e)
             error_event = SSEEvent(event="error", data={"message": str(e)})
             if stream_resumable:
                 await self._buffer.put(run_id_str, error_event)
         finally:
-            if thread_id in self._active_runs:
-                del self._active_runs[thread_id]
+            await self._remove_active_run(active_run)
@@ -0,0 +1,244 @@
+"""活跃 Run 注册表 - 跨 worker 查询和取消 Run
+
+Run 的 asyncio.Task 只存在于执行它的 worker，GraphExecutor._active_runs
+仍是本进程 Run 的唯一来源。注册表负责把本进程的 Run 暴露给其他 worker：
+
+- LocalRunRegistry: 单 worker（默认），无需额外登记
+- RedisRunRegistry: 在 Redis 中登记 Run 信息并定期心跳，
+  取消请求通过 Pub/Sub 转发给持有该 Run 的 worker
+
+跨 worker 只支持 reject/interrupt/rollback：Run 队列在持有当前 Run 的 worker 内存中，
+其他 worker 收到 multitask_strategy=enqueue 的请求时直接拒绝。
+"""
+
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable
+from uuid import uuid4
+import asyncio
+import json
+import logging
+
+from .types import ActiveRun
+
+logger = logging.getLogger(__name__)
+
+# 收到取消请求时的回调: (thread_id, run_id) -> 是否已取消
+CancelHandler = Callable[[str, str], Awaitable[bool]]
+
+# 取消请求订阅断开后的重连间隔（秒），按指数退避
+_RECONNECT_MIN_DELAY = 1.0
+_RECONNECT_MAX_DELAY = 30.0
+
+
+class RunRegistry(ABC):
+    """活跃 Run 注册表接口"""
+
+    async def start(self, on_cancel: CancelHandler) -> None:
+        """启动（on_cancel 用于处理其他 worker 发来的取消请求）"""
+
+    async def stop(self) -> None:
+        """停止并注销本进程的所有 Run"""
+
+    @abstractmethod
+    async def register(self, run: ActiveRun) -> None:
+        """登记（或更新）本进程的 Run"""
+
+    @abstractmethod
+    async def unregister(self, run: ActiveRun) -> None:
+        """注销本进程的 Run"""
+
+    @abstractmethod
+    async def get_run(self, thread_id: str) -> dict[str, Any] | None:
+        """查询其他 worker 上 Thread 的活跃 Run（API 响应格式）"""
+
+    @abstractmethod
+    async def request_cancel(self, thread_id: str, run_id: str) -> bool:
+        """请求其他 worker 取消 Run，Run 不存在时返回 False"""
+
+    def get_stats(self) -> dict[str, Any]:
+        return {}
+
+
+class LocalRunRegistry(RunRegistry):
+    """单 worker 注册表：所有 Run 都在本进程，executor 自行管理"""
+
+    async def register(self, run: ActiveRun) -> None:
+        pass
+
+    async def unregister(self, run: ActiveRun) -> None:
+        pass
+
+    async def get_run(self, thread_id: str) -> dict[str, Any] | None:
+        return None
+
+    async def request_cancel(self, thread_id: str, run_id: str) -> bool:
+        return False
+
+    def get_stats(self) -> dict[str, Any]:
+        return {"backend": "memory"}
+
+
+class RedisRunRegistry(RunRegistry):
+    """基于 Redis 的注册表
+
+    - {prefix}:thread:{thread_id}:runs  Hash，field 为 run_id，值为 Run 信息（含心跳时间）
+    - {prefix}:cancel                   Pub/Sub 频道，广播取消请求
+
+    worker 异常退出时不会注销，其 Run 在心跳超过 run_ttl 后被忽略并随 key 过期。
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        key_prefix: str = "langgraph",
+        run_ttl: int = 120,
+    ):
+        self._redis_url = redis_url
+        self._prefix = key_prefix
+        self._run_ttl = run_ttl
+        self._worker_id = uuid4().hex[:12]
+        self._redis: Any = None
+        self._local: dict[str, ActiveRun] = {}  # run_id → ActiveRun
+        self._on_cancel: CancelHandler | None = None
+        self._tasks: list[asyncio.Task[None]] = []
+        self._remote_cancels = 0
+
+    async def start(self, on_cancel: CancelHandler) -> None:
+        from .buffer_redis import create_redis_client
+
+        self._redis = create_redis_client(self._redis_url)
+        await self._redis.ping()
+        self._on_cancel = on_cancel
+        self._tasks = [
+            asyncio.create_task(self._listen_cancel()),
+            asyncio.create_task(self._heartbeat_loop()),
+        ]
+        logger.info(f"RedisRunRegistry 已启动: worker={self._worker_id}")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        if self._redis is not None:
+            for run in list(self._local.values()):
+                await self.unregister(run)
+            await self._redis.aclose()
+            self._redis = None
+        logger.info("RedisRunRegistry 已停止")
+
+    def _runs_key(self, thread_id: str) -> str:
+        return f"{self._prefix}:thread:{thread_id}:runs"
+
+    @property
+    def _cancel_channel(self) -> str:
+        return f"{self._prefix}:cancel"
+
+    # ==================== 登记 ====================
+
+    async def register(self, run: ActiveRun) -> None:
+        self._local[str(run.run_id)] = run
+        await self._write(run)
+
+    async def unregister(self, run: ActiveRun) -> None:
+        self._local.pop(str(run.run_id), None)
+        await self._redis.hdel(self._runs_key(run.thread_id), str(run.run_id))
+
+    async def _write(self, run: ActiveRun) -> None:
+        payload = {
+            **run.to_dict(),
+            "worker_id": self._worker_id,
+            "heartbeat_at": datetime.now(timezone.utc).timestamp(),
+        }
+        key = self._runs_key(run.thread_id)
+        await (
+            self._redis.pipeline(transaction=False)
+            .hset(key, str(run.run_id), json.dumps(payload, ensure_ascii=False))
+            .expire(key, self._run_ttl)
+            .execute()
+        )
+
+    async def _heartbeat_loop(self) -> None:
+        """定期刷新本进程 Run 的心跳和状态"""
+        while True:
+            await asyncio.sleep(self._run_ttl / 3)
+            for run in list(self._local.values()):
+                try:
+                    await self._write(run)
+                except Exception as e:
+                    logger.warning(f"Run {run.run_id} 心跳失败: {e}")
+
+    # ==================== 查询 ====================
+
+    async def get_run(self, thread_id: str) -> dict[str, Any] | None:
+        entries = await self._redis.hgetall(self._runs_key(thread_id))
+        now = datetime.now(timezone.utc).timestamp()
+        latest: dict[str, Any] | None = None
+        for raw in entries.values():
+            run = json.loads(raw)
+            if now - run.get("heartbeat_at", 0) > self._run_ttl:
+                continue  # worker 已失联
+            if latest is None or run["created_at"] > latest["created_at"]:
+                latest = run
+        if latest is None:
+            return None
+        latest.pop("worker_id", None)
+        latest.pop("heartbeat_at", None)
+        return latest
+
+    # ==================== 取消 ====================
+
+    async def request_cancel(self, thread_id: str, run_id: str) -> bool:
+        run = await self.get_run(thread_id)
+        if run is None or run["run_id"] != run_id:
+            return False
+        await self._redis.publish(
+            self._cancel_channel, json.dumps({"thread_id": thread_id, "run_id": run_id})
+        )
+        return True
+
+    async def _listen_cancel(self) -> None:
+        """订阅取消频道，连接断开后按指数退避重连"""
+        delay = _RECONNECT_MIN_DELAY
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.subscribe(self._cancel_channel)
+                delay = _RECONNECT_MIN_DELAY
+                async for message in pubsub.listen():
+                    await self._handle_cancel(message)
+                logger.warning(f"取消请求订阅已关闭，{delay:g} 秒后重连")
+            except Exception as e:
+                logger.warning(f"取消请求订阅失败，{delay:g} 秒后重连: {e}")
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception as e:
+                    logger.debug(f"关闭取消请求订阅失败: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, _RECONNECT_MAX_DELAY)
+
+    async def _handle_cancel(self, message: dict[str, Any]) -> None:
+        """处理其他 worker 转发的取消请求（只处理本进程持有的 Run）"""
+        if message.get("type") != "message":
+            return
+        try:
+            request = json.loads(message["data"])
+            if request["run_id"] in self._local and self._on_cancel:
+                if await self._on_cancel(request["thread_id"], request["run_id"]):
+                    self._remote_cancels += 1
+        except Exception as e:
+            logger.warning(f"处理取消请求失败: {e}")
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "backend": "redis",
+            "worker_id": self._worker_id,
+            "local_runs": len(self._local),
+            "remote_cancels": self._remote_cancels,
+        }
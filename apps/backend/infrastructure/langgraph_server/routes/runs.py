@@ -1,47 +1,34 @@
 """Run 路由 - Run 流式执行和管理"""
 
 import asyncio
-import dataclasses
-import json
-from enum import Enum
 from typing import Any, Callable, Coroutine, Dict, List, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Header, HTTPException, Query
-from pydantic import BaseModel
 from sse_starlette.sse import EventSourceResponse
 
 from ..config import LangGraphServerConfig
 from ..service import LangGraphService
-from ..schemas import Run, RunCreate
+from ..scheduler import RunSchedulerFullError
+from ..schemas import Run, RunCreate, SSEEvent
+from ..serializer import encode_event_frame
 
 
-class _PydanticJSONEncoder(json.JSONEncoder):
-    """自定义 JSON 编码器
+def _server_busy(e: RunSchedulerFullError) -> HTTPException:
+    """等待队列已满：429 + Retry-After"""
+    return HTTPException(
+        status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)}
+    )
 
-    处理 SSE 事件数据序列化，支持：
-    - Pydantic BaseModel
-    - dataclass（包括 LangGraph 的 Interrupt）
-    - Enum
-    - 普通对象（有 __dict__）
-    """
 
-    def default(self, o: Any) -> Any:
-        if isinstance(o, BaseModel):
-            return o.model_dump()
-        if dataclasses.is_dataclass(o) and not isinstance(o, type):
-            # 处理 dataclass 实例（如 LangGraph 的 Interrupt）
-            return dataclasses.asdict(o)
-        if isinstance(o, Enum):
-            return o.value
-        if hasattr(o, "__dict__"):
-            return o.__dict__
-        return str(o)
-
-
-def _serialize_event_data(data: Any) -> str:
-    """序列化 SSE 事件数据"""
-    return json.dumps(data, ensure_ascii=False, cls=_PydanticJSONEncoder)
+def _parse_last_event_id(last_event_id: Optional[str]) -> Optional[int]:
+    """解析 Last-Event-Id（无效值视为未提供，从头重放）"""
+    if last_event_id is None:
+        return None
+    try:
+        return int(last_event_id)
+    except ValueError:
+        return None
 
 
 def add_runs_routes(
@@ -68,34 +55,29 @@ def add_runs_routes(
                 detail=f"Graph {request.assistant_id} not found. Available: {service.list_graphs()}",
             )
 
+        # 服务繁忙时在建立 SSE 连接前拒绝
+        try:
+            service.check_admission()
+        except RunSchedulerFullError as e:
+            raise _server_busy(e)
+
         # 注意：LangGraph 的 Thread 是虚拟的，首次 run 时会自动创建 checkpoint
         # if_not_exists 参数在此场景下不适用，因为我们无法区分：
         # 1. 从未使用过的 thread_id（应该检查 if_not_exists）
         # 2. 通过 POST /threads 创建但还没执行 run 的 thread（应该允许）
         # 因此直接允许所有 thread_id 执行 run，首次执行会自动创建 checkpoint
 
-        seq_counter = 0
-
         async def event_generator():
-            nonlocal seq_counter
             try:
+                # 事件 id 由 executor/buffer 分配，与 /runs/{run_id}/stream 重连时一致
                 async for event in service.stream_run(str(thread_id), request):
-                    yield {
-                        "event": event.event,
-                        "data": _serialize_event_data(event.data),
-                        "id": str(seq_counter),
-                    }
-                    seq_counter += 1
+                    yield encode_event_frame(event)
             except asyncio.CancelledError:
                 pass
             except GeneratorExit:
                 pass
             except Exception as e:
-                yield {
-                    "event": "error",
-                    "data": _serialize_event_data({"message": str(e)}),
-                    "id": str(seq_counter),
-                }
+                yield encode_event_frame(SSEEvent(event="error", data={"message": str(e)}))
 
         return EventSourceResponse(
             event_generator(),
@@ -114,37 +96,24 @@ def add_runs_routes(
         """订阅 Run 的输出（用于重连）"""
         service = await get_service()
 
+        # Run 已结束但事件仍在缓冲区（可能由其他 worker 写入）时同样允许重放
         run = await service.get_run(str(thread_id), str(run_id))
-        if not run:
+        if not run and not await service.has_run_events(str(run_id)):
             raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
 
-        seq_counter = 0
-        if last_event_id is not None:
-            try:
-                seq_counter = int(last_event_id) + 1
-            except ValueError:
-                pass
+        after = _parse_last_event_id(last_event_id)
 
         async def event_generator():
-            nonlocal seq_counter
             try:
-                async for event in service.stream_run_output(str(thread_id), str(run_id)):
-                    yield {
-                        "event": event.event,
-                        "data": _serialize_event_data(event.data),
-                        "id": str(seq_counter),
-                    }
-                    seq_counter += 1
+                # 只传输 Last-Event-Id 之后缺失的事件
+                async for event in service.stream_run_output(str(thread_id), str(run_id), after):
+                    yield encode_event_frame(event)
             except asyncio.CancelledError:
                 pass
             except GeneratorExit:
                 pass
             except Exception as e:
-                yield {
-                    "event": "error",
-                    "data": _serialize_event_data({"message": str(e)}),
-                    "id": str(seq_counter),
-                }
+                yield encode_event_frame(SSEEvent(event="error", data={"message": str(e)}))
 
         return EventSourceResponse(
             event_generator(),
@@ -175,6 +144,8 @@ def add_runs_routes(
         try:
             run = await service.create_run(str(thread_id), request)
             return run
+        except RunSchedulerFullError as e:
+            raise _server_busy(e)
         except ValueError as e:
             raise HTTPException(status_code=409, detail=str(e))
 
@@ -185,9 +156,9 @@ def add_runs_routes(
         offset: int = Query(0, ge=0),
         status: Optional[str] = Query(None),
     ) -> List[Dict[str, Any]]:
-        """列出 Thread 的 Runs（仅返回活跃 Run）"""
+        """列出 Thread 的 Runs（新的在前，可按状态过滤）"""
         service = await get_service()
-        runs = await service.list_runs(str(thread_id))
+        runs = await service.list_runs(str(thread_id), status=status, limit=limit, offset=offset)
         return runs
 
     @router.get("/{thread_id}/runs/{run_id}", response_model=Run)
@@ -3,7 +3,7 @@
 from typing import Any, Callable, Coroutine, Dict, List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Header, HTTPException, Query, Response
 
 from ..service import LangGraphService
 from ..schemas import (
@@ -12,12 +12,20 @@ from ..schemas import (
     ThreadPatch,
     ThreadSearchRequest,
     ThreadState,
+    ThreadStateDiff,
+    ThreadStatus,
+    ThreadSummary,
     ThreadStateUpdate,
     ThreadStateUpdateResponse,
     ThreadHistoryRequest,
 )
 
 
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
 def add_thread_base_routes(
     router: APIRouter,
     get_service: Callable[[], Coroutine[Any, Any, LangGraphService]],
@@ -36,6 +44,18 @@ def add_thread_base_routes(
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
+    @router.get("", response_model=List[ThreadSummary])
+    async def list_threads(
+        status: Optional[ThreadStatus] = Query(None),
+        limit: int = Query(10, ge=1, le=100),
+        offset: int = Query(0, ge=0),
+    ) -> List[Dict[str, Any]]:
+        """列出 Thread 摘要（按更新时间倒序）"""
+        service = await get_service()
+        return await service.list_threads(
+            status=status.value if status else None, limit=limit, offset=offset
+        )
+
     @router.post("/search", response_model=List[Thread])
     async def search_threads(request: ThreadSearchRequest) -> List[Dict[str, Any]]:
         """搜索 Threads"""
@@ -46,6 +66,7 @@ def add_thread_base_routes(
             status=request.status.value if request.status else None,
             limit=request.limit,
             offset=request.offset,
+            select=request.select,
         )
         return threads
 
@@ -59,10 +80,15 @@ def add_thread_param_routes(
     # ==================== Thread CRUD ====================
 
     @router.get("/{thread_id}", response_model=Thread)
-    async def get_thread(thread_id: UUID) -> Dict[str, Any]:
+    async def get_thread(
+        thread_id: UUID,
+        select: Optional[List[str]] = Query(
+            None, description="返回字段（默认全部），不含 values/interrupts 时读取 Thread 摘要"
+        ),
+    ) -> Dict[str, Any]:
         """获取 Thread"""
         service = await get_service()
-        thread = await service.get_thread(str(thread_id))
+        thread = await service.get_thread(str(thread_id), select=select)
         if not thread:
             raise HTTPException(status_code=404, detail=f"Thread {thread_id} not found")
         return thread
@@ -90,19 +116,57 @@ def add_thread_param_routes(
     @router.get("/{thread_id}/state", response_model=ThreadState)
     async def get_thread_state(
         thread_id: UUID,
+        response: Response,
         subgraphs: bool = Query(False, description="是否包含子图状态"),
-    ) -> Dict[str, Any]:
+        fields: Optional[str] = Query(None, description="只返回 values 中的这些字段（逗号分隔）"),
+        messages_tail: Optional[int] = Query(None, ge=0, description="只返回最后 N 条消息"),
+        if_none_match: Optional[str] = Header(None),
+    ) -> Any:
         """获取 Thread 状态
 
         Args:
             thread_id: Thread ID
             subgraphs: 是否包含子图状态。默认 False，只返回根图状态。
                       设为 True 时，返回的 tasks 中会包含嵌套的子图 state。
+            fields: values 字段投影，如 fields=files,todos
+            messages_tail: 消息窗口，只返回最后 N 条消息
+
+        Thread 空闲时响应带 ETag（checkpoint_id + 投影参数），If-None-Match 命中时返回 304，
+        不读取和序列化 state。
         """
         service = await get_service()
-        state = await service.get_thread_state(str(thread_id), subgraphs=subgraphs)
+        field_list = (
+            [f.strip() for f in fields.split(",") if f.strip()] if fields is not None else None
+        )
+        if if_none_match:
+            etag = await service.get_thread_state_etag(
+                str(thread_id),
+                subgraphs=subgraphs,
+                fields=field_list,
+                messages_tail=messages_tail,
+            )
+            if etag and _etag_matches(if_none_match, etag):
+                return Response(status_code=304, headers={"ETag": etag})
+
+        state = await service.get_thread_state(
+            str(thread_id),
+            subgraphs=subgraphs,
+            fields=field_list,
+            messages_tail=messages_tail,
+        )
         if not state:
             raise HTTPException(status_code=404, detail=f"Thread {thread_id} not found")
+
+        checkpoint_id = (state.get("checkpoint") or {}).get("checkpoint_id")
+        etag = await service.get_thread_state_etag(
+            str(thread_id),
+            checkpoint_id,
+            subgraphs=subgraphs,
+            fields=field_list,
+            messages_tail=messages_tail,
+        )
+        if etag:
+            response.headers["ETag"] = etag
         return state
 
     @router.post("/{thread_id}/state", response_model=ThreadStateUpdateResponse)
@@ -126,6 +190,24 @@ def add_thread_param_routes(
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
+    @router.get("/{thread_id}/state/diff", response_model=ThreadStateDiff)
+    async def get_thread_state_diff(
+        thread_id: UUID,
+        from_checkpoint_id: str = Query(..., alias="from", description="起始 Checkpoint ID"),
+        to_checkpoint_id: Optional[str] = Query(None, alias="to", description="目标 Checkpoint ID，默认最新"),
+    ) -> Dict[str, Any]:
+        """获取两个 Checkpoint 之间的状态增量
+
+        只返回新增的消息、变化的文件和其他变化的字段，轮询客户端无需重新拉取完整 state。
+        """
+        service = await get_service()
+        diff = await service.get_thread_state_diff(
+            str(thread_id), from_checkpoint_id, to_checkpoint_id
+        )
+        if not diff:
+            raise HTTPException(status_code=404, detail=f"Checkpoint {from_checkpoint_id} not found")
+        return diff
+
     @router.get("/{thread_id}/state/{checkpoint_id}", response_model=ThreadState)
     async def get_thread_state_at_checkpoint(
         thread_id: UUID,
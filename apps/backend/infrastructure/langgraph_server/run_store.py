@@ -0,0 +1,354 @@
+"""Run 历史存储
+
+executor 在 Run 状态变化（创建/开始执行/结束）时调用 record() 写入快照，
+list_runs/get_run 直接查询这里，不再需要遍历 checkpoint 历史。
+
+- MemoryRunStore: 进程内存（默认），每个 Thread 保留最近的若干 Run
+- PostgresRunStore: PostgreSQL runs 表，record() 只写入内存待写队列，
+  后台任务按批次 upsert（同一 Run 的多次更新合并为一次写入）
+"""
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class RunStore(ABC):
+    """Run 历史存储接口（记录格式与 ActiveRun.to_dict 一致）"""
+
+    async def start(self) -> None:
+        """启动（建表、后台写入任务）"""
+
+    async def stop(self) -> None:
+        """停止并写入剩余记录"""
+
+    @abstractmethod
+    def record(self, run: dict[str, Any]) -> None:
+        """记录 Run 快照（不阻塞，按 run_id 覆盖）"""
+
+    @abstractmethod
+    async def list_runs(
+        self,
+        thread_id: str,
+        status: str | None = None,
+        limit: int = 10,
+        offset: int = 0,
+    ) -> list[dict[str, Any]]:
+        """按创建时间倒序列出 Thread 的 Run"""
+
+    @abstractmethod
+    async def get_run(self, thread_id: str, run_id: str) -> dict[str, Any] | None:
+        """获取单个 Run"""
+
+    @abstractmethod
+    async def delete_thread(self, thread_id: str) -> None:
+        """删除 Thread 的所有 Run 记录"""
+
+    def get_stats(self) -> dict[str, Any]:
+        return {}
+
+
+class MemoryRunStore(RunStore):
+    """进程内存存储（单 worker、重启后丢失）"""
+
+    def __init__(self, max_runs_per_thread: int = 100, max_threads: int = 10000):
+        self._max_runs = max_runs_per_thread
+        self._max_threads = max_threads
+        # thread_id → (run_id → 记录)，均按最近写入排序
+        self._threads: OrderedDict[str, OrderedDict[str, dict[str, Any]]] = OrderedDict()
+
+    def record(self, run: dict[str, Any]) -> None:
+        runs = self._threads.get(run["thread_id"])
+        if runs is None:
+            runs = self._threads[run["thread_id"]] = OrderedDict()
+            if len(self._threads) > self._max_threads:
+                self._threads.popitem(last=False)
+        else:
+            self._threads.move_to_end(run["thread_id"])
+        if run["run_id"] not in runs and len(runs) >= self._max_runs:
+            runs.popitem(last=False)
+        runs[run["run_id"]] = run
+
+    async def list_runs(
+        self,
+        thread_id: str,
+        status: str | None = None,
+        limit: int = 10,
+        offset: int = 0,
+    ) -> list[dict[str, Any]]:
+        runs = [
+            run
+            for run in self._threads.get(thread_id, {}).values()
+            if status is None or run["status"] == status
+        ]
+        runs.sort(key=lambda run: run["created_at"], reverse=True)
+        return runs[offset : offset + limit]
+
+    async def get_run(self, thread_id: str, run_id: str) -> dict[str, Any] | None:
+        return self._threads.get(thread_id, {}).get(run_id)
+
+    async def delete_thread(self, thread_id: str) -> None:
+        self._threads.pop(thread_id, None)
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "backend": "memory",
+            "threads": len(self._threads),
+            "runs": sum(len(runs) for runs in self._threads.values()),
+        }
+
+
+_CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    thread_id TEXT NOT NULL,
+    assistant_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    metadata JSONB NOT NULL DEFAULT '{}',
+    error_message TEXT,
+    usage JSONB,
+    created_at TIMESTAMPTZ NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL,
+    started_at TIMESTAMPTZ,
+    ended_at TIMESTAMPTZ
+);
+CREATE INDEX IF NOT EXISTS idx_runs_thread_created
+    ON runs (thread_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_runs_thread_status_created
+    ON runs (thread_id, status, created_at DESC);
+"""
+
+# 同一 Run 的旧快照不覆盖新快照
+_UPSERT_SQL = """
+INSERT INTO runs (
+    run_id, thread_id, assistant_id, status, metadata, error_message, usage,
+    created_at, updated_at, started_at, ended_at
+)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s::timestamptz, %s::timestamptz, %s::timestamptz, %s::timestamptz)
+ON CONFLICT (run_id) DO UPDATE SET
+    status = EXCLUDED.status,
+    metadata = EXCLUDED.metadata,
+    error_message = EXCLUDED.error_message,
+    usage = EXCLUDED.usage,
+    updated_at = EXCLUDED.updated_at,
+    started_at = EXCLUDED.started_at,
+    ended_at = EXCLUDED.ended_at
+WHERE runs.updated_at <= EXCLUDED.updated_at
+"""
+
+_SELECT_COLUMNS = """
+    run_id, thread_id, assistant_id, status, metadata, error_message, usage,
+    created_at, updated_at, started_at, ended_at
+"""
+
+
+def _iso(value: datetime | None) -> str | None:
+    return value.isoformat() if value is not None else None
+
+
+def _row_to_run(row: dict[str, Any]) -> dict[str, Any]:
+    return {
+        **row,
+        "created_at": _iso(row["created_at"]),
+        "updated_at": _iso(row["updated_at"]),
+        "started_at": _iso(row["started_at"]),
+        "ended_at": _iso(row["ended_at"]),
+    }
+
+
+class PostgresRunStore(RunStore):
+    """PostgreSQL 存储
+
+    写入不阻塞 Run：记录先进入待写字典，满 batch_size 或每隔 flush_interval 秒
+    批量 upsert。查询前若该 Thread 有待写记录则先写入，保证读到最新状态。
+
+    传入 pool（已打开的 AsyncConnectionPool，需 autocommit + dict_row）时复用该连接池，
+    由调用方负责关闭；否则 start() 按 database_url 创建自己的连接池。
+    """
+
+    def __init__(
+        self,
+        database_url: str,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        max_pending: int = 10000,
+        pool: Any = None,
+    ):
+        self._database_url = database_url
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._max_pending = max_pending
+        self._pool: Any = pool
+        self._owns_pool = pool is None
+        self._pending: dict[str, dict[str, Any]] = {}  # run_id → 最新快照
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: asyncio.Task[None] | None = None
+        self._written = 0
+        self._batches = 0
+        self._errors = 0
+        self._dropped = 0
+
+    async def start(self) -> None:
+        if self._owns_pool:
+            from psycopg.rows import dict_row
+            from psycopg_pool import AsyncConnectionPool
+
+            self._pool = AsyncConnectionPool(
+                conninfo=self._database_url,
+                min_size=1,
+                max_size=4,
+                open=False,
+                kwargs={"autocommit": True, "row_factory": dict_row},
+            )
+            await self._pool.open()
+        async with self._pool.connection() as conn:
+            await conn.execute(_CREATE_TABLE_SQL)
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        logger.info(
+            f"PostgresRunStore 已启动: batch_size={self._batch_size}, "
+            f"flush_interval={self._flush_interval}s"
+        )
+
+    async def stop(self) -> None:
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        if self._pool is not None:
+            await self._flush()
+            if self._owns_pool:
+                await self._pool.close()
+                self._pool = None
+        logger.info("PostgresRunStore 已停止")
+
+    # ==================== 写入 ====================
+
+    def record(self, run: dict[str, Any]) -> None:
+        if run["run_id"] not in self._pending and len(self._pending) >= self._max_pending:
+            # 数据库长时间不可用：丢弃最早的待写记录，避免内存无限增长
+            self._pending.pop(next(iter(self._pending)))
+            self._dropped += 1
+        self._pending[run["run_id"]] = run
+        if len(self._pending) >= self._batch_size:
+            self._wakeup.set()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self._flush()
+
+    async def _flush(self) -> None:
+        async with self._flush_lock:
+            while self._pending:
+                run_ids = list(self._pending)[: self._batch_size]
+                batch = [self._pending.pop(run_id) for run_id in run_ids]
+                try:
+                    await self._write(batch)
+                except asyncio.CancelledError:
+                    # stop() 取消后台任务时，未写完的记录由 stop() 中的最后一次写入处理
+                    self._requeue(batch)
+                    raise
+                except Exception as e:
+                    self._errors += 1
+                    logger.warning(f"写入 Run 记录失败（{len(batch)} 条），稍后重试: {e}")
+                    self._requeue(batch)
+                    return
+
+    def _requeue(self, batch: list[dict[str, Any]]) -> None:
+        """放回待写队列（期间产生的新快照优先）"""
+        for run in batch:
+            self._pending.setdefault(run["run_id"], run)
+
+    async def _write(self, batch: list[dict[str, Any]]) -> None:
+        from psycopg.types.json import Jsonb
+
+        params = [
+            (
+                run["run_id"],
+                run["thread_id"],
+                run["assistant_id"],
+                run["status"],
+                Jsonb(run.get("metadata") or {}),
+                run.get("error_message"),
+                Jsonb(run["usage"]) if run.get("usage") else None,
+                run["created_at"],
+                run["updated_at"],
+                run.get("started_at"),
+                run.get("ended_at"),
+            )
+            for run in batch
+        ]
+        async with self._pool.connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.executemany(_UPSERT_SQL, params)
+        self._written += len(batch)
+        self._batches += 1
+
+    async def _flush_thread(self, thread_id: str) -> None:
+        if any(run["thread_id"] == thread_id for run in self._pending.values()):
+            await self._flush()
+
+    # ==================== 查询 ====================
+
+    async def list_runs(
+        self,
+        thread_id: str,
+        status: str | None = None,
+        limit: int = 10,
+        offset: int = 0,
+    ) -> list[dict[str, Any]]:
+        await self._flush_thread(thread_id)
+        query = f"SELECT {_SELECT_COLUMNS} FROM runs WHERE thread_id = %s"
+        params: list[Any] = [thread_id]
+        if status is not None:
+            query += " AND status = %s"
+            params.append(status)
+        query += " ORDER BY created_at DESC LIMIT %s OFFSET %s"
+        params.extend([limit, offset])
+        async with self._pool.connection() as conn:
+            cursor = await conn.execute(query, params)
+            rows = await cursor.fetchall()
+        return [_row_to_run(row) for row in rows]
+
+    async def get_run(self, thread_id: str, run_id: str) -> dict[str, Any] | None:
+        await self._flush_thread(thread_id)
+        async with self._pool.connection() as conn:
+            cursor = await conn.execute(
+                f"SELECT {_SELECT_COLUMNS} FROM runs WHERE thread_id = %s AND run_id = %s",
+                (thread_id, run_id),
+            )
+            row = await cursor.fetchone()
+        return _row_to_run(row) if row else None
+
+    async def delete_thread(self, thread_id: str) -> None:
+        # 持有写入锁：正在写入的批次可能包含该 Thread 的记录，需在其写完后再删除
+        async with self._flush_lock:
+            for run_id in [
+                r["run_id"] for r in self._pending.values() if r["thread_id"] == thread_id
+            ]:
+                del self._pending[run_id]
+            async with self._pool.connection() as conn:
+                await conn.execute("DELETE FROM runs WHERE thread_id = %s", (thread_id,))
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "backend": "postgres",
+            "pending": len(self._pending),
+            "written": self._written,
+            "batches": self._batches,
+            "errors": self._errors,
+            "dropped": self._dropped,
+        }
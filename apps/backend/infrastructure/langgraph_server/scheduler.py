@@ -0,0 +1,148 @@
+"""Run 调度器 - 全局准入控制
+
+每个 Run 会驱动多次 LLM 调用和子 Agent，同时执行的 Run 过多时所有请求一起变慢、超时。
+调度器限制进程内同时执行的 Run 数量：
+
+- 超出 max_concurrent 的 Run 进入等待队列（Run 状态保持 PENDING）
+- 等待队列按用户分组，放行时在用户之间轮转，单个用户的突发请求不会饿死其他用户
+- 等待队列超过 max_waiting 时拒绝新 Run（RunSchedulerFullError，接口返回 429 + Retry-After）
+"""
+
+from collections import OrderedDict, deque
+from typing import Any
+import asyncio
+import logging
+import math
+import time
+
+logger = logging.getLogger(__name__)
+
+# 估算 Retry-After 时使用的平均 Run 时长初始值（秒）
+_DEFAULT_RUN_SECONDS = 30.0
+
+
+class RunSchedulerFullError(Exception):
+    """等待队列已满"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Server is busy, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class RunScheduler:
+    """Run 准入调度器
+
+    用法：submit() 同步占用等待位置（队列已满时立即抛出），
+    await 返回的 ticket 等待放行，Run 结束后调用 release()。
+    """
+
+    def __init__(self, max_concurrent: int = 8, max_waiting: int = 32):
+        self._max_concurrent = max_concurrent
+        self._max_waiting = max_waiting
+        self._running = 0
+        # user_id → 等待中的 (ticket, 入队时间)，按轮转顺序排列
+        self._waiting: OrderedDict[str, deque[tuple[asyncio.Future[None], float]]] = OrderedDict()
+        self._waiting_count = 0
+        self._avg_run_seconds = _DEFAULT_RUN_SECONDS
+        self._started_at: dict[int, float] = {}  # id(ticket) → 放行时间
+        self._admitted = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+
+    def submit(self, user_id: str, force: bool = False) -> asyncio.Future[None]:
+        """申请执行，返回 ticket（有空闲时已完成）
+
+        Args:
+            user_id: 用于公平调度的用户标识
+            force: 不受等待队列上限限制（已被接受、从 Thread 队列转入的 Run）
+
+        Raises:
+            RunSchedulerFullError: 等待队列已满
+        """
+        ticket: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        if self._running < self._max_concurrent and not self._waiting_count:
+            self._grant(ticket, time.monotonic())
+            return ticket
+        if not force and self._waiting_count >= self._max_waiting:
+            raise self._reject()
+        self._waiting.setdefault(user_id, deque()).append((ticket, time.monotonic()))
+        self._waiting_count += 1
+        return ticket
+
+    def cancel(self, ticket: asyncio.Future[None]) -> None:
+        """放弃 ticket：仍在等待时移出队列，已放行时归还执行名额"""
+        for user_id, queue in self._waiting.items():
+            for item in queue:
+                if item[0] is ticket:
+                    queue.remove(item)
+                    self._waiting_count -= 1
+                    if not queue:
+                        del self._waiting[user_id]
+                    return
+        if ticket.done() and not ticket.cancelled():
+            self.release(ticket)
+
+    def release(self, ticket: asyncio.Future[None]) -> None:
+        """Run 结束，归还执行名额并放行下一个等待者"""
+        started_at = self._started_at.pop(id(ticket), None)
+        if started_at is None:
+            return
+        self._running -= 1
+        # 指数移动平均，用于估算 Retry-After
+        self._avg_run_seconds += 0.2 * (time.monotonic() - started_at - self._avg_run_seconds)
+        self._dispatch()
+
+    def check(self) -> None:
+        """新 Run 会被拒绝时抛出 RunSchedulerFullError（用于在建立 SSE 连接前返回 429）"""
+        if self._running >= self._max_concurrent and self._waiting_count >= self._max_waiting:
+            raise self._reject()
+
+    def retry_after(self) -> int:
+        """按平均 Run 时长估算排到队首所需的秒数"""
+        rounds = (self._waiting_count + 1) / max(self._max_concurrent, 1)
+        return max(1, min(300, math.ceil(rounds * self._avg_run_seconds)))
+
+    def _reject(self) -> RunSchedulerFullError:
+        self._rejected += 1
+        retry_after = self.retry_after()
+        logger.warning(
+            f"Run 等待队列已满（执行中 {self._running}，等待 {self._waiting_count}），"
+            f"拒绝新 Run，Retry-After={retry_after}s"
+        )
+        return RunSchedulerFullError(retry_after)
+
+    def _grant(self, ticket: asyncio.Future[None], enqueued_at: float) -> None:
+        now = time.monotonic()
+        self._running += 1
+        self._admitted += 1
+        self._total_wait += now - enqueued_at
+        self._started_at[id(ticket)] = now
+        ticket.set_result(None)
+
+    def _dispatch(self) -> None:
+        """在用户之间轮转放行等待中的 Run"""
+        while self._running < self._max_concurrent and self._waiting:
+            user_id, queue = next(iter(self._waiting.items()))
+            ticket, enqueued_at = queue.popleft()
+            self._waiting_count -= 1
+            if queue:
+                self._waiting.move_to_end(user_id)
+            else:
+                del self._waiting[user_id]
+            if ticket.done():
+                continue  # 等待方已取消
+            self._grant(ticket, enqueued_at)
+
+    def get_stats(self) -> dict[str, Any]:
+        """调度指标（供 /metrics 使用）"""
+        return {
+            "running": self._running,
+            "waiting": self._waiting_count,
+            "waiting_users": len(self._waiting),
+            "max_concurrent": self._max_concurrent,
+            "max_waiting": self._max_waiting,
+            "admitted": self._admitted,
+            "rejected": self._rejected,
+            "avg_wait_seconds": round(self._total_wait / self._admitted, 3) if self._admitted else 0.0,
+            "avg_run_seconds": round(self._avg_run_seconds, 1),
+        }
@@ -8,7 +8,7 @@ from enum import Enum
 from typing import Any, Dict, List, Literal, Optional, Union
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 
 # ==================== Enums ====================
@@ -99,6 +99,19 @@ class Thread(BaseModel):
     )
 
 
+class ThreadSummary(BaseModel):
+    """Thread 摘要（列表用，不含 state values）"""
+
+    thread_id: UUID = Field(..., description="Thread ID")
+    assistant_id: Optional[str] = Field(None, description="Assistant ID")
+    status: ThreadStatus = Field(ThreadStatus.IDLE, description="状态")
+    created_at: datetime = Field(..., description="创建时间")
+    updated_at: datetime = Field(..., description="更新时间")
+    message_count: Optional[int] = Field(None, description="消息数")
+    last_message: Optional[str] = Field(None, description="最后一条消息预览")
+    metadata: Dict[str, Any] = Field(default_factory=dict, description="元数据")
+
+
 class ThreadPatch(BaseModel):
     """更新 Thread 请求"""
 
@@ -133,6 +146,20 @@ class ThreadState(BaseModel):
     )
 
 
+class ThreadStateDiff(BaseModel):
+    """两个 Checkpoint 之间的状态增量"""
+
+    thread_id: UUID = Field(..., description="Thread ID")
+    from_checkpoint_id: str = Field(..., description="起始 Checkpoint ID")
+    checkpoint_id: str = Field(..., description="目标 Checkpoint ID")
+    messages: List[Dict[str, Any]] = Field(default_factory=list, description="新增或修改的消息")
+    removed_message_ids: List[str] = Field(default_factory=list, description="删除的消息 ID")
+    files: Dict[str, Any] = Field(default_factory=dict, description="新增或修改的文件")
+    removed_files: List[str] = Field(default_factory=list, description="删除的文件路径")
+    values: Dict[str, Any] = Field(default_factory=dict, description="其他变化的字段（完整新值）")
+    removed_keys: List[str] = Field(default_factory=list, description="被清空的字段")
+
+
 class ThreadStateUpdate(BaseModel):
     """更新 Thread 状态请求 (用于 interrupt resume)"""
 
@@ -169,6 +196,9 @@ class ThreadSearchRequest(BaseModel):
     status: Optional[ThreadStatus] = Field(None, description="按状态过滤")
     limit: int = Field(10, ge=1, le=100, description="返回数量限制")
     offset: int = Field(0, ge=0, description="分页偏移")
+    select: Optional[List[str]] = Field(
+        None, description="返回字段（默认全部），不含 values/interrupts 时不读取 Thread 状态"
+    )
 
 
 class AssistantSearchRequest(BaseModel):
@@ -227,6 +257,11 @@ class RunCreate(BaseModel):
     stream_resumable: Optional[bool] = Field(
         False, description="是否保留事件历史供重连使用"
     )
+    stream_coalesce_ms: Optional[int] = Field(
+        None,
+        ge=0,
+        description="messages 模式下合并同一消息 token 片段的时间窗口（毫秒），不设置则逐片段输出",
+    )
     multitask_strategy: Optional[MultitaskStrategy] = Field(
         MultitaskStrategy.ENQUEUE, description="多任务策略"
     )
@@ -258,6 +293,11 @@ class Run(BaseModel):
     multitask_strategy: Optional[str] = Field(None, description="多任务策略")
     output: Optional[Dict[str, Any]] = Field(None, description="运行输出")
     error_message: Optional[str] = Field(None, description="错误信息")
+    started_at: Optional[datetime] = Field(None, description="开始执行时间")
+    ended_at: Optional[datetime] = Field(None, description="结束时间")
+    usage: Optional[Dict[str, int]] = Field(
+        None, description="token 用量（input_tokens/output_tokens/total_tokens）"
+    )
 
 
 class RunWaitResponse(BaseModel):
@@ -287,3 +327,8 @@ class SSEEvent(BaseModel):
 
     event: str = Field(..., description="事件类型")
     data: Any = Field(..., description="事件数据")
+    id: Optional[str] = Field(None, description="事件序号（Run 内单调递增，用于断线重连）")
+
+    # 编码缓存（见 serializer）：data 的 JSON 编码、完整的 SSE 帧
+    _encoded: Optional[str] = PrivateAttr(default=None)
+    _frame: Optional[bytes] = PrivateAttr(default=None)
@@ -0,0 +1,116 @@
+"""SSE 事件序列化
+
+事件在热路径上只编码一次：写入缓冲区时生成完整的 SSE 帧（id/event/data）并缓存在
+SSEEvent 上，缓冲区字节统计、断线重放和多个订阅者直接发送同一份 bytes。
+
+- 安装了 orjson 时使用 orjson，否则回退到标准库 json
+- 无法原生序列化的对象按 type → 编码函数 分派，分派结果按类型缓存
+
+两条路径的输出解码后完全一致（见 tests/test_serializer.py）：datetime 和 dataclass
+不使用 orjson 的原生格式，仍按原 _PydanticJSONEncoder 规则编码（datetime 为 str()，
+如 "2024-01-02 03:04:05+00:00"）。orjson 输出为紧凑格式（分隔符后没有空格）。
+"""
+
+from enum import Enum
+from typing import Any, Callable
+import dataclasses
+import json
+
+from pydantic import BaseModel
+
+from .schemas import SSEEvent
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson 为可选依赖
+    orjson = None  # type: ignore[assignment]
+
+# SSE 帧格式与 sse_starlette ServerSentEvent.encode 一致（默认分隔符 \r\n）
+_SEP = "\r\n"
+
+# datetime/dataclass 交给 _default，保持原有编码格式
+_ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+    if orjson is not None
+    else 0
+)
+
+# type → 编码函数（返回可继续序列化的对象）
+_ENCODERS: dict[type, Callable[[Any], Any]] = {}
+
+
+def _encode_model(o: BaseModel) -> Any:
+    return o.model_dump()
+
+
+def _encode_enum(o: Enum) -> Any:
+    return o.value
+
+
+def _encode_object(o: Any) -> Any:
+    try:
+        return vars(o)
+    except TypeError:
+        return str(o)
+
+
+def _resolve_encoder(tp: type) -> Callable[[Any], Any]:
+    """按类型选择编码函数，规则与原 _PydanticJSONEncoder 一致"""
+    if issubclass(tp, BaseModel):
+        return _encode_model
+    if dataclasses.is_dataclass(tp):
+        # 如 LangGraph 的 Interrupt
+        return dataclasses.asdict
+    if issubclass(tp, Enum):
+        return _encode_enum
+    return _encode_object
+
+
+def _default(o: Any) -> Any:
+    encoder = _ENCODERS.get(type(o))
+    if encoder is None:
+        encoder = _ENCODERS[type(o)] = _resolve_encoder(type(o))
+    return encoder(o)
+
+
+def dumps(data: Any) -> str:
+    """序列化为 JSON 字符串（保留非 ASCII 字符）"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, default=_default, option=_ORJSON_OPTIONS).decode()
+        except TypeError:
+            pass  # 超出 orjson 支持范围（如超过 64 位的整数），回退到标准库
+    return json.dumps(data, ensure_ascii=False, default=_default)
+
+
+def loads(raw: str | bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def encode_event_data(event: SSEEvent) -> str:
+    """事件数据的 JSON 编码（首次调用时序列化并缓存）"""
+    if event._encoded is None:
+        event._encoded = dumps(event.data)
+    return event._encoded
+
+
+def encode_event_frame(event: SSEEvent) -> bytes:
+    """事件的完整 SSE 帧（首次调用时编码并缓存，之后不再持有单独的 data 编码）
+
+    JSON 编码结果中不含换行，data 只占一行。需在分配 event.id 之后调用。
+    """
+    if event._frame is None:
+        head = f"id: {event.id}{_SEP}" if event.id is not None else ""
+        data = encode_event_data(event)
+        event._frame = f"{head}event: {event.event}{_SEP}data: {data}{_SEP}{_SEP}".encode()
+        event._encoded = None
+    return event._frame
+
+
+def event_from_json(event: str, raw: str | bytes, id: str | None = None) -> SSEEvent:
+    """由已编码的数据还原事件（保留编码结果，发送时无需再次序列化）"""
+    result = SSEEvent(event=event, data=loads(raw), id=id)
+    result._encoded = raw.decode() if isinstance(raw, bytes) else raw
+    return result
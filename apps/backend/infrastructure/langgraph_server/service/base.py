@@ -3,21 +3,46 @@
 生命周期管理和公共辅助方法。
 """
 
-from typing import Any
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
 import logging
 
 from langchain_core.runnables import RunnableConfig
 from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph.state import CompiledStateGraph
 
+from ..backends import (
+    create_event_buffer,
+    create_run_registry,
+    create_run_store,
+    create_thread_summary_store,
+)
+from ..assistant_cache import ThreadAssistantCache
 from ..config import LangGraphServerConfig
-from ..buffer import EventBuffer
 from ..executor import GraphExecutor
+from ..scheduler import RunScheduler
 from ..schemas import ThreadStatus
+from ..thread_summary import infer_state_status
 
 logger = logging.getLogger(__name__)
 
 
+def is_postgres_saver(checkpointer: Any) -> bool:
+    return type(checkpointer).__module__.startswith("langgraph.checkpoint.postgres")
+
+
+@asynccontextmanager
+async def pg_connection(checkpointer: Any) -> AsyncIterator[Any]:
+    """借用 PostgresSaver 的连接（连接池或单连接）"""
+    conn = checkpointer.conn
+    if hasattr(conn, "connection"):
+        async with conn.connection() as pooled:
+            yield pooled
+    else:
+        async with checkpointer.lock:
+            yield conn
+
+
 class BaseService:
     """基础服务类
 
@@ -39,20 +64,57 @@ class BaseService:
         self._checkpointer: BaseCheckpointSaver | None = (
             first_graph.checkpointer if first_graph else None  # type: ignore[assignment]
         )
-        self._buffer = EventBuffer(ttl_seconds=self._config.event_buffer_ttl)
-        self._executor = GraphExecutor(graphs, self._buffer)
+        self._buffer = create_event_buffer(self._config)
+        self._registry = create_run_registry(self._config)
+        self._run_store = create_run_store(self._config)
+        self._thread_summaries = create_thread_summary_store(self._config)
+        self._assistant_cache = ThreadAssistantCache(self._config.thread_assistant_cache_size)
+        self._executor = GraphExecutor(
+            graphs,
+            self._buffer,
+            self._registry,
+            scheduler=RunScheduler(
+                max_concurrent=self._config.max_concurrent_runs,
+                max_waiting=self._config.run_wait_queue_size,
+            ),
+            max_queue_depth=self._config.run_queue_max_depth,
+            run_store=self._run_store,
+            thread_summaries=self._thread_summaries,
+            assistant_cache=self._assistant_cache,
+        )
 
     async def start(self) -> None:
         """启动服务"""
         await self._buffer.start()
+        await self._run_store.start()
+        if self._thread_summaries:
+            await self._thread_summaries.start()
+        await self._executor.start()
         logger.info(f"LangGraphService 已启动，加载 {len(self._graphs)} 个 graphs: {list(self._graphs.keys())}")
 
     async def stop(self) -> None:
         """停止服务"""
-        await self._executor.cancel_all()
+        await self._executor.stop()
+        # executor 停止时会记录被取消的 Run，之后再写入剩余记录
+        await self._run_store.stop()
+        if self._thread_summaries:
+            await self._thread_summaries.stop()
         await self._buffer.stop()
         logger.info("LangGraphService 已停止")
 
+    def get_metrics(self) -> dict[str, Any]:
+        """运行指标（供 /metrics 使用）"""
+        return {
+            "event_buffer": self._buffer.get_stats(),
+            "run_registry": self._registry.get_stats(),
+            "stream_coalesce": self._executor.get_coalesce_stats(),
+            "run_queue": self._executor.get_queue_stats(),
+            "scheduler": self._executor.get_scheduler_stats(),
+            "run_store": self._run_store.get_stats(),
+            "thread_summaries": self._thread_summaries.get_stats() if self._thread_summaries else None,
+            "assistant_cache": self._assistant_cache.get_stats(),
+        }
+
     # ==================== Graphs ====================
 
     def get_graph(self, assistant_id: str) -> CompiledStateGraph | None:
@@ -68,11 +130,16 @@ class BaseService:
 
         LangGraph Platform 会自动将 assistant_id 存入 checkpoint metadata。
         我们在 executor._build_config() 中也实现了同样的行为。
+        只有一个 graph 时直接返回；否则先查 ThreadAssistantCache，未命中再读取 checkpoint。
         """
         default_graph = next(iter(self._graphs.values()), None)
-        if not self._checkpointer:
+        if len(self._graphs) <= 1 or not self._checkpointer:
             return default_graph
 
+        cached = self._assistant_cache.get(thread_id)
+        if cached in self._graphs:
+            return self._graphs[cached]
+
         try:
             config: RunnableConfig = {"configurable": {"thread_id": thread_id}}
             checkpoint_tuple = await self._checkpointer.aget_tuple(config)
@@ -80,6 +147,7 @@ class BaseService:
             if checkpoint_tuple and checkpoint_tuple.metadata:
                 assistant_id = checkpoint_tuple.metadata.get("assistant_id")
                 if assistant_id and assistant_id in self._graphs:
+                    self._assistant_cache.set(thread_id, assistant_id)
                     return self._graphs[assistant_id]
 
             return default_graph
@@ -96,25 +164,9 @@ class BaseService:
         - INTERRUPTED: 有 interrupt 信息
         - IDLE: 其他情况
         """
-        # 1. 活跃 run
         if self._executor.has_active_run(thread_id):
             return ThreadStatus.BUSY.value
-
-        # 2. 检查 error（从 tasks 中检测，LangGraph 自动记录）
-        if state.tasks and any(getattr(t, "error", None) for t in state.tasks):
-            return ThreadStatus.ERROR.value
-
-        # 3. 检查 interrupt（优先使用顶层 interrupts）
-        if getattr(state, "interrupts", None) or (
-            state.tasks and any(getattr(t, "interrupts", None) for t in state.tasks)
-        ):
-            return ThreadStatus.INTERRUPTED.value
-
-        # 4. 还有下一个节点待执行
-        if state.next:
-            return ThreadStatus.BUSY.value
-
-        return ThreadStatus.IDLE.value
+        return infer_state_status(state)
 
     def _serialize_values(self, values: dict[str, Any]) -> dict[str, Any]:
         """递归序列化字典中的 Pydantic 对象"""
@@ -15,6 +15,8 @@ class RunMixin:
 
     # Type hints for BaseService attributes
     _executor: Any
+    _buffer: Any
+    _run_store: Any
 
     async def create_run(
         self, thread_id: str, request: RunCreate
@@ -23,17 +25,28 @@ class RunMixin:
         active_run: ActiveRun = await self._executor.create_run(thread_id, request)
         return active_run.to_dict()
 
-    async def list_runs(self, thread_id: str) -> list[dict[str, Any]]:
-        """列出 Thread 的 Runs（只有活跃的）"""
-        run = self._executor.get_active_run(thread_id)
-        return [run.to_dict()] if run else []
+    async def list_runs(
+        self,
+        thread_id: str,
+        status: str | None = None,
+        limit: int = 10,
+        offset: int = 0,
+    ) -> list[dict[str, Any]]:
+        """列出 Thread 的 Runs（新的在前）
+
+        从 RunStore 分页查询，不读取 checkpoint；
+        仍在执行的 Run 以内存/注册表中的状态为准。
+        """
+        live = {run["run_id"]: run for run in await self._executor.list_run_infos(thread_id)}
+        runs = await self._run_store.list_runs(thread_id, status=status, limit=limit, offset=offset)
+        return [live.get(run["run_id"], run) for run in runs]
 
     async def get_run(self, thread_id: str, run_id: str) -> dict[str, Any] | None:
-        """获取 Run"""
-        run = self._executor.get_active_run(thread_id)
-        if run and str(run.run_id) == run_id:
-            return run.to_dict()
-        return None
+        """获取 Run（活跃和排队中的优先，其次查询 Run 历史）"""
+        for run in await self._executor.list_run_infos(thread_id):
+            if run["run_id"] == run_id:
+                return run
+        return await self._run_store.get_run(thread_id, run_id)
 
     async def stream_run(
         self,
@@ -48,11 +61,20 @@ class RunMixin:
         self,
         thread_id: str,
         run_id: str,
+        last_event_id: int | None = None,
     ) -> AsyncIterator[SSEEvent]:
-        """订阅 Run 输出（重连用）"""
-        async for event in self._executor.stream_run_output(thread_id, run_id):
+        """订阅 Run 输出（重连用，只返回 last_event_id 之后的事件）"""
+        async for event in self._executor.stream_run_output(thread_id, run_id, last_event_id):
             yield event
 
+    def check_admission(self) -> None:
+        """新 Run 会因服务繁忙被拒绝时抛出 RunSchedulerFullError"""
+        self._executor.check_admission()
+
+    async def has_run_events(self, run_id: str) -> bool:
+        """事件缓冲区中是否有该 Run（用于已结束 Run 的重放）"""
+        return await self._buffer.has_run(run_id)
+
     async def cancel_run(self, thread_id: str, run_id: str) -> bool:
         """取消 Run"""
         return await self._executor.cancel_run(thread_id, run_id)
@@ -2,12 +2,156 @@
 
 from typing import Any
 from uuid import uuid4
+import hashlib
 import logging
 
 from langchain_core.runnables import RunnableConfig
 
+from .base import is_postgres_saver, pg_connection
+
 logger = logging.getLogger(__name__)
 
+_LATEST_CHECKPOINT_SQL = """
+SELECT checkpoint_id FROM checkpoints
+WHERE thread_id = %s AND checkpoint_ns = ''
+ORDER BY checkpoint_id DESC
+LIMIT 1
+"""
+
+# 两个 checkpoint 的 channel 版本和内联值（基本类型的 channel 值直接存在 checkpoint 中）
+_CHECKPOINT_VERSIONS_SQL = """
+SELECT checkpoint_id,
+    checkpoint -> 'channel_versions' AS channel_versions,
+    checkpoint -> 'channel_values' AS inline_values
+FROM checkpoints
+WHERE thread_id = %(thread_id)s AND checkpoint_ns = ''
+    AND checkpoint_id = ANY(%(checkpoint_ids)s::text[])
+"""
+
+# 只读取指定 (channel, version) 的 blob
+_CHANNEL_BLOBS_SQL = """
+SELECT bl.channel, bl.version, bl.type, bl.blob
+FROM checkpoint_blobs bl
+JOIN unnest(%(channels)s::text[], %(versions)s::text[]) AS v(channel, version)
+    ON bl.channel = v.channel AND bl.version = v.version
+WHERE bl.thread_id = %(thread_id)s AND bl.checkpoint_ns = ''
+"""
+
+# 需要与旧值逐项比较的 channel，其他 channel 变化时返回完整新值
+_MESSAGES_CHANNEL = "messages"
+_FILES_CHANNEL = "files"
+
+
+def _message_id(message: Any) -> Any:
+    return message.get("id") if isinstance(message, dict) else getattr(message, "id", None)
+
+
+def _diff_messages(old: list[Any], new: list[Any]) -> tuple[list[Any], list[str]]:
+    """返回 (新增或修改的消息, 删除的消息 ID)；消息缺少 id 时按位置比较"""
+    if all(_message_id(m) for m in old + new):
+        old_by_id = {_message_id(m): m for m in old}
+        new_ids = {_message_id(m) for m in new}
+        changed = [m for m in new if old_by_id.get(_message_id(m)) != m]
+        removed = [msg_id for msg_id in old_by_id if msg_id not in new_ids]
+        return changed, removed
+    common = 0
+    while common < min(len(old), len(new)) and old[common] == new[common]:
+        common += 1
+    return new[common:], []
+
+
+def _diff_files(old: dict[str, Any], new: dict[str, Any]) -> tuple[dict[str, Any], list[str]]:
+    """返回 (新增或修改的文件, 删除的文件路径)"""
+    changed = {path: entry for path, entry in new.items() if old.get(path) != entry}
+    removed = [path for path in old if path not in new]
+    return changed, removed
+
+
+def _diff_channel_values(
+    old_versions: dict[str, Any],
+    new_versions: dict[str, Any],
+    old_values: dict[str, Any],
+    new_values: dict[str, Any],
+    keys: list[str] | None = None,
+) -> dict[str, Any]:
+    """按 channel 版本计算两个 checkpoint 的状态增量
+
+    只比较版本号不同的 channel；keys 为 graph 输出的 channel（None 表示全部）。
+    old_values 只需包含 messages/files 的旧值。
+    """
+    diff: dict[str, Any] = {
+        "messages": [],
+        "removed_message_ids": [],
+        "files": {},
+        "removed_files": [],
+        "values": {},
+        "removed_keys": [],
+    }
+    channels = set(old_versions) | set(new_versions)
+    for channel in sorted(channels):
+        if keys is not None and channel not in keys:
+            continue
+        if old_versions.get(channel) == new_versions.get(channel):
+            continue
+        if channel not in new_values:
+            diff["removed_keys"].append(channel)
+            continue
+        value = new_values[channel]
+        old_value = old_values.get(channel)
+        if channel == _MESSAGES_CHANNEL and isinstance(value, list):
+            diff["messages"], diff["removed_message_ids"] = _diff_messages(
+                old_value if isinstance(old_value, list) else [], value
+            )
+        elif channel == _FILES_CHANNEL and isinstance(value, dict):
+            diff["files"], diff["removed_files"] = _diff_files(
+                old_value if isinstance(old_value, dict) else {}, value
+            )
+        else:
+            diff["values"][channel] = value
+    return diff
+
+
+def _project_values(
+    values: Any, fields: list[str] | None, messages_tail: int | None
+) -> Any:
+    """在序列化之前裁剪 state.values：只保留 fields 中的字段，messages 只保留最后 messages_tail 条
+
+    字段保持 state 中的顺序（与 fields 的顺序无关）。
+    pydantic 模型的 state 先按 fields 导出为 dict（字段序列化规则不变）再裁剪消息。
+    """
+    if hasattr(values, "model_dump") and (fields is not None or messages_tail is not None):
+        values = values.model_dump(mode="json", include=set(fields) if fields is not None else None)
+    if not isinstance(values, dict):
+        return values
+    if fields is not None:
+        wanted = set(fields)
+        values = {key: value for key, value in values.items() if key in wanted}
+    if messages_tail is not None and isinstance(values.get("messages"), list):
+        messages = values["messages"]
+        values = {**values, "messages": messages[-messages_tail:] if messages_tail else []}
+    return values
+
+
+def _state_etag(
+    checkpoint_id: str,
+    subgraphs: bool = False,
+    fields: list[str] | None = None,
+    messages_tail: int | None = None,
+) -> str:
+    """由 checkpoint_id 和投影参数生成 ETag（不同投影的响应内容不同，不能共用同一个 ETag）
+
+    没有投影时为 "<checkpoint_id>"，否则附加规范化投影参数的摘要。
+    """
+    if not subgraphs and fields is None and messages_tail is None:
+        return f'"{checkpoint_id}"'
+    projection = "|".join([
+        "subgraphs" if subgraphs else "",
+        ",".join(sorted(set(fields))) if fields is not None else "*",
+        str(messages_tail) if messages_tail is not None else "*",
+    ])
+    digest = hashlib.sha1(projection.encode()).hexdigest()[:12]
+    return f'"{checkpoint_id}.{digest}"'
+
 
 class StateMixin:
     """Thread State 管理 Mixin
@@ -19,6 +163,7 @@ class StateMixin:
     # Type hints for BaseService attributes
     _executor: Any
     _graphs: Any
+    _checkpointer: Any
 
     async def _get_graph_for_thread(self, thread_id: str) -> Any:
         ...
@@ -29,6 +174,9 @@ class StateMixin:
     def _serialize_state_values(self, state_values: Any) -> dict[str, Any]:
         ...
 
+    def _serialize_values(self, values: dict[str, Any]) -> dict[str, Any]:
+        ...
+
     def _serialize_subgraph_state(self, thread_id: str, state: Any) -> dict[str, Any] | None:
         """递归序列化子图状态（用于 subgraphs=True 时）"""
         if state is None:
@@ -82,7 +230,11 @@ class StateMixin:
         }
 
     async def get_thread_state(
-        self, thread_id: str, subgraphs: bool = False
+        self,
+        thread_id: str,
+        subgraphs: bool = False,
+        fields: list[str] | None = None,
+        messages_tail: int | None = None,
     ) -> dict[str, Any] | None:
         """获取 Thread 状态
 
@@ -91,6 +243,8 @@ class StateMixin:
             subgraphs: 是否包含子图状态。默认 False。
                       设为 True 时，会获取子图的嵌套状态，
                       返回的 tasks 中每个 task 会包含 state 字段。
+            fields: 只返回 values 中的这些字段（默认全部）
+            messages_tail: 只返回最后 N 条消息（默认全部）
 
         Returns:
             Thread 状态字典，包含 values, next, checkpoint, tasks 等字段
@@ -147,7 +301,9 @@ class StateMixin:
 
         interrupts = all_interrupts  # 顶级 interrupts 保持兼容
 
-        values = self._serialize_state_values(state.values or {})
+        values = self._serialize_state_values(
+            _project_values(state.values or {}, fields, messages_tail)
+        )
 
         # 提取 checkpoint 配置
         checkpoint_config = state.config.get("configurable", {}) if state.config else {}
@@ -182,6 +338,186 @@ class StateMixin:
             "interrupts": interrupts,
         }
 
+    async def get_thread_state_etag(
+        self,
+        thread_id: str,
+        checkpoint_id: str | None = None,
+        subgraphs: bool = False,
+        fields: list[str] | None = None,
+        messages_tail: int | None = None,
+    ) -> str | None:
+        """Thread 状态的 ETag（根图最新 checkpoint_id + 投影参数），不可缓存时返回 None
+
+        有活跃 Run 时，interrupt/error 等 pending writes 会在 checkpoint 不变的情况下改变状态，
+        因此只在 Thread 空闲时提供 ETag。checkpoint_id 为 None 时查询最新 checkpoint
+        （PostgreSQL 只读取 checkpoint_id 列，不加载 state）。
+        subgraphs/fields/messages_tail 与 get_thread_state 的参数一致。
+        """
+        if await self._executor.get_run_info(thread_id):
+            return None
+        if checkpoint_id is None:
+            checkpoint_id = await self._get_latest_checkpoint_id(thread_id)
+        if not checkpoint_id:
+            return None
+        return _state_etag(checkpoint_id, subgraphs, fields, messages_tail)
+
+    async def _get_latest_checkpoint_id(self, thread_id: str) -> str | None:
+        if not self._checkpointer:
+            return None
+        try:
+            if is_postgres_saver(self._checkpointer):
+                async with pg_connection(self._checkpointer) as conn:
+                    cursor = await conn.execute(_LATEST_CHECKPOINT_SQL, (thread_id,))
+                    row = await cursor.fetchone()
+                return row["checkpoint_id"] if row else None
+            config: RunnableConfig = {"configurable": {"thread_id": thread_id}}
+            checkpoint_tuple = await self._checkpointer.aget_tuple(config)
+        except Exception as e:
+            logger.warning(f"获取 Thread {thread_id} 最新 checkpoint 失败: {e}")
+            return None
+        if not checkpoint_tuple:
+            return None
+        return checkpoint_tuple.config["configurable"].get("checkpoint_id")
+
+    async def get_thread_state_diff(
+        self,
+        thread_id: str,
+        from_checkpoint_id: str,
+        to_checkpoint_id: str | None = None,
+    ) -> dict[str, Any] | None:
+        """计算两个根图 checkpoint 之间的状态增量
+
+        比较两个 checkpoint 的 channel_versions，只加载和序列化版本发生变化的 channel；
+        messages 按 ID 返回新增/修改/删除，files 按路径返回变化的条目，其他字段返回完整新值。
+
+        Args:
+            thread_id: Thread ID
+            from_checkpoint_id: 客户端已有的 checkpoint
+            to_checkpoint_id: 目标 checkpoint，默认最新
+
+        Returns:
+            增量字典，checkpoint 不存在时返回 None
+        """
+        if not self._checkpointer:
+            return None
+        graph = await self._get_graph_for_thread(thread_id)
+        keys = getattr(graph, "stream_channels_list", None)
+
+        try:
+            if is_postgres_saver(self._checkpointer):
+                loaded = await self._load_checkpoint_channels_pg(
+                    thread_id, from_checkpoint_id, to_checkpoint_id
+                )
+            else:
+                loaded = await self._load_checkpoint_channels(
+                    thread_id, from_checkpoint_id, to_checkpoint_id
+                )
+        except Exception as e:
+            logger.warning(f"计算 Thread {thread_id} 状态增量失败: {e}")
+            return None
+        if not loaded:
+            return None
+
+        to_checkpoint_id, old_versions, new_versions, old_values, new_values = loaded
+        diff = _diff_channel_values(old_versions, new_versions, old_values, new_values, keys)
+        serialized = self._serialize_values(
+            {"messages": diff["messages"], "files": diff["files"], "values": diff["values"]}
+        )
+        return {
+            **diff,
+            **serialized,
+            "thread_id": thread_id,
+            "from_checkpoint_id": from_checkpoint_id,
+            "checkpoint_id": to_checkpoint_id,
+        }
+
+    async def _load_checkpoint_channels(
+        self, thread_id: str, from_checkpoint_id: str, to_checkpoint_id: str | None
+    ) -> tuple[str, dict[str, Any], dict[str, Any], dict[str, Any], dict[str, Any]] | None:
+        """通用实现：通过 checkpointer 读取两个完整 checkpoint"""
+        tuples = []
+        for checkpoint_id in (from_checkpoint_id, to_checkpoint_id):
+            config: RunnableConfig = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+            if checkpoint_id:
+                config["configurable"]["checkpoint_id"] = checkpoint_id
+            checkpoint_tuple = await self._checkpointer.aget_tuple(config)
+            if not checkpoint_tuple:
+                return None
+            tuples.append(checkpoint_tuple)
+        old, new = (t.checkpoint for t in tuples)
+        return (
+            tuples[1].config["configurable"]["checkpoint_id"],
+            old.get("channel_versions") or {},
+            new.get("channel_versions") or {},
+            old.get("channel_values") or {},
+            new.get("channel_values") or {},
+        )
+
+    async def _load_checkpoint_channels_pg(
+        self, thread_id: str, from_checkpoint_id: str, to_checkpoint_id: str | None
+    ) -> tuple[str, dict[str, Any], dict[str, Any], dict[str, Any], dict[str, Any]] | None:
+        """PostgreSQL：先比较 channel_versions，只读取变化 channel 的 blob
+
+        新值只读取版本变化的 channel；旧值只读取需要逐项比较的 messages/files。
+        """
+        serde = self._checkpointer.serde
+        async with pg_connection(self._checkpointer) as conn:
+            if to_checkpoint_id is None:
+                cursor = await conn.execute(_LATEST_CHECKPOINT_SQL, (thread_id,))
+                row = await cursor.fetchone()
+                if not row:
+                    return None
+                to_checkpoint_id = row["checkpoint_id"]
+
+            cursor = await conn.execute(
+                _CHECKPOINT_VERSIONS_SQL,
+                {"thread_id": thread_id, "checkpoint_ids": [from_checkpoint_id, to_checkpoint_id]},
+            )
+            rows = {row["checkpoint_id"]: row for row in await cursor.fetchall()}
+            if from_checkpoint_id not in rows or to_checkpoint_id not in rows:
+                return None
+            old_versions = rows[from_checkpoint_id]["channel_versions"] or {}
+            new_versions = rows[to_checkpoint_id]["channel_versions"] or {}
+            changed = [
+                channel
+                for channel in new_versions
+                if old_versions.get(channel) != new_versions[channel]
+            ]
+
+            # (channel, version) → 所属的 checkpoint（新/旧）
+            wanted: dict[tuple[str, str], str] = {
+                (channel, str(new_versions[channel])): "new" for channel in changed
+            }
+            for channel in (_MESSAGES_CHANNEL, _FILES_CHANNEL):
+                if channel in changed and channel in old_versions:
+                    wanted.setdefault((channel, str(old_versions[channel])), "old")
+
+            old_values = dict(rows[from_checkpoint_id]["inline_values"] or {})
+            new_values = {
+                channel: value
+                for channel, value in (rows[to_checkpoint_id]["inline_values"] or {}).items()
+                if channel in changed
+            }
+            if wanted:
+                cursor = await conn.execute(
+                    _CHANNEL_BLOBS_SQL,
+                    {
+                        "thread_id": thread_id,
+                        "channels": [channel for channel, _ in wanted],
+                        "versions": [version for _, version in wanted],
+                    },
+                )
+                for blob in await cursor.fetchall():
+                    if blob["type"] == "empty":
+                        continue
+                    value = serde.loads_typed((blob["type"], blob["blob"]))
+                    if str(new_versions.get(blob["channel"])) == blob["version"]:
+                        new_values[blob["channel"]] = value
+                    if str(old_versions.get(blob["channel"])) == blob["version"]:
+                        old_values[blob["channel"]] = value
+
+        return to_checkpoint_id, old_versions, new_versions, old_values, new_values
+
     async def update_thread_state(
         self,
         thread_id: str,
@@ -205,6 +541,8 @@ class StateMixin:
 
         # 获取更新后的状态以返回正确的 checkpoint_id
         new_state = await graph.aget_state(config)
+        if not checkpoint_ns:
+            await self._executor.refresh_thread_summary(thread_id, graph, new_state)
         new_checkpoint_id = (
             new_state.config.get("configurable", {}).get("checkpoint_id")
             if new_state and new_state.config
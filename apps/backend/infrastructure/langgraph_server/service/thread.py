@@ -8,9 +8,82 @@ import logging
 from langchain_core.runnables import RunnableConfig
 
 from ..schemas import ThreadStatus
+from ..thread_summary import summary_to_thread
+from .base import is_postgres_saver, pg_connection
 
 logger = logging.getLogger(__name__)
 
+# 每个 Thread 最新的根 checkpoint → 状态、时间、metadata（过滤后分页）
+# created_at 只为本页的 Thread 计算（按主键读取第一个 checkpoint）
+_SEARCH_THREADS_SQL = """
+WITH latest AS (
+    SELECT DISTINCT ON (thread_id)
+        thread_id, checkpoint_id, metadata,
+        checkpoint -> 'channel_values' AS inline_values,
+        checkpoint ->> 'ts' AS updated_at
+    FROM checkpoints
+    WHERE checkpoint_ns = ''
+    ORDER BY thread_id, checkpoint_id DESC
+), summaries AS (
+    SELECT l.*,
+        CASE
+            WHEN l.thread_id = ANY(%(busy)s::text[]) THEN 'busy'
+            WHEN EXISTS (
+                SELECT 1 FROM checkpoint_writes w
+                WHERE w.thread_id = l.thread_id AND w.checkpoint_ns = ''
+                    AND w.checkpoint_id = l.checkpoint_id AND w.channel = '__error__'
+            ) THEN 'error'
+            WHEN EXISTS (
+                SELECT 1 FROM checkpoint_writes w
+                WHERE w.thread_id = l.thread_id AND w.checkpoint_ns = ''
+                    AND w.checkpoint_id = l.checkpoint_id AND w.channel = '__interrupt__'
+            ) THEN 'interrupted'
+            ELSE 'idle'
+        END AS status
+    FROM latest l
+    WHERE l.metadata @> %(metadata)s
+)
+SELECT page.*, (
+    SELECT c.checkpoint ->> 'ts' FROM checkpoints c
+    WHERE c.thread_id = page.thread_id AND c.checkpoint_ns = ''
+    ORDER BY c.checkpoint_id
+    LIMIT 1
+) AS created_at
+FROM (
+    SELECT * FROM summaries
+    WHERE %(status)s::text IS NULL OR status = %(status)s::text
+    ORDER BY checkpoint_id DESC
+    LIMIT %(limit)s OFFSET %(offset)s
+) page
+ORDER BY page.checkpoint_id DESC
+"""
+
+# 多个 checkpoint 的 channel blob（非基本类型的值）和 __interrupt__ 写入
+_THREAD_BLOBS_SQL = """
+SELECT c.thread_id, 'value' AS kind, bl.channel AS key, bl.type, bl.blob
+FROM checkpoints c
+CROSS JOIN LATERAL jsonb_each_text(c.checkpoint -> 'channel_versions') v
+JOIN checkpoint_blobs bl
+    ON bl.thread_id = c.thread_id AND bl.checkpoint_ns = c.checkpoint_ns
+    AND bl.channel = v.key AND bl.version = v.value
+WHERE c.checkpoint_ns = '' AND c.thread_id = ANY(%(thread_ids)s::text[])
+    AND c.checkpoint_id = ANY(%(checkpoint_ids)s::text[])
+UNION ALL
+SELECT w.thread_id, 'interrupt' AS kind, w.task_id AS key, w.type, w.blob
+FROM checkpoint_writes w
+WHERE w.checkpoint_ns = '' AND w.thread_id = ANY(%(thread_ids)s::text[])
+    AND w.checkpoint_id = ANY(%(checkpoint_ids)s::text[]) AND w.channel = '__interrupt__'
+"""
+
+
+def _needs_state(select: list[str] | None) -> bool:
+    """响应是否需要读取 Thread state（默认返回全部字段）"""
+    return select is None or bool({"values", "interrupts"} & set(select))
+
+
+def _match_values(thread_values: dict[str, Any] | None, values: dict[str, Any]) -> bool:
+    return thread_values is not None and all(thread_values.get(k) == v for k, v in values.items())
+
 
 class ThreadMixin:
     """Thread 管理 Mixin
@@ -23,6 +96,9 @@ class ThreadMixin:
     _executor: Any
     _graphs: Any
     _checkpointer: Any
+    _run_store: Any
+    _thread_summaries: Any
+    _assistant_cache: Any
 
     async def _get_graph_for_thread(self, thread_id: str) -> Any:
         ...
@@ -49,8 +125,19 @@ class ThreadMixin:
             "metadata": {},
         }
 
-    async def get_thread(self, thread_id: str) -> dict[str, Any] | None:
-        """获取 Thread（从 Checkpoint 推断）"""
+    async def get_thread(
+        self, thread_id: str, select: list[str] | None = None
+    ) -> dict[str, Any] | None:
+        """获取 Thread（从 Checkpoint 推断）
+
+        select 不包含 values/interrupts 时优先读取 Thread 摘要。
+        """
+        if self._thread_summaries and not _needs_state(select):
+            busy = [thread_id] if self._executor.has_active_run(thread_id) else []
+            summary = await self._thread_summaries.get(thread_id, busy)
+            if summary:
+                return summary_to_thread(summary)
+
         graph = await self._get_graph_for_thread(thread_id)
         if not graph:
             return None
@@ -92,7 +179,7 @@ class ThreadMixin:
             "thread_id": thread_id,
             "created_at": created_at,
             "updated_at": created_at,
-            "metadata": {},
+            "metadata": state.metadata or {},
             "status": status,
             "values": values,
             "interrupts": interrupts,
@@ -102,19 +189,24 @@ class ThreadMixin:
         """删除 Thread
 
         包括：取消活跃 Run、删除 Checkpoint 数据。
+        删除期间不再写入 Thread 摘要（被取消的 Run 不会在删除后写回摘要）。
         """
-        # 取消活跃 run
-        run = self._executor.get_active_run(thread_id)
-        if run:
-            await self._executor.cancel_run(thread_id, str(run.run_id))
-
-        # 删除 checkpoint 数据
-        if self._checkpointer:
-            try:
-                await self._checkpointer.adelete_thread(thread_id)
-            except Exception as e:
-                logger.warning(f"删除 thread {thread_id} checkpoint 失败: {e}")
-                return False
+        async with self._executor.deleting_thread(thread_id):
+            # 取消排队中和活跃的 run（先取消排队的，避免活跃 run 结束后启动下一个）
+            for run in await self._executor.list_run_infos(thread_id):
+                await self._executor.cancel_run(thread_id, run["run_id"])
+            await self._run_store.delete_thread(thread_id)
+            self._assistant_cache.invalidate(thread_id)
+            if self._thread_summaries:
+                await self._thread_summaries.delete(thread_id)
+
+            # 删除 checkpoint 数据
+            if self._checkpointer:
+                try:
+                    await self._checkpointer.adelete_thread(thread_id)
+                except Exception as e:
+                    logger.warning(f"删除 thread {thread_id} checkpoint 失败: {e}")
+                    return False
 
         return True
 
@@ -125,85 +217,165 @@ class ThreadMixin:
         status: str | None = None,
         limit: int = 10,
         offset: int = 0,
+        select: list[str] | None = None,
     ) -> list[dict[str, Any]]:
         """搜索 Threads
 
         优化策略：
-        1. 对于 PostgreSQL checkpointer，尝试直接 SQL 查询（最高效）
-        2. 回退到 checkpointer.alist() 遍历（兼容所有 checkpointer）
+        1. 不需要 state（select 不含 values/interrupts 且没有 values 过滤）时查询 Thread 摘要
+        2. 对于 PostgreSQL checkpointer，批量 SQL 查询（status/metadata 在 SQL 中过滤）
+        3. 回退到 checkpointer.alist() 遍历（兼容所有 checkpointer）
         """
         if not self._checkpointer:
             return []
 
-        # 尝试使用优化的 PostgreSQL 直接查询
-        pg_results = await self._search_threads_postgres(limit, offset, metadata, status)
-        if pg_results is not None:
-            return pg_results
+        load_state = bool(values) or _needs_state(select)
+        if self._thread_summaries and not load_state:
+            summaries = await self._thread_summaries.search(
+                self._executor.active_thread_ids(), metadata, status, limit, offset
+            )
+            return [summary_to_thread(summary) for summary in summaries]
+
+        if is_postgres_saver(self._checkpointer):
+            try:
+                return await self._search_threads_postgres(
+                    metadata, values, status, limit, offset, load_state
+                )
+            except Exception as e:
+                logger.warning(f"PostgreSQL 批量查询 threads 失败，回退到通用实现: {e}")
 
         # 回退到通用实现（遍历 checkpoints）
         return await self._search_threads_fallback(metadata, values, status, limit, offset)
 
-    async def _search_threads_postgres(
+    async def list_threads(
         self,
-        limit: int,
-        offset: int,
-        metadata: dict[str, Any] | None = None,
         status: str | None = None,
-    ) -> list[dict[str, Any]] | None:
-        """PostgreSQL 优化查询
+        limit: int = 10,
+        offset: int = 0,
+    ) -> list[dict[str, Any]]:
+        """列出 Thread 摘要（按更新时间倒序）
 
-        直接查询数据库获取 distinct thread_ids，避免遍历所有 checkpoints。
-        返回 None 表示不支持，回退到通用实现。
+        未启用摘要表时由 search_threads 生成（不含消息数和预览）。
         """
-        if not self._checkpointer:
-            return None
-
-        # 检查是否是 AsyncPostgresSaver（有 conn 或 pool 属性）
-        pool = getattr(self._checkpointer, "pool", None) or getattr(self._checkpointer, "conn", None)
-        if not pool:
-            return None
-
-        try:
-            query = """
-                SELECT DISTINCT ON (thread_id) thread_id
-                FROM checkpoints
-                WHERE checkpoint_ns = ''
-                ORDER BY thread_id, checkpoint_id DESC
-                LIMIT $1 OFFSET $2
-            """
-
-            async with pool.acquire() as conn:
-                rows = await conn.fetch(query, limit + 100, offset)
-
-            results: list[dict[str, Any]] = []
-            for row in rows:
-                thread_id = row["thread_id"]
-                thread = await self.get_thread(thread_id)
-                if not thread:
-                    continue
+        if self._thread_summaries:
+            return await self._thread_summaries.search(
+                self._executor.active_thread_ids(), status=status, limit=limit, offset=offset
+            )
+        threads = await self.search_threads(
+            status=status, limit=limit, offset=offset, select=["thread_id", "status"]
+        )
+        return [
+            {**thread, "assistant_id": (thread.get("metadata") or {}).get("assistant_id")}
+            for thread in threads
+        ]
 
-                if status and thread.get("status") != status:
-                    continue
+    async def _search_threads_postgres(
+        self,
+        metadata: dict[str, Any] | None,
+        values: dict[str, Any] | None,
+        status: str | None,
+        limit: int,
+        offset: int,
+        load_state: bool,
+    ) -> list[dict[str, Any]]:
+        """PostgreSQL 批量查询
 
-                if metadata:
-                    thread_metadata = thread.get("metadata", {})
-                    if not all(thread_metadata.get(k) == v for k, v in metadata.items()):
-                        continue
+        第 1 条 SQL 查询每个 Thread 最新的 checkpoint，在 SQL 中推断状态、过滤并分页；
+        需要 values/interrupts 时，第 2 条 SQL 一次读取本页所有 Thread 的 channel 数据。
 
-                results.append(thread)
-                if len(results) >= limit:
-                    break
+        状态推断与 _infer_thread_status 一致（本进程活跃 Run → BUSY，
+        最新 checkpoint 有 __error__ 写入 → ERROR，有 __interrupt__ 写入 → INTERRUPTED），
+        只是不会把"无 Run 但仍有待执行节点"的 Thread 识别为 BUSY。
+        """
+        from psycopg.types.json import Jsonb
 
-            return results
+        # values 过滤需在分页前进行：与通用实现一样多取一批候选，过滤后再分页
+        window = (limit + offset + 100, 0) if values else (limit, offset)
+        params = {
+            "busy": self._executor.active_thread_ids(),
+            "metadata": Jsonb(metadata or {}),
+            "status": status,
+            "limit": window[0],
+            "offset": window[1],
+        }
+        async with pg_connection(self._checkpointer) as conn:
+            cursor = await conn.execute(_SEARCH_THREADS_SQL, params)
+            rows = await cursor.fetchall()
+            states = await self._load_thread_states(conn, rows) if load_state and rows else {}
 
-        except Exception as e:
-            logger.debug(f"PostgreSQL 直接查询失败，回退到通用实现: {e}")
-            return None
+        results: list[dict[str, Any]] = []
+        for row in rows:
+            thread_values, interrupts = states.get(row["thread_id"], (None, {}))
+            if values and not _match_values(thread_values, values):
+                continue
+            results.append({
+                "thread_id": row["thread_id"],
+                "created_at": row["created_at"],
+                "updated_at": row["updated_at"],
+                "metadata": row["metadata"] or {},
+                "status": row["status"],
+                "values": thread_values,
+                "interrupts": interrupts,
+            })
+        return results[offset : offset + limit] if values else results
+
+    async def _load_thread_states(
+        self, conn: Any, rows: list[dict[str, Any]]
+    ) -> dict[str, tuple[dict[str, Any], dict[str, list[dict[str, Any]]]]]:
+        """一次查询读取多个 Thread 最新 checkpoint 的 channel 值和 interrupts
+
+        Returns:
+            thread_id → (values, interrupts)，格式与 get_thread 一致
+        """
+        serde = self._checkpointer.serde
+        cursor = await conn.execute(
+            _THREAD_BLOBS_SQL,
+            {
+                "thread_ids": [row["thread_id"] for row in rows],
+                "checkpoint_ids": [row["checkpoint_id"] for row in rows],
+            },
+        )
+        channel_values: dict[str, dict[str, Any]] = {
+            row["thread_id"]: dict(row["inline_values"] or {}) for row in rows
+        }
+        interrupts: dict[str, dict[str, list[dict[str, Any]]]] = {}
+        for blob in await cursor.fetchall():
+            if blob["type"] == "empty":
+                continue
+            value = serde.loads_typed((blob["type"], blob["blob"]))
+            if blob["kind"] == "value":
+                channel_values[blob["thread_id"]][blob["key"]] = value
+            else:
+                interrupts.setdefault(blob["thread_id"], {}).setdefault(blob["key"], []).extend(
+                    {
+                        "value": getattr(intr, "value", intr),
+                        "when": "during",
+                        "resumable": True,
+                        "ns": None,
+                    }
+                    for intr in value
+                )
+
+        default_graph = next(iter(self._graphs.values()), None)
+        states = {}
+        for row in rows:
+            thread_id = row["thread_id"]
+            # 只保留 graph 输出的 channel（与 StateSnapshot.values 一致）
+            graph = self._graphs.get((row["metadata"] or {}).get("assistant_id"), default_graph)
+            keys = getattr(graph, "stream_channels_list", None)
+            raw = channel_values[thread_id]
+            if keys is not None:
+                raw = {key: raw[key] for key in keys if key in raw}
+            states[thread_id] = (
+                self._serialize_state_values(raw),
+                interrupts.get(thread_id, {}),
+            )
+        return states
 
     async def _search_threads_fallback(
         self,
         metadata: dict[str, Any] | None,
-        _values: dict[str, Any] | None,
+        values: dict[str, Any] | None,
         status: str | None,
         limit: int,
         offset: int,
@@ -237,6 +409,9 @@ class ThreadMixin:
                     if not all(thread_metadata.get(k) == v for k, v in metadata.items()):
                         continue
 
+                if values and not _match_values(thread.get("values"), values):
+                    continue
+
                 results.append(thread)
 
                 if len(results) >= limit + offset:
@@ -0,0 +1,310 @@
+"""Thread 摘要索引
+
+每个 Thread 一行轻量摘要（状态、消息数、最后一条消息预览、metadata），
+Run 开始时写入占位行，Run 结束/中断以及 update_thread_state 后由 executor 根据最新 state 写入。
+Thread 列表、search（不需要 values 时）和 get_thread（不需要 values 时）直接查询摘要，
+不再读取完整的 checkpoint state。
+
+摘要表只在 PostgreSQL 部署中启用（与 checkpoint 同库），其他部署沿用原有查询路径。
+"""
+
+from datetime import datetime
+from typing import Any
+import logging
+
+from .schemas import ThreadStatus
+
+logger = logging.getLogger(__name__)
+
+# 最后一条消息预览的字符上限
+PREVIEW_MAX_CHARS = 200
+
+
+def infer_state_status(state: Any) -> str:
+    """从 StateSnapshot 推断 Thread 状态（不考虑活跃 Run）
+
+    优先级：ERROR > INTERRUPTED > BUSY（还有下一个节点待执行）> IDLE
+    """
+    # tasks 中有 error（LangGraph 自动记录）
+    if state.tasks and any(getattr(t, "error", None) for t in state.tasks):
+        return ThreadStatus.ERROR.value
+
+    # interrupt 信息（优先使用顶层 interrupts）
+    if getattr(state, "interrupts", None) or (
+        state.tasks and any(getattr(t, "interrupts", None) for t in state.tasks)
+    ):
+        return ThreadStatus.INTERRUPTED.value
+
+    if state.next:
+        return ThreadStatus.BUSY.value
+
+    return ThreadStatus.IDLE.value
+
+
+def _message_preview(message: Any) -> str:
+    content = message.get("content") if isinstance(message, dict) else getattr(message, "content", "")
+    if isinstance(content, list):
+        # 多模态内容：只取文本块
+        content = " ".join(
+            block if isinstance(block, str) else str(block.get("text", ""))
+            for block in content
+            if isinstance(block, str) or (isinstance(block, dict) and block.get("type") == "text")
+        )
+    text = " ".join(str(content or "").split())
+    return text[:PREVIEW_MAX_CHARS]
+
+
+def summarize_state(thread_id: str, state: Any) -> dict[str, Any]:
+    """由 StateSnapshot 生成摘要（status 不含活跃 Run 信息）"""
+    values = state.values if isinstance(state.values, dict) else {}
+    messages = values.get("messages") or []
+    metadata = dict(state.metadata or {})
+    return {
+        "thread_id": thread_id,
+        "assistant_id": metadata.get("assistant_id"),
+        "status": infer_state_status(state),
+        "updated_at": getattr(state, "created_at", None),
+        "message_count": len(messages),
+        "last_message": _message_preview(messages[-1]) if messages else None,
+        "metadata": metadata,
+    }
+
+
+_CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS thread_summaries (
+    thread_id TEXT PRIMARY KEY,
+    assistant_id TEXT,
+    status TEXT NOT NULL,
+    metadata JSONB NOT NULL DEFAULT '{}',
+    message_count INTEGER NOT NULL DEFAULT 0,
+    last_message TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS idx_thread_summaries_status_updated
+    ON thread_summaries (status, updated_at DESC);
+CREATE INDEX IF NOT EXISTS idx_thread_summaries_updated
+    ON thread_summaries (updated_at DESC);
+CREATE INDEX IF NOT EXISTS idx_thread_summaries_metadata
+    ON thread_summaries USING GIN (metadata jsonb_path_ops);
+"""
+
+# 首次建表时为已有 Thread 生成摘要（只有 checkpoint 中可直接读取的字段，
+# 消息数和预览在下一次 Run 结束后补齐）
+_BACKFILL_SQL = """
+INSERT INTO thread_summaries (thread_id, assistant_id, status, metadata, created_at, updated_at)
+SELECT DISTINCT ON (thread_id)
+    thread_id, metadata ->> 'assistant_id', 'idle', metadata,
+    (checkpoint ->> 'ts')::timestamptz, (checkpoint ->> 'ts')::timestamptz
+FROM checkpoints
+WHERE checkpoint_ns = ''
+ORDER BY thread_id, checkpoint_id DESC
+ON CONFLICT (thread_id) DO NOTHING
+"""
+
+_UPSERT_SQL = """
+INSERT INTO thread_summaries (
+    thread_id, assistant_id, status, metadata, message_count, last_message, updated_at
+)
+VALUES (
+    %(thread_id)s, %(assistant_id)s, %(status)s, %(metadata)s, %(message_count)s,
+    %(last_message)s, COALESCE(%(updated_at)s::timestamptz, NOW())
+)
+ON CONFLICT (thread_id) DO UPDATE SET
+    assistant_id = COALESCE(EXCLUDED.assistant_id, thread_summaries.assistant_id),
+    status = EXCLUDED.status,
+    metadata = EXCLUDED.metadata,
+    message_count = EXCLUDED.message_count,
+    last_message = EXCLUDED.last_message,
+    updated_at = EXCLUDED.updated_at
+"""
+
+# Thread 的 Run 开始时写入占位摘要（已有摘要时不覆盖），
+# 第一个 Run 执行期间 Thread 同样出现在列表和搜索中，Run 结束后由完整摘要覆盖
+_INSERT_PLACEHOLDER_SQL = """
+INSERT INTO thread_summaries (thread_id, assistant_id, status, metadata)
+VALUES (%(thread_id)s, %(assistant_id)s, 'busy', %(metadata)s)
+ON CONFLICT (thread_id) DO NOTHING
+"""
+
+# 启动时清理上次进程退出前残留的占位摘要（Run 未结束，完整摘要没有写入）：
+# 没有 checkpoint 的 Thread 直接删除，其余按回填规则改为 idle
+_DELETE_STALE_PLACEHOLDERS_SQL = """
+DELETE FROM thread_summaries s
+WHERE s.status = 'busy' AND s.message_count = 0 AND s.last_message IS NULL
+    AND NOT EXISTS (
+        SELECT 1 FROM checkpoints c WHERE c.thread_id = s.thread_id AND c.checkpoint_ns = ''
+    )
+"""
+
+_RESET_STALE_PLACEHOLDERS_SQL = """
+UPDATE thread_summaries SET status = 'idle'
+WHERE status = 'busy' AND message_count = 0 AND last_message IS NULL
+"""
+
+# 本进程有活跃 Run 的 Thread 状态为 busy（与 _infer_thread_status 一致）
+_SELECT_SQL = """
+SELECT thread_id, assistant_id, metadata, message_count, last_message, created_at, updated_at,
+    CASE WHEN thread_id = ANY(%(busy)s::text[]) THEN 'busy' ELSE status END AS status
+FROM thread_summaries
+"""
+
+
+class PostgresThreadSummaryStore:
+    """PostgreSQL thread_summaries 表
+
+    传入 pool（已打开的 AsyncConnectionPool，需 autocommit + dict_row）时复用该连接池，
+    由调用方负责关闭。
+    """
+
+    def __init__(self, database_url: str, pool: Any = None):
+        self._database_url = database_url
+        self._pool: Any = pool
+        self._owns_pool = pool is None
+        self._writes = 0
+        self._errors = 0
+
+    async def start(self) -> None:
+        if self._owns_pool:
+            from psycopg.rows import dict_row
+            from psycopg_pool import AsyncConnectionPool
+
+            self._pool = AsyncConnectionPool(
+                conninfo=self._database_url,
+                min_size=1,
+                max_size=4,
+                open=False,
+                kwargs={"autocommit": True, "row_factory": dict_row},
+            )
+            await self._pool.open()
+        async with self._pool.connection() as conn:
+            cursor = await conn.execute("SELECT to_regclass('thread_summaries') IS NULL AS missing")
+            row = await cursor.fetchone()
+            await conn.execute(_CREATE_TABLE_SQL)
+            if row and row["missing"]:
+                await self._backfill(conn)
+            else:
+                await self._reconcile(conn)
+        logger.info("PostgresThreadSummaryStore 已启动")
+
+    async def _backfill(self, conn: Any) -> None:
+        try:
+            cursor = await conn.execute(_BACKFILL_SQL)
+            logger.info(f"thread_summaries 已回填 {cursor.rowcount} 个 Thread")
+        except Exception as e:
+            # checkpoints 表不在同一个库（或尚未创建）时跳过
+            logger.warning(f"thread_summaries 回填失败: {e}")
+
+    async def _reconcile(self, conn: Any) -> None:
+        """清理残留的占位摘要
+
+        多 worker 部署时其他 worker 上执行中的 Run 的占位摘要同样会被改为 idle，
+        与非首个 Run 执行期间的摘要状态一致，Run 结束后由完整摘要覆盖。
+        """
+        try:
+            cursor = await conn.execute(_DELETE_STALE_PLACEHOLDERS_SQL)
+            deleted = cursor.rowcount
+        except Exception as e:
+            # checkpoints 表不在同一个库时只重置状态
+            logger.warning(f"清理占位摘要失败: {e}")
+            deleted = 0
+        cursor = await conn.execute(_RESET_STALE_PLACEHOLDERS_SQL)
+        if deleted or cursor.rowcount:
+            logger.info(f"thread_summaries 已清理占位摘要: 删除 {deleted}，重置 {cursor.rowcount}")
+
+    async def stop(self) -> None:
+        if self._pool is not None and self._owns_pool:
+            await self._pool.close()
+            self._pool = None
+        logger.info("PostgresThreadSummaryStore 已停止")
+
+    async def upsert(self, summary: dict[str, Any]) -> None:
+        from psycopg.types.json import Jsonb
+
+        try:
+            async with self._pool.connection() as conn:
+                await conn.execute(
+                    _UPSERT_SQL, {**summary, "metadata": Jsonb(summary.get("metadata") or {})}
+                )
+            self._writes += 1
+        except Exception as e:
+            self._errors += 1
+            logger.warning(f"写入 Thread {summary['thread_id']} 摘要失败: {e}")
+
+    async def insert_placeholder(
+        self, thread_id: str, assistant_id: str, metadata: dict[str, Any]
+    ) -> None:
+        from psycopg.types.json import Jsonb
+
+        try:
+            async with self._pool.connection() as conn:
+                await conn.execute(
+                    _INSERT_PLACEHOLDER_SQL,
+                    {
+                        "thread_id": thread_id,
+                        "assistant_id": assistant_id,
+                        "metadata": Jsonb(metadata),
+                    },
+                )
+            self._writes += 1
+        except Exception as e:
+            self._errors += 1
+            logger.warning(f"写入 Thread {thread_id} 占位摘要失败: {e}")
+
+    async def get(self, thread_id: str, busy: list[str]) -> dict[str, Any] | None:
+        async with self._pool.connection() as conn:
+            cursor = await conn.execute(
+                _SELECT_SQL + " WHERE thread_id = %(thread_id)s",
+                {"busy": busy, "thread_id": thread_id},
+            )
+            return await cursor.fetchone()
+
+    async def search(
+        self,
+        busy: list[str],
+        metadata: dict[str, Any] | None = None,
+        status: str | None = None,
+        limit: int = 10,
+        offset: int = 0,
+    ) -> list[dict[str, Any]]:
+        """按 updated_at 倒序分页（status 走 (status, updated_at) 索引，metadata 走 GIN 索引）"""
+        from psycopg.types.json import Jsonb
+
+        conditions: list[str] = []
+        params: dict[str, Any] = {"busy": busy, "limit": limit, "offset": offset}
+        if metadata:
+            conditions.append("metadata @> %(metadata)s")
+            params["metadata"] = Jsonb(metadata)
+        if status == ThreadStatus.BUSY.value:
+            conditions.append("(status = 'busy' OR thread_id = ANY(%(busy)s::text[]))")
+        elif status is not None:
+            conditions.append("status = %(status)s AND NOT thread_id = ANY(%(busy)s::text[])")
+            params["status"] = status
+        query = _SELECT_SQL
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY updated_at DESC LIMIT %(limit)s OFFSET %(offset)s"
+        async with self._pool.connection() as conn:
+            cursor = await conn.execute(query, params)
+            return await cursor.fetchall()
+
+    async def delete(self, thread_id: str) -> None:
+        async with self._pool.connection() as conn:
+            await conn.execute("DELETE FROM thread_summaries WHERE thread_id = %s", (thread_id,))
+
+    def get_stats(self) -> dict[str, Any]:
+        return {"writes": self._writes, "errors": self._errors}
+
+
+def summary_to_thread(summary: dict[str, Any]) -> dict[str, Any]:
+    """摘要 → Thread 响应（不含 values/interrupts）"""
+    updated_at: datetime = summary["updated_at"]
+    return {
+        "thread_id": summary["thread_id"],
+        "created_at": summary.get("created_at") or updated_at,
+        "updated_at": updated_at,
+        "metadata": summary.get("metadata") or {},
+        "status": summary["status"],
+        "values": None,
+        "interrupts": {},
+    }
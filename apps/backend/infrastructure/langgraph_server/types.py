@@ -9,8 +9,13 @@ from typing import Any
 from uuid import UUID
 import asyncio
 
+from langchain_core.callbacks import UsageMetadataCallbackHandler
+
 from .schemas import RunStatus
 
+# Run 结束时仍处于这些状态，说明被取消/打断
+_UNFINISHED = (RunStatus.PENDING, RunStatus.RUNNING)
+
 
 @dataclass
 class ActiveRun:
@@ -29,9 +34,38 @@ class ActiveRun:
     updated_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
     metadata: dict[str, Any] = field(default_factory=dict)
     on_disconnect: str = "cancel"  # "cancel" | "continue"
+    ticket: asyncio.Future[None] | None = None  # RunScheduler 准入凭证（放行后占用执行名额）
+    started_at: datetime | None = None  # 调度器放行时间
+    ended_at: datetime | None = None
+    error: str | None = None
+    # 汇总本次 Run 内所有 LLM 调用的 token 用量（通过 config callbacks 注入）
+    usage: UsageMetadataCallbackHandler = field(default_factory=UsageMetadataCallbackHandler)
+
+    def start(self) -> None:
+        """标记为开始执行"""
+        self.status = RunStatus.RUNNING
+        self.started_at = self.updated_at = datetime.now(timezone.utc)
+
+    def end(self) -> None:
+        """标记为结束（未得出结果的 Run 视为被中断）"""
+        if self.status in _UNFINISHED:
+            self.status = RunStatus.INTERRUPTED
+        if self.ended_at is None:
+            self.ended_at = datetime.now(timezone.utc)
+        self.updated_at = datetime.now(timezone.utc)
+
+    def usage_totals(self) -> dict[str, int] | None:
+        """各模型 token 用量之和，没有 LLM 调用时返回 None"""
+        if not self.usage.usage_metadata:
+            return None
+        totals = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+        for usage in self.usage.usage_metadata.values():
+            for key in totals:
+                totals[key] += usage.get(key, 0)
+        return totals
 
     def to_dict(self) -> dict[str, Any]:
-        """转换为 API 响应格式"""
+        """转换为 API 响应格式（同时是 RunStore 的记录格式）"""
         return {
             "run_id": str(self.run_id),
             "thread_id": self.thread_id,
@@ -39,5 +73,23 @@ class ActiveRun:
             "status": self.status.value,
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "ended_at": self.ended_at.isoformat() if self.ended_at else None,
             "metadata": self.metadata,
+            "error_message": self.error,
+            "usage": self.usage_totals(),
         }
+
+
+@dataclass
+class QueuedRun:
+    """排队中的 Run（multitask_strategy=enqueue）
+
+    前一个 Run 结束后由 executor 按 FIFO 顺序启动：run 成为 Thread 的 ActiveRun，
+    ready 置为 True；排队期间被取消时 ready 置为 False。
+    """
+
+    run: ActiveRun
+    ready: asyncio.Future[bool] = field(
+        default_factory=lambda: asyncio.get_running_loop().create_future()
+    )
@@ -14,18 +14,31 @@
 
 环境变量:
     ENVIRONMENT: 环境名称 (local/test/production)
-    WORKFLOW_DATABASE_URL: PostgreSQL 连接字符串（可选，不配置则使用内存）
+    WORKFLOW_DATABASE_URL: PostgreSQL 连接字符串（可选，不配置则使用内存；同时用于 runs / thread_summaries 表）
     WORKFLOW_SQLITE_PATH: SQLite 数据库路径（可选，用于本地持久化）
+    LANGGRAPH_REDIS_URL: Redis 连接字符串（可选，配置后可启动多个 uvicorn worker）
+    LANGGRAPH_MAX_CONCURRENT_RUNS: 同时执行的 Run 上限（默认 8）
+    LANGGRAPH_RUN_WAIT_QUEUE_SIZE: 等待执行的 Run 上限（默认 32，超出返回 429）
 """
 
+from concurrent.futures.process import BrokenProcessPool
 from contextlib import asynccontextmanager
 
-import fitz  # pymupdf
-from fastapi import FastAPI, File, UploadFile
+from fastapi import FastAPI, File, HTTPException, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
+from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
 
 from api.sessions import router as sessions_router, prefs_router
 from api.auth import router as auth_router
+from api.database import get_db_context, open_db_pool
+from api.pdf_parser import (
+    PdfExtractTimeoutError,
+    PdfParserBusyError,
+    get_pdf_parser_stats,
+    open_pdf_executor,
+    parse_pdf_bytes,
+)
+from api.token_cache import get_auth_cache_stats
 
 from config.app_config import config
 from config.langgraph_config import _configure_langgraph_logging, get_checkpointer, get_store
@@ -40,6 +53,12 @@ from infrastructure.langgraph_server import (
 
 # 导入 workflow builders
 from workflows.graphs.resume_enhancer.builder import _build_graph as build_resume_enhancer_graph
+from workflows.graphs.resume_enhancer.tools._internal import (
+    close_github_cache,
+    close_http_client,
+    get_github_cache_stats,
+    get_github_ratelimit_stats,
+)
 
 # Workflow 注册表
 WORKFLOW_BUILDERS = {
@@ -50,7 +69,12 @@ WORKFLOW_BUILDERS = {
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期管理"""
-    async with get_checkpointer() as checkpointer, get_store() as store:
+    async with (
+        open_db_pool(),
+        open_pdf_executor(),
+        get_checkpointer() as checkpointer,
+        get_store() as store,
+    ):
         # 编译所有 workflow graphs
         graphs = {
             name: builder().compile(checkpointer=checkpointer, store=store)
@@ -60,7 +84,18 @@ async def lifespan(app: FastAPI):
         # 创建 router 和 service lifespan
         router, get_service_lifespan, assistants_router = create_langgraph_router(
             graphs=graphs,
-            config=LangGraphServerConfig(),
+            config=LangGraphServerConfig(
+                buffer_backend="redis" if config.langgraph_redis_url else "memory",
+                redis_url=config.langgraph_redis_url,
+                max_concurrent_runs=config.langgraph_max_concurrent_runs,
+                run_wait_queue_size=config.langgraph_run_wait_queue_size,
+                # Run 历史、Thread 摘要与 checkpoint 存放在同一个数据库，并复用其连接池
+                run_store_url=config.workflow_database_url,
+                thread_summary_url=config.workflow_database_url,
+                database_pool=(
+                    checkpointer.conn if isinstance(checkpointer, AsyncPostgresSaver) else None
+                ),
+            ),
         )
 
         # 动态挂载 router
@@ -69,8 +104,14 @@ async def lifespan(app: FastAPI):
             app.include_router(assistants_router)  # 挂载 /assistants 到根路径
 
         # 启动 service
-        async with get_service_lifespan():
-            yield
+        try:
+            async with get_service_lifespan() as service:
+                app.state.langgraph_service = service
+                yield
+        finally:
+            # 关闭研究工具共享的 HTTP 连接池和 GitHub 缓存
+            await close_http_client()
+            close_github_cache()
 
 
 # 创建 FastAPI 应用
@@ -106,17 +147,27 @@ app.include_router(auth_router)
 @app.get("/health")
 async def health_check():
     """健康检查 - 验证数据库连接"""
-    from api.database import get_db_context
-
     try:
-        with get_db_context() as conn:
-            conn.execute("SELECT 1")
+        async with get_db_context() as conn:
+            await conn.execute("SELECT 1")
         return {"status": "healthy", "database": "connected"}
     except Exception as e:
-        from fastapi import HTTPException
         raise HTTPException(status_code=503, detail=f"Database unavailable: {str(e)}")
 
 
+@app.get("/metrics")
+async def metrics():
+    """运行指标（各组件计数器，供监控抓取）"""
+    service = getattr(app.state, "langgraph_service", None)
+    return {
+        **(service.get_metrics() if service else {}),
+        "auth_cache": get_auth_cache_stats(),
+        "github_cache": get_github_cache_stats(),
+        "github_ratelimit": get_github_ratelimit_stats(),
+        "pdf_parser": get_pdf_parser_stats(),
+    }
+
+
 MAX_PDF_SIZE = 20 * 1024 * 1024  # 20MB
 
 
@@ -124,12 +175,8 @@ MAX_PDF_SIZE = 20 * 1024 * 1024  # 20MB
 async def parse_pdf(file: UploadFile = File(...)):
     """解析 PDF 文件为 Markdown 格式
 
-    使用 pymupdf4llm 提取 PDF 内容，然后用 LLM 转换为结构化 Markdown。
+    使用 pymupdf4llm 提取 PDF 内容（进程池中执行），然后用 LLM 转换为结构化 Markdown。
     """
-    import re
-    from fastapi import HTTPException
-    from langchain_openai import ChatOpenAI
-
     if not file.filename or not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="请上传 PDF 文件")
 
@@ -139,53 +186,15 @@ async def parse_pdf(file: UploadFile = File(...)):
         raise HTTPException(status_code=413, detail=f"文件过大，最大支持 {MAX_PDF_SIZE // 1024 // 1024}MB")
 
     try:
-        import pymupdf4llm
-
-        # 使用 pymupdf4llm 提取文本（传入字节流，提取所有页面）
-        doc = fitz.open(stream=content, filetype="pdf")
-        num_pages = len(doc)
-        doc.close()
-
-        # pymupdf4llm.to_markdown 需要传入文件路径或字节流，不是 doc 对象
-        raw_text = pymupdf4llm.to_markdown(
-            fitz.open(stream=content, filetype="pdf"),
-            pages=list(range(num_pages)),  # 明确指定所有页面
-        )
-
-        # 使用 LLM 转换为结构化 Markdown
-        llm = ChatOpenAI(
-            model=config.openai_api_key and "gpt-4o-mini" or "deepseek-chat",
-            base_url=config.openai_api_base,
-            api_key=config.openai_api_key,
-            temperature=0,
+        return await parse_pdf_bytes(content)
+    except PdfParserBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except PdfExtractTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except BrokenProcessPool:
+        raise HTTPException(
+            status_code=503, detail="PDF 解析进程异常退出，请稍后重试", headers={"Retry-After": "5"}
         )
-
-        prompt = f"""请将以下简历内容转换为结构清晰的 Markdown 格式。
-
-要求：
-1. 使用 # 作为姓名/主标题
-2. 使用 ## 作为各个板块标题（如：教育背景、工作经历、项目经验、技能等）
-3. 使用 ### 作为子标题（如：公司名称、项目名称）
-4. 使用 **粗体** 突出重要信息（如：职位、时间、技术栈）
-5. 使用 - 列表展示具体内容
-6. 保持原有信息完整，不要添加或删除内容
-7. 直接输出 Markdown 内容，不要添加任何解释
-
-简历原文：
-{raw_text}
-
-Markdown 格式简历："""
-
-        response = await llm.ainvoke(prompt)
-        md_content = response.content
-
-        # 清理可能的代码块标记
-        md_content = re.sub(r'^```markdown\s*', '', md_content)
-        md_content = re.sub(r'^```\s*', '', md_content)
-        md_content = re.sub(r'\s*```$', '', md_content)
-
-        return {"markdown": md_content, "pages": num_pages}
-
     except Exception as e:
         import traceback
         error_detail = traceback.format_exc()
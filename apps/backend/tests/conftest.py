@@ -1,7 +1,13 @@
 """Pytest 配置"""
 
+import os
+
 import pytest
 
+# 导入 config 时必须存在的配置（测试不会真正请求 LLM）
+os.environ.setdefault("OPENAI_API_BASE", "http://localhost:8000/v1")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
 
 @pytest.fixture
 def sample_resume_content() -> str:
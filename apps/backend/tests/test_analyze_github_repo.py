@@ -0,0 +1,120 @@
+"""GitHub 仓库分析测试"""
+
+import asyncio
+import importlib
+
+from workflows.graphs.resume_enhancer.tools._internal import PRIORITY_BULK, GitHubRateLimitError
+from workflows.graphs.resume_enhancer.tools._internal.github_ratelimit import current_priority
+
+# tools 包导出了同名函数，这里取模块本身
+module = importlib.import_module("workflows.graphs.resume_enhancer.tools.analyze_github_repo")
+
+
+def _report(repo: str) -> dict:
+    return {
+        "summary": f"{repo} summary",
+        "document_content": f"# {repo}",
+        "suggested_path": f"/references/{repo}.md",
+    }
+
+
+class TestAnalyzeRepos:
+    """批量分析：数量上限、并发与优先级"""
+
+    async def test_dedupes_and_caps_batch(self, monkeypatch):
+        analyzed: list[str] = []
+
+        async def analyze(repo: str) -> dict:
+            analyzed.append(repo)
+            return _report(repo)
+
+        monkeypatch.setattr(module, "analyze_github_repo", analyze)
+        repos = ["a/0", " a/0 ", ""] + [f"a/{i}" for i in range(12)]
+
+        result = await module.analyze_github_repos(repos)
+
+        expected = [f"a/{i}" for i in range(module.BATCH_MAX_REPOS)]
+        assert sorted(analyzed) == sorted(expected)
+        assert [doc["repo"] for doc in result["documents"]] == expected
+        assert result["summary"].split("\n\n---\n\n") == [f"{r} summary" for r in expected]
+
+    async def test_concurrency_is_bounded(self, monkeypatch):
+        in_flight = 0
+        max_in_flight = 0
+
+        async def analyze(repo: str) -> dict:
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return _report(repo)
+
+        monkeypatch.setattr(module, "analyze_github_repo", analyze)
+        await module.analyze_github_repos([f"a/{i}" for i in range(8)])
+
+        assert max_in_flight == module.BATCH_MAX_CONCURRENCY == 4
+
+    async def test_requests_use_bulk_priority(self, monkeypatch):
+        priorities: list[int] = []
+
+        async def analyze(repo: str) -> dict:
+            priorities.append(current_priority())
+            return _report(repo)
+
+        monkeypatch.setattr(module, "analyze_github_repo", analyze)
+        await module.analyze_github_repos(["a/1", "a/2"])
+
+        assert priorities == [PRIORITY_BULK, PRIORITY_BULK]
+        assert current_priority() != PRIORITY_BULK
+
+
+class TestAnalyzeRepo:
+    """单仓库分析的子请求"""
+
+    async def test_rate_limit_cancels_sibling_requests(self, monkeypatch):
+        cancelled: list[str] = []
+
+        async def repo_info(repo: str) -> dict:
+            return {"full_name": repo}
+
+        async def rate_limited(repo: str) -> dict:
+            raise GitHubRateLimitError("core", 30)
+
+        def slow(name: str):
+            async def fetch(repo: str):
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    cancelled.append(name)
+                    raise
+
+            return fetch
+
+        monkeypatch.setattr(module, "_get_repo_info", repo_info)
+        monkeypatch.setattr(module, "_get_languages", rate_limited)
+        for name in ["_get_contributors", "_get_recent_commits", "_get_readme", "_get_releases"]:
+            monkeypatch.setattr(module, name, slow(name))
+
+        result = await asyncio.wait_for(module._analyze_repo("a/b"), timeout=1.0)
+
+        assert "限流" in result["error"]
+        assert sorted(cancelled) == [
+            "_get_contributors",
+            "_get_readme",
+            "_get_recent_commits",
+            "_get_releases",
+        ]
+
+    async def test_missing_repo_skips_other_requests(self, monkeypatch):
+        async def repo_info(repo: str) -> dict:
+            return {"error": f"仓库 {repo} 不存在"}
+
+        async def unexpected(repo: str):
+            raise AssertionError("不应请求")
+
+        monkeypatch.setattr(module, "_get_repo_info", repo_info)
+        monkeypatch.setattr(module, "_get_languages", unexpected)
+
+        result = await module._analyze_repo("a/missing")
+        assert result["error"] == "仓库 a/missing 不存在"
@@ -0,0 +1,150 @@
+"""ThreadAssistantCache 测试"""
+
+from types import SimpleNamespace
+from typing import Any
+from uuid import uuid4
+import asyncio
+
+from infrastructure.langgraph_server.assistant_cache import ThreadAssistantCache
+from infrastructure.langgraph_server.schemas import RunStatus
+from infrastructure.langgraph_server.service import LangGraphService
+from infrastructure.langgraph_server.types import ActiveRun
+
+
+class TestThreadAssistantCache:
+    """有界 LRU"""
+
+    def test_get_and_set(self):
+        cache = ThreadAssistantCache()
+        assert cache.get("t1") is None
+
+        cache.set("t1", "resume")
+        assert cache.get("t1") == "resume"
+        cache.set("t1", "article")
+        assert cache.get("t1") == "article"
+
+    def test_evicts_least_recently_used(self):
+        cache = ThreadAssistantCache(max_size=2)
+        cache.set("t1", "a")
+        cache.set("t2", "b")
+        cache.get("t1")
+        cache.set("t3", "c")
+
+        assert cache.get("t2") is None
+        assert cache.get("t1") == "a"
+        assert cache.get("t3") == "c"
+
+    def test_set_existing_refreshes_recency(self):
+        cache = ThreadAssistantCache(max_size=2)
+        cache.set("t1", "a")
+        cache.set("t2", "b")
+        cache.set("t1", "a")
+        cache.set("t3", "c")
+
+        assert cache.get("t1") == "a"
+        assert cache.get("t2") is None
+
+    def test_invalidate(self):
+        cache = ThreadAssistantCache()
+        cache.set("t1", "a")
+        cache.invalidate("t1")
+        cache.invalidate("missing")
+
+        assert cache.get("t1") is None
+
+    def test_stats(self):
+        cache = ThreadAssistantCache(max_size=5)
+        assert cache.get_stats()["hit_rate"] == 0.0
+
+        cache.set("t1", "a")
+        cache.get("t1")
+        cache.get("t1")
+        cache.get("t2")
+        assert cache.get_stats() == {
+            "size": 1,
+            "max_size": 5,
+            "hits": 2,
+            "misses": 1,
+            "hit_rate": 0.667,
+        }
+
+
+class FakeCheckpointer:
+    """按 thread_id 返回 checkpoint metadata，记录读取次数"""
+
+    def __init__(self, assistants: dict[str, str]):
+        self.assistants = assistants
+        self.reads: list[str] = []
+
+    async def aget_tuple(self, config: Any) -> SimpleNamespace | None:
+        thread_id = config["configurable"]["thread_id"]
+        self.reads.append(thread_id)
+        if thread_id not in self.assistants:
+            return None
+        return SimpleNamespace(metadata={"assistant_id": self.assistants[thread_id]})
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        self.assistants.pop(thread_id, None)
+
+
+def _service(checkpointer: FakeCheckpointer) -> LangGraphService:
+    graphs = {
+        "resume": SimpleNamespace(checkpointer=checkpointer),
+        "article": SimpleNamespace(checkpointer=checkpointer),
+    }
+    return LangGraphService(graphs)  # type: ignore[arg-type]
+
+
+class TestGraphForThread:
+    """_get_graph_for_thread 使用缓存"""
+
+    async def test_reads_checkpoint_once(self):
+        checkpointer = FakeCheckpointer({"t1": "article"})
+        service = _service(checkpointer)
+
+        assert await service._get_graph_for_thread("t1") is service._graphs["article"]
+        assert await service._get_graph_for_thread("t1") is service._graphs["article"]
+        assert checkpointer.reads == ["t1"]
+
+    async def test_unknown_thread_is_not_cached(self):
+        checkpointer = FakeCheckpointer({"t2": "unknown-graph"})
+        service = _service(checkpointer)
+
+        assert await service._get_graph_for_thread("t1") is service._graphs["resume"]
+        assert await service._get_graph_for_thread("t2") is service._graphs["resume"]
+        await service._get_graph_for_thread("t1")
+        assert checkpointer.reads == ["t1", "t2", "t1"]
+
+    async def test_single_graph_skips_lookup(self):
+        checkpointer = FakeCheckpointer({"t1": "resume"})
+        graph = SimpleNamespace(checkpointer=checkpointer)
+        service = LangGraphService({"resume": graph})  # type: ignore[dict-item]
+
+        assert await service._get_graph_for_thread("t1") is service._graphs["resume"]
+        assert checkpointer.reads == []
+
+    async def test_run_start_fills_cache(self):
+        checkpointer = FakeCheckpointer({})
+        service = _service(checkpointer)
+        task = asyncio.create_task(asyncio.sleep(60))
+        run = ActiveRun(
+            run_id=uuid4(),
+            thread_id="t1",
+            assistant_id="article",
+            status=RunStatus.PENDING,
+            task=task,
+        )
+
+        await service._executor._add_active_run(run)
+        assert await service._get_graph_for_thread("t1") is service._graphs["article"]
+        assert checkpointer.reads == []
+        task.cancel()
+
+    async def test_delete_thread_invalidates(self):
+        checkpointer = FakeCheckpointer({"t1": "article"})
+        service = _service(checkpointer)
+        await service._get_graph_for_thread("t1")
+
+        assert await service.delete_thread("t1")
+        assert await service._get_graph_for_thread("t1") is service._graphs["resume"]
+        assert checkpointer.reads == ["t1", "t1"]
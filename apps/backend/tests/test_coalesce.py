@@ -0,0 +1,117 @@
+"""messages 模式片段合并测试"""
+
+import asyncio
+from typing import Any, AsyncIterator
+
+import pytest
+from langchain_core.messages import AIMessageChunk
+
+from infrastructure.langgraph_server.coalesce import (
+    CoalesceStats,
+    MessageChunkCoalescer,
+    coalesce_chunks,
+    is_messages_mode,
+)
+
+METADATA = {"langgraph_node": "agent"}
+
+
+def _chunk(text: str, message_id: str = "m1") -> tuple[AIMessageChunk, dict]:
+    return AIMessageChunk(content=text, id=message_id), METADATA
+
+
+def _texts(chunks: list[Any]) -> list[str]:
+    return [chunk[0].content for chunk in chunks]
+
+
+async def _stream(items: list[Any], delay: float = 0.0) -> AsyncIterator[Any]:
+    for item in items:
+        await asyncio.sleep(delay)
+        yield item
+
+
+class TestMessageChunkCoalescer:
+    """合并规则"""
+
+    def test_merges_chunks_of_same_message(self):
+        coalescer = MessageChunkCoalescer("messages", window_seconds=10)
+        assert coalescer.add(_chunk("Hel")) == []
+        assert coalescer.add(_chunk("lo")) == []
+
+        flushed = coalescer.flush()
+        assert _texts(flushed) == ["Hello"]
+        assert flushed[0][1] == METADATA
+
+    def test_new_message_id_flushes_previous(self):
+        coalescer = MessageChunkCoalescer("messages", window_seconds=10)
+        coalescer.add(_chunk("a", "m1"))
+        assert _texts(coalescer.add(_chunk("b", "m2"))) == ["a"]
+        assert _texts(coalescer.flush()) == ["b"]
+
+    def test_other_events_flush_first_and_keep_order(self):
+        coalescer = MessageChunkCoalescer(["messages", "values"], window_seconds=10)
+        coalescer.add(("messages", _chunk("a")))
+        values = ("values", {"messages": []})
+
+        ready = coalescer.add(values)
+        assert ready[0][0] == "messages" and ready[0][1][0].content == "a"
+        assert ready[1] is values
+
+    def test_max_chars_flushes(self):
+        coalescer = MessageChunkCoalescer("messages", window_seconds=10, max_chars=4)
+        assert coalescer.add(_chunk("ab")) == []
+        assert _texts(coalescer.add(_chunk("cd"))) == ["abcd"]
+
+    def test_chunks_without_id_pass_through(self):
+        coalescer = MessageChunkCoalescer("messages", window_seconds=10)
+        chunk = (AIMessageChunk(content="x"), METADATA)
+        assert coalescer.add(chunk) == [chunk]
+
+    def test_namespaced_chunks_keep_prefix(self):
+        coalescer = MessageChunkCoalescer(["messages"], window_seconds=10)
+        coalescer.add((("sub:1",), "messages", _chunk("a")))
+        coalescer.add((("sub:1",), "messages", _chunk("b")))
+
+        (flushed,) = coalescer.flush()
+        assert flushed[:2] == (("sub:1",), "messages")
+        assert flushed[2][0].content == "ab"
+
+    def test_stats(self):
+        stats = CoalesceStats()
+        coalescer = MessageChunkCoalescer("messages", window_seconds=10, stats=stats)
+        for text in "abcd":
+            coalescer.add(_chunk(text))
+        coalescer.flush()
+        assert stats.to_dict() == {"chunks_in": 4, "chunks_out": 1, "events_saved": 3, "ratio": 4.0}
+
+
+def test_is_messages_mode():
+    assert is_messages_mode("messages")
+    assert is_messages_mode(["values", "messages-tuple"])
+    assert not is_messages_mode(["values", "updates"])
+
+
+class TestCoalesceChunks:
+    """包装 graph 流"""
+
+    async def test_coalesces_stream(self):
+        coalescer = MessageChunkCoalescer("messages", window_seconds=10)
+        items = [_chunk("a"), _chunk("b"), _chunk("c", "m2")]
+        chunks = [chunk async for chunk in coalesce_chunks(_stream(items), coalescer)]
+        assert _texts(chunks) == ["ab", "c"]
+
+    async def test_window_flushes_when_stream_stalls(self):
+        coalescer = MessageChunkCoalescer("messages", window_seconds=0.02)
+        items = [_chunk("a"), _chunk("b")]
+        chunks = [chunk async for chunk in coalesce_chunks(_stream(items, delay=0.1), coalescer)]
+        assert _texts(chunks) == ["a", "b"]
+
+    async def test_propagates_stream_errors(self):
+        async def broken() -> AsyncIterator[Any]:
+            yield _chunk("a")
+            raise RuntimeError("boom")
+
+        coalescer = MessageChunkCoalescer("messages", window_seconds=10)
+        with pytest.raises(RuntimeError, match="boom"):
+            async for _ in coalesce_chunks(broken(), coalescer):
+                pass
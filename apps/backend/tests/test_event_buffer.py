@@ -0,0 +1,262 @@
+"""EventBuffer 测试"""
+
+import asyncio
+from typing import AsyncIterator
+
+from infrastructure.langgraph_server.buffer import EventBuffer, RunBuffer
+from infrastructure.langgraph_server.schemas import SSEEvent
+
+# 每个 values 事件的 SSE 帧约 1040 字节
+EVENT_BYTES = 1040
+
+
+def _event(name: str = "values", size: int = 1000) -> SSEEvent:
+    return SSEEvent(event=name, data="x" * size)
+
+
+def _metadata() -> SSEEvent:
+    return SSEEvent(event="metadata", data={"run_id": "r"})
+
+
+async def _put_many(buffer: EventBuffer, run_id: str, count: int) -> None:
+    for _ in range(count):
+        await buffer.put(run_id, _event())
+
+
+def _ids(events: list[SSEEvent]) -> list[int]:
+    return [int(event.id) for event in events]
+
+
+async def _drain(subscription: AsyncIterator[SSEEvent]) -> list[int]:
+    return [int(event.id) async for event in subscription]
+
+
+class TestByteBudget:
+    """单 Run 与全局字节预算"""
+
+    async def test_run_budget_drops_oldest(self):
+        buffer = EventBuffer(run_max_bytes=3 * EVENT_BYTES)
+        await _put_many(buffer, "r1", 5)
+
+        events = await buffer.get_events("r1")
+        assert _ids(events) == [2, 3, 4]
+        stats = buffer.get_stats()
+        assert stats["dropped_events"] == 2
+        assert stats["buffered_bytes"] <= 3 * EVENT_BYTES
+
+    async def test_metadata_head_is_pinned(self):
+        buffer = EventBuffer(run_max_bytes=3 * EVENT_BYTES)
+        await buffer.put("r1", _metadata())
+        await _put_many(buffer, "r1", 5)
+
+        events = await buffer.get_events("r1")
+        assert events[0].event == "metadata"
+        assert _ids(events) == [0, 4, 5]
+
+    async def test_global_budget_evicts_finished_runs_first(self):
+        buffer = EventBuffer(max_bytes=4 * EVENT_BYTES, run_max_bytes=10 * EVENT_BYTES)
+        await _put_many(buffer, "finished", 2)
+        await buffer.finish("finished")
+        await _put_many(buffer, "active", 2)
+
+        await _put_many(buffer, "new", 1)
+
+        assert not await buffer.has_run("finished")
+        assert len(await buffer.get_events("active")) == 2
+        assert buffer.get_stats()["evicted_runs"] == 1
+
+    async def test_global_budget_trims_least_recently_used_active_run(self):
+        buffer = EventBuffer(max_bytes=4 * EVENT_BYTES, run_max_bytes=10 * EVENT_BYTES)
+        await _put_many(buffer, "old", 2)
+        await _put_many(buffer, "recent", 2)
+
+        await _put_many(buffer, "recent", 1)
+
+        assert _ids(await buffer.get_events("old")) == [1]
+        assert _ids(await buffer.get_events("recent")) == [0, 1, 2]
+        assert buffer.get_stats()["buffered_bytes"] <= 4 * EVENT_BYTES
+
+    async def test_subscribed_finished_run_is_not_evicted(self):
+        buffer = EventBuffer(max_bytes=3 * EVENT_BYTES, run_max_bytes=10 * EVENT_BYTES)
+        await _put_many(buffer, "watched", 2)
+        buffer._buffers["watched"].subscribers = 1
+        await buffer.finish("watched")
+
+        await _put_many(buffer, "new", 2)
+
+        assert await buffer.has_run("watched")
+
+    async def test_clear_run_releases_bytes(self):
+        buffer = EventBuffer()
+        await _put_many(buffer, "r1", 3)
+        await buffer.clear_run("r1")
+        assert buffer.get_stats()["buffered_bytes"] == 0
+
+
+class TestRunBuffer:
+    """环形存储"""
+
+    def test_drop_oldest_compacts(self):
+        buf = RunBuffer()
+        for _ in range(200):
+            buf.append(_event(size=10))
+        for _ in range(150):
+            buf.drop_oldest()
+
+        assert buf.start < 150  # 已压缩
+        assert _ids(buf.events_after()) == list(range(150, 200))
+        assert len(buf) == 50
+
+    def test_drop_oldest_on_empty_buffer(self):
+        assert RunBuffer().drop_oldest() == 0
+
+
+class TestSequenceIds:
+    """事件序号与 Last-Event-Id 重放"""
+
+    async def test_put_assigns_monotonic_ids(self):
+        buffer = EventBuffer()
+        events = [await buffer.put("r1", _event(size=10)) for _ in range(3)]
+        assert [event.id for event in events] == ["0", "1", "2"]
+        # 每个 Run 独立计数
+        assert (await buffer.put("r2", _event(size=10))).id == "0"
+
+    async def test_get_events_returns_tail_after_last_event_id(self):
+        buffer = EventBuffer()
+        await buffer.put("r1", _metadata())
+        await _put_many(buffer, "r1", 4)
+
+        assert _ids(await buffer.get_events("r1", last_event_id=2)) == [3, 4]
+        assert _ids(await buffer.get_events("r1", last_event_id=4)) == []
+        assert _ids(await buffer.get_events("r1")) == [0, 1, 2, 3, 4]
+
+    async def test_replay_after_dropped_events_starts_at_oldest_retained(self):
+        buffer = EventBuffer(run_max_bytes=2 * EVENT_BYTES)
+        await _put_many(buffer, "r1", 5)
+        assert _ids(await buffer.get_events("r1", last_event_id=0)) == [3, 4]
+
+    async def test_subscribe_replays_missing_tail_then_live_events(self):
+        buffer = EventBuffer()
+        await _put_many(buffer, "r1", 3)
+        received: list[int] = []
+
+        async def consume() -> None:
+            async for event in buffer.subscribe("r1", last_event_id=1):
+                received.append(int(event.id))
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0)
+        await buffer.put("r1", _event())
+        await buffer.put("r1", _event("end", size=0))
+        await asyncio.wait_for(task, 1)
+
+        assert received == [2, 3, 4]
+
+    async def test_subscriber_does_not_duplicate_events(self):
+        buffer = EventBuffer()
+        await buffer.open("r1")
+        received: list[int] = []
+
+        async def consume() -> None:
+            async for event in buffer.subscribe("r1"):
+                received.append(int(event.id))
+
+        task = asyncio.create_task(consume())
+        for _ in range(3):
+            await _put_many(buffer, "r1", 2)
+            await asyncio.sleep(0)
+        await buffer.put("r1", _event("end", size=0))
+        await asyncio.wait_for(task, 1)
+
+        assert received == list(range(7))
+
+
+class TestSubscriberWakeups:
+    """订阅者唤醒与结束信号"""
+
+    async def test_finish_ends_idle_subscriber(self):
+        buffer = EventBuffer()
+        await _put_many(buffer, "r1", 1)
+        received: list[int] = []
+
+        async def consume() -> None:
+            async for event in buffer.subscribe("r1"):
+                received.append(int(event.id))
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.01)
+        assert not task.done()
+
+        await buffer.finish("r1")
+        await asyncio.wait_for(task, 1)
+        assert received == [0]
+        assert buffer.get_stats()["subscribers"] == 0
+
+    async def test_clear_run_ends_subscriber(self):
+        buffer = EventBuffer()
+        await buffer.open("r1")
+        task = asyncio.create_task(_drain(buffer.subscribe("r1")))
+        await asyncio.sleep(0.01)
+
+        await buffer.clear_run("r1")
+        await asyncio.wait_for(task, 1)
+
+    async def test_put_wakes_all_subscribers(self):
+        buffer = EventBuffer()
+        await buffer.open("r1")
+        tasks = [asyncio.create_task(_drain(buffer.subscribe("r1"))) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        assert buffer.get_stats()["subscribers"] == 3
+
+        await buffer.put("r1", _event(size=10))
+        await buffer.put("r1", _event("end", size=0))
+        results = await asyncio.wait_for(asyncio.gather(*tasks), 1)
+        assert results == [[0, 1]] * 3
+
+    async def test_subscribe_to_finished_run_replays_and_exits(self):
+        buffer = EventBuffer()
+        await _put_many(buffer, "r1", 2)
+        await buffer.finish("r1")
+        assert await asyncio.wait_for(_drain(buffer.subscribe("r1")), 1) == [0, 1]
+
+    async def test_subscribe_to_unknown_run_returns_immediately(self):
+        buffer = EventBuffer()
+        assert await asyncio.wait_for(_drain(buffer.subscribe("missing")), 1) == []
+        # 不为未知 Run 创建缓冲区
+        assert not await buffer.has_run("missing")
+        assert buffer.get_stats()["runs"] == 0
+
+    async def test_open_keeps_existing_events(self):
+        buffer = EventBuffer()
+        await _put_many(buffer, "r1", 2)
+        await buffer.open("r1")
+        assert _ids(await buffer.get_events("r1")) == [0, 1]
+        assert await buffer.is_active("r1")
+
+
+class TestSlowSubscriber:
+    """订阅者未读事件被预算丢弃"""
+
+    async def _lagging_subscriber(self, policy: str) -> tuple[EventBuffer, list[int]]:
+        buffer = EventBuffer(run_max_bytes=2 * EVENT_BYTES, slow_subscriber_policy=policy)
+        await _put_many(buffer, "r1", 1)
+        received: list[int] = []
+        subscription = buffer.subscribe("r1")
+        received.append(int((await subscription.__anext__()).id))
+
+        # 订阅者暂停读取期间写入的事件超出预算
+        await _put_many(buffer, "r1", 4)
+        await buffer.put("r1", _event("end", size=0))
+        async for event in subscription:
+            received.append(int(event.id))
+        return buffer, received
+
+    async def test_skip_policy_continues_from_oldest_retained(self):
+        buffer, received = await self._lagging_subscriber("skip")
+        assert received == [0, 4, 5]
+        assert buffer.get_stats()["skipped_events"] == 3
+
+    async def test_disconnect_policy_closes_subscription(self):
+        buffer, received = await self._lagging_subscriber("disconnect")
+        assert received == [0]
+        assert buffer.get_stats()["slow_disconnects"] == 1
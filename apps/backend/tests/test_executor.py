@@ -0,0 +1,517 @@
+"""GraphExecutor 测试"""
+
+from types import SimpleNamespace
+from typing import Any
+from uuid import uuid4
+import asyncio
+
+import pytest
+
+from infrastructure.langgraph_server import executor as executor_module
+from infrastructure.langgraph_server.buffer import EventBuffer
+from infrastructure.langgraph_server.executor import GraphExecutor
+from infrastructure.langgraph_server.service import LangGraphService
+from infrastructure.langgraph_server.registry import LocalRunRegistry
+from infrastructure.langgraph_server.scheduler import RunScheduler, RunSchedulerFullError
+from infrastructure.langgraph_server.schemas import (
+    MultitaskStrategy,
+    RunCreate,
+    RunStatus,
+    SSEEvent,
+)
+from infrastructure.langgraph_server.types import ActiveRun
+
+
+class RemoteRegistry(LocalRunRegistry):
+    """模拟另一个 worker 上的活跃 Run：收到取消请求后 stop_after 次查询内注销"""
+
+    def __init__(self, stop_after: int | None):
+        self.remote: dict[str, Any] | None = {"run_id": "remote-run", "thread_id": "t1"}
+        self.stop_after = stop_after
+        self.cancel_requests: list[str] = []
+
+    async def get_run(self, thread_id: str) -> dict[str, Any] | None:
+        if self.cancel_requests and self.stop_after is not None:
+            if self.stop_after <= 0:
+                self.remote = None
+            self.stop_after -= 1
+        return self.remote
+
+    async def request_cancel(self, thread_id: str, run_id: str) -> bool:
+        self.cancel_requests.append(run_id)
+        return True
+
+
+class RecordingBuffer(EventBuffer):
+    """记录 put/finish 的调用顺序"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls: list[tuple[str, str]] = []
+
+    async def put(self, run_id: str, event: SSEEvent) -> SSEEvent:
+        self.calls.append(("put", event.event))
+        return await super().put(run_id, event)
+
+    async def finish(self, run_id: str) -> None:
+        self.calls.append(("finish", run_id))
+        await super().finish(run_id)
+
+
+class FakeSummaryStore:
+    """记录摘要写入顺序（PostgresThreadSummaryStore 的替身）"""
+
+    def __init__(self):
+        self.calls: list[tuple[str, str]] = []
+        self.placeholders: dict[str, dict[str, Any]] = {}
+
+    async def upsert(self, summary: dict[str, Any]) -> None:
+        self.calls.append(("upsert", summary["thread_id"]))
+
+    async def insert_placeholder(
+        self, thread_id: str, assistant_id: str, metadata: dict[str, Any]
+    ) -> None:
+        self.calls.append(("placeholder", thread_id))
+        self.placeholders[thread_id] = metadata
+
+    async def delete(self, thread_id: str) -> None:
+        self.calls.append(("delete", thread_id))
+
+
+class FakeGraph:
+    """aget_state 返回固定 state，gate 未放行时阻塞"""
+
+    def __init__(self, values: dict[str, Any] | None = None):
+        self.values = {"messages": []} if values is None else values
+        self.gate: asyncio.Event | None = None
+        self.checkpointer = None
+
+    async def aget_state(self, config: Any) -> SimpleNamespace:
+        if self.gate is not None:
+            await self.gate.wait()
+        return SimpleNamespace(
+            values=self.values, metadata={}, tasks=(), next=(), created_at=None
+        )
+
+
+@pytest.fixture
+async def idle_task():
+    """充当 ActiveRun.task 的后台任务"""
+    task = asyncio.create_task(asyncio.sleep(60))
+    yield task
+    task.cancel()
+
+
+def _run(task: asyncio.Task[Any], thread_id: str = "t1") -> ActiveRun:
+    return ActiveRun(
+        run_id=uuid4(),
+        thread_id=thread_id,
+        assistant_id="graph",
+        status=RunStatus.PENDING,
+        task=task,
+    )
+
+
+@pytest.fixture
+def fast_remote_cancel(monkeypatch):
+    monkeypatch.setattr(executor_module, "REMOTE_CANCEL_TIMEOUT", 0.2)
+    monkeypatch.setattr(executor_module, "REMOTE_CANCEL_POLL_INTERVAL", 0.01)
+
+
+class TestRemoteRun:
+    """其他 worker 上的活跃 Run"""
+
+    @pytest.mark.parametrize(
+        "strategy", [MultitaskStrategy.INTERRUPT, MultitaskStrategy.ROLLBACK]
+    )
+    async def test_waits_until_remote_run_stops(self, fast_remote_cancel, strategy):
+        registry = RemoteRegistry(stop_after=3)
+        executor = GraphExecutor({}, EventBuffer(), registry=registry)
+
+        assert await executor._check_remote_run("t1", strategy) is None
+        assert registry.cancel_requests == ["remote-run"]
+        assert registry.remote is None
+
+    async def test_rejects_when_remote_run_does_not_stop(self, fast_remote_cancel):
+        registry = RemoteRegistry(stop_after=None)
+        executor = GraphExecutor({}, EventBuffer(), registry=registry)
+
+        error = await executor._check_remote_run("t1", MultitaskStrategy.INTERRUPT)
+        assert error is not None
+        assert registry.cancel_requests == ["remote-run"]
+
+    async def test_reject_strategy_does_not_cancel(self):
+        registry = RemoteRegistry(stop_after=0)
+        executor = GraphExecutor({}, EventBuffer(), registry=registry)
+
+        assert await executor._check_remote_run("t1", MultitaskStrategy.REJECT)
+        assert registry.cancel_requests == []
+
+
+class TestInterruptActiveRun:
+    """新 Run 打断当前 Run"""
+
+    @pytest.mark.parametrize(
+        "strategy, message",
+        [
+            (MultitaskStrategy.INTERRUPT, "Run interrupted by new run"),
+            (MultitaskStrategy.ROLLBACK, "Run rolled back by new run"),
+        ],
+    )
+    async def test_error_event_before_finish(self, idle_task, strategy, message):
+        buffer = RecordingBuffer()
+        executor = GraphExecutor({}, buffer)
+        run = _run(idle_task)
+        await executor._add_active_run(run)
+
+        await executor._interrupt_active_run(run, strategy)
+
+        assert buffer.calls == [("put", "error"), ("finish", str(run.run_id))]
+        events = await buffer.get_events(str(run.run_id))
+        assert [event.data for event in events] == [{"message": message}]
+        assert not executor.has_active_run("t1")
+        assert run.status == RunStatus.INTERRUPTED
+        await asyncio.sleep(0)
+        assert idle_task.cancelled()
+
+    async def test_subscriber_receives_reason(self, idle_task):
+        buffer = EventBuffer()
+        executor = GraphExecutor({}, buffer)
+        run = _run(idle_task)
+        await executor._add_active_run(run)
+        await buffer.put(str(run.run_id), SSEEvent(event="metadata", data={}))
+
+        async def _collect() -> list[str]:
+            return [event.event async for event in buffer.subscribe(str(run.run_id))]
+
+        subscriber = asyncio.create_task(_collect())
+        await asyncio.sleep(0)
+        await executor._interrupt_active_run(run, MultitaskStrategy.INTERRUPT)
+
+        assert await asyncio.wait_for(subscriber, 1) == ["metadata", "error"]
+
+    async def test_does_not_start_queued_run(self, idle_task):
+        executor = GraphExecutor({}, EventBuffer())
+        active = _run(idle_task)
+        await executor._add_active_run(active)
+        queued = executor._enqueue(_run(idle_task))
+
+        await executor._interrupt_active_run(active, MultitaskStrategy.INTERRUPT)
+
+        assert not queued.ready.done()
+        assert not executor.has_active_run("t1")
+
+
+class TestRunQueue:
+    """Thread 的 Run 队列（multitask_strategy=enqueue）"""
+
+    async def test_enqueue_rejects_when_full(self, idle_task):
+        executor = GraphExecutor({}, EventBuffer(), max_queue_depth=2)
+        executor._enqueue(_run(idle_task))
+        executor._enqueue(_run(idle_task))
+
+        with pytest.raises(ValueError, match="queue is full"):
+            executor._enqueue(_run(idle_task))
+        assert executor.get_queue_stats()["queued_runs"] == 2
+
+    async def test_enqueue_records_pending_run(self, idle_task):
+        executor = GraphExecutor({}, EventBuffer())
+        run = _run(idle_task)
+        executor._enqueue(run)
+
+        infos = await executor.list_run_infos("t1")
+        assert [info["run_id"] for info in infos] == [str(run.run_id)]
+        stored = await executor._run_store.get_run("t1", str(run.run_id))
+        assert stored is not None and stored["status"] == RunStatus.PENDING.value
+
+    async def test_queued_runs_start_in_order(self, idle_task):
+        executor = GraphExecutor({}, EventBuffer())
+        active = _run(idle_task)
+        await executor._add_active_run(active)
+        first = executor._enqueue(_run(idle_task))
+        second = executor._enqueue(_run(idle_task))
+        waiter = asyncio.create_task(executor._wait_queued(first))
+
+        await executor._remove_active_run(active)
+
+        assert await asyncio.wait_for(waiter, 1) is True
+        assert executor.get_active_run("t1") is first.run
+        assert not second.ready.done()
+
+        await executor._remove_active_run(first.run)
+        assert second.ready.result() is True
+        assert executor.get_active_run("t1") is second.run
+
+    async def test_cancelled_queued_run_returns_false(self, idle_task):
+        executor = GraphExecutor({}, EventBuffer())
+        await executor._add_active_run(_run(idle_task))
+        queued = executor._enqueue(_run(idle_task))
+        waiter = asyncio.create_task(executor._wait_queued(queued))
+        await asyncio.sleep(0)
+
+        assert await executor.cancel_run("t1", str(queued.run.run_id))
+
+        assert await asyncio.wait_for(waiter, 1) is False
+        assert queued.run.status == RunStatus.INTERRUPTED
+        assert executor.get_queue_stats()["queued_runs"] == 0
+
+    async def test_waiter_cancelled_while_queued_leaves_queue(self, idle_task):
+        executor = GraphExecutor({}, EventBuffer())
+        active = _run(idle_task)
+        await executor._add_active_run(active)
+        queued = executor._enqueue(_run(idle_task))
+        waiter = asyncio.create_task(executor._wait_queued(queued))
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert executor.get_queue_stats()["queued_runs"] == 0
+        assert queued.run.ended_at is not None
+        assert executor.get_active_run("t1") is active
+
+    async def test_waiter_cancelled_after_start_hands_over_slot(self, idle_task):
+        executor = GraphExecutor({}, EventBuffer())
+        active = _run(idle_task)
+        await executor._add_active_run(active)
+        first = executor._enqueue(_run(idle_task))
+        second = executor._enqueue(_run(idle_task))
+        waiter = asyncio.create_task(executor._wait_queued(first))
+        await asyncio.sleep(0)
+
+        # 轮到 first 后、等待方恢复执行前被取消（如 SSE 恰好断开）
+        await executor._remove_active_run(active)
+        assert first.ready.result() is True
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert first.run.ended_at is not None
+        assert second.ready.result() is True
+        assert executor.get_active_run("t1") is second.run
+
+
+    async def test_stream_output_of_queued_run_waits_for_events(self, idle_task):
+        executor = GraphExecutor({}, EventBuffer())
+        await executor._add_active_run(_run(idle_task))
+        queued = executor._enqueue(_run(idle_task))
+        run_id = str(queued.run.run_id)
+
+        async def _collect() -> list[str]:
+            return [event.event async for event in executor.stream_run_output("t1", run_id)]
+
+        subscriber = asyncio.create_task(_collect())
+        await asyncio.sleep(0.01)
+        assert not subscriber.done()
+
+        # 排队中的 Run 被取消后订阅立即结束
+        assert await executor.cancel_run("t1", run_id)
+        assert await asyncio.wait_for(subscriber, 1) == []
+
+    async def test_waiter_cancelled_while_queued_ends_stream_output(self, idle_task):
+        executor = GraphExecutor({}, EventBuffer())
+        await executor._add_active_run(_run(idle_task))
+        queued = executor._enqueue(_run(idle_task))
+        run_id = str(queued.run.run_id)
+        waiter = asyncio.create_task(executor._wait_queued(queued))
+
+        async def _collect() -> list[str]:
+            return [event.event async for event in executor.stream_run_output("t1", run_id)]
+
+        subscriber = asyncio.create_task(_collect())
+        await asyncio.sleep(0.01)
+        assert not subscriber.done()
+
+        # 排队 Run 的创建方断开（如 SSE 断开）后，join 该 Run 的订阅者也结束
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert await asyncio.wait_for(subscriber, 1) == []
+
+    async def test_stream_output_of_unknown_run_returns(self):
+        executor = GraphExecutor({}, EventBuffer())
+        events = [event async for event in executor.stream_run_output("t1", "missing")]
+        assert events == []
+        assert not await executor._buffer.has_run("missing")
+
+
+class TestAdmissionBeforeInterrupt:
+    """服务繁忙时拒绝新 Run，不取消当前 Run"""
+
+    @pytest.fixture
+    async def busy_scheduler(self):
+        scheduler = RunScheduler(max_concurrent=1, max_waiting=0)
+        scheduler.submit("other")
+        return scheduler
+
+    @pytest.mark.parametrize(
+        "strategy", [MultitaskStrategy.INTERRUPT, MultitaskStrategy.ROLLBACK]
+    )
+    async def test_create_run_keeps_existing_run(self, idle_task, busy_scheduler, strategy):
+        buffer = RecordingBuffer()
+        executor = GraphExecutor(
+            {"graph": object()}, buffer, scheduler=busy_scheduler  # type: ignore[dict-item]
+        )
+        existing = _run(idle_task)
+        await executor._add_active_run(existing)
+
+        with pytest.raises(RunSchedulerFullError):
+            await executor.create_run(
+                "t1", RunCreate(assistant_id="graph", multitask_strategy=strategy)
+            )
+
+        assert executor.get_active_run("t1") is existing
+        assert buffer.calls == []
+        assert not idle_task.cancelled()
+
+    async def test_stream_run_keeps_existing_run(self, idle_task, busy_scheduler):
+        buffer = RecordingBuffer()
+        executor = GraphExecutor(
+            {"graph": object()}, buffer, scheduler=busy_scheduler  # type: ignore[dict-item]
+        )
+        existing = _run(idle_task)
+        await executor._add_active_run(existing)
+
+        request = RunCreate(assistant_id="graph", multitask_strategy=MultitaskStrategy.INTERRUPT)
+        events = [event async for event in executor.stream_run("t1", request)]
+
+        assert [event.event for event in events] == ["error"]
+        assert "busy" in events[0].data["message"]
+        assert executor.get_active_run("t1") is existing
+        assert buffer.calls == []
+
+    async def test_remote_run_not_cancelled_when_busy(self, busy_scheduler):
+        registry = RemoteRegistry(stop_after=0)
+        executor = GraphExecutor(
+            {"graph": object()},  # type: ignore[dict-item]
+            EventBuffer(),
+            registry=registry,
+            scheduler=busy_scheduler,
+        )
+
+        with pytest.raises(RunSchedulerFullError):
+            await executor.create_run(
+                "t1",
+                RunCreate(assistant_id="graph", multitask_strategy=MultitaskStrategy.INTERRUPT),
+            )
+        assert registry.cancel_requests == []
+
+
+def _summary_executor(graph: FakeGraph, store: FakeSummaryStore) -> GraphExecutor:
+    return GraphExecutor(
+        {"graph": graph},  # type: ignore[dict-item]
+        EventBuffer(),
+        thread_summaries=store,  # type: ignore[arg-type]
+    )
+
+
+async def _settle() -> None:
+    """等待后台摘要写入执行完"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestThreadSummaries:
+    """Run 开始/结束时的 Thread 摘要写入"""
+
+    async def test_placeholder_then_summary(self, idle_task):
+        store = FakeSummaryStore()
+        graph = FakeGraph()
+        graph.gate = asyncio.Event()
+        executor = _summary_executor(graph, store)
+        run = _run(idle_task)
+        run.metadata = {"user_id": "u1"}
+
+        await executor._add_active_run(run)
+        await executor._remove_active_run(run)
+        await _settle()
+        assert store.calls == [("placeholder", "t1")]
+        assert store.placeholders["t1"] == {"user_id": "u1", "assistant_id": "graph"}
+
+        graph.gate.set()
+        await _settle()
+        assert store.calls == [("placeholder", "t1"), ("upsert", "t1")]
+
+    async def test_empty_state_removes_placeholder(self, idle_task):
+        store = FakeSummaryStore()
+        executor = _summary_executor(FakeGraph(values={}), store)
+        run = _run(idle_task)
+
+        await executor._add_active_run(run)
+        await executor._remove_active_run(run)
+        await _settle()
+        assert store.calls == [("placeholder", "t1"), ("delete", "t1")]
+
+    async def test_cancelled_run_refreshes_once(self):
+        store = FakeSummaryStore()
+        executor = _summary_executor(FakeGraph(), store)
+        started = asyncio.Event()
+
+        async def _body() -> None:
+            try:
+                started.set()
+                await asyncio.sleep(60)
+            finally:
+                await executor._remove_active_run(run)
+
+        task = asyncio.create_task(_body())
+        run = _run(task)
+        await executor._add_active_run(run)
+        await started.wait()
+
+        assert await executor.cancel_run("t1", str(run.run_id))
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await _settle()
+        assert store.calls.count(("upsert", "t1")) == 1
+
+    async def test_deleting_thread_waits_for_pending_write(self, idle_task):
+        store = FakeSummaryStore()
+        graph = FakeGraph()
+        graph.gate = asyncio.Event()
+        executor = _summary_executor(graph, store)
+        run = _run(idle_task)
+        await executor._add_active_run(run)
+        await executor._remove_active_run(run)
+        await _settle()  # 摘要更新正在读取 state
+
+        async def _delete() -> None:
+            async with executor.deleting_thread("t1"):
+                store.calls.append(("deleted", "t1"))
+
+        deleting = asyncio.create_task(_delete())
+        await _settle()
+        assert not deleting.done()
+
+        graph.gate.set()
+        await deleting
+        # 删除开始后才读到 state 的摘要更新不再写入
+        assert store.calls == [("placeholder", "t1"), ("deleted", "t1")]
+
+
+async def test_delete_thread_does_not_rewrite_summary():
+    store = FakeSummaryStore()
+    service = LangGraphService({"graph": FakeGraph()})  # type: ignore[dict-item]
+    service._thread_summaries = store  # type: ignore[assignment]
+    executor = service._executor
+    executor._thread_summaries = store  # type: ignore[assignment]
+
+    async def _body() -> None:
+        try:
+            await asyncio.sleep(60)
+        finally:
+            await executor._remove_active_run(run)
+
+    task = asyncio.create_task(_body())
+    run = _run(task)
+    await executor._add_active_run(run)
+    await _settle()
+
+    assert await service.delete_thread("t1")
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    await _settle()
+
+    assert store.calls == [("placeholder", "t1"), ("delete", "t1")]
+    assert not executor.has_active_run("t1")
@@ -0,0 +1,182 @@
+"""GitHub 响应缓存测试"""
+
+import time
+
+import pytest
+
+from workflows.graphs.resume_enhancer.tools._internal import github_api, github_cache
+from workflows.graphs.resume_enhancer.tools._internal.github_cache import (
+    CacheEntry,
+    GitHubCache,
+    make_cache_key,
+    ttl_for_path,
+)
+from workflows.graphs.resume_enhancer.tools._internal.http_client import HttpResponse
+
+
+def _entry(body: bytes = b"{}", fetched_at: float | None = None, ttl: float = 60) -> CacheEntry:
+    return CacheEntry(
+        url="https://api.github.com/repos/a/b",
+        body=body,
+        headers={"Content-Type": "application/json", "ETag": '"v1"'},
+        etag='"v1"',
+        last_modified="Wed, 01 Jan 2026 00:00:00 GMT",
+        fetched_at=time.time() if fetched_at is None else fetched_at,
+        ttl=ttl,
+    )
+
+
+class TestCacheEntry:
+    """TTL 与条件请求头"""
+
+    def test_expires_after_ttl(self):
+        entry = _entry(fetched_at=1000.0, ttl=60)
+        assert entry.is_fresh(now=1059.0)
+        assert not entry.is_fresh(now=1060.0)
+
+    def test_conditional_headers(self):
+        assert _entry().conditional_headers() == {
+            "If-None-Match": '"v1"',
+            "If-Modified-Since": "Wed, 01 Jan 2026 00:00:00 GMT",
+        }
+
+    def test_search_uses_shorter_ttl(self):
+        assert ttl_for_path("/search/repositories") == github_cache.GITHUB_SEARCH_CACHE_TTL
+        assert ttl_for_path("/repos/a/b") == github_cache.GITHUB_CACHE_TTL
+
+    def test_cache_key_ignores_param_order(self):
+        assert make_cache_key("/p", {"a": 1, "b": 2}, None) == make_cache_key(
+            "/p", {"b": 2, "a": 1}, None
+        )
+        assert make_cache_key("/p", None, None) != make_cache_key("/p", None, "raw")
+
+
+class TestGitHubCache:
+    """内存 LRU 与 SQLite 持久化"""
+
+    async def test_memory_lru_eviction(self):
+        cache = GitHubCache(db_path=None, memory_entries=2)
+        await cache.put("a", _entry(b"a"))
+        await cache.put("b", _entry(b"b"))
+        await cache.get("a")
+        await cache.put("c", _entry(b"c"))
+
+        assert cache.in_memory("a") and cache.in_memory("c")
+        assert not cache.in_memory("b")
+        assert await cache.get("b") is None
+
+    async def test_sqlite_round_trip(self, tmp_path):
+        db_path = str(tmp_path / "cache.db")
+        cache = GitHubCache(db_path=db_path)
+        entry = _entry(b'{"name": "b"}')
+        await cache.put("k", entry)
+        cache.close()
+
+        # 新实例（模拟进程重启）从 SQLite 读取
+        reopened = GitHubCache(db_path=db_path)
+        loaded = await reopened.get("k")
+        assert loaded == entry
+        assert reopened.in_memory("k")
+        assert reopened.get_stats()["persistent"]
+        reopened.close()
+
+    async def test_sqlite_lru_eviction(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(github_cache, "_EVICT_EVERY_N_PUTS", 1)
+        # 内存层不保留条目，读取都走 SQLite 并刷新 accessed_at
+        cache = GitHubCache(db_path=str(tmp_path / "cache.db"), max_entries=2, memory_entries=0)
+        await cache.put("a", _entry(b"a"))
+        await cache.put("b", _entry(b"b"))
+        assert await cache.get("a") is not None
+        await cache.put("c", _entry(b"c"))
+
+        assert await cache.get("b") is None
+        assert await cache.get("a") is not None
+        assert await cache.get("c") is not None
+        assert cache.get_stats()["evictions"] == 1
+        cache.close()
+
+    async def test_unusable_db_falls_back_to_memory(self, tmp_path):
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+        cache = GitHubCache(db_path=str(blocker / "cache.db"))
+
+        await cache.put("k", _entry())
+        assert await cache.get("k") is not None
+        stats = cache.get_stats()
+        assert stats["errors"] == 1
+        assert not stats["persistent"]
+
+
+class FakeGitHub:
+    """替代 _scheduled_get：按顺序返回预置响应，记录请求头"""
+
+    def __init__(self, *responses: HttpResponse):
+        self._responses = list(responses)
+        self.requests: list[dict[str, str]] = []
+
+    async def __call__(self, path, url, params, headers, timeout) -> HttpResponse:
+        self.requests.append(dict(headers))
+        return self._responses.pop(0)
+
+
+@pytest.fixture
+def memory_cache(monkeypatch) -> GitHubCache:
+    cache = GitHubCache(db_path=None)
+    monkeypatch.setattr(github_api, "get_github_cache", lambda: cache)
+    return cache
+
+
+def _response(status: int, body: bytes = b"", etag: str | None = None) -> HttpResponse:
+    headers = {"Content-Type": "application/json"}
+    if etag:
+        headers["ETag"] = etag
+    return HttpResponse(
+        status=status, url="https://api.github.com/repos/a/b", headers=headers, body=body
+    )
+
+
+class TestGitHubGet:
+    """github_get 的缓存命中与 304 重新验证"""
+
+    async def test_fresh_entry_skips_request(self, memory_cache, monkeypatch):
+        fake = FakeGitHub(_response(200, b'{"v": 1}', etag='"v1"'))
+        monkeypatch.setattr(github_api, "_scheduled_get", fake)
+
+        first = await github_api.github_get("/repos/a/b")
+        second = await github_api.github_get("/repos/a/b")
+
+        assert first.json() == second.json() == {"v": 1}
+        assert len(fake.requests) == 1
+        stats = memory_cache.get_stats()
+        assert (stats["misses"], stats["hits"]) == (1, 1)
+
+    async def test_expired_entry_revalidates_with_304(self, memory_cache, monkeypatch):
+        fake = FakeGitHub(_response(200, b'{"v": 1}', etag='"v1"'), _response(304))
+        monkeypatch.setattr(github_api, "_scheduled_get", fake)
+
+        await github_api.github_get("/repos/a/b")
+        key = make_cache_key("/repos/a/b", None, None)
+        memory_cache._memory[key].fetched_at -= github_cache.GITHUB_CACHE_TTL + 1
+
+        response = await github_api.github_get("/repos/a/b")
+
+        assert response.status == 200
+        assert response.json() == {"v": 1}
+        assert fake.requests[1]["If-None-Match"] == '"v1"'
+        assert memory_cache._memory[key].is_fresh()
+        assert memory_cache.get_stats()["revalidated"] == 1
+
+    async def test_changed_resource_replaces_entry(self, memory_cache, monkeypatch):
+        fake = FakeGitHub(
+            _response(200, b'{"v": 1}', etag='"v1"'),
+            _response(200, b'{"v": 2}', etag='"v2"'),
+        )
+        monkeypatch.setattr(github_api, "_scheduled_get", fake)
+
+        await github_api.github_get("/repos/a/b")
+        key = make_cache_key("/repos/a/b", None, None)
+        memory_cache._memory[key].fetched_at = 0
+
+        response = await github_api.github_get("/repos/a/b")
+        assert response.json() == {"v": 2}
+        assert memory_cache._memory[key].etag == '"v2"'
@@ -0,0 +1,163 @@
+"""GitHub 限流调度器测试"""
+
+import asyncio
+import time
+
+import pytest
+
+from workflows.graphs.resume_enhancer.tools._internal import github_ratelimit
+from workflows.graphs.resume_enhancer.tools._internal.github_ratelimit import (
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+    SECONDARY_LIMIT_PAUSE,
+    GitHubRateLimitError,
+    GitHubScheduler,
+)
+
+
+def _drained(rate: float = 1000.0) -> GitHubScheduler:
+    """core 配额的令牌已用完，按 rate 补充"""
+    scheduler = GitHubScheduler(authenticated=True)
+    bucket = scheduler._buckets["core"]
+    bucket.tokens = 0
+    bucket.refill_rate = rate
+    bucket.updated_at = time.monotonic()
+    return scheduler
+
+
+class TestAcquire:
+    """排队与放行"""
+
+    async def test_interactive_before_bulk(self):
+        scheduler = _drained(rate=50)
+        granted: list[str] = []
+
+        async def acquire(name: str, priority: int) -> None:
+            await scheduler.acquire("core", priority=priority)
+            granted.append(name)
+
+        bulk = [asyncio.create_task(acquire(f"bulk{i}", PRIORITY_BULK)) for i in range(2)]
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(acquire("interactive", PRIORITY_INTERACTIVE))
+        await asyncio.gather(*bulk, interactive)
+
+        assert granted == ["interactive", "bulk0", "bulk1"]
+
+    async def test_rejects_when_wait_exceeds_max_wait(self):
+        scheduler = _drained(rate=1 / 3600)
+
+        with pytest.raises(GitHubRateLimitError) as exc_info:
+            await scheduler.acquire("core", max_wait=0.05)
+
+        assert exc_info.value.retry_after > 60
+        assert scheduler.get_stats()["core"]["rejected"] == 1
+
+    async def test_blocked_longer_than_max_wait_fails_fast(self):
+        scheduler = GitHubScheduler(authenticated=True)
+        scheduler._buckets["core"].blocked_until = time.monotonic() + 100
+
+        started = time.monotonic()
+        with pytest.raises(GitHubRateLimitError) as exc_info:
+            await scheduler.acquire("core", max_wait=1)
+
+        assert time.monotonic() - started < 0.5
+        assert 99 < exc_info.value.retry_after <= 100
+
+    async def test_dispatch_waits_when_token_is_gone(self):
+        scheduler = _drained(rate=20)
+        bucket = scheduler._buckets["core"]
+        waiter = asyncio.create_task(scheduler.acquire("core"))
+        await asyncio.sleep(0)
+
+        # 排队期间被二级限流暂停：dispatcher 不能在没有令牌时放行
+        bucket.blocked_until = time.monotonic() + 0.1
+        await asyncio.sleep(0.07)
+        assert not waiter.done()
+
+        await asyncio.wait_for(waiter, timeout=1)
+        assert bucket.granted == 1
+
+
+class TestUpdateFromResponse:
+    """响应头同步配额"""
+
+    async def test_remaining_zero_blocks_until_reset(self):
+        scheduler = GitHubScheduler(authenticated=True)
+        scheduler.update_from_response(
+            "core",
+            200,
+            {"x-ratelimit-remaining": "0", "x-ratelimit-reset": str(int(time.time()) + 30)},
+        )
+
+        assert scheduler.get_stats()["core"]["blocked_for"] > 25
+        with pytest.raises(GitHubRateLimitError):
+            await scheduler.acquire("core", max_wait=1)
+
+    def test_remaining_caps_tokens(self):
+        scheduler = GitHubScheduler(authenticated=True)
+        scheduler.update_from_response("core", 200, {"x-ratelimit-remaining": "3"})
+
+        stats = scheduler.get_stats()["core"]
+        assert stats["remaining"] == 3
+        assert stats["tokens"] <= 3
+
+    def test_retry_after_pauses_resource(self):
+        scheduler = GitHubScheduler(authenticated=True)
+        with pytest.raises(GitHubRateLimitError) as exc_info:
+            scheduler.update_from_response(
+                "search", 403, {"retry-after": "20", "x-ratelimit-resource": "search"}
+            )
+
+        assert exc_info.value.resource == "search"
+        assert 19 < exc_info.value.retry_after <= 20
+        assert scheduler.get_stats()["search"]["throttled"] == 1
+
+    @pytest.mark.parametrize(
+        "status, body",
+        [(403, b'{"message": "You have exceeded a secondary rate limit."}'), (429, b"")],
+    )
+    def test_secondary_limit_without_retry_after(self, status, body):
+        scheduler = GitHubScheduler(authenticated=True)
+        with pytest.raises(GitHubRateLimitError) as exc_info:
+            scheduler.update_from_response(
+                "core", status, {"x-ratelimit-remaining": "4000"}, body
+            )
+
+        assert exc_info.value.retry_after > SECONDARY_LIMIT_PAUSE - 1
+        assert scheduler.get_stats()["core"]["blocked_for"] > SECONDARY_LIMIT_PAUSE - 1
+
+    def test_forbidden_is_not_rate_limit(self):
+        scheduler = GitHubScheduler(authenticated=True)
+        body = b'{"message": "Resource not accessible by integration"}'
+        scheduler.update_from_response("core", 403, {"x-ratelimit-remaining": "4000"}, body)
+
+        assert scheduler.get_stats()["core"]["blocked_for"] == 0
+
+
+def test_new_event_loop_gets_new_dispatcher():
+    scheduler = _drained(rate=1 / 3600)
+    old_loop = asyncio.new_event_loop()
+    old_loop.create_task(scheduler.acquire("core", max_wait=60))
+    old_loop.run_until_complete(asyncio.sleep(0.01))
+    # 旧循环停止时仍有排队请求和未结束的 dispatcher
+    old_loop.close()
+
+    bucket = scheduler._buckets["core"]
+    bucket.refill_rate = 1000.0
+
+    async def acquire() -> None:
+        await scheduler.acquire("core", max_wait=1)
+
+    asyncio.run(acquire())
+    assert bucket.granted == 1
+
+
+def test_scheduler_follows_authentication(monkeypatch):
+    monkeypatch.setattr(github_ratelimit, "_scheduler", None)
+
+    anonymous = github_ratelimit.get_github_scheduler(authenticated=False)
+    assert github_ratelimit.get_github_scheduler(authenticated=False) is anonymous
+
+    authenticated = github_ratelimit.get_github_scheduler(authenticated=True)
+    assert authenticated is not anonymous
+    assert github_ratelimit.get_github_ratelimit_stats()["authenticated"] is True
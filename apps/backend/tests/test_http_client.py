@@ -0,0 +1,53 @@
+"""共享 HTTP 客户端测试"""
+
+import asyncio
+
+from workflows.graphs.resume_enhancer.tools._internal import http_client
+
+
+async def _get_session():
+    return http_client.get_session()
+
+
+class TestGetSession:
+    """ClientSession 按事件循环复用"""
+
+    def test_reuses_session_within_loop(self):
+        async def run():
+            try:
+                return http_client.get_session() is http_client.get_session()
+            finally:
+                await http_client.close_http_client()
+
+        assert asyncio.run(run())
+
+    def test_closes_session_of_finished_loop(self):
+        old = asyncio.run(_get_session())
+        connector = old.connector
+
+        async def run():
+            try:
+                return http_client.get_session()
+            finally:
+                await http_client.close_http_client()
+
+        new = asyncio.run(run())
+        assert new is not old
+        assert old.closed
+        assert connector.closed
+
+    def test_closes_session_of_stopped_loop(self):
+        loop = asyncio.new_event_loop()
+        try:
+            old = loop.run_until_complete(_get_session())
+            connector = old.connector
+
+            async def run():
+                http_client.get_session()
+                await http_client.close_http_client()
+
+            asyncio.run(run())
+            assert old.closed
+            assert connector.closed
+        finally:
+            loop.close()
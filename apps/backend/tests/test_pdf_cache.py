@@ -0,0 +1,72 @@
+"""PDF 解析结果缓存测试"""
+
+from api.pdf_cache import PdfParseCache, make_cache_key
+
+
+def _result(markdown: str, pages: int = 1) -> dict:
+    return {"markdown": markdown, "pages": pages}
+
+
+class TestMakeCacheKey:
+    """缓存 key：内容哈希 + 提示词版本"""
+
+    def test_same_content_same_key(self):
+        assert make_cache_key(b"%PDF-1", "v1") == make_cache_key(b"%PDF-1", "v1")
+        assert make_cache_key(b"%PDF-1", "v1") != make_cache_key(b"%PDF-2", "v1")
+
+    def test_prompt_version_changes_key(self):
+        assert make_cache_key(b"%PDF-1", "v1") != make_cache_key(b"%PDF-1", "v2")
+
+
+class TestPdfParseCache:
+    """SQLite 缓存读写与淘汰"""
+
+    async def test_hit_and_miss(self, tmp_path):
+        cache = PdfParseCache(db_path=str(tmp_path / "pdf.db"))
+        assert await cache.get("k") is None
+
+        await cache.put("k", _result("# 简历", pages=2))
+        assert await cache.get("k") == _result("# 简历", pages=2)
+
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
+        cache.close()
+
+    async def test_old_prompt_version_misses(self, tmp_path):
+        cache = PdfParseCache(db_path=str(tmp_path / "pdf.db"))
+        await cache.put(make_cache_key(b"%PDF", "v1"), _result("旧版本"))
+
+        assert await cache.get(make_cache_key(b"%PDF", "v2")) is None
+        assert await cache.get(make_cache_key(b"%PDF", "v1")) == _result("旧版本")
+        cache.close()
+
+    async def test_evicts_least_recently_used_by_size(self, tmp_path):
+        # markdown 按 UTF-8 字节计，每条 4 字节，上限可容纳 2 条
+        cache = PdfParseCache(db_path=str(tmp_path / "pdf.db"), max_bytes=8)
+        await cache.put("a", _result("aaaa"))
+        await cache.put("b", _result("bbbb"))
+        assert await cache.get("a") is not None
+        await cache.put("c", _result("cccc"))
+
+        assert await cache.get("b") is None
+        assert await cache.get("a") is not None
+        assert await cache.get("c") is not None
+        assert cache.get_stats()["evictions"] == 1
+        cache.close()
+
+    async def test_persists_across_instances(self, tmp_path):
+        db_path = str(tmp_path / "pdf.db")
+        cache = PdfParseCache(db_path=db_path)
+        await cache.put("k", _result("# 简历"))
+        cache.close()
+
+        reopened = PdfParseCache(db_path=db_path)
+        assert await reopened.get("k") == _result("# 简历")
+        reopened.close()
+
+    async def test_disabled_without_path(self):
+        cache = PdfParseCache(db_path=None)
+        await cache.put("k", _result("# 简历"))
+
+        assert await cache.get("k") is None
+        assert cache.get_stats()["enabled"] is False
@@ -0,0 +1,207 @@
+"""PDF 解析进程池测试"""
+
+import asyncio
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from api import pdf_parser
+
+
+def _echo(value: int) -> int:
+    return value
+
+
+def _sleep(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+def _crash() -> None:
+    os._exit(1)
+
+
+def _crash_once(marker: str) -> str:
+    """第一次执行时让工作进程崩溃，之后正常返回"""
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    return "ok"
+
+
+async def _until(predicate, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "等待超时"
+        await asyncio.sleep(0.02)
+
+
+@pytest.fixture
+async def executor(monkeypatch):
+    monkeypatch.setattr(pdf_parser, "PDF_WORKERS", 1)
+    monkeypatch.setattr(pdf_parser, "PDF_MAX_PENDING", 2)
+    monkeypatch.setattr(pdf_parser, "PDF_EXTRACT_TIMEOUT", 0.5)
+    monkeypatch.setattr(pdf_parser, "close_pdf_cache", lambda: None)
+    monkeypatch.setattr(pdf_parser, "_pending", 0)
+    async with pdf_parser.open_pdf_executor():
+        yield
+
+
+class TestRunJob:
+    """进程池名额与故障恢复"""
+
+    async def test_runs_job(self, executor):
+        assert await pdf_parser._run_job(_echo, 3) == 3
+        await _until(lambda: pdf_parser._pending == 0)
+
+    async def test_rejects_when_full(self, executor, monkeypatch):
+        monkeypatch.setattr(pdf_parser, "_pending", pdf_parser.PDF_MAX_PENDING)
+        with pytest.raises(pdf_parser.PdfParserBusyError):
+            await pdf_parser._run_job(_echo, 1)
+
+    async def test_broken_pool_on_submit_is_rebuilt(self, executor, monkeypatch):
+        broken = pdf_parser._pool
+
+        def submit(*args, **kwargs):
+            raise BrokenProcessPool("broken")
+
+        monkeypatch.setattr(broken.executor, "submit", submit)
+        assert await pdf_parser._run_job(_echo, 5) == 5
+        assert pdf_parser._pool is not broken
+        await _until(lambda: pdf_parser._pending == 0)
+
+    async def test_worker_crash_retries_on_new_pool(self, executor, tmp_path):
+        crashed = pdf_parser._pool
+        restarts = pdf_parser._restarts
+
+        assert await pdf_parser._run_job(_crash_once, str(tmp_path / "marker")) == "ok"
+        assert pdf_parser._pool is not crashed
+        assert pdf_parser._restarts == restarts + 1
+        await _until(lambda: pdf_parser._pending == 0)
+
+    async def test_repeated_crash_is_raised(self, executor):
+        crashed = pdf_parser._pool
+        restarts = pdf_parser._restarts
+
+        with pytest.raises(BrokenProcessPool):
+            await pdf_parser._run_job(_crash)
+        # 重试只有一次，每次崩溃都重建进程池
+        assert pdf_parser._pool is not crashed
+        assert pdf_parser._restarts == restarts + 2
+        await _until(lambda: pdf_parser._pending == 0)
+        assert await pdf_parser._run_job(_echo, 7) == 7
+
+    async def test_hung_job_releases_slot(self, executor):
+        hung_pool = pdf_parser._pool
+        with pytest.raises(pdf_parser.PdfExtractTimeoutError):
+            await pdf_parser._run_job(_sleep, 30)
+        assert pdf_parser._pool is not hung_pool
+        # 卡住的工作进程被结束后名额释放
+        await _until(lambda: pdf_parser._pending == 0)
+        assert await pdf_parser._run_job(_echo, 9) == 9
+
+    async def test_hung_pool_waits_for_other_jobs(self, executor, monkeypatch):
+        monkeypatch.setattr(pdf_parser, "PDF_WORKERS", 2)
+        monkeypatch.setattr(pdf_parser, "PDF_EXTRACT_TIMEOUT", 2.0)
+        pdf_parser._replace_pool(pdf_parser._pool, "测试")
+
+        slow = asyncio.create_task(pdf_parser._run_job(_sleep, 0.8))
+        await asyncio.sleep(0.1)
+        monkeypatch.setattr(pdf_parser, "PDF_EXTRACT_TIMEOUT", 0.3)
+        with pytest.raises(pdf_parser.PdfExtractTimeoutError):
+            await pdf_parser._run_job(_sleep, 30)
+
+        # 同一进程池中未超时的任务正常完成，之后卡住的工作进程被结束
+        assert await slow == 0.8
+        await _until(lambda: pdf_parser._pending == 0)
+
+
+
+class FakeParse:
+    """替代文本提取和 LLM 整理：提取卡住直到 gate 放行，缓存写入内存"""
+
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.extracts: list[bytes] = []
+        self.cached: dict[str, dict] = {}
+
+    async def run_extract(self, content: bytes) -> tuple[str, int]:
+        self.extracts.append(content)
+        await self.gate.wait()
+        return "raw", 2
+
+    async def restructure_markdown(self, raw_text: str) -> str:
+        return f"# {raw_text}"
+
+    async def get(self, key: str) -> dict | None:
+        return self.cached.get(key)
+
+    async def put(self, key: str, result: dict) -> None:
+        self.cached[key] = result
+
+
+@pytest.fixture
+def fake_parse(monkeypatch) -> FakeParse:
+    fake = FakeParse()
+    monkeypatch.setattr(pdf_parser, "run_extract", fake.run_extract)
+    monkeypatch.setattr(pdf_parser, "restructure_markdown", fake.restructure_markdown)
+    monkeypatch.setattr(pdf_parser, "get_pdf_cache", lambda: fake)
+    return fake
+
+
+class TestParsePdfBytes:
+    """同一文件的并发请求共享解析任务"""
+
+    async def test_concurrent_requests_parse_once(self, fake_parse):
+        first = asyncio.create_task(pdf_parser.parse_pdf_bytes(b"%PDF"))
+        second = asyncio.create_task(pdf_parser.parse_pdf_bytes(b"%PDF"))
+        await asyncio.sleep(0.01)
+        fake_parse.gate.set()
+
+        assert await first == await second == {"markdown": "# raw", "pages": 2}
+        assert fake_parse.extracts == [b"%PDF"]
+        assert pdf_parser._inflight == {}
+
+        # 之后的请求命中缓存
+        assert await pdf_parser.parse_pdf_bytes(b"%PDF") == {"markdown": "# raw", "pages": 2}
+        assert fake_parse.extracts == [b"%PDF"]
+
+    async def test_cancelled_first_request_does_not_break_others(self, fake_parse):
+        first = asyncio.create_task(pdf_parser.parse_pdf_bytes(b"%PDF"))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(pdf_parser.parse_pdf_bytes(b"%PDF"))
+        await asyncio.sleep(0.01)
+
+        first.cancel()
+        await asyncio.sleep(0.01)
+        fake_parse.gate.set()
+
+        assert await second == {"markdown": "# raw", "pages": 2}
+        assert first.cancelled()
+        assert fake_parse.extracts == [b"%PDF"]
+
+    async def test_parse_finishes_after_all_requests_cancelled(self, fake_parse):
+        request = asyncio.create_task(pdf_parser.parse_pdf_bytes(b"%PDF"))
+        await asyncio.sleep(0.01)
+        request.cancel()
+        fake_parse.gate.set()
+        await _until(lambda: not pdf_parser._inflight)
+
+        assert list(fake_parse.cached.values()) == [{"markdown": "# raw", "pages": 2}]
+
+    async def test_failure_is_shared_and_not_cached(self, fake_parse, monkeypatch):
+        async def run_extract(content: bytes) -> tuple[str, int]:
+            await fake_parse.gate.wait()
+            raise pdf_parser.PdfExtractTimeoutError("超时")
+
+        monkeypatch.setattr(pdf_parser, "run_extract", run_extract)
+        requests = [asyncio.create_task(pdf_parser.parse_pdf_bytes(b"%PDF")) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        fake_parse.gate.set()
+
+        results = await asyncio.gather(*requests, return_exceptions=True)
+        assert all(isinstance(r, pdf_parser.PdfExtractTimeoutError) for r in results)
+        assert fake_parse.cached == {}
+        assert pdf_parser._inflight == {}
@@ -0,0 +1,222 @@
+"""Redis 事件缓冲区与 Run 注册表测试（fakeredis）"""
+
+import asyncio
+from uuid import uuid4
+
+import pytest
+
+from infrastructure.langgraph_server import buffer_redis, registry
+from infrastructure.langgraph_server.buffer_redis import RedisEventBuffer
+from infrastructure.langgraph_server.registry import RedisRunRegistry
+from infrastructure.langgraph_server.schemas import SSEEvent
+from infrastructure.langgraph_server.types import ActiveRun, RunStatus
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def redis_server(monkeypatch):
+    """所有客户端共享同一个 fakeredis 实例（模拟多个 worker 连接同一 Redis）"""
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        buffer_redis,
+        "create_redis_client",
+        lambda url: fakeredis.FakeAsyncRedis(server=server),
+    )
+    monkeypatch.setattr(buffer_redis, "_XREAD_BLOCK_MS", 50)
+    return server
+
+
+@pytest.fixture
+async def buffer(redis_server):
+    buffer = RedisEventBuffer("redis://fake")
+    await buffer.start()
+    yield buffer
+    await buffer.stop()
+
+
+async def _collect(buffer: RedisEventBuffer, run_id: str, last_event_id: int | None = None):
+    return [event async for event in buffer.subscribe(run_id, last_event_id)]
+
+
+class TestRedisEventBuffer:
+    """Stream 写入、重放与订阅"""
+
+    async def test_put_assigns_sequence(self, buffer):
+        events = [
+            await buffer.put("r1", SSEEvent(event="metadata", data={"run_id": "r1"})),
+            await buffer.put("r1", SSEEvent(event="values", data={"n": 1})),
+        ]
+
+        assert [e.id for e in events] == ["0", "1"]
+        assert [e.id for e in await buffer.get_events("r1")] == ["0", "1"]
+        assert [e.data for e in await buffer.get_events("r1", last_event_id=0)] == [{"n": 1}]
+
+    async def test_subscribe_receives_live_events(self, buffer):
+        await buffer.put("r1", SSEEvent(event="metadata", data={}))
+        task = asyncio.create_task(_collect(buffer, "r1"))
+        await asyncio.sleep(0.01)
+
+        await buffer.put("r1", SSEEvent(event="values", data={"n": 1}))
+        await buffer.put("r1", SSEEvent(event="end", data=None))
+        events = await asyncio.wait_for(task, timeout=1)
+
+        assert [e.event for e in events] == ["metadata", "values", "end"]
+        assert not await buffer.is_active("r1")
+
+    async def test_resume_from_last_event_id(self, buffer):
+        for n in range(3):
+            await buffer.put("r1", SSEEvent(event="values", data={"n": n}))
+        await buffer.put("r1", SSEEvent(event="end", data=None))
+
+        events = await _collect(buffer, "r1", last_event_id=1)
+        assert [e.id for e in events] == ["2", "3"]
+
+    async def test_finish_ends_subscription(self, buffer):
+        await buffer.put("r1", SSEEvent(event="metadata", data={}))
+        task = asyncio.create_task(_collect(buffer, "r1"))
+        await asyncio.sleep(0.01)
+
+        await buffer.finish("r1")
+        events = await asyncio.wait_for(task, timeout=1)
+        assert [e.event for e in events] == ["metadata"]
+
+    async def test_events_written_before_finish_are_delivered(self, buffer, monkeypatch):
+        await buffer.put("r1", SSEEvent(event="metadata", data={}))
+        reads = 0
+        xread = buffer._redis.xread
+
+        async def racing_xread(*args, **kwargs):
+            # 第一次阻塞读超时后、检查 is_active 前，Run 写入最后一个事件并结束
+            nonlocal reads
+            reads += 1
+            if reads == 1:
+                await buffer.put("r1", SSEEvent(event="values", data={"n": 1}))
+                await buffer.finish("r1")
+                return []
+            return await xread(*args, **kwargs)
+
+        monkeypatch.setattr(buffer._redis, "xread", racing_xread)
+        events = await asyncio.wait_for(_collect(buffer, "r1"), timeout=1)
+
+        assert [e.event for e in events] == ["metadata", "values"]
+
+    async def test_opened_run_waits_for_first_event(self, buffer):
+        await buffer.open("queued")
+        assert await buffer.is_active("queued")
+        assert await buffer.has_run("queued")
+
+        task = asyncio.create_task(_collect(buffer, "queued"))
+        # 多次 XREAD 超时后仍在等待
+        await asyncio.sleep(0.2)
+        assert not task.done()
+
+        await buffer.put("queued", SSEEvent(event="metadata", data={}))
+        await buffer.put("queued", SSEEvent(event="end", data=None))
+        events = await asyncio.wait_for(task, timeout=1)
+        assert [e.event for e in events] == ["metadata", "end"]
+
+    async def test_unknown_run_returns_immediately(self, buffer):
+        assert await asyncio.wait_for(_collect(buffer, "missing"), timeout=1) == []
+
+    async def test_clear_run(self, buffer):
+        await buffer.open("r1")
+        await buffer.put("r1", SSEEvent(event="metadata", data={}))
+        await buffer.clear_run("r1")
+
+        assert not await buffer.has_run("r1")
+        assert await buffer.get_events("r1") == []
+
+
+def _active_run(thread_id: str) -> ActiveRun:
+    return ActiveRun(
+        run_id=uuid4(),
+        thread_id=thread_id,
+        assistant_id="agent",
+        status=RunStatus.RUNNING,
+        task=asyncio.current_task(),  # type: ignore[arg-type]
+    )
+
+
+class CancelRecorder:
+    """记录本 worker 收到的取消请求"""
+
+    def __init__(self):
+        self.calls: list[tuple[str, str]] = []
+        self.received = asyncio.Event()
+
+    async def __call__(self, thread_id: str, run_id: str) -> bool:
+        self.calls.append((thread_id, run_id))
+        self.received.set()
+        return True
+
+
+class TestRedisRunRegistry:
+    """跨 worker 查询与取消"""
+
+    async def test_cancel_from_other_worker(self, redis_server):
+        owner, other = RedisRunRegistry("redis://fake"), RedisRunRegistry("redis://fake")
+        on_cancel = CancelRecorder()
+        await owner.start(on_cancel)
+        await other.start(CancelRecorder())
+        try:
+            run = _active_run("t1")
+            await owner.register(run)
+            remote = await other.get_run("t1")
+            assert remote is not None and remote["run_id"] == str(run.run_id)
+
+            # 等订阅建立后再发布取消请求
+            await asyncio.sleep(0.05)
+            assert await other.request_cancel("t1", str(run.run_id))
+            await asyncio.wait_for(on_cancel.received.wait(), timeout=1)
+
+            assert on_cancel.calls == [("t1", str(run.run_id))]
+            assert owner.get_stats()["remote_cancels"] == 1
+            assert not await other.request_cancel("t1", "other-run")
+
+            # worker 停止时注销其 Run
+            await owner.stop()
+            assert await other.get_run("t1") is None
+        finally:
+            await owner.stop()
+            await other.stop()
+
+    async def test_listener_reconnects_after_failure(self, redis_server, monkeypatch):
+        monkeypatch.setattr(registry, "_RECONNECT_MIN_DELAY", 0.01)
+        owner, other = RedisRunRegistry("redis://fake"), RedisRunRegistry("redis://fake")
+        on_cancel = CancelRecorder()
+
+        await owner.start(on_cancel)
+        await other.start(CancelRecorder())
+        try:
+            # 第一次订阅在连接断开时失败，之后重连成功
+            pubsub = owner._redis.pubsub
+            attempts = 0
+
+            def flaky_pubsub():
+                nonlocal attempts
+                attempts += 1
+                ps = pubsub()
+                if attempts == 1:
+
+                    async def broken_listen():
+                        raise ConnectionError("connection reset")
+                        yield
+
+                    ps.listen = broken_listen
+                return ps
+
+            monkeypatch.setattr(owner._redis, "pubsub", flaky_pubsub)
+            owner._tasks[0].cancel()
+            owner._tasks[0] = asyncio.create_task(owner._listen_cancel())
+
+            run = _active_run("t1")
+            await owner.register(run)
+            await asyncio.sleep(0.1)
+            assert attempts >= 2
+
+            assert await other.request_cancel("t1", str(run.run_id))
+            await asyncio.wait_for(on_cancel.received.wait(), timeout=1)
+        finally:
+            await owner.stop()
+            await other.stop()
@@ -0,0 +1,346 @@
+"""RunStore 测试"""
+
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Any
+import asyncio
+
+import pytest
+
+from infrastructure.langgraph_server.run_store import MemoryRunStore, PostgresRunStore
+
+
+def _snapshot(
+    run_id: str,
+    thread_id: str = "t1",
+    status: str = "pending",
+    created_at: str = "2026-01-01T00:00:00+00:00",
+) -> dict[str, Any]:
+    return {
+        "run_id": run_id,
+        "thread_id": thread_id,
+        "assistant_id": "graph",
+        "status": status,
+        "created_at": created_at,
+        "updated_at": created_at,
+        "started_at": None,
+        "ended_at": None,
+        "metadata": {},
+        "error_message": None,
+        "usage": None,
+    }
+
+
+class FakeCursor:
+    def __init__(self, pool: "FakePool", rows: list[dict[str, Any]] | None = None):
+        self._pool = pool
+        self._rows = rows or []
+
+    async def __aenter__(self) -> "FakeCursor":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        return None
+
+    async def executemany(self, query: str, params: list[tuple[Any, ...]]) -> None:
+        if self._pool.gate is not None:
+            gate, self._pool.gate = self._pool.gate, None
+            await gate.wait()
+        if self._pool.fail is not None:
+            raise self._pool.fail
+        self._pool.writes.append(list(params))
+
+    async def fetchall(self) -> list[dict[str, Any]]:
+        return self._rows
+
+    async def fetchone(self) -> dict[str, Any] | None:
+        return self._rows[0] if self._rows else None
+
+
+class FakeConnection:
+    def __init__(self, pool: "FakePool"):
+        self._pool = pool
+
+    def cursor(self) -> FakeCursor:
+        return FakeCursor(self._pool)
+
+    async def execute(self, query: str, params: Any = None) -> FakeCursor:
+        self._pool.queries.append((" ".join(query.split()), params))
+        return FakeCursor(self._pool, self._pool.rows)
+
+
+class FakePool:
+    """模拟 psycopg_pool.AsyncConnectionPool：记录批量写入和查询"""
+
+    def __init__(self):
+        self.writes: list[list[tuple[Any, ...]]] = []
+        self.queries: list[tuple[str, Any]] = []
+        self.rows: list[dict[str, Any]] = []
+        self.fail: Exception | None = None
+        self.gate: asyncio.Event | None = None  # 下一次写入等待放行
+        self.closed = False
+
+    @asynccontextmanager
+    async def connection(self):
+        yield FakeConnection(self)
+
+    async def close(self) -> None:
+        self.closed = True
+
+    def written_ids(self) -> list[list[str]]:
+        return [[params[0] for params in batch] for batch in self.writes]
+
+
+def _postgres_store(**kwargs: Any) -> tuple[PostgresRunStore, FakePool]:
+    pool = FakePool()
+    return PostgresRunStore("postgresql://unused", pool=pool, **kwargs), pool
+
+
+class TestMemoryRunStore:
+    """进程内存存储"""
+
+    async def test_lists_newest_first_with_filter_and_paging(self):
+        store = MemoryRunStore()
+        for i, status in enumerate(["success", "error", "success", "success"]):
+            created_at = f"2026-01-0{i + 1}T00:00:00+00:00"
+            store.record(_snapshot(f"r{i}", status=status, created_at=created_at))
+
+        assert [r["run_id"] for r in await store.list_runs("t1")] == ["r3", "r2", "r1", "r0"]
+        assert [r["run_id"] for r in await store.list_runs("t1", status="success")] == [
+            "r3",
+            "r2",
+            "r0",
+        ]
+        assert [r["run_id"] for r in await store.list_runs("t1", limit=2, offset=1)] == [
+            "r2",
+            "r1",
+        ]
+        assert await store.list_runs("other") == []
+
+    async def test_record_overwrites_same_run(self):
+        store = MemoryRunStore()
+        store.record(_snapshot("r1"))
+        store.record(_snapshot("r1", status="success"))
+
+        run = await store.get_run("t1", "r1")
+        assert run is not None and run["status"] == "success"
+        assert store.get_stats()["runs"] == 1
+
+    async def test_keeps_latest_runs_per_thread(self):
+        store = MemoryRunStore(max_runs_per_thread=2)
+        for run_id in ["r1", "r2", "r3"]:
+            store.record(_snapshot(run_id))
+        # 更新已有 Run 不淘汰其他 Run
+        store.record(_snapshot("r2", status="success"))
+
+        assert await store.get_run("t1", "r1") is None
+        assert {r["run_id"] for r in await store.list_runs("t1")} == {"r2", "r3"}
+
+    async def test_evicts_least_recently_written_thread(self):
+        store = MemoryRunStore(max_threads=2)
+        store.record(_snapshot("r1", thread_id="t1"))
+        store.record(_snapshot("r2", thread_id="t2"))
+        store.record(_snapshot("r3", thread_id="t1"))
+        store.record(_snapshot("r4", thread_id="t3"))
+
+        assert await store.list_runs("t2") == []
+        assert len(await store.list_runs("t1")) == 2
+        assert store.get_stats()["threads"] == 2
+
+    async def test_delete_thread(self):
+        store = MemoryRunStore()
+        store.record(_snapshot("r1", thread_id="t1"))
+        store.record(_snapshot("r2", thread_id="t2"))
+
+        await store.delete_thread("t1")
+        assert await store.list_runs("t1") == []
+        assert await store.get_run("t2", "r2") is not None
+
+
+class TestPostgresRunStoreWrites:
+    """待写队列与批量写入"""
+
+    async def test_coalesces_updates_of_same_run(self):
+        store, pool = _postgres_store()
+        for status in ["pending", "running", "success"]:
+            store.record(_snapshot("r1", status=status))
+
+        await store._flush()
+        assert pool.written_ids() == [["r1"]]
+        assert pool.writes[0][0][3] == "success"
+
+    async def test_writes_in_batches(self):
+        store, pool = _postgres_store(batch_size=2)
+        for i in range(5):
+            store.record(_snapshot(f"r{i}"))
+
+        await store._flush()
+        assert pool.written_ids() == [["r0", "r1"], ["r2", "r3"], ["r4"]]
+        stats = store.get_stats()
+        assert stats["written"] == 5
+        assert stats["batches"] == 3
+        assert stats["pending"] == 0
+
+    async def test_failed_batch_is_retried(self):
+        store, pool = _postgres_store()
+        store.record(_snapshot("r1"))
+        pool.fail = OSError("connection refused")
+
+        await store._flush()
+        assert store.get_stats()["errors"] == 1
+        assert store.get_stats()["pending"] == 1
+
+        pool.fail = None
+        await store._flush()
+        assert pool.written_ids() == [["r1"]]
+
+    async def test_requeue_keeps_newer_snapshot(self):
+        store, pool = _postgres_store()
+        store.record(_snapshot("r1", status="running"))
+        gate = pool.gate = asyncio.Event()
+        pool.fail = OSError("connection reset")
+        flush = asyncio.create_task(store._flush())
+        await asyncio.sleep(0)
+
+        # 写入期间产生的新快照不被失败批次覆盖
+        store.record(_snapshot("r1", status="success"))
+        gate.set()
+        await flush
+
+        pool.fail = None
+        await store._flush()
+        assert pool.writes[0][0][3] == "success"
+
+    async def test_drops_oldest_when_pending_full(self):
+        store, _ = _postgres_store(max_pending=2)
+        for run_id in ["r1", "r2", "r3"]:
+            store.record(_snapshot(run_id))
+        store.record(_snapshot("r3", status="success"))
+
+        assert list(store._pending) == ["r2", "r3"]
+        assert store.get_stats()["dropped"] == 1
+
+    async def test_full_batch_wakes_flush_loop(self):
+        store, pool = _postgres_store(batch_size=2, flush_interval=60)
+        store._flush_task = asyncio.create_task(store._flush_loop())
+        store.record(_snapshot("r1"))
+        await asyncio.sleep(0.01)
+        assert pool.writes == []
+
+        store.record(_snapshot("r2"))
+        await asyncio.sleep(0.01)
+        assert pool.written_ids() == [["r1", "r2"]]
+        await store.stop()
+
+    async def test_flush_loop_writes_on_interval(self):
+        store, pool = _postgres_store(flush_interval=0.01)
+        store._flush_task = asyncio.create_task(store._flush_loop())
+        store.record(_snapshot("r1"))
+
+        await asyncio.sleep(0.05)
+        assert pool.written_ids() == [["r1"]]
+        await store.stop()
+
+    async def test_stop_writes_batch_interrupted_by_cancel(self):
+        store, pool = _postgres_store(batch_size=1, flush_interval=60)
+        pool.gate = asyncio.Event()
+        store._flush_task = asyncio.create_task(store._flush_loop())
+        store.record(_snapshot("r1"))
+        await asyncio.sleep(0.01)
+        assert store.get_stats()["pending"] == 0  # 已取出，正在写入
+
+        await store.stop()
+        assert pool.written_ids() == [["r1"]]
+        assert not pool.closed  # 注入的连接池由调用方关闭
+
+
+class TestPostgresRunStoreQueries:
+    """查询与删除"""
+
+    async def test_query_flushes_pending_runs_of_thread(self):
+        store, pool = _postgres_store()
+        store.record(_snapshot("r1", thread_id="t1"))
+
+        await store.get_run("t1", "r1")
+        assert pool.written_ids() == [["r1"]]
+
+        store.record(_snapshot("r2", thread_id="t2"))
+        await store.list_runs("t1")
+        assert pool.written_ids() == [["r1"]]
+        assert store.get_stats()["pending"] == 1
+
+    async def test_list_runs_builds_filtered_query(self):
+        store, pool = _postgres_store()
+        created = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        pool.rows = [
+            {
+                **_snapshot("r1", status="success"),
+                "created_at": created,
+                "updated_at": created,
+                "started_at": None,
+                "ended_at": created,
+            }
+        ]
+
+        runs = await store.list_runs("t1", status="success", limit=5, offset=10)
+        query, params = pool.queries[-1]
+        assert "AND status = %s" in query
+        assert "ORDER BY created_at DESC LIMIT %s OFFSET %s" in query
+        assert params == ["t1", "success", 5, 10]
+        assert runs[0]["created_at"] == created.isoformat()
+        assert runs[0]["started_at"] is None
+        assert runs[0]["ended_at"] == created.isoformat()
+
+    async def test_get_run_missing(self):
+        store, _ = _postgres_store()
+        assert await store.get_run("t1", "missing") is None
+
+    async def test_delete_thread_drops_pending_runs(self):
+        store, pool = _postgres_store()
+        store.record(_snapshot("r1", thread_id="t1"))
+        store.record(_snapshot("r2", thread_id="t2"))
+
+        await store.delete_thread("t1")
+        assert list(store._pending) == ["r2"]
+        assert pool.queries == [("DELETE FROM runs WHERE thread_id = %s", ("t1",))]
+
+        await store._flush()
+        assert pool.written_ids() == [["r2"]]
+
+    async def test_delete_thread_waits_for_inflight_batch(self):
+        store, pool = _postgres_store()
+        store.record(_snapshot("r1", thread_id="t1"))
+        gate = pool.gate = asyncio.Event()
+        flush = asyncio.create_task(store._flush())
+        await asyncio.sleep(0)
+
+        # 批次已取出正在写入：删除需等其写完，否则写入会在 DELETE 之后重新插入记录
+        delete = asyncio.create_task(store.delete_thread("t1"))
+        await asyncio.sleep(0.01)
+        assert pool.queries == []
+
+        gate.set()
+        await asyncio.gather(flush, delete)
+        assert pool.written_ids() == [["r1"]]
+        assert pool.queries == [("DELETE FROM runs WHERE thread_id = %s", ("t1",))]
+
+
+async def test_start_reuses_injected_pool():
+    store, pool = _postgres_store()
+    await store.start()
+    await store.stop()
+
+    assert pool.queries[0][0].startswith("CREATE TABLE IF NOT EXISTS runs")
+    assert not pool.closed
+
+
+@pytest.mark.parametrize("usage", [None, {"input_tokens": 1, "output_tokens": 2, "total_tokens": 3}])
+async def test_write_params_follow_column_order(usage):
+    store, pool = _postgres_store()
+    store.record({**_snapshot("r1"), "metadata": {"user_id": "u1"}, "usage": usage})
+
+    await store._flush()
+    params = pool.writes[0][0]
+    assert params[:4] == ("r1", "t1", "graph", "pending")
+    assert params[4].obj == {"user_id": "u1"}
+    assert (params[6].obj if params[6] is not None else None) == usage
@@ -0,0 +1,134 @@
+"""RunScheduler 测试"""
+
+import asyncio
+
+import pytest
+
+from infrastructure.langgraph_server.scheduler import RunScheduler, RunSchedulerFullError
+
+
+def _granted(tickets: list[asyncio.Future[None]]) -> list[bool]:
+    return [ticket.done() for ticket in tickets]
+
+
+class TestAdmission:
+    """准入与等待队列上限"""
+
+    async def test_grants_until_max_concurrent(self):
+        scheduler = RunScheduler(max_concurrent=2, max_waiting=5)
+        tickets = [scheduler.submit("u1") for _ in range(3)]
+
+        assert _granted(tickets) == [True, True, False]
+        stats = scheduler.get_stats()
+        assert stats["running"] == 2
+        assert stats["waiting"] == 1
+
+    async def test_rejects_when_waiting_queue_full(self):
+        scheduler = RunScheduler(max_concurrent=1, max_waiting=1)
+        scheduler.submit("u1")
+        scheduler.submit("u1")
+
+        with pytest.raises(RunSchedulerFullError) as exc_info:
+            scheduler.submit("u2")
+        assert exc_info.value.retry_after >= 1
+        assert scheduler.get_stats()["rejected"] == 1
+
+    async def test_force_ignores_waiting_limit(self):
+        scheduler = RunScheduler(max_concurrent=1, max_waiting=0)
+        scheduler.submit("u1")
+
+        ticket = scheduler.submit("u1", force=True)
+        assert not ticket.done()
+        assert scheduler.get_stats()["waiting"] == 1
+
+    async def test_check_matches_submit(self):
+        scheduler = RunScheduler(max_concurrent=1, max_waiting=1)
+        scheduler.check()
+        scheduler.submit("u1")
+        scheduler.check()
+        scheduler.submit("u1")
+
+        with pytest.raises(RunSchedulerFullError):
+            scheduler.check()
+        with pytest.raises(RunSchedulerFullError):
+            scheduler.submit("u1")
+
+    async def test_new_run_waits_behind_queue(self):
+        scheduler = RunScheduler(max_concurrent=1, max_waiting=5)
+        running = scheduler.submit("u1")
+        waiting = scheduler.submit("u1")
+        scheduler.release(running)
+
+        # 有空闲名额但队列中仍有等待者时，新 Run 同样排队
+        assert waiting.done()
+        assert not scheduler.submit("u2").done()
+
+
+class TestDispatch:
+    """放行顺序"""
+
+    async def test_release_admits_next(self):
+        scheduler = RunScheduler(max_concurrent=1, max_waiting=5)
+        first = scheduler.submit("u1")
+        second = scheduler.submit("u1")
+
+        scheduler.release(first)
+        assert second.done()
+        assert scheduler.get_stats()["running"] == 1
+
+    async def test_round_robin_between_users(self):
+        scheduler = RunScheduler(max_concurrent=1, max_waiting=10)
+        running = scheduler.submit("u1")
+        burst = [scheduler.submit("u1") for _ in range(3)]
+        other = scheduler.submit("u2")
+
+        scheduler.release(running)
+        assert _granted(burst + [other]) == [True, False, False, False]
+        scheduler.release(burst[0])
+        assert other.done()
+        assert not burst[1].done()
+
+    async def test_release_is_idempotent(self):
+        scheduler = RunScheduler(max_concurrent=1, max_waiting=5)
+        first = scheduler.submit("u1")
+        scheduler.release(first)
+        scheduler.release(first)
+
+        assert scheduler.get_stats()["running"] == 0
+
+
+class TestCancel:
+    """放弃 ticket"""
+
+    async def test_cancel_waiting_ticket(self):
+        scheduler = RunScheduler(max_concurrent=1, max_waiting=5)
+        running = scheduler.submit("u1")
+        waiting = scheduler.submit("u2")
+
+        scheduler.cancel(waiting)
+        stats = scheduler.get_stats()
+        assert stats["waiting"] == 0
+        assert stats["waiting_users"] == 0
+
+        scheduler.release(running)
+        assert scheduler.get_stats()["running"] == 0
+
+    async def test_cancel_granted_ticket_releases_slot(self):
+        scheduler = RunScheduler(max_concurrent=1, max_waiting=5)
+        running = scheduler.submit("u1")
+        waiting = scheduler.submit("u2")
+
+        scheduler.cancel(running)
+        assert waiting.done()
+        assert scheduler.get_stats()["running"] == 1
+
+    async def test_skips_abandoned_waiters(self):
+        scheduler = RunScheduler(max_concurrent=1, max_waiting=5)
+        running = scheduler.submit("u1")
+        abandoned = scheduler.submit("u2")
+        waiting = scheduler.submit("u3")
+        abandoned.cancel()
+
+        scheduler.release(running)
+        assert waiting.done() and not waiting.cancelled()
+        assert scheduler.get_stats()["running"] == 1
@@ -0,0 +1,75 @@
+"""相似项目搜索测试"""
+
+import asyncio
+import importlib
+
+import pytest
+
+# tools 包导出了同名函数，这里取模块本身
+module = importlib.import_module("workflows.graphs.resume_enhancer.tools.search_similar_projects")
+
+
+def _repo(name: str) -> dict:
+    return {
+        "full_name": name,
+        "description": "multi agent system built with langgraph and fastapi",
+        "topics": ["langgraph", "fastapi"],
+        "language": "Python",
+        "stargazers_count": 100,
+    }
+
+
+@pytest.fixture
+def fake_search(monkeypatch):
+    """第一个检索词最慢返回，两个检索词命中同一仓库"""
+    delays = {"q1": 0.05, "q2": 0.0}
+
+    async def search(query: str, max_results: int = 8) -> list[dict]:
+        await asyncio.sleep(delays[query])
+        return [_repo("acme/shared"), _repo(f"acme/{query}")]
+
+    monkeypatch.setattr(module, "_search_github_repos", search)
+
+
+class TestCollectCandidates:
+    """检索词结果的去重与归属"""
+
+    async def test_matched_query_follows_submission_order(self, fake_search):
+        candidates = await module._collect_candidates(
+            ["q1", "q2"],
+            ["LangGraph", "FastAPI"],
+            "基于 LangGraph 的多 Agent 系统",
+            8,
+        )
+
+        # q2 先返回，但共享仓库仍归属于提交顺序靠前的 q1
+        assert [(c["repo"]["full_name"], c["query"]) for c in candidates] == [
+            ("acme/shared", "q1"),
+            ("acme/q1", "q1"),
+            ("acme/q2", "q2"),
+        ]
+
+    async def test_concurrency_is_bounded(self, monkeypatch):
+        in_flight = 0
+        max_in_flight = 0
+
+        async def search(query: str, max_results: int = 8) -> list[dict]:
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return []
+
+        monkeypatch.setattr(module, "_search_github_repos", search)
+        monkeypatch.setattr(module, "README_FETCH_CONCURRENCY", 2)
+        await module._collect_candidates(["q1", "q2", "q3", "q4", "q5"], [], "", 8)
+        assert max_in_flight == 2
+
+    async def test_rate_limited_without_candidates_raises(self, monkeypatch):
+        async def search(query: str, max_results: int = 8) -> list[dict]:
+            raise module.GitHubRateLimitError("search", 30)
+
+        monkeypatch.setattr(module, "_search_github_repos", search)
+        with pytest.raises(module.GitHubRateLimitError):
+            await module._collect_candidates(["q1", "q2"], ["LangGraph"], "", 8)
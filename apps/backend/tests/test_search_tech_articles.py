@@ -0,0 +1,75 @@
+"""技术文章搜索测试"""
+
+import asyncio
+import importlib
+
+
+module = importlib.import_module("workflows.graphs.resume_enhancer.tools.search_tech_articles")
+
+
+def _source(delay: float, results: int = 1):
+    """先写入 results 条结果，再等待 delay 秒"""
+
+    async def search(keywords: list[str], max_results: int, sink: list[dict]) -> list[dict]:
+        sink.extend({"title": f"r{i}"} for i in range(results))
+        await asyncio.sleep(delay)
+        return sink
+
+    return search
+
+
+def test_source_budgets_are_shorter_than_deadline():
+    assert all(budget < module.SEARCH_DEADLINE for budget in module.SOURCE_BUDGETS.values())
+
+
+class TestGatherSources:
+    """全局截止时间与单来源预算"""
+
+    async def test_fast_sources_complete(self):
+        sinks, partial = await module._gather_sources(
+            [("A", "a", _source(0)), ("B", "b", _source(0, results=2))], ["x"], 5, deadline=1.0
+        )
+        assert partial == set()
+        assert len(sinks["A"]) == 1 and len(sinks["B"]) == 2
+
+    async def test_deadline_caps_source_budget(self, monkeypatch):
+        monkeypatch.setitem(module.SOURCE_BUDGETS, "Slow", 10.0)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        sinks, partial = await module._gather_sources(
+            [("Fast", "f", _source(0)), ("Slow", "s", _source(10.0))], ["x"], 5, deadline=0.1
+        )
+
+        assert loop.time() - started < 1.0
+        assert partial == {"Slow"}
+        # 超时来源已写入的结果保留
+        assert sinks["Slow"] == [{"title": "r0"}]
+
+    async def test_source_budget_shorter_than_deadline(self, monkeypatch):
+        monkeypatch.setitem(module.SOURCE_BUDGETS, "Slow", 0.05)
+        sinks, partial = await module._gather_sources(
+            [("Slow", "s", _source(10.0))], ["x"], 5, deadline=1.0
+        )
+        assert partial == {"Slow"}
+
+    async def test_failed_source_is_not_partial(self):
+        async def broken(keywords: list[str], max_results: int, sink: list[dict]) -> list[dict]:
+            raise RuntimeError("boom")
+
+        sinks, partial = await module._gather_sources([("Broken", "b", broken)], ["x"], 5)
+        assert partial == set()
+        assert sinks["Broken"] == []
+
+
+async def test_empty_partial_source_is_reported(monkeypatch):
+    async def gather(sources, keywords, max_results):
+        sinks = {name: [] for name, _, _ in sources}
+        sinks["DEV.to"] = [{"title": "a", "source": "DEV.to"}]
+        return sinks, {"DEV.to", "Reddit"}
+
+    monkeypatch.setattr(module, "_gather_sources", gather)
+    result = await module.search_tech_articles(["RAG"], language="en")
+
+    # Reddit 超时且没有结果，仍标记为 partial；HuggingFace 正常完成但无结果，不列出
+    assert "数据来源：DEV.to (partial), Reddit (partial)" in result["summary"]
@@ -0,0 +1,134 @@
+"""SSE 序列化测试"""
+
+import dataclasses
+import json
+from datetime import date, datetime, timezone
+from enum import Enum
+from uuid import UUID
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from pydantic import BaseModel
+
+from infrastructure.langgraph_server import serializer
+from infrastructure.langgraph_server.buffer import EventBuffer
+from infrastructure.langgraph_server.executor import GraphExecutor
+from infrastructure.langgraph_server.schemas import SSEEvent
+
+
+class Color(str, Enum):
+    RED = "red"
+
+
+@dataclasses.dataclass
+class Interrupt:
+    value: dict
+    created_at: datetime
+
+
+class Model(BaseModel):
+    name: str
+    tags: list[str]
+
+
+class Opaque:
+    def __init__(self) -> None:
+        self.x = 1
+
+
+CREATED_AT = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+PAYLOAD = {
+    "messages": [HumanMessage(content="你好", id="h1"), AIMessage(content="hi", id="a1")],
+    "created_at": CREATED_AT,
+    "day": date(2024, 1, 2),
+    "run_id": UUID("12345678-1234-5678-1234-567812345678"),
+    "color": Color.RED,
+    "interrupt": Interrupt(value={"question": "继续?"}, created_at=CREATED_AT),
+    "model": Model(name="m", tags=["a"]),
+    "opaque": Opaque(),
+    "counts": {1: "one"},
+    "nested": [{"ok": True, "none": None, "pi": 3.5}],
+}
+
+# 与原 _PydanticJSONEncoder 一致的编码结果（解码后比较）
+GOLDEN = {
+    "created_at": "2024-01-02 03:04:05+00:00",
+    "day": "2024-01-02",
+    "run_id": "12345678-1234-5678-1234-567812345678",
+    "color": "red",
+    "interrupt": {"value": {"question": "继续?"}, "created_at": "2024-01-02 03:04:05+00:00"},
+    "model": {"name": "m", "tags": ["a"]},
+    "opaque": {"x": 1},
+    "counts": {"1": "one"},
+    "nested": [{"ok": True, "none": None, "pi": 3.5}],
+}
+
+
+@pytest.fixture
+def stdlib_only(monkeypatch):
+    monkeypatch.setattr(serializer, "orjson", None)
+
+
+def _stdlib_dumps(data):
+    return json.dumps(data, ensure_ascii=False, default=serializer._default)
+
+
+@pytest.mark.skipif(serializer.orjson is None, reason="orjson 未安装")
+class TestOrjsonMatchesStdlib:
+    """orjson 路径与标准库路径的输出一致"""
+
+    def test_decoded_output_is_identical(self):
+        assert json.loads(serializer.dumps(PAYLOAD)) == json.loads(_stdlib_dumps(PAYLOAD))
+
+    def test_golden_values(self):
+        decoded = json.loads(serializer.dumps(PAYLOAD))
+        assert {key: decoded[key] for key in GOLDEN} == GOLDEN
+        assert [m["content"] for m in decoded["messages"]] == ["你好", "hi"]
+
+    def test_keeps_non_ascii(self):
+        assert "你好" in serializer.dumps({"text": "你好"})
+
+
+class TestStdlibPath:
+    """未安装 orjson 或 orjson 不支持的值"""
+
+    def test_golden_values(self, stdlib_only):
+        decoded = json.loads(serializer.dumps(PAYLOAD))
+        assert {key: decoded[key] for key in GOLDEN} == GOLDEN
+
+    def test_big_int_falls_back(self):
+        assert json.loads(serializer.dumps({"n": 2**70})) == {"n": 2**70}
+
+
+class TestEventEncoding:
+    """SSE 帧编码与缓存"""
+
+    def test_frame_layout(self):
+        event = SSEEvent(event="values", data={"a": 1}, id="3")
+        frame = serializer.encode_event_frame(event)
+        data = serializer.dumps({"a": 1})
+        assert frame == f"id: 3\r\nevent: values\r\ndata: {data}\r\n\r\n".encode()
+        assert serializer.encode_event_frame(event) is frame
+
+    def test_event_from_json_reuses_encoding(self):
+        event = serializer.event_from_json("values", b'{"a": 1}', id="0")
+        assert event.data == {"a": 1}
+        assert serializer.encode_event_data(event) == '{"a": 1}'
+
+    @pytest.mark.parametrize(
+        "chunk, stream_mode",
+        [
+            ((AIMessage(content="你好", id="a1"), {"langgraph_node": "agent"}), "messages"),
+            (("messages", (AIMessage(content="你好", id="a1"), {})), ["messages", "values"]),
+            ((("agent:1",), "messages", (AIMessage(content="你好", id="a1"), {})), ["messages"]),
+        ],
+    )
+    def test_messages_are_encoded_once(self, chunk, stream_mode):
+        # 消息对象原样进入事件，由 serializer 编码，结果与 model_dump 一致
+        event = GraphExecutor({}, EventBuffer())._chunk_to_event(chunk, stream_mode)
+        message, metadata = event.data
+        assert isinstance(message, AIMessage)
+
+        decoded = json.loads(serializer.encode_event_data(event))
+        assert decoded == [message.model_dump(), metadata]
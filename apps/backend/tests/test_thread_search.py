@@ -0,0 +1,214 @@
+"""Thread 搜索（PostgreSQL 批量查询）测试"""
+
+from types import SimpleNamespace
+from typing import Any
+import asyncio
+
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.types import Interrupt
+
+from infrastructure.langgraph_server.service import LangGraphService
+from infrastructure.langgraph_server.service import thread as thread_module
+
+SERDE = JsonPlusSerializer()
+
+
+class FakeCursor:
+    def __init__(self, rows: list[dict[str, Any]]):
+        self._rows = rows
+
+    async def fetchall(self) -> list[dict[str, Any]]:
+        return self._rows
+
+
+class FakeConnection:
+    """按调用顺序返回预置的结果集，并记录 SQL 参数"""
+
+    def __init__(self, *results: list[dict[str, Any]]):
+        self._results = list(results)
+        self.calls: list[tuple[str, dict[str, Any]]] = []
+
+    async def execute(self, query: str, params: dict[str, Any]) -> FakeCursor:
+        self.calls.append((query, params))
+        return FakeCursor(self._results.pop(0))
+
+
+def _checkpointer(conn: FakeConnection) -> SimpleNamespace:
+    """单连接 PostgresSaver（conn 没有 connection()，通过 lock 串行使用）"""
+    return SimpleNamespace(conn=conn, lock=asyncio.Lock(), serde=SERDE)
+
+
+def _service(conn: FakeConnection, **graphs: Any) -> LangGraphService:
+    graphs = graphs or {"resume": SimpleNamespace(checkpointer=None, stream_channels_list=None)}
+    service = LangGraphService(graphs)  # type: ignore[arg-type]
+    service._checkpointer = _checkpointer(conn)  # type: ignore[assignment]
+    return service
+
+
+def _thread_row(
+    thread_id: str,
+    checkpoint_id: str = "cp-1",
+    status: str = "idle",
+    metadata: dict[str, Any] | None = None,
+    inline_values: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    return {
+        "thread_id": thread_id,
+        "checkpoint_id": checkpoint_id,
+        "metadata": metadata,
+        "inline_values": inline_values,
+        "updated_at": "2026-01-02T00:00:00+00:00",
+        "created_at": "2026-01-01T00:00:00+00:00",
+        "status": status,
+    }
+
+
+def _blob(thread_id: str, kind: str, key: str, value: Any) -> dict[str, Any]:
+    type_, blob = SERDE.dumps_typed(value)
+    return {"thread_id": thread_id, "kind": kind, "key": key, "type": type_, "blob": blob}
+
+
+async def _search(service: LangGraphService, **kwargs: Any) -> list[dict[str, Any]]:
+    args: dict[str, Any] = {
+        "metadata": None,
+        "values": None,
+        "status": None,
+        "limit": 10,
+        "offset": 0,
+        "load_state": False,
+    }
+    args.update(kwargs)
+    return await service._search_threads_postgres(**args)
+
+
+class TestSearchQuery:
+    """第 1 条 SQL：状态、过滤、分页"""
+
+    async def test_maps_rows_without_loading_state(self):
+        conn = FakeConnection([_thread_row("t1", status="error", metadata={"user_id": "u1"})])
+        service = _service(conn)
+
+        threads = await _search(
+            service, metadata={"user_id": "u1"}, status="error", limit=5, offset=3
+        )
+
+        assert len(conn.calls) == 1
+        query, params = conn.calls[0]
+        assert query == thread_module._SEARCH_THREADS_SQL
+        assert params["metadata"].obj == {"user_id": "u1"}
+        assert params["status"] == "error"
+        assert (params["limit"], params["offset"]) == (5, 3)
+        assert threads == [
+            {
+                "thread_id": "t1",
+                "created_at": "2026-01-01T00:00:00+00:00",
+                "updated_at": "2026-01-02T00:00:00+00:00",
+                "metadata": {"user_id": "u1"},
+                "status": "error",
+                "values": None,
+                "interrupts": {},
+            }
+        ]
+
+    async def test_passes_local_active_threads_as_busy(self, monkeypatch):
+        conn = FakeConnection([])
+        service = _service(conn)
+        monkeypatch.setattr(service._executor, "active_thread_ids", lambda: ["t1", "t2"])
+
+        assert await _search(service, load_state=True) == []
+        assert conn.calls[0][1]["busy"] == ["t1", "t2"]
+        assert conn.calls[0][1]["metadata"].obj == {}
+        # 没有结果时不读取 channel 数据
+        assert len(conn.calls) == 1
+
+    async def test_values_filter_pages_after_filtering(self):
+        rows = [
+            _thread_row(f"t{i}", checkpoint_id=f"cp-{i}", inline_values={"stage": stage})
+            for i, stage in enumerate(["done", "draft", "done", "done", "done"])
+        ]
+        conn = FakeConnection(rows, [])
+        service = _service(conn)
+
+        threads = await _search(
+            service, values={"stage": "done"}, limit=2, offset=1, load_state=True
+        )
+
+        params = conn.calls[0][1]
+        assert (params["limit"], params["offset"]) == (103, 0)
+        assert [thread["thread_id"] for thread in threads] == ["t2", "t3"]
+        assert threads[0]["values"] == {"stage": "done"}
+
+
+class TestLoadThreadStates:
+    """第 2 条 SQL：channel 值和 interrupts"""
+
+    async def test_merges_inline_values_and_blobs(self):
+        rows = [
+            _thread_row("t1", checkpoint_id="cp-1", inline_values={"title": "简历"}),
+            _thread_row("t2", checkpoint_id="cp-9"),
+        ]
+        blobs = [
+            _blob("t1", "value", "sections", [{"name": "教育经历"}]),
+            {"thread_id": "t1", "kind": "value", "key": "draft", "type": "empty", "blob": None},
+            _blob("t2", "value", "title", "项目经历"),
+        ]
+        conn = FakeConnection(rows, blobs)
+        service = _service(conn)
+
+        threads = await _search(service, load_state=True)
+
+        query, params = conn.calls[1]
+        assert query == thread_module._THREAD_BLOBS_SQL
+        assert params == {"thread_ids": ["t1", "t2"], "checkpoint_ids": ["cp-1", "cp-9"]}
+        assert threads[0]["values"] == {"title": "简历", "sections": [{"name": "教育经历"}]}
+        assert threads[1]["values"] == {"title": "项目经历"}
+
+    async def test_groups_interrupts_by_task(self):
+        rows = [_thread_row("t1", status="interrupted")]
+        blobs = [
+            _blob("t1", "interrupt", "task-a", [Interrupt(value={"question": "确认?"}, id="i1")]),
+            _blob("t1", "interrupt", "task-a", [Interrupt(value="second", id="i2")]),
+            _blob("t1", "interrupt", "task-b", [Interrupt(value="other", id="i3")]),
+        ]
+        service = _service(FakeConnection(rows, blobs))
+
+        threads = await _search(service, load_state=True)
+
+        interrupts = threads[0]["interrupts"]
+        assert [item["value"] for item in interrupts["task-a"]] == [
+            {"question": "确认?"},
+            "second",
+        ]
+        assert [item["value"] for item in interrupts["task-b"]] == ["other"]
+        assert interrupts["task-a"][0] == {
+            "value": {"question": "确认?"},
+            "when": "during",
+            "resumable": True,
+            "ns": None,
+        }
+
+    async def test_keeps_output_channels_of_thread_graph(self):
+        rows = [
+            _thread_row(
+                "t1",
+                metadata={"assistant_id": "resume"},
+                inline_values={"title": "a", "branch:to:node": None},
+            ),
+            _thread_row(
+                "t2",
+                metadata={"assistant_id": "unknown"},
+                inline_values={"title": "b", "summary": "c"},
+            ),
+        ]
+        conn = FakeConnection(rows, [])
+        service = _service(
+            conn,
+            resume=SimpleNamespace(checkpointer=None, stream_channels_list=["title"]),
+            article=SimpleNamespace(checkpointer=None, stream_channels_list=["summary"]),
+        )
+
+        threads = await _search(service, load_state=True)
+
+        assert threads[0]["values"] == {"title": "a"}
+        # metadata 中的 assistant_id 不存在时使用第一个 graph
+        assert threads[1]["values"] == {"title": "b"}
@@ -0,0 +1,217 @@
+"""Thread State 投影、ETag 与增量测试"""
+
+from typing import Any
+
+from langchain_core.messages import AIMessage, HumanMessage
+from pydantic import BaseModel
+
+from infrastructure.langgraph_server.service import LangGraphService
+from infrastructure.langgraph_server.service.state import (
+    _diff_channel_values,
+    _diff_files,
+    _diff_messages,
+    _project_values,
+    _state_etag,
+)
+
+
+class ResumeState(BaseModel):
+    title: str
+    messages: list[dict[str, Any]]
+    files: dict[str, str]
+
+
+class TestProjectValues:
+    """fields / messages_tail 投影"""
+
+    def test_without_projection_returns_values(self):
+        values = {"title": "简历", "messages": [1, 2, 3]}
+        assert _project_values(values, None, None) is values
+
+    def test_fields_keep_state_order(self):
+        values = {"title": "简历", "messages": [1], "files": {}}
+        assert list(_project_values(values, ["files", "title", "missing"], None)) == [
+            "title",
+            "files",
+        ]
+
+    def test_messages_tail(self):
+        values = {"title": "简历", "messages": [1, 2, 3]}
+        assert _project_values(values, None, 2) == {"title": "简历", "messages": [2, 3]}
+        assert _project_values(values, None, 0) == {"title": "简历", "messages": []}
+        assert values["messages"] == [1, 2, 3]
+
+    def test_pydantic_state_fields(self):
+        state = ResumeState(
+            title="简历",
+            messages=[{"id": "1"}, {"id": "2"}],
+            files={"a.md": "# a"},
+        )
+
+        assert _project_values(state, ["title", "files"], None) == {
+            "title": "简历",
+            "files": {"a.md": "# a"},
+        }
+        assert _project_values(state, ["messages"], 1) == {"messages": [{"id": "2"}]}
+        assert _project_values(state, None, None) is state
+
+
+class TestStateEtag:
+    """ETag 区分不同投影"""
+
+    def test_plain_state_uses_checkpoint_id(self):
+        assert _state_etag("cp-1") == '"cp-1"'
+
+    def test_projections_have_distinct_tags(self):
+        tags = {
+            _state_etag("cp-1"),
+            _state_etag("cp-1", subgraphs=True),
+            _state_etag("cp-1", fields=["title"]),
+            _state_etag("cp-1", fields=[]),
+            _state_etag("cp-1", messages_tail=5),
+            _state_etag("cp-1", messages_tail=0),
+            _state_etag("cp-1", fields=["title"], messages_tail=5),
+        }
+        assert len(tags) == 7
+        assert all(tag.startswith('"cp-1') and tag.endswith('"') for tag in tags)
+
+    def test_fields_are_normalized(self):
+        assert _state_etag("cp-1", fields=["title", "files"]) == _state_etag(
+            "cp-1", fields=["files", "title", "files"]
+        )
+
+    def test_checkpoint_changes_tag(self):
+        assert _state_etag("cp-1", fields=["title"]) != _state_etag("cp-2", fields=["title"])
+
+
+async def test_service_etag_includes_projection():
+    service = LangGraphService({})
+
+    plain = await service.get_thread_state_etag("t1", "cp-1")
+    projected = await service.get_thread_state_etag("t1", "cp-1", fields=["title"], messages_tail=3)
+
+    assert plain == '"cp-1"'
+    assert projected == _state_etag("cp-1", fields=["title"], messages_tail=3)
+    assert await service.get_thread_state_etag("t1") is None  # 没有 checkpointer
+
+
+class TestDiffMessages:
+    """messages channel 增量"""
+
+    def test_by_id(self):
+        old = [
+            {"id": "1", "content": "a"},
+            {"id": "2", "content": "b"},
+            {"id": "3", "content": "c"},
+        ]
+        new = [
+            {"id": "1", "content": "a"},
+            {"id": "3", "content": "c!"},
+            {"id": "4", "content": "d"},
+        ]
+
+        changed, removed = _diff_messages(old, new)
+        assert changed == [{"id": "3", "content": "c!"}, {"id": "4", "content": "d"}]
+        assert removed == ["2"]
+
+    def test_message_objects(self):
+        old = [HumanMessage(content="你好", id="h1")]
+        new = [HumanMessage(content="你好", id="h1"), AIMessage(content="您好", id="a1")]
+
+        changed, removed = _diff_messages(old, new)
+        assert [m.id for m in changed] == ["a1"]
+        assert removed == []
+
+    def test_without_ids_compares_by_position(self):
+        old = [{"content": "a"}, {"content": "b"}]
+        new = [{"content": "a"}, {"content": "b2"}, {"content": "c"}]
+
+        assert _diff_messages(old, new) == ([{"content": "b2"}, {"content": "c"}], [])
+        assert _diff_messages(old, old) == ([], [])
+
+    def test_from_empty(self):
+        new = [{"id": "1", "content": "a"}]
+        assert _diff_messages([], new) == (new, [])
+
+
+def test_diff_files():
+    old = {"a.md": {"content": "a"}, "b.md": {"content": "b"}}
+    new = {"a.md": {"content": "a"}, "b.md": {"content": "b2"}, "c.md": {"content": "c"}}
+
+    assert _diff_files(old, new) == ({"b.md": {"content": "b2"}, "c.md": {"content": "c"}}, [])
+    assert _diff_files(old, {"a.md": {"content": "a"}}) == ({}, ["b.md"])
+
+
+class TestDiffChannelValues:
+    """按 channel 版本计算状态增量"""
+
+    def test_only_changed_channels(self):
+        diff = _diff_channel_values(
+            old_versions={"title": "1", "stage": "1", "messages": "1"},
+            new_versions={"title": "1", "stage": "2", "messages": "1"},
+            old_values={"messages": [{"id": "1"}]},
+            new_values={"title": "简历", "stage": "review", "messages": [{"id": "1"}]},
+        )
+
+        assert diff == {
+            "messages": [],
+            "removed_message_ids": [],
+            "files": {},
+            "removed_files": [],
+            "values": {"stage": "review"},
+            "removed_keys": [],
+        }
+
+    def test_messages_and_files_are_diffed(self):
+        diff = _diff_channel_values(
+            old_versions={"messages": "1", "files": "1"},
+            new_versions={"messages": "2", "files": "2"},
+            old_values={
+                "messages": [{"id": "1", "content": "a"}, {"id": "2", "content": "b"}],
+                "files": {"a.md": "a", "b.md": "b"},
+            },
+            new_values={
+                "messages": [{"id": "1", "content": "a"}, {"id": "3", "content": "c"}],
+                "files": {"a.md": "a2"},
+            },
+        )
+
+        assert diff["messages"] == [{"id": "3", "content": "c"}]
+        assert diff["removed_message_ids"] == ["2"]
+        assert diff["files"] == {"a.md": "a2"}
+        assert diff["removed_files"] == ["b.md"]
+        assert diff["values"] == {}
+
+    def test_new_and_removed_channels(self):
+        diff = _diff_channel_values(
+            old_versions={"draft": "3"},
+            new_versions={"messages": "1", "summary": "1"},
+            old_values={},
+            new_values={"messages": [{"id": "1"}], "summary": "完成"},
+        )
+
+        assert diff["messages"] == [{"id": "1"}]
+        assert diff["values"] == {"summary": "完成"}
+        assert diff["removed_keys"] == ["draft"]
+
+    def test_keys_filter_internal_channels(self):
+        diff = _diff_channel_values(
+            old_versions={"title": "1", "branch:to:review": "1"},
+            new_versions={"title": "2", "branch:to:review": "2"},
+            old_values={},
+            new_values={"title": "新标题", "branch:to:review": None},
+            keys=["title"],
+        )
+
+        assert diff["values"] == {"title": "新标题"}
+
+    def test_non_list_messages_returned_whole(self):
+        diff = _diff_channel_values(
+            old_versions={"messages": "1"},
+            new_versions={"messages": "2"},
+            old_values={"messages": None},
+            new_values={"messages": "reset"},
+        )
+
+        assert diff["values"] == {"messages": "reset"}
+        assert diff["messages"] == []
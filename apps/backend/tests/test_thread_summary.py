@@ -0,0 +1,210 @@
+"""Thread 摘要存储测试"""
+
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from typing import Any
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from infrastructure.langgraph_server.thread_summary import (
+    PREVIEW_MAX_CHARS,
+    PostgresThreadSummaryStore,
+    summarize_state,
+)
+
+
+class FakeCursor:
+    def __init__(self, rows: list[dict[str, Any]], rowcount: int = 0):
+        self._rows = rows
+        self.rowcount = rowcount
+
+    async def fetchone(self) -> dict[str, Any] | None:
+        return self._rows[0] if self._rows else None
+
+    async def fetchall(self) -> list[dict[str, Any]]:
+        return self._rows
+
+
+class FakePool:
+    """模拟 AsyncConnectionPool：记录 SQL，按关键字返回结果或抛出异常"""
+
+    def __init__(self, table_missing: bool = False):
+        self.queries: list[tuple[str, Any]] = []
+        self.rows: list[dict[str, Any]] = []
+        self.rowcount = 0
+        self.table_missing = table_missing
+        self.fail_on: str | None = None  # SQL 包含该关键字时抛出异常
+        self.closed = False
+
+    @asynccontextmanager
+    async def connection(self):
+        yield self
+
+    async def execute(self, query: str, params: Any = None) -> FakeCursor:
+        query = " ".join(query.split())
+        self.queries.append((query, params))
+        if self.fail_on and self.fail_on in query:
+            raise RuntimeError('relation "checkpoints" does not exist')
+        if "to_regclass" in query:
+            return FakeCursor([{"missing": self.table_missing}])
+        return FakeCursor(self.rows, self.rowcount)
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def _store(pool: FakePool) -> PostgresThreadSummaryStore:
+    return PostgresThreadSummaryStore("postgresql://unused", pool=pool)
+
+
+class TestStart:
+    """建表、首次回填与占位摘要清理"""
+
+    async def test_new_table_is_backfilled(self):
+        pool = FakePool(table_missing=True)
+        await _store(pool).start()
+
+        queries = [query for query, _ in pool.queries]
+        assert queries[1].startswith("CREATE TABLE IF NOT EXISTS thread_summaries")
+        assert queries[2].startswith("INSERT INTO thread_summaries")
+        assert "FROM checkpoints" in queries[2]
+        assert len(queries) == 3
+
+    async def test_existing_table_reconciles_placeholders(self):
+        pool = FakePool()
+        await _store(pool).start()
+
+        delete, reset = [query for query, _ in pool.queries[2:]]
+        assert delete.startswith("DELETE FROM thread_summaries")
+        assert "NOT EXISTS ( SELECT 1 FROM checkpoints" in delete
+        assert reset.startswith("UPDATE thread_summaries SET status = 'idle'")
+        for query in (delete, reset):
+            assert "status = 'busy' AND" in query and "message_count = 0" in query
+
+    async def test_reset_still_runs_without_checkpoints_table(self):
+        pool = FakePool()
+        pool.fail_on = "DELETE FROM thread_summaries"
+        await _store(pool).start()
+
+        assert pool.queries[-1][0].startswith("UPDATE thread_summaries SET status = 'idle'")
+
+    async def test_injected_pool_is_not_closed(self):
+        pool = FakePool()
+        store = _store(pool)
+        await store.start()
+        await store.stop()
+        assert not pool.closed
+
+
+class TestWrites:
+    """摘要与占位摘要写入"""
+
+    async def test_upsert_wraps_metadata(self):
+        pool = FakePool()
+        store = _store(pool)
+        summary = {
+            "thread_id": "t1",
+            "assistant_id": "resume",
+            "status": "idle",
+            "updated_at": None,
+            "message_count": 2,
+            "last_message": "完成",
+            "metadata": {"user_id": "u1"},
+        }
+        await store.upsert(summary)
+
+        query, params = pool.queries[0]
+        assert query.startswith("INSERT INTO thread_summaries")
+        assert "ON CONFLICT (thread_id) DO UPDATE" in query
+        assert params["metadata"].obj == {"user_id": "u1"}
+        assert params["message_count"] == 2
+        assert store.get_stats() == {"writes": 1, "errors": 0}
+
+    async def test_placeholder_does_not_overwrite(self):
+        pool = FakePool()
+        store = _store(pool)
+        await store.insert_placeholder("t1", "resume", {"user_id": "u1"})
+
+        query, params = pool.queries[0]
+        assert "VALUES (%(thread_id)s, %(assistant_id)s, 'busy', %(metadata)s)" in query
+        assert query.endswith("ON CONFLICT (thread_id) DO NOTHING")
+        assert (params["thread_id"], params["metadata"].obj) == ("t1", {"user_id": "u1"})
+
+    async def test_write_errors_are_counted(self):
+        pool = FakePool()
+        pool.fail_on = "INSERT"
+        store = _store(pool)
+        await store.insert_placeholder("t1", "resume", {})
+        await store.upsert({"thread_id": "t1", "metadata": {}})
+
+        assert store.get_stats() == {"writes": 0, "errors": 2}
+
+
+class TestSearch:
+    """状态与 metadata 过滤"""
+
+    async def test_busy_includes_local_active_threads(self):
+        pool = FakePool()
+        await _store(pool).search(busy=["t2"], status="busy")
+
+        query, params = pool.queries[0]
+        assert "WHERE (status = 'busy' OR thread_id = ANY(%(busy)s::text[]))" in query
+        assert params["busy"] == ["t2"]
+
+    async def test_other_status_excludes_local_active_threads(self):
+        pool = FakePool()
+        await _store(pool).search(
+            busy=["t2"], status="idle", metadata={"user_id": "u1"}, limit=5, offset=10
+        )
+
+        query, params = pool.queries[0]
+        assert (
+            "WHERE metadata @> %(metadata)s AND status = %(status)s "
+            "AND NOT thread_id = ANY(%(busy)s::text[])"
+        ) in query
+        assert query.endswith("ORDER BY updated_at DESC LIMIT %(limit)s OFFSET %(offset)s")
+        assert params["metadata"].obj == {"user_id": "u1"}
+        assert (params["status"], params["limit"], params["offset"]) == ("idle", 5, 10)
+
+    async def test_without_filters(self):
+        pool = FakePool()
+        pool.rows = [{"thread_id": "t1"}]
+
+        assert await _store(pool).search(busy=[]) == [{"thread_id": "t1"}]
+        assert " WHERE " not in pool.queries[0][0]
+
+
+def _state(messages: list[Any], next_nodes: tuple[str, ...] = ()) -> SimpleNamespace:
+    return SimpleNamespace(
+        values={"messages": messages},
+        metadata={"assistant_id": "resume"},
+        created_at="2026-01-02T00:00:00+00:00",
+        tasks=(),
+        interrupts=(),
+        next=next_nodes,
+    )
+
+
+class TestSummarizeState:
+    """由 StateSnapshot 生成摘要"""
+
+    def test_preview_of_last_message(self):
+        long_text = "简历 " * PREVIEW_MAX_CHARS
+        summary = summarize_state("t1", _state([HumanMessage("你好"), AIMessage(long_text)]))
+
+        assert summary["status"] == "idle"
+        assert summary["message_count"] == 2
+        assert summary["assistant_id"] == "resume"
+        assert len(summary["last_message"]) == PREVIEW_MAX_CHARS
+
+    def test_multimodal_content_keeps_text_blocks(self):
+        message = {
+            "content": [
+                {"type": "text", "text": "请看\n附件"},
+                {"type": "image_url", "image_url": {"url": "data:"}},
+            ]
+        }
+        summary = summarize_state("t1", _state([message], next_nodes=("agent",)))
+
+        assert summary["last_message"] == "请看 附件"
+        assert summary["status"] == "busy"
@@ -0,0 +1,102 @@
+"""签名 token 与认证缓存测试"""
+
+import pytest
+
+from api import auth, token_cache
+
+
+@pytest.fixture
+def signing_secret(monkeypatch):
+    monkeypatch.setattr(token_cache, "AUTH_SIGNING_SECRET", "test-secret")
+
+
+@pytest.fixture
+def no_database(monkeypatch):
+    """签名 token 的认证不应访问数据库"""
+
+    def fail(*args, **kwargs):
+        raise AssertionError("不应查询数据库")
+
+    monkeypatch.setattr(auth, "get_db_context", fail)
+
+
+def _issued_at(monkeypatch, seconds_ago: float) -> str:
+    now = token_cache.time.time()
+    monkeypatch.setattr(token_cache.time, "time", lambda: now - seconds_ago)
+    token = token_cache.create_signed_token("user-1")
+    monkeypatch.setattr(token_cache.time, "time", lambda: now)
+    return token
+
+
+def _tamper(token: str) -> str:
+    payload, _, signature = token.rpartition(".")
+    return f"{payload.replace('user-1', 'user-2')}.{signature}"
+
+
+class TestVerifySignedToken:
+    """签名校验"""
+
+    def test_valid(self, signing_secret):
+        token = token_cache.create_signed_token("user-1")
+        assert token_cache.verify_signed_token(token) == "user-1"
+
+    def test_expired(self, signing_secret, monkeypatch):
+        token = _issued_at(monkeypatch, token_cache.AUTH_TOKEN_MAX_AGE + 1)
+        assert token_cache.verify_signed_token(token) is None
+
+    def test_tampered(self, signing_secret):
+        token = token_cache.create_signed_token("user-1")
+        assert token_cache.verify_signed_token(_tamper(token)) is None
+
+    def test_revoked(self, signing_secret):
+        token = token_cache.create_signed_token("user-1")
+        token_cache.invalidate_token(token)
+        assert token_cache.verify_signed_token(token) is None
+
+    def test_signing_disabled(self, signing_secret, monkeypatch):
+        token = token_cache.create_signed_token("user-1")
+        monkeypatch.setattr(token_cache, "AUTH_SIGNING_SECRET", "")
+        assert token_cache.verify_signed_token(token) is None
+
+
+class TestGetUserFromToken:
+    """签名 token 校验失败时不回退到数据库"""
+
+    async def test_valid(self, signing_secret, no_database):
+        token = token_cache.create_signed_token("user-1")
+        assert await auth.get_user_from_token(f"Bearer {token}") == "user-1"
+
+    async def test_expired(self, signing_secret, no_database, monkeypatch):
+        token = _issued_at(monkeypatch, token_cache.AUTH_TOKEN_MAX_AGE + 1)
+        assert await auth.get_user_from_token(f"Bearer {token}") is None
+
+    async def test_tampered(self, signing_secret, no_database):
+        token = token_cache.create_signed_token("user-1")
+        assert await auth.get_user_from_token(f"Bearer {_tamper(token)}") is None
+
+    async def test_cached_random_token(self, no_database):
+        token_cache.cache_user_id("random-token", "user-1")
+        try:
+            assert await auth.get_user_from_token("Bearer random-token") == "user-1"
+        finally:
+            token_cache.invalidate_token("random-token")
+
+
+class TestTTLCache:
+    """有界 TTL 缓存"""
+
+    def test_expired_entry_is_miss(self, monkeypatch):
+        cache = token_cache.TTLCache(ttl=10, max_entries=10)
+        cache.put("a", 1)
+        now = token_cache.time.monotonic()
+        monkeypatch.setattr(token_cache.time, "monotonic", lambda: now + 11)
+        assert cache.get("a") is None
+
+    def test_evicts_least_recently_used(self):
+        cache = token_cache.TTLCache(ttl=10, max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1 and cache.get("c") == 3
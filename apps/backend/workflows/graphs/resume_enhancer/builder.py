@@ -16,6 +16,7 @@ Middleware:
 - search_similar_projects: 相似项目搜索
 - search_tech_articles: 技术内容搜索
 - analyze_github_repo: GitHub 仓库深度分析
+- analyze_github_repos: GitHub 仓库批量分析
 """
 
 import logging
@@ -38,6 +39,7 @@ from workflows.graphs.resume_enhancer.tools import (
     search_similar_projects,  # 相似项目搜索（基于简历项目和技术栈）
     search_tech_articles,     # 技术内容（DEV.to/掘金/InfoQ/Reddit/HuggingFace）
     analyze_github_repo,      # GitHub 仓库深度分析
+    analyze_github_repos,     # GitHub 仓库批量分析
 )
 
 logger = logging.getLogger(__name__)
@@ -158,6 +160,7 @@ def _build_graph() -> StateGraph:
         search_similar_projects,  # 相似项目搜索（基于简历项目和技术栈）
         search_tech_articles,     # 技术内容（DEV.to/掘金/InfoQ/Reddit/HuggingFace）
         analyze_github_repo,      # GitHub 仓库深度分析
+        analyze_github_repos,     # GitHub 仓库批量分析
     ]
 
     # 定义研究子 Agent
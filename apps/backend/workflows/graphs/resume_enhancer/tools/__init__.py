@@ -5,7 +5,7 @@
 
 from .search_similar_projects import search_similar_projects
 from .search_tech_articles import search_tech_articles
-from .analyze_github_repo import analyze_github_repo
+from .analyze_github_repo import analyze_github_repo, analyze_github_repos
 
 __all__ = [
     # 相似项目搜索（基于简历项目描述和技术栈搜索 GitHub 相似项目）
@@ -14,4 +14,6 @@ __all__ = [
     "search_tech_articles",
     # GitHub 仓库深度分析
     "analyze_github_repo",
+    # GitHub 仓库批量分析
+    "analyze_github_repos",
 ]
@@ -3,7 +3,16 @@
 这些工具仅供外部工具内部调用，不直接暴露给 Agent。
 """
 
-from .github_api import github_search, get_github_headers
+from .github_api import github_search, github_get, get_github_headers
+from .github_cache import close_github_cache, get_github_cache_stats
+from .github_ratelimit import (
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+    GitHubRateLimitError,
+    get_github_ratelimit_stats,
+    request_priority,
+)
+from .http_client import HttpResponse, close_http_client, http_get, http_post
 from .formatters import (
     format_tech_trends_document,
     format_tech_articles_document,
@@ -14,7 +23,21 @@ from .formatters import (
 __all__ = [
     # GitHub API
     "github_search",
+    "github_get",
     "get_github_headers",
+    "get_github_cache_stats",
+    "close_github_cache",
+    # GitHub 限流调度
+    "GitHubRateLimitError",
+    "PRIORITY_BULK",
+    "PRIORITY_INTERACTIVE",
+    "request_priority",
+    "get_github_ratelimit_stats",
+    # 共享 HTTP 客户端
+    "HttpResponse",
+    "http_get",
+    "http_post",
+    "close_http_client",
     # 文档格式化
     "format_tech_trends_document",
     "format_tech_articles_document",
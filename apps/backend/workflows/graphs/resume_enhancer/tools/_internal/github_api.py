@@ -1,12 +1,19 @@
 """GitHub API 封装（内部使用）
 
 统一的 GitHub API 调用，供 tech_trends 和 repo_analyzer 使用。
+
+GET 请求默认经过 github_cache：TTL 内直接返回缓存，过期后发送条件请求
+（If-None-Match / If-Modified-Since），304 不计入 rate limit。
+实际发出的请求都经过 github_ratelimit 调度器，配额耗尽时抛出 GitHubRateLimitError。
 """
 import logging
 import os
+import time
 from typing import Any
 
-import requests
+from .github_cache import CacheEntry, get_github_cache, make_cache_key, ttl_for_path
+from .github_ratelimit import GitHubRateLimitError, get_github_scheduler, resource_for_path
+from .http_client import HttpResponse, http_get
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +32,103 @@ def get_github_headers() -> dict:
     return headers
 
 
+async def github_get(
+    path: str,
+    params: dict[str, Any] | None = None,
+    accept: str | None = None,
+    timeout: float | None = None,
+    use_cache: bool = True,
+) -> HttpResponse:
+    """GET 请求 GitHub API（带缓存和条件请求）
+
+    Args:
+        path: API 路径（如 /repos/{owner}/{repo}）
+        params: 查询参数
+        accept: 覆盖 Accept 头（如获取 README 原文时使用 raw）
+        timeout: 超时（秒）
+        use_cache: 是否使用响应缓存
+
+    Returns:
+        HttpResponse，由调用方判断 status
+
+    Raises:
+        GitHubRateLimitError: 配额耗尽或触发二级限流
+    """
+    headers = get_github_headers()
+    if accept:
+        headers["Accept"] = accept
+    url = f"{GITHUB_API_BASE}{path}"
+
+    if not use_cache:
+        return await _scheduled_get(path, url, params, headers, timeout)
+
+    cache = get_github_cache()
+    key = make_cache_key(path, params, accept)
+    tier = "memory" if cache.in_memory(key) else "sqlite"
+    entry = await cache.get(key)
+
+    if entry is not None:
+        if entry.is_fresh():
+            cache.record_hit(tier)
+            return entry.to_response()
+        headers.update(entry.conditional_headers())
+
+    response = await _scheduled_get(path, url, params, headers, timeout)
+
+    if response.status == 304 and entry is not None:
+        cache.stats.revalidated += 1
+        await cache.touch(key, entry)
+        return entry.to_response()
+
+    cache.stats.misses += 1
+    if response.status == 200:
+        await cache.put(key, CacheEntry(
+            url=response.url,
+            body=response.body,
+            headers={
+                k: v for k, v in response.headers.items()
+                if k.lower() in ("content-type", "etag", "last-modified")
+            },
+            etag=_get_header(response, "ETag"),
+            last_modified=_get_header(response, "Last-Modified"),
+            fetched_at=time.time(),
+            ttl=ttl_for_path(path),
+        ))
+
+    return response
+
+
+async def _scheduled_get(
+    path: str,
+    url: str,
+    params: dict[str, Any] | None,
+    headers: dict[str, str],
+    timeout: float | None,
+) -> HttpResponse:
+    """经过限流调度器发出请求，并用响应头同步剩余配额"""
+    scheduler = get_github_scheduler(authenticated=bool(GITHUB_TOKEN))
+    resource = resource_for_path(path)
+    await scheduler.acquire(resource)
+
+    response = await http_get(url, params=params, headers=headers, timeout=timeout)
+    scheduler.update_from_response(
+        resource,
+        response.status,
+        {k.lower(): v for k, v in response.headers.items()},
+        response.body,
+    )
+    return response
+
+
+def _get_header(response: HttpResponse, name: str) -> str | None:
+    """大小写不敏感地读取响应头"""
+    lowered = name.lower()
+    for key, value in response.headers.items():
+        if key.lower() == lowered:
+            return value
+    return None
+
+
 async def github_search(
     query: str,
     language: str | None = None,
@@ -41,7 +145,6 @@ async def github_search(
         包含仓库列表的搜索结果
     """
     try:
-        url = f"{GITHUB_API_BASE}/search/repositories"
         q = f"{query} language:{language}" if language else query
         params = {
             "q": q,
@@ -50,8 +153,9 @@ async def github_search(
             "per_page": max_results
         }
 
-        response = requests.get(url, headers=get_github_headers(), params=params, timeout=30)
-        response.raise_for_status()
+        response = await github_get("/search/repositories", params=params, timeout=30)
+        if not response.ok:
+            raise RuntimeError(f"GitHub API 错误: {response.status}")
         data = response.json()
 
         repos = []
@@ -72,6 +176,9 @@ async def github_search(
             "total_count": data.get("total_count", 0),
         }
 
+    except GitHubRateLimitError as e:
+        logger.warning(f"GitHub 搜索被限流: {e}")
+        return {"query": query, "repos": [], "error": str(e), "retry_after": e.retry_after}
     except Exception as e:
         logger.error(f"GitHub 搜索失败: {e}")
         return {"query": query, "repos": [], "error": str(e)}
@@ -0,0 +1,328 @@
+"""GitHub 响应缓存（内部使用）
+
+两级缓存，供 github_api.github_get 使用：
+- 内存 LRU：热点仓库/查询直接命中，不发请求
+- SQLite 持久化：进程重启后仍可复用，按最近访问时间做 LRU 淘汰
+
+条目过期（超过 TTL）后不会立即删除，而是携带 ETag / Last-Modified
+发起条件请求；GitHub 返回 304 时不计入 rate limit，直接刷新条目。
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .http_client import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+# 缓存配置
+GITHUB_CACHE_PATH = os.getenv("GITHUB_CACHE_PATH", "./data/github_cache.db")
+GITHUB_CACHE_TTL = int(os.getenv("GITHUB_CACHE_TTL", "3600"))
+GITHUB_SEARCH_CACHE_TTL = int(os.getenv("GITHUB_SEARCH_CACHE_TTL", "600"))
+GITHUB_CACHE_MAX_ENTRIES = int(os.getenv("GITHUB_CACHE_MAX_ENTRIES", "5000"))
+GITHUB_CACHE_MEMORY_ENTRIES = int(os.getenv("GITHUB_CACHE_MEMORY_ENTRIES", "512"))
+
+# 每写入多少次执行一次 SQLite LRU 淘汰
+_EVICT_EVERY_N_PUTS = 50
+
+
+@dataclass
+class CacheEntry:
+    """缓存条目（只缓存 200 响应）"""
+
+    url: str
+    body: bytes
+    headers: dict[str, str]
+    etag: str | None
+    last_modified: str | None
+    fetched_at: float
+    ttl: float
+
+    def is_fresh(self, now: float | None = None) -> bool:
+        return ((now or time.time()) - self.fetched_at) < self.ttl
+
+    def conditional_headers(self) -> dict[str, str]:
+        """条件请求头"""
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_response(self) -> HttpResponse:
+        return HttpResponse(status=200, url=self.url, headers=dict(self.headers), body=self.body)
+
+
+@dataclass
+class CacheStats:
+    """缓存计数器"""
+
+    hits: int = 0  # TTL 内命中，未发请求
+    misses: int = 0  # 无可用条目或条目已变化（200）
+    revalidated: int = 0  # 条件请求返回 304
+    stores: int = 0
+    evictions: int = 0
+    errors: int = 0
+    by_tier: dict[str, int] = field(default_factory=lambda: {"memory": 0, "sqlite": 0})
+
+    def to_dict(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses + self.revalidated
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "errors": self.errors,
+            "hits_by_tier": dict(self.by_tier),
+            "hit_ratio": round((self.hits + self.revalidated) / lookups, 4) if lookups else 0.0,
+        }
+
+
+def make_cache_key(path: str, params: dict[str, Any] | None, accept: str | None) -> str:
+    """生成缓存 key（path + 排序后的参数 + Accept）"""
+    normalized = json.dumps(
+        [path, sorted((str(k), str(v)) for k, v in (params or {}).items()), accept or ""],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def ttl_for_path(path: str) -> int:
+    """搜索结果变化较快，使用较短 TTL"""
+    return GITHUB_SEARCH_CACHE_TTL if path.startswith("/search/") else GITHUB_CACHE_TTL
+
+
+class GitHubCache:
+    """GitHub 响应两级缓存
+
+    SQLite 操作通过 asyncio.to_thread 执行，不阻塞事件循环。
+    db_path 为空时只使用内存缓存。
+    """
+
+    def __init__(
+        self,
+        db_path: str | None = GITHUB_CACHE_PATH,
+        max_entries: int = GITHUB_CACHE_MAX_ENTRIES,
+        memory_entries: int = GITHUB_CACHE_MEMORY_ENTRIES,
+    ):
+        self._db_path = db_path or None
+        self._max_entries = max_entries
+        self._memory_entries = memory_entries
+        self._memory: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._conn: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()
+        self._db_failed = False
+        self._puts_since_evict = 0
+        self.stats = CacheStats()
+
+    # ==================== 读写 ====================
+
+    async def get(self, key: str) -> CacheEntry | None:
+        """获取条目（可能已过期，由调用方决定是否条件请求）"""
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            return entry
+
+        entry = await self._run_db(self._db_get, key)
+        if entry is not None:
+            self._remember(key, entry)
+        return entry
+
+    async def put(self, key: str, entry: CacheEntry) -> None:
+        """写入条目"""
+        self._remember(key, entry)
+        self.stats.stores += 1
+        await self._run_db(self._db_put, key, entry)
+
+        self._puts_since_evict += 1
+        if self._puts_since_evict >= _EVICT_EVERY_N_PUTS:
+            self._puts_since_evict = 0
+            evicted = await self._run_db(self._db_evict)
+            if evicted:
+                self.stats.evictions += evicted
+
+    async def touch(self, key: str, entry: CacheEntry) -> None:
+        """304 后刷新条目的获取时间"""
+        entry.fetched_at = time.time()
+        self._remember(key, entry)
+        await self._run_db(self._db_put, key, entry)
+
+    def record_hit(self, tier: str) -> None:
+        self.stats.hits += 1
+        self.stats.by_tier[tier] = self.stats.by_tier.get(tier, 0) + 1
+
+    def in_memory(self, key: str) -> bool:
+        return key in self._memory
+
+    def get_stats(self) -> dict[str, Any]:
+        data = self.stats.to_dict()
+        data["memory_entries"] = len(self._memory)
+        data["persistent"] = self._db_path is not None and not self._db_failed
+        return data
+
+    def close(self) -> None:
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ==================== 内存 LRU ====================
+
+    def _remember(self, key: str, entry: CacheEntry) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._memory_entries:
+            self._memory.popitem(last=False)
+
+    # ==================== SQLite ====================
+
+    async def _run_db(self, fn: Any, *args: Any) -> Any:
+        if self._db_path is None or self._db_failed:
+            return None
+        try:
+            return await asyncio.to_thread(fn, *args)
+        except Exception as e:
+            self.stats.errors += 1
+            logger.warning(f"GitHub 缓存读写失败: {e}")
+            return None
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            assert self._db_path is not None
+            try:
+                Path(self._db_path).parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(self._db_path, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS github_cache (
+                        key TEXT PRIMARY KEY,
+                        url TEXT NOT NULL,
+                        body BLOB NOT NULL,
+                        headers TEXT NOT NULL,
+                        etag TEXT,
+                        last_modified TEXT,
+                        fetched_at REAL NOT NULL,
+                        ttl REAL NOT NULL,
+                        accessed_at REAL NOT NULL
+                    )
+                """)
+                conn.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_github_cache_accessed_at
+                    ON github_cache(accessed_at)
+                """)
+                conn.commit()
+            except Exception:
+                # 持久化不可用时降级为纯内存缓存
+                self._db_failed = True
+                raise
+            self._conn = conn
+            logger.info(f"GitHub 缓存已启用: {self._db_path}")
+        return self._conn
+
+    def _db_get(self, key: str) -> CacheEntry | None:
+        with self._db_lock:
+            conn = self._get_conn()
+            row = conn.execute(
+                "SELECT url, body, headers, etag, last_modified, fetched_at, ttl "
+                "FROM github_cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE github_cache SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+            conn.commit()
+        url, body, headers, etag, last_modified, fetched_at, ttl = row
+        return CacheEntry(
+            url=url,
+            body=bytes(body),
+            headers=json.loads(headers),
+            etag=etag,
+            last_modified=last_modified,
+            fetched_at=fetched_at,
+            ttl=ttl,
+        )
+
+    def _db_put(self, key: str, entry: CacheEntry) -> None:
+        with self._db_lock:
+            conn = self._get_conn()
+            conn.execute(
+                """
+                INSERT INTO github_cache
+                    (key, url, body, headers, etag, last_modified, fetched_at, ttl, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    url = excluded.url,
+                    body = excluded.body,
+                    headers = excluded.headers,
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    fetched_at = excluded.fetched_at,
+                    ttl = excluded.ttl,
+                    accessed_at = excluded.accessed_at
+                """,
+                (
+                    key,
+                    entry.url,
+                    entry.body,
+                    json.dumps(entry.headers),
+                    entry.etag,
+                    entry.last_modified,
+                    entry.fetched_at,
+                    entry.ttl,
+                    time.time(),
+                ),
+            )
+            conn.commit()
+
+    def _db_evict(self) -> int:
+        """按最近访问时间淘汰超出上限的条目"""
+        with self._db_lock:
+            conn = self._get_conn()
+            (count,) = conn.execute("SELECT COUNT(*) FROM github_cache").fetchone()
+            overflow = count - self._max_entries
+            if overflow <= 0:
+                return 0
+            conn.execute(
+                "DELETE FROM github_cache WHERE key IN ("
+                "SELECT key FROM github_cache ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,),
+            )
+            conn.commit()
+            return overflow
+
+
+# 进程级缓存实例
+_cache: GitHubCache | None = None
+
+
+def get_github_cache() -> GitHubCache:
+    """获取进程级 GitHub 缓存"""
+    global _cache
+    if _cache is None:
+        _cache = GitHubCache()
+    return _cache
+
+
+def get_github_cache_stats() -> dict[str, Any]:
+    """缓存命中统计（供 /metrics 使用）"""
+    return get_github_cache().get_stats()
+
+
+def close_github_cache() -> None:
+    """关闭 SQLite 连接（应用退出时调用）"""
+    if _cache is not None:
+        _cache.close()
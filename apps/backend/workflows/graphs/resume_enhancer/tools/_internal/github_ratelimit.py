@@ -0,0 +1,309 @@
+"""GitHub 限流调度器（内部使用）
+
+进程级调度器，所有经过 github_api.github_get 的请求在发出前都需要获取令牌：
+- search / core 两类配额分别记账（与 GitHub 的 X-RateLimit-Resource 对应）
+- 令牌桶平滑请求速率，排队时交互请求优先于批量请求
+- 根据 X-RateLimit-Remaining / X-RateLimit-Reset 和 Retry-After 同步真实配额，
+  遇到二级限流时暂停该类请求（没有 Retry-After 时至少暂停 60 秒）
+- 配额耗尽且恢复时间超过可等待时间时立即失败，返回明确的重试时间
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+logger = logging.getLogger(__name__)
+
+# 请求优先级（数值越小越优先）
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+
+# 排队最长等待时间（秒），超过则直接失败
+MAX_QUEUE_WAIT = 15.0
+
+# 二级限流没有 Retry-After 时的暂停时间（秒），GitHub 建议至少等待 1 分钟
+SECONDARY_LIMIT_PAUSE = 60
+
+# 令牌桶参数：(容量, 每秒补充速率)
+# GitHub 限额：search 30 次/分钟（未认证 10 次），core 5000 次/小时（未认证 60 次）
+_BUCKET_LIMITS = {
+    True: {"search": (10, 30 / 60), "core": (50, 5000 / 3600)},
+    False: {"search": (5, 10 / 60), "core": (10, 60 / 3600)},
+}
+
+_current_priority: ContextVar[int] = ContextVar(
+    "github_request_priority", default=PRIORITY_INTERACTIVE
+)
+
+
+class GitHubRateLimitError(Exception):
+    """GitHub 配额耗尽或触发二级限流"""
+
+    def __init__(self, resource: str, retry_after: float):
+        self.resource = resource
+        self.retry_after = max(0.0, retry_after)
+        super().__init__(
+            f"GitHub API 限流（{resource}），请在 {math.ceil(self.retry_after)} 秒后重试"
+        )
+
+
+@contextmanager
+def request_priority(priority: int) -> Iterator[None]:
+    """在当前上下文（及其创建的子任务）中设置 GitHub 请求优先级
+
+    用法:
+        with request_priority(PRIORITY_BULK):
+            await asyncio.gather(...)
+    """
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> int:
+    return _current_priority.get()
+
+
+def resource_for_path(path: str) -> str:
+    """API 路径对应的配额类别"""
+    return "search" if path.startswith("/search/") else "core"
+
+
+@dataclass
+class _Bucket:
+    """单类配额的令牌桶 + 等待队列"""
+
+    name: str
+    capacity: float
+    refill_rate: float
+    tokens: float
+    updated_at: float = field(default_factory=time.monotonic)
+    remaining: int | None = None  # GitHub 返回的剩余配额
+    reset_at: float | None = None  # 配额重置时间（monotonic）
+    blocked_until: float = 0.0  # 配额耗尽/二级限流期间暂停
+    waiters: list[tuple[int, int, asyncio.Future[None]]] = field(default_factory=list)
+    dispatcher: asyncio.Task[None] | None = None
+    loop: asyncio.AbstractEventLoop | None = None  # waiters / dispatcher 所属的事件循环
+    granted: int = 0
+    rejected: int = 0
+    throttled: int = 0
+
+    def refill(self, now: float) -> None:
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
+            self.updated_at = now
+
+    def blocked_seconds(self, now: float) -> float:
+        return max(0.0, self.blocked_until - now)
+
+    def seconds_until_token(self, now: float) -> float:
+        self.refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.refill_rate
+
+    def try_take(self, now: float) -> bool:
+        if self.blocked_seconds(now) > 0:
+            return False
+        self.refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            self.granted += 1
+            return True
+        return False
+
+    def has_live_waiters(self) -> bool:
+        return any(not fut.done() for _, _, fut in self.waiters)
+
+
+class GitHubScheduler:
+    """GitHub 请求调度器"""
+
+    def __init__(self, authenticated: bool):
+        self.authenticated = authenticated
+        self._seq = itertools.count()
+        now = time.monotonic()
+        self._buckets = {
+            name: _Bucket(name=name, capacity=capacity, refill_rate=rate, tokens=capacity, updated_at=now)
+            for name, (capacity, rate) in _BUCKET_LIMITS[authenticated].items()
+        }
+
+    async def acquire(
+        self,
+        resource: str,
+        priority: int | None = None,
+        max_wait: float = MAX_QUEUE_WAIT,
+    ) -> None:
+        """获取一个请求令牌
+
+        Raises:
+            GitHubRateLimitError: 配额耗尽且无法在 max_wait 内恢复
+        """
+        bucket = self._buckets[resource]
+        priority = current_priority() if priority is None else priority
+        now = time.monotonic()
+
+        blocked = bucket.blocked_seconds(now)
+        if blocked > max_wait:
+            bucket.rejected += 1
+            raise GitHubRateLimitError(resource, blocked)
+
+        loop = asyncio.get_running_loop()
+        if bucket.loop is not loop:
+            # 等待队列和 dispatcher 绑定在创建它们的事件循环上，换循环后重新创建
+            bucket.waiters = []
+            bucket.dispatcher = None
+            bucket.loop = loop
+
+        if not bucket.has_live_waiters() and bucket.try_take(now):
+            return
+
+        future: asyncio.Future[None] = loop.create_future()
+        heapq.heappush(bucket.waiters, (priority, next(self._seq), future))
+        if bucket.dispatcher is None or bucket.dispatcher.done():
+            bucket.dispatcher = asyncio.create_task(self._dispatch(bucket, bucket.waiters))
+
+        try:
+            await asyncio.wait_for(future, timeout=max_wait)
+        except asyncio.TimeoutError:
+            bucket.rejected += 1
+            now = time.monotonic()
+            retry_after = max(bucket.blocked_seconds(now), bucket.seconds_until_token(now))
+            raise GitHubRateLimitError(resource, retry_after) from None
+
+    async def _dispatch(
+        self, bucket: _Bucket, waiters: list[tuple[int, int, asyncio.Future[None]]]
+    ) -> None:
+        """按优先级依次放行排队请求
+
+        waiters 固定为启动时的等待队列：事件循环切换后 bucket 换了新队列，
+        旧 dispatcher 不会去放行其他循环的 future。
+        """
+        while waiters:
+            now = time.monotonic()
+            delay = max(bucket.blocked_seconds(now), bucket.seconds_until_token(now))
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            # 已超时/取消的请求直接丢弃
+            while waiters and waiters[0][2].done():
+                heapq.heappop(waiters)
+            if not waiters:
+                break
+
+            # 拿到令牌后才放行优先级最高的请求，否则重新计算等待时间
+            if not bucket.try_take(time.monotonic()):
+                continue
+            _, _, future = heapq.heappop(waiters)
+            future.set_result(None)
+
+    def update_from_response(
+        self,
+        resource: str,
+        status: int,
+        headers: dict[str, str],
+        body: bytes = b"",
+    ) -> None:
+        """根据响应头同步配额
+
+        Args:
+            resource: 请求对应的配额类别
+            status: HTTP 状态码
+            headers: 响应头（key 需为小写）
+            body: 响应体，用于区分 403 限流和无权限
+
+        Raises:
+            GitHubRateLimitError: 响应表明已被限流（403/429）
+        """
+        now = time.monotonic()
+        bucket = self._buckets.get(headers.get("x-ratelimit-resource", resource)) or self._buckets[resource]
+
+        remaining = _parse_int(headers.get("x-ratelimit-remaining"))
+        reset_epoch = _parse_int(headers.get("x-ratelimit-reset"))
+        if remaining is not None:
+            bucket.remaining = remaining
+            bucket.refill(now)
+            bucket.tokens = min(bucket.tokens, float(remaining))
+        if reset_epoch is not None:
+            bucket.reset_at = now + max(0.0, reset_epoch - time.time())
+
+        if remaining == 0 and bucket.reset_at is not None:
+            bucket.blocked_until = max(bucket.blocked_until, bucket.reset_at)
+
+        if status in (403, 429):
+            retry_after = _parse_int(headers.get("retry-after"))
+            if retry_after is None and remaining != 0 and _is_secondary_limit(status, body):
+                # 二级限流但没有 Retry-After
+                retry_after = SECONDARY_LIMIT_PAUSE
+            if retry_after is not None:
+                # 二级限流
+                bucket.throttled += 1
+                bucket.blocked_until = max(bucket.blocked_until, now + retry_after)
+                logger.warning(f"GitHub 二级限流（{bucket.name}），暂停 {retry_after} 秒")
+            if retry_after is not None or remaining == 0:
+                raise GitHubRateLimitError(bucket.name, bucket.blocked_seconds(now))
+
+    def get_stats(self) -> dict[str, Any]:
+        now = time.monotonic()
+        stats: dict[str, Any] = {"authenticated": self.authenticated}
+        for name, bucket in self._buckets.items():
+            bucket.refill(now)
+            stats[name] = {
+                "tokens": round(bucket.tokens, 2),
+                "remaining": bucket.remaining,
+                "reset_in": round(bucket.reset_at - now, 1) if bucket.reset_at else None,
+                "blocked_for": round(bucket.blocked_seconds(now), 1),
+                "queued": sum(1 for _, _, fut in bucket.waiters if not fut.done()),
+                "granted": bucket.granted,
+                "rejected": bucket.rejected,
+                "throttled": bucket.throttled,
+            }
+        return stats
+
+
+def _is_secondary_limit(status: int, body: bytes) -> bool:
+    """429 总是限流；403 可能只是无权限，需要看响应体"""
+    return status == 429 or b"rate limit" in body.lower()
+
+
+def _parse_int(value: str | None) -> int | None:
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+# 进程级调度器实例
+_scheduler: GitHubScheduler | None = None
+
+
+def get_github_scheduler(authenticated: bool) -> GitHubScheduler:
+    """获取进程级 GitHub 调度器
+
+    认证状态变化时配额完全不同，重新创建调度器。
+    """
+    global _scheduler
+    if _scheduler is None or _scheduler.authenticated != authenticated:
+        if _scheduler is not None:
+            logger.info(f"GitHub 认证状态变化（authenticated={authenticated}），重建限流调度器")
+        _scheduler = GitHubScheduler(authenticated=authenticated)
+    return _scheduler
+
+
+def get_github_ratelimit_stats() -> dict[str, Any]:
+    """调度器状态（供 /metrics 使用）"""
+    if _scheduler is None:
+        return {}
+    return _scheduler.get_stats()
@@ -0,0 +1,196 @@
+"""共享异步 HTTP 客户端（内部使用）
+
+所有研究工具统一通过此模块发起外部请求，避免在事件循环中调用阻塞的 requests。
+
+特点：
+- 进程内共享 aiohttp.ClientSession，连接池 + keep-alive 复用
+- 全局连接数与单 host 连接数上限，防止单个子 Agent 占满连接
+- 统一的默认超时，可按请求覆盖
+"""
+import asyncio
+import json as _json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# 连接池配置
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "10"))
+HTTP_KEEPALIVE_TIMEOUT = 30.0
+
+# 默认超时（秒）
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_TIMEOUT = 15.0
+
+DEFAULT_USER_AGENT = "ResumeAgent/1.0"
+
+_session: aiohttp.ClientSession | None = None
+_session_loop: asyncio.AbstractEventLoop | None = None
+
+
+@dataclass
+class HttpResponse:
+    """已读取完毕的 HTTP 响应
+
+    响应体在返回前已完整读取，连接可立即归还连接池。
+    """
+
+    status: int
+    url: str
+    headers: dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    @property
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return _json.loads(self.body)
+
+
+def get_session() -> aiohttp.ClientSession:
+    """获取共享的 ClientSession（按事件循环懒加载）"""
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        if _session is not None and not _session.closed:
+            _close_stale_session(_session, _session_loop)
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_MAX_CONNECTIONS,
+            limit_per_host=HTTP_MAX_CONNECTIONS_PER_HOST,
+            keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=300,
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(
+                total=DEFAULT_TIMEOUT,
+                sock_connect=DEFAULT_CONNECT_TIMEOUT,
+            ),
+            headers={"User-Agent": DEFAULT_USER_AGENT},
+        )
+        _session_loop = loop
+        logger.info(
+            f"HTTP 客户端已初始化: limit={HTTP_MAX_CONNECTIONS}, "
+            f"limit_per_host={HTTP_MAX_CONNECTIONS_PER_HOST}"
+        )
+    return _session
+
+
+def _close_stale_session(
+    session: aiohttp.ClientSession, loop: asyncio.AbstractEventLoop | None
+) -> None:
+    """关闭属于其他事件循环的 session，避免泄漏连接池"""
+    if loop is not None and loop.is_running():
+        # 原事件循环仍在其他线程运行：在原循环中关闭
+        asyncio.run_coroutine_threadsafe(session.close(), loop)
+        return
+    # 原事件循环已停止：无法在当前循环等待其关闭回调，同步关闭所有连接
+    connector = session.connector
+    session.detach()
+    if connector is not None and not connector.closed:
+        connector._close()
+
+
+async def close_http_client() -> None:
+    """关闭共享 ClientSession（应用退出时调用）"""
+    global _session, _session_loop
+    if _session is not None and not _session.closed:
+        await _session.close()
+        logger.info("HTTP 客户端已关闭")
+    _session = None
+    _session_loop = None
+
+
+async def http_request(
+    method: str,
+    url: str,
+    *,
+    params: dict[str, Any] | None = None,
+    json: Any = None,
+    headers: dict[str, str] | None = None,
+    timeout: float | None = None,
+) -> HttpResponse:
+    """发起 HTTP 请求并读取完整响应
+
+    Args:
+        method: HTTP 方法
+        url: 请求地址
+        params: 查询参数
+        json: JSON 请求体
+        headers: 请求头
+        timeout: 总超时（秒），默认 DEFAULT_TIMEOUT
+
+    Returns:
+        HttpResponse（不会因 4xx/5xx 抛异常，由调用方判断 status）
+
+    Raises:
+        aiohttp.ClientError / asyncio.TimeoutError: 网络错误或超时
+    """
+    session = get_session()
+    request_timeout = (
+        aiohttp.ClientTimeout(total=timeout, sock_connect=DEFAULT_CONNECT_TIMEOUT)
+        if timeout is not None
+        else None
+    )
+    async with session.request(
+        method,
+        url,
+        params=_normalize_params(params),
+        json=json,
+        headers=headers,
+        timeout=request_timeout,
+    ) as response:
+        body = await response.read()
+        return HttpResponse(
+            status=response.status,
+            url=str(response.url),
+            headers=dict(response.headers),
+            body=body,
+        )
+
+
+async def http_get(
+    url: str,
+    *,
+    params: dict[str, Any] | None = None,
+    headers: dict[str, str] | None = None,
+    timeout: float | None = None,
+) -> HttpResponse:
+    """GET 请求"""
+    return await http_request("GET", url, params=params, headers=headers, timeout=timeout)
+
+
+async def http_post(
+    url: str,
+    *,
+    json: Any = None,
+    headers: dict[str, str] | None = None,
+    timeout: float | None = None,
+) -> HttpResponse:
+    """POST JSON 请求"""
+    return await http_request("POST", url, json=json, headers=headers, timeout=timeout)
+
+
+def _normalize_params(params: dict[str, Any] | None) -> dict[str, str] | None:
+    """aiohttp 只接受 str/int/float 参数，统一转换（bool 转为小写字符串）"""
+    if not params:
+        return None
+    normalized: dict[str, str] = {}
+    for key, value in params.items():
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            normalized[key] = "true" if value else "false"
+        else:
+            normalized[key] = str(value)
+    return normalized
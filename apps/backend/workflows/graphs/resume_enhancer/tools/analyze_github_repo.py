@@ -4,17 +4,28 @@
 为简历提供可参考的技术细节和量化指标。
 
 返回简洁摘要 + 详细文档内容（供 Agent 使用 write_file 保存）。
+支持批量分析多个仓库（analyze_github_repos）。
 """
+import asyncio
 import logging
 from typing import Any
 
-import requests
-
-from ._internal import format_repo_analysis_document, get_document_path, get_github_headers
+from ._internal import (
+    PRIORITY_BULK,
+    GitHubRateLimitError,
+    format_repo_analysis_document,
+    get_document_path,
+    github_get,
+    request_priority,
+)
 
 logger = logging.getLogger(__name__)
 
-GITHUB_API_BASE = "https://api.github.com"
+
+# 批量分析时的最大并发仓库数
+BATCH_MAX_CONCURRENCY = 4
+# 批量分析的仓库数量上限
+BATCH_MAX_REPOS = 10
 
 
 async def analyze_github_repo(repo: str) -> dict[str, Any]:
@@ -32,7 +43,74 @@ async def analyze_github_repo(repo: str) -> dict[str, Any]:
         - document_content: 详细的 Markdown 文档内容
         - suggested_path: 建议保存路径
     """
-    result = {
+    result = await _analyze_repo(repo)
+
+    # 生成文档内容和简洁摘要
+    document_content = format_repo_analysis_document(repo, result)
+    suggested_path = get_document_path("repo_analysis", repo)
+    summary = _format_summary(repo, result, suggested_path)
+
+    return {
+        "summary": summary,
+        "document_content": document_content,
+        "suggested_path": suggested_path,
+    }
+
+
+async def analyze_github_repos(repos: list[str]) -> dict[str, Any]:
+    """批量深度分析多个 GitHub 仓库
+
+    一次调用分析多个仓库，仓库之间并发执行并复用同一连接池，
+    适合需要横向对比多个同类项目的场景。
+
+    Args:
+        repos: 仓库名称列表，格式为 "owner/repo"（最多 10 个）
+
+    Returns:
+        包含汇总摘要和每个仓库文档的字典：
+        - summary: 所有仓库的简洁摘要
+        - documents: [{repo, document_content, suggested_path}] 列表
+    """
+    unique_repos = list(dict.fromkeys(r.strip() for r in repos if r and r.strip()))
+    if len(unique_repos) > BATCH_MAX_REPOS:
+        logger.info(f"批量分析仓库数 {len(unique_repos)} 超过上限，只分析前 {BATCH_MAX_REPOS} 个")
+        unique_repos = unique_repos[:BATCH_MAX_REPOS]
+
+    semaphore = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+
+    async def _analyze(repo: str) -> dict[str, Any]:
+        async with semaphore:
+            return await analyze_github_repo(repo)
+
+    # 批量分析优先级低于交互式请求，限流排队时让位
+    with request_priority(PRIORITY_BULK):
+        reports = await asyncio.gather(*(_analyze(repo) for repo in unique_repos))
+
+    documents = [
+        {
+            "repo": repo,
+            "document_content": report["document_content"],
+            "suggested_path": report["suggested_path"],
+        }
+        for repo, report in zip(unique_repos, reports)
+    ]
+    summary = "\n\n---\n\n".join(report["summary"] for report in reports)
+
+    return {
+        "summary": summary,
+        "documents": documents,
+    }
+
+
+async def _analyze_repo(repo: str) -> dict[str, Any]:
+    """执行仓库分析
+
+    执行计划：
+    1. 先获取仓库基本信息（仓库不存在/无权限时直接返回，不再请求其他接口）
+    2. 其余 5 个接口（语言、贡献者、提交、README、releases）并发请求，
+       任一接口抛出异常（如限流）时取消其余请求，不再占用连接和配额
+    """
+    result: dict[str, Any] = {
         "repo": repo,
         "basic_info": {},
         "tech_stack": [],
@@ -45,18 +123,36 @@ async def analyze_github_repo(repo: str) -> dict[str, Any]:
     }
 
     try:
-        # 1. 获取仓库基本信息
+        # 1. 获取仓库基本信息（门控后续请求）
         repo_info = await _get_repo_info(repo)
         if "error" in repo_info:
             result["error"] = repo_info["error"]
             return result
 
+        # 2. 并发获取其余信息（各接口内部已处理普通异常，失败时返回空值；限流会向上抛出）
+        try:
+            async with asyncio.TaskGroup() as tg:
+                languages_task = tg.create_task(_get_languages(repo))
+                contributors_task = tg.create_task(_get_contributors(repo))
+                commits_task = tg.create_task(_get_recent_commits(repo))
+                readme_task = tg.create_task(_get_readme(repo))
+                releases_task = tg.create_task(_get_releases(repo))
+        except ExceptionGroup as eg:
+            # TaskGroup 已取消其余请求，这里只保留第一个错误
+            raise eg.exceptions[0] from None
+
+        languages = languages_task.result()
+        contributors = contributors_task.result()
+        commits = commits_task.result()
+        readme = readme_task.result()
+        releases = releases_task.result()
+
         result["basic_info"] = {
             "name": repo_info.get("full_name", ""),
             "description": repo_info.get("description", ""),
             "homepage": repo_info.get("homepage", ""),
             "topics": repo_info.get("topics", []),
-            "license": repo_info.get("license", {}).get("name", "Unknown"),
+            "license": (repo_info.get("license") or {}).get("name", "Unknown"),
             "created_at": repo_info.get("created_at", ""),
             "updated_at": repo_info.get("updated_at", ""),
         }
@@ -69,8 +165,7 @@ async def analyze_github_repo(repo: str) -> dict[str, Any]:
             "size_kb": repo_info.get("size", 0),
         }
 
-        # 2. 获取语言分布（技术栈）
-        languages = await _get_languages(repo)
+        # 语言分布（技术栈）
         if languages:
             total_bytes = sum(languages.values())
             result["tech_stack"] = [
@@ -82,29 +177,25 @@ async def analyze_github_repo(repo: str) -> dict[str, Any]:
                 for lang, bytes_count in sorted(languages.items(), key=lambda x: x[1], reverse=True)
             ]
 
-        # 3. 获取贡献者信息
-        contributors = await _get_contributors(repo)
+        # 贡献者信息
         result["metrics"]["contributors"] = len(contributors)
         result["metrics"]["top_contributors"] = [
             {"login": c.get("login", ""), "contributions": c.get("contributions", 0)}
             for c in contributors[:5]
         ]
 
-        # 4. 获取最近的提交活动
-        commits = await _get_recent_commits(repo)
+        # 最近的提交活动
         result["recent_activity"] = commits
         if commits:
             result["metrics"]["commit_frequency"] = f"{len(commits)} commits in last 30 days"
 
-        # 5. 获取 README 并提取摘要
-        readme = await _get_readme(repo)
+        # README 摘要
         if readme:
             result["readme_summary"] = _extract_readme_summary(readme)
             result["key_features"] = _extract_features_from_readme(readme)
             result["architecture_highlights"] = _extract_architecture_from_readme(readme)
 
-        # 6. 获取仓库的 releases 信息
-        releases = await _get_releases(repo)
+        # releases 信息
         if releases:
             result["metrics"]["latest_release"] = releases[0].get("tag_name", "")
             result["metrics"]["total_releases"] = len(releases)
@@ -113,16 +204,7 @@ async def analyze_github_repo(repo: str) -> dict[str, Any]:
         logger.error(f"分析仓库 {repo} 失败: {e}")
         result["error"] = str(e)
 
-    # 生成文档内容和简洁摘要
-    document_content = format_repo_analysis_document(repo, result)
-    suggested_path = get_document_path("repo_analysis", repo)
-    summary = _format_summary(repo, result, suggested_path)
-
-    return {
-        "summary": summary,
-        "document_content": document_content,
-        "suggested_path": suggested_path,
-    }
+    return result
 
 
 def _format_summary(repo: str, result: dict, suggested_path: str) -> str:
@@ -172,14 +254,13 @@ def _format_summary(repo: str, result: dict, suggested_path: str) -> str:
 async def _get_repo_info(repo: str) -> dict:
     """获取仓库基本信息"""
     try:
-        url = f"{GITHUB_API_BASE}/repos/{repo}"
-        response = requests.get(url, headers=get_github_headers(), timeout=10)
-        if response.status_code == 200:
+        response = await github_get(f"/repos/{repo}", timeout=10)
+        if response.status == 200:
             return response.json()
-        elif response.status_code == 404:
+        elif response.status == 404:
             return {"error": f"仓库 {repo} 不存在"}
         else:
-            return {"error": f"GitHub API 错误: {response.status_code}"}
+            return {"error": f"GitHub API 错误: {response.status}"}
     except Exception as e:
         return {"error": str(e)}
 
@@ -187,10 +268,11 @@ async def _get_repo_info(repo: str) -> dict:
 async def _get_languages(repo: str) -> dict:
     """获取仓库语言分布"""
     try:
-        url = f"{GITHUB_API_BASE}/repos/{repo}/languages"
-        response = requests.get(url, headers=get_github_headers(), timeout=10)
-        if response.status_code == 200:
+        response = await github_get(f"/repos/{repo}/languages", timeout=10)
+        if response.status == 200:
             return response.json()
+    except GitHubRateLimitError:
+        raise  # 限流需要让调用方感知，不能当作空结果
     except Exception as e:
         logger.warning(f"获取语言分布失败: {e}")
     return {}
@@ -199,11 +281,12 @@ async def _get_languages(repo: str) -> dict:
 async def _get_contributors(repo: str, max_count: int = 30) -> list:
     """获取贡献者列表"""
     try:
-        url = f"{GITHUB_API_BASE}/repos/{repo}/contributors"
         params = {"per_page": max_count}
-        response = requests.get(url, headers=get_github_headers(), params=params, timeout=10)
-        if response.status_code == 200:
+        response = await github_get(f"/repos/{repo}/contributors", params=params, timeout=10)
+        if response.status == 200:
             return response.json()
+    except GitHubRateLimitError:
+        raise  # 限流需要让调用方感知，不能当作空结果
     except Exception as e:
         logger.warning(f"获取贡献者失败: {e}")
     return []
@@ -215,10 +298,9 @@ async def _get_recent_commits(repo: str, days: int = 30) -> list:
         from datetime import datetime, timedelta
         since = (datetime.utcnow() - timedelta(days=days)).isoformat() + "Z"
 
-        url = f"{GITHUB_API_BASE}/repos/{repo}/commits"
         params = {"since": since, "per_page": 100}
-        response = requests.get(url, headers=get_github_headers(), params=params, timeout=10)
-        if response.status_code == 200:
+        response = await github_get(f"/repos/{repo}/commits", params=params, timeout=10)
+        if response.status == 200:
             commits = response.json()
             return [
                 {
@@ -229,6 +311,8 @@ async def _get_recent_commits(repo: str, days: int = 30) -> list:
                 }
                 for c in commits[:10]  # 只返回最近 10 条
             ]
+    except GitHubRateLimitError:
+        raise  # 限流需要让调用方感知，不能当作空结果
     except Exception as e:
         logger.warning(f"获取提交记录失败: {e}")
     return []
@@ -237,12 +321,13 @@ async def _get_recent_commits(repo: str, days: int = 30) -> list:
 async def _get_readme(repo: str) -> str:
     """获取 README 内容"""
     try:
-        url = f"{GITHUB_API_BASE}/repos/{repo}/readme"
-        headers = get_github_headers()
-        headers["Accept"] = "application/vnd.github.v3.raw"
-        response = requests.get(url, headers=headers, timeout=10)
-        if response.status_code == 200:
+        response = await github_get(
+            f"/repos/{repo}/readme", accept="application/vnd.github.v3.raw", timeout=10
+        )
+        if response.status == 200:
             return response.text
+    except GitHubRateLimitError:
+        raise  # 限流需要让调用方感知，不能当作空结果
     except Exception as e:
         logger.warning(f"获取 README 失败: {e}")
     return ""
@@ -251,10 +336,9 @@ async def _get_readme(repo: str) -> str:
 async def _get_releases(repo: str, max_count: int = 10) -> list:
     """获取发布版本列表"""
     try:
-        url = f"{GITHUB_API_BASE}/repos/{repo}/releases"
         params = {"per_page": max_count}
-        response = requests.get(url, headers=get_github_headers(), params=params, timeout=10)
-        if response.status_code == 200:
+        response = await github_get(f"/repos/{repo}/releases", params=params, timeout=10)
+        if response.status == 200:
             releases = response.json()
             return [
                 {
@@ -265,6 +349,8 @@ async def _get_releases(repo: str, max_count: int = 10) -> list:
                 }
                 for r in releases
             ]
+    except GitHubRateLimitError:
+        raise  # 限流需要让调用方感知，不能当作空结果
     except Exception as e:
         logger.warning(f"获取 releases 失败: {e}")
     return []
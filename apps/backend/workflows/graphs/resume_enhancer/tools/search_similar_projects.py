@@ -8,18 +8,25 @@
 
 返回简洁摘要 + 详细文档内容（供 Agent 使用 write_file 保存）。
 """
+import asyncio
 import logging
+import os
 import re
 from datetime import datetime
 from typing import Any
 
-import requests
-
-from ._internal import get_document_path, get_github_headers
+from ._internal import (
+    PRIORITY_BULK,
+    GitHubRateLimitError,
+    get_document_path,
+    github_get,
+    request_priority,
+)
 
 logger = logging.getLogger(__name__)
 
-GITHUB_API_BASE = "https://api.github.com"
+# 检索词与 README 的并发请求上限（避免单次调用占满 GitHub 连接）
+README_FETCH_CONCURRENCY = int(os.getenv("GITHUB_README_CONCURRENCY", "6"))
 
 # 需要排除的官方框架/库仓库
 EXCLUDED_REPOS = {
@@ -124,51 +131,43 @@ async def search_similar_projects(
     search_queries = _generate_context_queries(resume_item, tech_stack, project_type)
     results["search_queries"] = search_queries
 
-    # 2. 搜索相似项目
-    seen_repos = set()
-    for query in search_queries:
-        repos = await _search_github_repos(query, max_results=max_results)
-
-        for repo in repos:
-            repo_key = repo.get("full_name", "")
-            if repo_key in seen_repos:
-                continue
-            seen_repos.add(repo_key)
-
-            if _is_framework_repo(repo):
-                continue
-
-            # 计算与用户项目的相似度
-            similarity = _calculate_similarity(repo, tech_stack, resume_item)
-            if similarity < 0.2:  # 相似度太低的跳过
-                continue
-
-            # 获取 README
-            readme = await _fetch_readme(repo_key)
-            readme_summary = _summarize_readme(readme) if readme else ""
-
-            # 提取技术亮点
-            tech_highlights = _extract_tech_highlights(repo, readme)
-
-            results["similar_projects"].append({
-                "name": repo.get("full_name", ""),
-                "url": repo.get("html_url", ""),
-                "description": repo.get("description", "") or "",
-                "stars": repo.get("stargazers_count", 0),
-                "language": repo.get("language", ""),
-                "topics": repo.get("topics", []),
-                "similarity_score": similarity,
-                "readme_summary": readme_summary,
-                "tech_highlights": tech_highlights,
-                "matched_query": query,
-            })
+    # 2. 并发执行所有检索词，去重并计算相似度
+    try:
+        candidates = await _collect_candidates(search_queries, tech_stack, resume_item, max_results)
+    except GitHubRateLimitError as e:
+        return {
+            "summary": f"搜索失败：{e}",
+            "document_content": "",
+            "suggested_path": "",
+            "retry_after": e.retry_after,
+        }
 
-    # 3. 按相似度和 stars 综合排序
-    results["similar_projects"] = sorted(
-        results["similar_projects"],
-        key=lambda x: (x.get("similarity_score", 0) * 0.6 + min(x.get("stars", 0) / 10000, 0.4)),
-        reverse=True
+    # 3. 按相似度和 stars 综合排序（排序不依赖 README），
+    #    只为能进入最终 top max_results 的候选并发获取 README
+    top_candidates = sorted(
+        candidates,
+        key=lambda c: _rank_score(c["similarity"], c["repo"].get("stargazers_count", 0)),
+        reverse=True,
     )[:max_results]
+    readmes = await _fetch_readmes(
+        [c["repo"].get("full_name", "") for c in top_candidates],
+        concurrency=README_FETCH_CONCURRENCY,
+    )
+
+    for candidate, readme in zip(top_candidates, readmes):
+        repo = candidate["repo"]
+        results["similar_projects"].append({
+            "name": repo.get("full_name", ""),
+            "url": repo.get("html_url", ""),
+            "description": repo.get("description", "") or "",
+            "stars": repo.get("stargazers_count", 0),
+            "language": repo.get("language", ""),
+            "topics": repo.get("topics", []),
+            "similarity_score": candidate["similarity"],
+            "readme_summary": _summarize_readme(readme) if readme else "",
+            "tech_highlights": _extract_tech_highlights(repo, readme),
+            "matched_query": candidate["query"],
+        })
 
     # 4. 从相似项目中提炼可学习的技术亮点
     results["learnable_highlights"] = _extract_learnable_highlights(
@@ -197,6 +196,101 @@ async def search_similar_projects(
     }
 
 
+async def _collect_candidates(
+    queries: list[str],
+    tech_stack: list[str],
+    resume_item: str,
+    max_results: int,
+) -> list[dict[str, Any]]:
+    """并发执行所有检索词，结果到达时即去重并过滤
+
+    并发数受 README_FETCH_CONCURRENCY 限制，请求本身还要经过 GitHub 限流调度。
+    同一仓库被多个检索词命中时归属于提交顺序最靠前的检索词，
+    返回顺序也按（检索词顺序, 结果位置）排列，与逐个执行的结果一致。
+
+    Returns:
+        候选列表，每项包含 repo（原始搜索结果）、similarity、query（首个命中的检索词）
+
+    Raises:
+        GitHubRateLimitError: 被限流且没有拿到任何候选
+    """
+    semaphore = asyncio.Semaphore(max(1, README_FETCH_CONCURRENCY))
+
+    async def _search(index: int, query: str) -> tuple[int, list[dict] | GitHubRateLimitError]:
+        async with semaphore:
+            try:
+                return index, await _search_github_repos(query, max_results=max_results)
+            except GitHubRateLimitError as e:
+                return index, e
+
+    # repo -> 命中位置（检索词序号, 结果序号），用于确定归属
+    seen_repos: dict[str, tuple[int, int]] = {}
+    candidates: dict[str, dict[str, Any]] = {}
+    rate_limit_error: GitHubRateLimitError | None = None
+
+    tasks = [asyncio.create_task(_search(i, q)) for i, q in enumerate(queries)]
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            index, repos = await next_result
+            if isinstance(repos, GitHubRateLimitError):
+                rate_limit_error = repos
+                continue
+
+            for position, repo in enumerate(repos):
+                repo_key = repo.get("full_name", "")
+                hit = (index, position)
+                known = seen_repos.get(repo_key)
+                if known is not None:
+                    # 已处理过：过滤结果与检索词无关，只在更靠前的检索词命中时改归属
+                    if hit < known:
+                        seen_repos[repo_key] = hit
+                        if repo_key in candidates:
+                            candidates[repo_key]["query"] = queries[index]
+                    continue
+                seen_repos[repo_key] = hit
+
+                if _is_framework_repo(repo):
+                    continue
+
+                # 计算与用户项目的相似度
+                similarity = _calculate_similarity(repo, tech_stack, resume_item)
+                if similarity < 0.2:  # 相似度太低的跳过
+                    continue
+
+                candidates[repo_key] = {
+                    "repo": repo,
+                    "similarity": similarity,
+                    "query": queries[index],
+                }
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    # 全部检索词都被限流时明确告知调用方，而不是返回空结果
+    if rate_limit_error is not None and not candidates:
+        raise rate_limit_error
+
+    return sorted(candidates.values(), key=lambda c: seen_repos[c["repo"].get("full_name", "")])
+
+
+def _rank_score(similarity: float, stars: int) -> float:
+    """综合排序得分：相似度占 0.6，stars 最多贡献 0.4"""
+    return similarity * 0.6 + min(stars / 10000, 0.4)
+
+
+async def _fetch_readmes(repos: list[str], concurrency: int = README_FETCH_CONCURRENCY) -> list[str]:
+    """并发获取多个仓库的 README，结果顺序与输入一致"""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def _fetch(repo: str) -> str:
+        async with semaphore:
+            return await _fetch_readme(repo)
+
+    # README 属于批量请求，限流排队时让位给交互式搜索
+    with request_priority(PRIORITY_BULK):
+        return list(await asyncio.gather(*(_fetch(repo) for repo in repos)))
+
+
 def _generate_context_queries(resume_item: str, tech_stack: list[str], project_type: str) -> list[str]:
     """根据项目上下文生成精准检索词"""
     if not tech_stack:
@@ -495,7 +589,6 @@ def _format_summary(results: dict, suggested_path: str) -> str:
 async def _search_github_repos(query: str, max_results: int = 10) -> list[dict]:
     """搜索 GitHub 仓库"""
     try:
-        url = f"{GITHUB_API_BASE}/search/repositories"
         params = {
             "q": query,
             "sort": "stars",
@@ -503,13 +596,15 @@ async def _search_github_repos(query: str, max_results: int = 10) -> list[dict]:
             "per_page": max_results,
         }
 
-        response = requests.get(url, headers=get_github_headers(), params=params, timeout=15)
+        response = await github_get("/search/repositories", params=params, timeout=15)
 
-        if response.status_code == 200:
+        if response.status == 200:
             return response.json().get("items", [])
         else:
-            logger.warning(f"GitHub 搜索失败: {response.status_code} - {query}")
+            logger.warning(f"GitHub 搜索失败: {response.status} - {query}")
 
+    except GitHubRateLimitError:
+        raise
     except Exception as e:
         logger.error(f"GitHub 搜索异常 ({query}): {e}")
 
@@ -519,13 +614,11 @@ async def _search_github_repos(query: str, max_results: int = 10) -> list[dict]:
 async def _fetch_readme(repo: str) -> str:
     """获取仓库 README 内容"""
     try:
-        url = f"{GITHUB_API_BASE}/repos/{repo}/readme"
-        headers = get_github_headers()
-        headers["Accept"] = "application/vnd.github.v3.raw"
-
-        response = requests.get(url, headers=headers, timeout=15)
+        response = await github_get(
+            f"/repos/{repo}/readme", accept="application/vnd.github.v3.raw", timeout=15
+        )
 
-        if response.status_code == 200:
+        if response.status == 200:
             return response.text
 
     except Exception as e:
@@ -7,18 +7,37 @@
 - Reddit: 技术讨论帖子
 - HuggingFace: AI 模型和论文
 
+所有来源及其关键词并发请求，受全局截止时间和单来源预算约束：
+超时的来源返回已到达的部分结果，并在 data_sources 中标记为 partial。
+
 返回简洁摘要 + 详细文档内容（供 Agent 使用 write_file 保存）。
 """
+import asyncio
 import logging
 from datetime import datetime
-from typing import Any
-
-import requests
+from typing import Any, Awaitable, Callable
 
-from ._internal import get_document_path
+from ._internal import get_document_path, http_get, http_post
 
 logger = logging.getLogger(__name__)
 
+# 全局截止时间（秒）：到期后直接返回已到达的结果
+SEARCH_DEADLINE = 7.0
+
+# 单来源时间预算（秒），均短于全局截止时间；未配置的来源只受全局截止时间约束
+SOURCE_BUDGETS: dict[str, float] = {
+    "DEV.to": 6.5,
+    "掘金": 6.5,
+    "InfoQ": 6.0,
+    "Reddit": 6.0,
+    "HuggingFace": 5.0,
+}
+
+# 部分结果标记（追加在 data_sources 的来源名后）
+PARTIAL_MARK = " (partial)"
+
+_SourceFn = Callable[[list[str], int, list[dict]], Awaitable[list[dict]]]
+
 
 async def search_tech_articles(
     keywords: list[str],
@@ -45,39 +64,32 @@ async def search_tech_articles(
         "discussions": [],
         "models": [],
         "data_sources": [],
+        "partial_sources": [],
     }
 
-    # 1. DEV.to (英文技术博客)
-    dev_articles = await _search_devto(keywords, max_results)
-    if dev_articles:
-        results["data_sources"].append("DEV.to")
-        results["articles"].extend(dev_articles)
-
-    # 2. 掘金 (中文技术社区)
-    if language == "zh":
-        juejin_articles = await _search_juejin(keywords, max_results)
-        if juejin_articles:
-            results["data_sources"].append("掘金")
-            results["articles"].extend(juejin_articles)
-
-    # 3. InfoQ (架构/企业级)
+    # (来源名, 结果分类, 搜索函数)，顺序即文档中的展示顺序
+    sources: list[tuple[str, str, _SourceFn]] = [
+        ("DEV.to", "articles", _search_devto),           # 英文技术博客
+    ]
     if language == "zh":
-        infoq_articles = await _search_infoq(keywords, max_results)
-        if infoq_articles:
-            results["data_sources"].append("InfoQ")
-            results["articles"].extend(infoq_articles)
-
-    # 4. Reddit (技术讨论)
-    reddit_posts = await _search_reddit(keywords, max_results)
-    if reddit_posts:
-        results["data_sources"].append("Reddit")
-        results["discussions"].extend(reddit_posts)
-
-    # 5. HuggingFace (AI 模型)
-    hf_models = await _search_huggingface(keywords, max_results)
-    if hf_models:
-        results["data_sources"].append("HuggingFace")
-        results["models"].extend(hf_models)
+        sources.append(("掘金", "articles", _search_juejin))    # 中文技术社区
+        sources.append(("InfoQ", "articles", _search_infoq))    # 架构/企业级
+    sources.append(("Reddit", "discussions", _search_reddit))  # 技术讨论
+    sources.append(("HuggingFace", "models", _search_huggingface))  # AI 模型
+
+    sinks, partial = await _gather_sources(sources, keywords, max_results)
+
+    for name, category, _ in sources:
+        items = sinks[name][:max_results]
+        # 没有结果的超时来源也要标记，调用方才能区分"无结果"和"没来得及返回"
+        if not items and name not in partial:
+            continue
+        if name in partial:
+            results["data_sources"].append(f"{name}{PARTIAL_MARK}")
+            results["partial_sources"].append(name)
+        else:
+            results["data_sources"].append(name)
+        results[category].extend(items)
 
     # 生成文档内容和简洁摘要
     document_content = _format_document(keywords, results)
@@ -91,68 +103,111 @@ async def search_tech_articles(
     }
 
 
-async def _search_devto(keywords: list[str], max_results: int = 5) -> list[dict]:
+async def _gather_sources(
+    sources: list[tuple[str, str, _SourceFn]],
+    keywords: list[str],
+    max_results: int,
+    deadline: float = SEARCH_DEADLINE,
+) -> tuple[dict[str, list[dict]], set[str]]:
+    """并发执行所有来源
+
+    每个来源把结果实时写入自己的 sink，超时被取消时已写入的结果仍然保留。
+    单来源的时间预算不超过 deadline。
+
+    Returns:
+        (来源名 → 结果列表, 超时未完成的来源名集合)
+    """
+    sinks: dict[str, list[dict]] = {name: [] for name, _, _ in sources}
+    tasks: dict[asyncio.Task[Any], str] = {}
+    for name, _, search_fn in sources:
+        budget = min(SOURCE_BUDGETS.get(name, deadline), deadline)
+        task = asyncio.create_task(
+            asyncio.wait_for(search_fn(keywords, max_results, sinks[name]), timeout=budget)
+        )
+        tasks[task] = name
+
+    done, pending = await asyncio.wait(tasks.keys(), timeout=deadline)
+
+    partial: set[str] = set()
+    for task in pending:
+        task.cancel()
+        partial.add(tasks[task])
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    for task in done:
+        error = task.exception()
+        if isinstance(error, asyncio.TimeoutError):
+            partial.add(tasks[task])
+        elif error is not None:
+            logger.warning(f"{tasks[task]} 搜索失败: {error}")
+
+    if partial:
+        logger.info(f"以下来源超时，返回部分结果: {', '.join(sorted(partial))}")
+
+    return sinks, partial
+
+
+def _parse_devto_article(item: dict) -> dict:
+    """DEV.to 文章转换为统一格式"""
+    return {
+        "title": item.get("title", ""),
+        "url": item.get("url", ""),
+        "summary": item.get("description", "")[:200],
+        "tags": item.get("tag_list", []),
+        "source": "DEV.to",
+        "author": item.get("user", {}).get("name", ""),
+        "reactions": item.get("positive_reactions_count", 0),
+        "published_at": item.get("published_at", ""),
+    }
+
+
+async def _search_devto(
+    keywords: list[str], max_results: int = 5, sink: list[dict] | None = None
+) -> list[dict]:
     """搜索 DEV.to 文章"""
-    articles = []
-    try:
-        for keyword in keywords[:2]:
-            url = "https://dev.to/api/articles"
+    articles = sink if sink is not None else []
+    url = "https://dev.to/api/articles"
+    headers = {"User-Agent": "ResumeAgent/1.0"}
+
+    async def _search_tag(keyword: str) -> None:
+        try:
             params = {
                 "tag": keyword.lower().replace(" ", ""),
                 "per_page": max_results,
                 "top": 7,
             }
-            headers = {"User-Agent": "ResumeAgent/1.0"}
-
-            response = requests.get(url, params=params, headers=headers, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                for item in data[:max_results]:
-                    articles.append({
-                        "title": item.get("title", ""),
-                        "url": item.get("url", ""),
-                        "summary": item.get("description", "")[:200],
-                        "tags": item.get("tag_list", []),
-                        "source": "DEV.to",
-                        "author": item.get("user", {}).get("name", ""),
-                        "reactions": item.get("positive_reactions_count", 0),
-                        "published_at": item.get("published_at", ""),
-                    })
-
-            if len(articles) >= max_results:
-                break
-
-        # 如果 tag 搜索没有结果，尝试通用搜索
-        if not articles:
-            url = "https://dev.to/api/articles"
+            response = await http_get(url, params=params, headers=headers, timeout=10)
+            if response.status == 200:
+                for item in response.json()[:max_results]:
+                    articles.append(_parse_devto_article(item))
+        except Exception as e:
+            logger.warning(f"DEV.to 搜索失败 ({keyword}): {e}")
+
+    await asyncio.gather(*(_search_tag(keyword) for keyword in keywords[:2]))
+
+    # 如果 tag 搜索没有结果，尝试通用搜索
+    if not articles:
+        try:
             params = {"per_page": max_results}
-            response = requests.get(url, params=params, headers={"User-Agent": "ResumeAgent/1.0"}, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                for item in data[:max_results]:
+            response = await http_get(url, params=params, headers=headers, timeout=10)
+            if response.status == 200:
+                for item in response.json()[:max_results]:
                     title = item.get("title", "").lower()
                     desc = item.get("description", "").lower()
                     if any(kw.lower() in title or kw.lower() in desc for kw in keywords):
-                        articles.append({
-                            "title": item.get("title", ""),
-                            "url": item.get("url", ""),
-                            "summary": item.get("description", "")[:200],
-                            "tags": item.get("tag_list", []),
-                            "source": "DEV.to",
-                            "author": item.get("user", {}).get("name", ""),
-                            "reactions": item.get("positive_reactions_count", 0),
-                            "published_at": item.get("published_at", ""),
-                        })
-
-    except Exception as e:
-        logger.warning(f"DEV.to 搜索失败: {e}")
+                        articles.append(_parse_devto_article(item))
+        except Exception as e:
+            logger.warning(f"DEV.to 搜索失败: {e}")
 
     return articles[:max_results]
 
 
-async def _search_juejin(keywords: list[str], max_results: int = 5) -> list[dict]:
+async def _search_juejin(
+    keywords: list[str], max_results: int = 5, sink: list[dict] | None = None
+) -> list[dict]:
     """搜索掘金文章"""
-    articles = []
+    articles = sink if sink is not None else []
     try:
         search_query = " ".join(keywords)
         url = "https://api.juejin.cn/search_api/v1/search"
@@ -169,8 +224,8 @@ async def _search_juejin(keywords: list[str], max_results: int = 5) -> list[dict
             "User-Agent": "ResumeAgent/1.0",
         }
 
-        response = requests.post(url, json=payload, headers=headers, timeout=10)
-        if response.status_code == 200:
+        response = await http_post(url, json=payload, headers=headers, timeout=10)
+        if response.status == 200:
             data = response.json()
             items = data.get("data", [])
             for item in items[:max_results]:
@@ -196,9 +251,11 @@ async def _search_juejin(keywords: list[str], max_results: int = 5) -> list[dict
     return articles[:max_results]
 
 
-async def _search_infoq(keywords: list[str], max_results: int = 3) -> list[dict]:
+async def _search_infoq(
+    keywords: list[str], max_results: int = 3, sink: list[dict] | None = None
+) -> list[dict]:
     """搜索 InfoQ 中文站文章"""
-    articles = []
+    articles = sink if sink is not None else []
     try:
         url = "https://www.infoq.cn/public/v1/article/getList"
         payload = {
@@ -213,8 +270,8 @@ async def _search_infoq(keywords: list[str], max_results: int = 3) -> list[dict]
             "Referer": "https://www.infoq.cn/",
         }
 
-        response = requests.post(url, json=payload, headers=headers, timeout=10)
-        if response.status_code == 200:
+        response = await http_post(url, json=payload, headers=headers, timeout=10)
+        if response.status == 200:
             data = response.json()
             items = data.get("data", [])
             for item in items[:max_results]:
@@ -237,11 +294,14 @@ async def _search_infoq(keywords: list[str], max_results: int = 3) -> list[dict]
     return articles[:max_results]
 
 
-async def _search_reddit(keywords: list[str], max_results: int = 5) -> list[dict]:
+async def _search_reddit(
+    keywords: list[str], max_results: int = 5, sink: list[dict] | None = None
+) -> list[dict]:
     """搜索 Reddit 讨论"""
-    posts = []
-    try:
-        for keyword in keywords[:2]:
+    posts = sink if sink is not None else []
+
+    async def _search_keyword(keyword: str) -> None:
+        try:
             # 针对 AI 相关关键词优化搜索
             search_term = keyword
             if "agent" in keyword.lower():
@@ -258,8 +318,8 @@ async def _search_reddit(keywords: list[str], max_results: int = 5) -> list[dict
             }
             headers = {"User-Agent": "ResumeAgent/1.0"}
 
-            response = requests.get(url, params=params, headers=headers, timeout=10)
-            if response.status_code == 200:
+            response = await http_get(url, params=params, headers=headers, timeout=10)
+            if response.status == 200:
                 data = response.json()
                 for child in data.get("data", {}).get("children", [])[:max_results]:
                     post = child.get("data", {})
@@ -271,18 +331,22 @@ async def _search_reddit(keywords: list[str], max_results: int = 5) -> list[dict
                         "url": f"https://reddit.com{post.get('permalink', '')}",
                         "source": "Reddit",
                     })
+        except Exception as e:
+            logger.warning(f"Reddit 搜索失败 ({keyword}): {e}")
 
-    except Exception as e:
-        logger.warning(f"Reddit 搜索失败: {e}")
+    await asyncio.gather(*(_search_keyword(keyword) for keyword in keywords[:2]))
 
     return posts[:max_results]
 
 
-async def _search_huggingface(keywords: list[str], max_results: int = 5) -> list[dict]:
+async def _search_huggingface(
+    keywords: list[str], max_results: int = 5, sink: list[dict] | None = None
+) -> list[dict]:
     """搜索 HuggingFace 模型"""
-    models = []
-    try:
-        for keyword in keywords[:2]:
+    models = sink if sink is not None else []
+
+    async def _search_keyword(keyword: str) -> None:
+        try:
             url = "https://huggingface.co/api/models"
             params = {
                 "search": keyword,
@@ -290,8 +354,8 @@ async def _search_huggingface(keywords: list[str], max_results: int = 5) -> list
                 "direction": -1,
                 "limit": max_results
             }
-            response = requests.get(url, params=params, timeout=10)
-            if response.status_code == 200:
+            response = await http_get(url, params=params, timeout=10)
+            if response.status == 200:
                 data = response.json()
                 for m in data[:max_results]:
                     models.append({
@@ -302,9 +366,10 @@ async def _search_huggingface(keywords: list[str], max_results: int = 5) -> list
                         "url": f"https://huggingface.co/{m.get('modelId', '')}",
                         "source": "HuggingFace",
                     })
+        except Exception as e:
+            logger.warning(f"HuggingFace 搜索失败 ({keyword}): {e}")
 
-    except Exception as e:
-        logger.warning(f"HuggingFace 搜索失败: {e}")
+    await asyncio.gather(*(_search_keyword(keyword) for keyword in keywords[:2]))
 
     return models[:max_results]
 